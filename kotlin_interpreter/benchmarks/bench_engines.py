@@ -0,0 +1,121 @@
+"""
+Benchmark the execution engines against each other.
+
+Runs each workload on every Evaluator engine, the bytecode VM and the
+Python transpiler, checks that they print the same output, and reports
+the best of N wall-clock times (VM and py times include compiling; the
+py engine runs without its code cache so compile() is counted).
+
+Usage:
+    python benchmarks/bench_engines.py [--repeat N] [file.kt ...]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.lexer import Lexer
+from src.parser import Parser
+from src.runtime import Evaluator
+from src.vm import VM
+from src.codegen import PythonEngine
+
+
+WORKLOADS = {
+    "fib(22)": """
+        fun fib(n: Int): Int {
+            if (n < 2) { return n }
+            return fib(n - 1) + fib(n - 2)
+        }
+        fun main() { println(fib(22)) }
+    """,
+    "loop 300k": """
+        fun main() {
+            var i = 0
+            var total = 0
+            while (i < 300000) {
+                if (i % 3 == 0) { total = total + i } else { total = total - 1 }
+                i = i + 1
+            }
+            println(total)
+        }
+    """,
+    "returns 100k": """
+        fun clamp(n: Int): Int {
+            if (n < 10) { return 10 }
+            if (n > 90) { return 90 }
+            return n
+        }
+        fun main() {
+            var i = 0
+            var total = 0
+            while (true) {
+                i = i + 1
+                if (i > 100000) { break }
+                total = total + clamp(i % 100)
+            }
+            println(total)
+        }
+    """,
+    "tailrec sum": """
+        tailrec fun sum(n: Int, acc: Int): Int {
+            if (n == 0) { return acc }
+            return sum(n - 1, acc + n)
+        }
+        fun main() { println(sum(200000, 0)) }
+    """,
+}
+
+
+def run_once(source: str, engine: str):
+    """Run a program; return (seconds, output)."""
+    program = Parser(Lexer(source).tokenize()).parse()
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        if engine == "vm":
+            VM().evaluate(program)
+        elif engine == "py":
+            PythonEngine(cache_dir=None).evaluate(program)
+        else:
+            Evaluator(engine=engine).evaluate(program)
+    return time.perf_counter() - start, output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare execution engines")
+    parser.add_argument("files", nargs="*", help="Extra Kotlin files to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine (best is kept)")
+    args = parser.parse_args()
+
+    workloads = dict(WORKLOADS)
+    for path in args.files:
+        workloads[Path(path).name] = Path(path).read_text()
+
+    engines = Evaluator.ENGINES + ("vm", "py")
+    print(f"{'workload':<16}" + "".join(f"{engine:>12}" for engine in engines) + f"{'speedup':>10}")
+    for name, source in workloads.items():
+        times = {}
+        outputs = set()
+        for engine in engines:
+            best = None
+            for _ in range(args.repeat):
+                seconds, output = run_once(source, engine)
+                best = seconds if best is None else min(best, seconds)
+                outputs.add(output)
+            times[engine] = best
+        if len(outputs) != 1:
+            print(f"{name}: engines disagree on output!")
+            sys.exit(1)
+        speedup = times[engines[0]] / max(min(times.values()), 1e-9)
+        print(f"{name:<16}" + "".join(f"{times[e]:>11.3f}s" for e in engines) + f"{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
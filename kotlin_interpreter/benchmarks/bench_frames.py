@@ -0,0 +1,126 @@
+"""
+Measure Environment pooling on call-heavy workloads.
+
+Runs each workload in the tree-walker with the environment pool on and
+off (limit 0), and reports the best of N wall-clock times, environments
+created, and garbage-collector activity: number of collections, total
+time spent collecting and the longest single pause.
+
+Usage:
+    python benchmarks/bench_frames.py [--repeat N] [file.kt ...]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.lexer import Lexer
+from src.parser import Parser
+from src.runtime import Evaluator
+
+
+WORKLOADS = {
+    "fib(22)": """
+        fun fib(n: Int): Int {
+            if (n < 2) { return n }
+            return fib(n - 1) + fib(n - 2)
+        }
+        fun main() { println(fib(22)) }
+    """,
+    "depth 300 x300": """
+        fun depth(n: Int): Int {
+            if (n == 0) { return 0 }
+            val next = n - 1
+            return 1 + depth(next)
+        }
+        fun main() {
+            var i = 0
+            var total = 0
+            while (i < 300) {
+                total = total + depth(300)
+                i = i + 1
+            }
+            println(total)
+        }
+    """,
+}
+
+
+class GcMonitor:
+    """Collects GC pause statistics through gc.callbacks."""
+
+    def __init__(self):
+        self.collections = 0
+        self.total = 0.0
+        self.longest = 0.0
+        self._start = 0.0
+
+    def __call__(self, phase: str, info: dict):
+        if phase == "start":
+            self._start = time.perf_counter()
+        else:
+            pause = time.perf_counter() - self._start
+            self.collections += 1
+            self.total += pause
+            self.longest = max(self.longest, pause)
+
+
+def run(source: str, pooled: bool, repeat: int):
+    """Return (best seconds, environments created, GcMonitor of the best run, output)."""
+    best = None
+    for _ in range(repeat):
+        program = Parser(Lexer(source).tokenize()).parse()
+        evaluator = Evaluator()
+        if not pooled:
+            evaluator.env_pool.limit = 0
+        monitor = GcMonitor()
+        output = io.StringIO()
+        gc.collect()
+        gc.callbacks.append(monitor)
+        try:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(output):
+                evaluator.evaluate(program)
+            seconds = time.perf_counter() - start
+        finally:
+            gc.callbacks.remove(monitor)
+        if best is None or seconds < best[0]:
+            best = (seconds, evaluator.pool_stats()['created'], monitor, output.getvalue())
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure environment pooling")
+    parser.add_argument("files", nargs="*", help="Extra Kotlin files to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (best is kept)")
+    args = parser.parse_args()
+    sys.setrecursionlimit(20000)
+
+    workloads = dict(WORKLOADS)
+    for path in args.files:
+        workloads[Path(path).name] = Path(path).read_text()
+
+    print(f"{'workload':<16}{'mode':>8}{'time':>10}{'envs':>10}{'GCs':>7}{'GC total':>11}{'longest':>10}")
+    for name, source in workloads.items():
+        outputs = set()
+        for pooled in (False, True):
+            seconds, created, monitor, output = run(source, pooled, args.repeat)
+            outputs.add(output)
+            print(
+                f"{name:<16}{'pool' if pooled else 'no pool':>8}{seconds:>9.3f}s{created:>10}"
+                f"{monitor.collections:>7}{monitor.total * 1000:>9.2f}ms{monitor.longest * 1000:>8.2f}ms"
+            )
+        if len(outputs) != 1:
+            print(f"{name}: modes disagree on output!")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
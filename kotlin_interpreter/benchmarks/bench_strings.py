@@ -0,0 +1,85 @@
+"""
+Benchmark building a 1 MB String with and without ropes.
+
+Each workload appends about 1 MB of text in a loop ('s = s + x' or
+buildString { append(x) }) and prints it. Runs every engine with ropes
+and with ropes disabled (every concatenation copies, as plain Python
+str values do), checks that the outputs agree and reports the best of
+N wall-clock times.
+
+Usage:
+    python benchmarks/bench_strings.py [--repeat N] [--engines tree,vm,...] [file.kt ...]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.runtime import Evaluator, ropes
+
+from bench_engines import run_once
+
+
+WORKLOADS = {
+    "s = s + x (1 MB)": """
+        fun main() {
+            var s = ""
+            var i = 0
+            while (i < 100000) {
+                s = s + "line " + i + "\\n"
+                i = i + 1
+            }
+            println(s == s + "")
+            print(s)
+        }
+    """,
+    "buildString (1 MB)": """
+        fun main() {
+            val s = buildString {
+                for (i in 0 until 100000) { append("line ") appendLine(i) }
+            }
+            print(s)
+        }
+    """,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare String building with and without ropes")
+    parser.add_argument("files", nargs="*", help="Extra Kotlin files to benchmark")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per engine and mode (best is kept)")
+    parser.add_argument("--engines", default=",".join(Evaluator.ENGINES + ("vm", "py")),
+                        help="Comma-separated engines to run")
+    args = parser.parse_args()
+
+    workloads = dict(WORKLOADS)
+    for path in args.files:
+        workloads[Path(path).name] = Path(path).read_text()
+
+    rope_length = ropes.MIN_LENGTH
+    print(f"{'workload':<20}{'engine':>8}{'ropes':>10}{'copying':>10}{'speedup':>9}")
+    for name, source in workloads.items():
+        for engine in args.engines.split(","):
+            times = {}
+            outputs = set()
+            for mode, min_length in (("ropes", rope_length), ("copying", sys.maxsize)):
+                ropes.MIN_LENGTH = min_length
+                best = None
+                for _ in range(args.repeat):
+                    seconds, output = run_once(source, engine)
+                    best = seconds if best is None else min(best, seconds)
+                    outputs.add(output)
+                times[mode] = best
+            ropes.MIN_LENGTH = rope_length
+            if len(outputs) != 1:
+                print(f"{name} ({engine}): modes disagree on output!")
+                sys.exit(1)
+            print(f"{name:<20}{engine:>8}{times['ropes']:>9.3f}s{times['copying']:>9.3f}s"
+                  f"{times['copying'] / times['ropes']:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
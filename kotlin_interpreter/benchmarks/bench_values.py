@@ -0,0 +1,112 @@
+"""
+Compare boxed and unboxed value representations in the tree-walker.
+
+For each workload reports the best of N wall-clock times and the number
+of value wrappers (IntValue, StringValue, BooleanValue, UnitValue)
+allocated per operator evaluated.
+
+Usage:
+    python benchmarks/bench_values.py [--repeat N] [file.kt ...]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.lexer import Lexer
+from src.parser import Parser, BinaryExpression, UnaryExpression
+from src.runtime import Evaluator, IntValue, StringValue, BooleanValue, UnitValue
+
+from bench_engines import WORKLOADS
+
+
+WRAPPERS = (IntValue, StringValue, BooleanValue, UnitValue)
+
+
+class CountingEvaluator(Evaluator):
+    """Evaluator counting the operators it evaluates."""
+
+    operations = 0
+
+    def eval_expression(self, node):
+        # Counted here: quickening rebinds the per-operator methods
+        if type(node) in (BinaryExpression, UnaryExpression):
+            CountingEvaluator.operations += 1
+        return super().eval_expression(node)
+
+
+@contextlib.contextmanager
+def count_wrappers():
+    """Count wrapper allocations inside the block (yields a one-item list)."""
+    count = [0]
+    originals = {cls: cls.__init__ for cls in WRAPPERS}
+
+    def counting(init):
+        def __init__(self, *args, **kwargs):
+            count[0] += 1
+            init(self, *args, **kwargs)
+        return __init__
+
+    for cls, init in originals.items():
+        cls.__init__ = counting(init)
+    try:
+        yield count
+    finally:
+        for cls, init in originals.items():
+            cls.__init__ = init
+
+
+def parse(source: str):
+    return Parser(Lexer(source).tokenize()).parse()
+
+
+def run(source: str, unboxed: bool, repeat: int):
+    """Return (best seconds, wrappers per operation, output)."""
+    best = None
+    for _ in range(repeat):
+        program = parse(source)
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            Evaluator(unboxed=unboxed).evaluate(program)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    CountingEvaluator.operations = 0
+    with count_wrappers() as count, contextlib.redirect_stdout(io.StringIO()):
+        CountingEvaluator(unboxed=unboxed).evaluate(parse(source))
+    per_operation = count[0] / max(CountingEvaluator.operations, 1)
+    return best, per_operation, output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare boxed and unboxed values")
+    parser.add_argument("files", nargs="*", help="Extra Kotlin files to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (best is kept)")
+    args = parser.parse_args()
+
+    workloads = dict(WORKLOADS)
+    for path in args.files:
+        workloads[Path(path).name] = Path(path).read_text()
+
+    print(f"{'workload':<16}{'boxed':>10}{'unboxed':>10}{'speedup':>9}{'alloc/op boxed':>17}{'unboxed':>9}")
+    for name, source in workloads.items():
+        boxed_time, boxed_allocs, boxed_output = run(source, False, args.repeat)
+        raw_time, raw_allocs, raw_output = run(source, True, args.repeat)
+        if boxed_output != raw_output:
+            print(f"{name}: modes disagree on output!")
+            sys.exit(1)
+        print(
+            f"{name:<16}{boxed_time:>9.3f}s{raw_time:>9.3f}s{boxed_time / raw_time:>8.1f}x"
+            f"{boxed_allocs:>17.2f}{raw_allocs:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
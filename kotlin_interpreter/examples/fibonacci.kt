@@ -0,0 +1,15 @@
+// Naive recursive Fibonacci - exponential without memoization
+fun fib(n: Int): Int {
+    if (n < 2) {
+        return n
+    }
+    return fib(n - 1) + fib(n - 2)
+}
+
+fun main() {
+    var i = 0
+    while (i <= 25) {
+        println("fib(" + i + ") = " + fib(i))
+        i = i + 1
+    }
+}
@@ -6,12 +6,73 @@ Demo mô phỏng quá trình biên dịch và thực thi Kotlin từ A đến Z.
 """
 
 import argparse
+import sys
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 from src.lexer import Lexer, Token
 from src.parser import Parser
-from src.semantic import ErrorCollector, SymbolTable, CollectionPass
-from src.runtime import Evaluator
+from src.semantic import ParallelChecker
+from src.optimizer import Optimizer
+from src.runtime import (Evaluator, ExecutionTimeout, ResourceLimitExceeded, StackOverflowError,
+                         AdmissionPolicy, AdmissionDecision, OutputSink, Profiler)
+from src.vm import VM, BytecodeCompiler, disassemble_module
+from src.codegen import PythonEngine, PythonTranspiler
+
+
+# Execution engines: the Evaluator's, the bytecode VM and transpiled Python
+ENGINES = Evaluator.ENGINES + ("vm", "py")
+
+
+@dataclass
+class RunOptions:
+    """Tùy chọn chạy chương trình (từ command line)."""
+    memoize: bool = False
+    optimize: bool = True
+    stats: bool = False
+    jobs: int = 1
+    admission: bool = True
+    time_limit: Optional[float] = None
+    max_steps: Optional[int] = None
+    memory_limit: Optional[int] = None
+    engine: str = "tree"
+    disassemble: bool = False
+    unboxed: bool = False
+    quicken: bool = True
+    max_depth: Optional[int] = None
+    tier_threshold: Optional[int] = None
+    output: Optional[str] = None  # None: theo dòng nếu stdout là terminal, ngược lại có buffer
+    profile: bool = False
+    flamegraph: Optional[str] = None  # File collapsed stacks cho flamegraph
+    profile_json: Optional[str] = None  # File JSON tóm tắt profile
+    
+    def make_output(self) -> OutputSink:
+        """Tạo sink cho print/println theo chế độ flush."""
+        mode = self.output or ("line" if sys.stdout.isatty() else "buffered")
+        return OutputSink(mode=mode)
+    
+    def make_evaluator(self, decision: Optional[AdmissionDecision] = None):
+        """Tạo Evaluator (hoặc VM) theo tùy chọn (và quyết định admission nếu có)."""
+        memoize = self.memoize
+        time_limit = self.time_limit
+        if decision is not None:
+            memoize = memoize or decision.memoize
+            if time_limit is None:
+                time_limit = decision.time_limit
+        # VM and py engines have no memoization: pure functions run as plain calls
+        depth = {} if self.max_depth is None else {"max_depth": self.max_depth}
+        output = self.make_output()
+        if self.engine == "vm":
+            return VM(time_limit=time_limit, output=output, **depth)
+        if self.engine == "py":
+            return PythonEngine(time_limit=time_limit, output=output)
+        profiler = Profiler() if self.profile else None
+        tiers = {} if self.tier_threshold is None else {"tier_threshold": self.tier_threshold}
+        return Evaluator(memoize=memoize, time_limit=time_limit, max_steps=self.max_steps,
+                         memory_limit=self.memory_limit, engine=self.engine,
+                         unboxed=self.unboxed, quicken=self.quicken, output=output,
+                         profiler=profiler, **depth, **tiers)
 
 
 def print_header(title: str):
@@ -27,7 +88,107 @@ def print_step(step: str, description: str):
     print("-" * 70)
 
 
-def demo_full_pipeline(source_code: str, show_details: bool = True):
+def print_memo_stats(evaluator: Evaluator):
+    """Print memoization cache statistics."""
+    stats = evaluator.memo_stats()
+    if not stats:
+        print("Memoization: không có hàm thuần (pure) nào được cache")
+        return
+    print("Memoization (hàm thuần):")
+    for entry in stats:
+        print(
+            f"  - {entry['function']}: {entry['hits']} hits, {entry['misses']} misses, "
+            f"{entry['size']}/{entry['max_size']} entries"
+        )
+
+
+def print_stats(optimizer: Optimizer, evaluator: Evaluator, options: RunOptions,
+                decision: Optional[AdmissionDecision] = None):
+    """Print optimizer, cost estimate and runtime statistics (--stats)."""
+    print_step("S", "Thống kê (Statistics)")
+    if decision is not None:
+        print(f"Admission: {decision}")
+        print(decision.cost.to_text())
+    if options.optimize:
+        print(optimizer.report.to_text())
+    else:
+        print("Optimizer: tắt (--no-optimize)")
+    if isinstance(evaluator, VM):
+        module = evaluator.module
+        print(f"VM: {len(module.functions)} hàm, {module.size} ints bytecode, "
+              f"{len(module.global_names)} global slots")
+        print()
+        return
+    if isinstance(evaluator, PythonEngine):
+        lines = evaluator.module.source.count("\n")
+        cache = "cache hit" if evaluator.cache_hit else "compiled"
+        print(f"Python: {len(evaluator.module.functions)} hàm, {lines} dòng ({cache})")
+        print()
+        return
+    if options.memoize:
+        print_memo_stats(evaluator)
+    env = evaluator.env_stats()
+    total = env['allocated'] + env['avoided']
+    print(f"Environment cho block: {env['allocated']} cấp phát, "
+          f"{env['avoided']}/{total} được bỏ qua nhờ scope analysis")
+    pool = evaluator.pool_stats()
+    print(f"Environment pool: {pool['created']} tạo mới, {pool['reused']} tái sử dụng")
+    calls = evaluator.call_cache_stats()
+    print(f"Inline cache lời gọi hàm: {calls['hits']} hit, {calls['misses']} miss")
+    reductions = evaluator.reduction_stats()
+    if reductions:
+        methods = ", ".join(f"{method} x{count}" for method, count in sorted(reductions.items()))
+        print(f"Vòng lặp tích lũy (loop idiom): {methods}")
+    if options.engine == "tiered":
+        promotions = evaluator.tier_stats()
+        print(f"Tiered: {len(promotions)} lần nâng lên tier closure (ngưỡng {evaluator.tier_threshold})")
+        for promotion in promotions:
+            print(f"  - {promotion}")
+    if evaluator.governor is not None:
+        used = evaluator.governor.stats()
+        print(f"Governor: {used['steps']} bước, {used['seconds']}s, "
+              f"~{used['string_bytes'] + used['environment_bytes']} bytes ({evaluator.governor!r})")
+    if options.quicken:
+        quick = evaluator.quicken_stats()
+        specialized = ", ".join(f"{name} x{count}" for name, count in sorted(quick['specialized'].items()))
+        print(f"Quickening: {sum(quick['specialized'].values())} lần chuyên biệt hóa"
+              f"{f' ({specialized})' if specialized else ''}, "
+              f"{sum(quick['deopts'].values())} deopt, {quick['generic']} node giữ bản tổng quát")
+    else:
+        print("Quickening: tắt (--no-quicken)")
+    print()
+
+
+def report_profile(evaluator: Evaluator, options: RunOptions, source_code: str):
+    """Print the Kotlin profile and write its exports (--profile, --flamegraph, --profile-json)."""
+    profiler = evaluator.profiler
+    print_step("P", "Profile (hàm và dòng Kotlin)")
+    print(profiler.to_text(source_code))
+    if options.flamegraph:
+        Path(options.flamegraph).write_text(profiler.to_collapsed(), encoding='utf-8')
+        print(f"Collapsed stacks (flamegraph): {options.flamegraph}")
+    if options.profile_json:
+        Path(options.profile_json).write_text(profiler.to_json(), encoding='utf-8')
+        print(f"Tóm tắt JSON: {options.profile_json}")
+    print()
+
+
+def admit_program(program, options: RunOptions) -> Optional[AdmissionDecision]:
+    """Estimate program cost and decide how to run it (None if admission is off)."""
+    if not options.admission:
+        return None
+    return AdmissionPolicy().decide(program)
+
+
+def optimize_program(ast, options: RunOptions):
+    """Run the optimizer if enabled. Returns (program, optimizer)."""
+    optimizer = Optimizer()
+    if options.optimize:
+        return optimizer.optimize(ast), optimizer
+    return ast, optimizer
+
+
+def demo_full_pipeline(source_code: str, show_details: bool = True, options: RunOptions = None):
     """
     Mô phỏng toàn bộ quá trình từ A đến Z như Gemini đã giải thích.
     
@@ -39,6 +200,7 @@ def demo_full_pipeline(source_code: str, show_details: bool = True):
        sử dụng AST trực tiếp
     F. Thực thi (Execution) - Interpreter thay vì JVM
     """
+    options = options or RunOptions()
     
     print_header("KOTLIN INTERPRETER - DEMO ĐẦY ĐỦ TỪ A → Z")
     
@@ -95,12 +257,10 @@ def demo_full_pipeline(source_code: str, show_details: bool = True):
     print_step("D", "Phân tích Ngữ nghĩa (Semantic Analysis)")
     print("Kiểm tra kiểu dữ liệu, phạm vi biến, v.v...")
     
-    error_collector = ErrorCollector()
-    symbol_table = SymbolTable()
-    
-    # Collection pass: Thu thập tất cả declarations
-    collection_pass = CollectionPass(symbol_table, error_collector)
-    collection_pass.collect(ast)
+    # Collection pass (tuần tự) rồi kiểm tra thân hàm (song song nếu --jobs > 1)
+    semantic = ParallelChecker(max_workers=options.jobs).check(ast)
+    error_collector = semantic.errors
+    symbol_table = semantic.symbol_table
     
     if error_collector.has_errors():
         print("❌ LỖI NGỮ NGHĨA:")
@@ -120,7 +280,21 @@ def demo_full_pipeline(source_code: str, show_details: bool = True):
     print_step("E", "Sinh mã (Code Generation)")
     print("SIMPLIFIED: Thay vì sinh Java Bytecode, ta sử dụng AST trực tiếp")
     print("(Trong Kotlin thực tế, bước này sẽ sinh ra file .class)")
+    
+    program, optimizer = optimize_program(ast, options)
+    if options.optimize:
+        report = optimizer.report
+        print(f"✓ Tối ưu hoá: loại bỏ {len(report.removed_functions)} hàm không dùng, "
+              f"tính trước {report.folded_calls} lời gọi hằng, "
+              f"inline {report.inlined_calls} lời gọi hàm")
     print("✓ AST sẵn sàng để thực thi")
+    
+    decision = admit_program(program, options)
+    if decision is not None:
+        print(f"✓ Ước lượng chi phí: {decision.cost.cost_class} → {decision}")
+        if not decision.admitted:
+            print("❌ Chương trình bị từ chối (không kết thúc)")
+            return
     print()
     
     # F. Thực thi (Execution)
@@ -128,14 +302,16 @@ def demo_full_pipeline(source_code: str, show_details: bool = True):
     print("Interpreter đang thực thi code...")
     print("-" * 70)
     
-    evaluator = Evaluator()
+    evaluator = options.make_evaluator(decision)
     
     try:
-        result = evaluator.evaluate(ast)
+        result = evaluator.evaluate(program)
         print("-" * 70)
         print(f"✓ Thực thi thành công")
         if not result.type_name == "Unit":
             print(f"Kết quả: {result}")
+        if options.memoize and not options.stats:
+            print_memo_stats(evaluator)
     except Exception as e:
         print("-" * 70)
         print(f"❌ LỖI RUNTIME: {e}")
@@ -145,14 +321,20 @@ def demo_full_pipeline(source_code: str, show_details: bool = True):
         return
     print()
     
+    if options.stats:
+        print_stats(optimizer, evaluator, options, decision)
+    if options.profile:
+        report_profile(evaluator, options, source_code)
+    
     # Z. Kết quả
     print_step("Z", "Kết quả (Result)")
     print("Chương trình đã chạy xong!")
     print("Quá trình từ A → Z hoàn tất ✓")
 
 
-def demo_step_by_step(source_code: str):
+def demo_step_by_step(source_code: str, options: RunOptions = None):
     """Demo từng bước riêng biệt."""
+    options = options or RunOptions()
     
     print_header("DEMO TỪNG BƯỚC RIÊNG BIỆT")
     
@@ -179,23 +361,29 @@ def demo_step_by_step(source_code: str):
     
     # Step 3: Evaluator
     print_step("3", "EVALUATOR - Thực thi")
-    evaluator = Evaluator()
-    result = evaluator.evaluate(ast)
+    program, optimizer = optimize_program(ast, options)
+    decision = admit_program(program, options)
+    if decision is not None and not decision.admitted:
+        print(f"❌ Chương trình bị từ chối: {decision.reason}")
+        return
+    evaluator = options.make_evaluator(decision)
+    result = evaluator.evaluate(program)
     print(f"\nKết quả: {result}")
 
 
-def run_file(filepath: str, mode: str = "full"):
+def run_file(filepath: str, mode: str = "full", options: RunOptions = None):
     """Run a Kotlin file."""
+    options = options or RunOptions()
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             source_code = f.read()
         
         if mode == "full":
-            demo_full_pipeline(source_code, show_details=True)
+            demo_full_pipeline(source_code, show_details=True, options=options)
         elif mode == "step":
-            demo_step_by_step(source_code)
+            demo_step_by_step(source_code, options=options)
         elif mode == "simple":
-            demo_full_pipeline(source_code, show_details=False)
+            demo_full_pipeline(source_code, show_details=False, options=options)
         elif mode == "run":
             # Just run without explanation
             lexer = Lexer(source_code)
@@ -204,12 +392,41 @@ def run_file(filepath: str, mode: str = "full"):
             parser = Parser(tokens)
             ast = parser.parse()
             
-            evaluator = Evaluator()
-            evaluator.evaluate(ast)
+            program, optimizer = optimize_program(ast, options)
+            decision = admit_program(program, options)
+            if decision is not None and not decision.admitted:
+                print(f"❌ Chương trình bị từ chối: {decision.reason}")
+                return
+            if options.disassemble:
+                if options.engine == "py":
+                    print(PythonTranspiler().transpile(program).source)
+                else:
+                    print(disassemble_module(BytecodeCompiler().compile(program)))
+                print()
+            evaluator = options.make_evaluator(decision)
+            evaluator.evaluate(program)
+            
+            if options.stats:
+                print_stats(optimizer, evaluator, options, decision)
+            if options.profile:
+                report_profile(evaluator, options, source_code)
     
     except FileNotFoundError:
         print(f"❌ File không tìm thấy: {filepath}")
+    except ExecutionTimeout as e:
+        print(f"⏱️ Dừng chương trình: {e}")
+    except ResourceLimitExceeded as e:
+        print(f"🛑 Dừng chương trình (vượt giới hạn {e.limit}): {e}")
+    except StackOverflowError as e:
+        print(f"❌ {e}")
+    except RecursionError:
+        print("❌ Lỗi: đệ quy quá sâu so với stack của Python (thử --engine stack, có thể kèm --max-depth)")
     except Exception as e:
+        line = getattr(e, "kotlin_line", None)
+        if line is not None:
+            # Transpiled code: the location is the Kotlin line, not a Python traceback
+            print(f"❌ Lỗi (dòng {line}): {e}")
+            return
         print(f"❌ Lỗi: {e}")
         import traceback
         traceback.print_exc()
@@ -231,6 +448,14 @@ Examples:
   python main.py examples/hello_world.kt
   python main.py examples/hello_world.kt --mode step
   python main.py examples/arithmetic.kt --mode simple
+  python main.py examples/fibonacci.kt --memoize
+  python main.py examples/factorial.kt --mode run --stats
+  python main.py examples/fibonacci.kt --mode run --engine vm --disassemble
+  python main.py examples/fibonacci.kt --mode run --engine py
+  python main.py examples/factorial.kt --mode run --engine stack --max-depth 50000
+  python main.py examples/fibonacci.kt --mode run --max-steps 1000000 --memory-limit 50000000
+  python main.py examples/fibonacci.kt --mode run --profile --flamegraph fib.folded
+  python main.py examples/fibonacci.kt --mode run --engine tiered --tier-threshold 100 --stats
         """
     )
     
@@ -241,10 +466,143 @@ Examples:
         default='full',
         help='Demo mode (default: full)'
     )
+    parser.add_argument(
+        '--memoize',
+        action='store_true',
+        help='Cache results of pure functions (purity analysis + LRU)'
+    )
+    parser.add_argument(
+        '--no-optimize',
+        action='store_true',
+        help='Disable AST optimizations: dead-function elimination, inlining and partial evaluation '
+             '(folding and specializing calls with constant arguments)'
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Worker processes for checking function bodies (large programs)'
+    )
+    parser.add_argument(
+        '--no-admission',
+        action='store_true',
+        help='Run without static cost estimation (no rejecting or time-boxing)'
+    )
+    parser.add_argument(
+        '--time-limit',
+        type=float,
+        default=None,
+        help='Abort execution after this many seconds'
+    )
+    parser.add_argument(
+        '--max-steps',
+        type=int,
+        default=None,
+        help='Tree/closure/stack engines: abort after this many loop iterations and calls'
+    )
+    parser.add_argument(
+        '--memory-limit',
+        type=int,
+        default=None,
+        help='Tree/closure/stack engines: abort when Strings and environments hold about this many bytes'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=ENGINES,
+        default='tree',
+        help='Execution engine: AST tree-walker, compiled closures, heap-stack tree-walker, '
+             'tiered (tree-walker promoting hot functions and loops to closures), bytecode VM or transpiled Python'
+    )
+    parser.add_argument(
+        '--tier-threshold',
+        type=int,
+        default=None,
+        help='Tiered engine: calls + loop back-edges before a function or loop is compiled (default: 1000)'
+    )
+    parser.add_argument(
+        '--unboxed',
+        action='store_true',
+        help='Tree engine: keep Int/String/Boolean as plain Python values (no wrappers)'
+    )
+    parser.add_argument(
+        '--no-quicken',
+        action='store_true',
+        help='Tree/closure engines: do not specialize operator and variable nodes to observed types'
+    )
+    parser.add_argument(
+        '--max-depth',
+        type=int,
+        default=None,
+        help='Stack and VM engines: most nested Kotlin calls before StackOverflowError / RecursionError'
+    )
+    parser.add_argument(
+        '--output',
+        choices=OutputSink.MODES,
+        default=None,
+        help='Program output flushing: buffered (large writes), line (after each newline) or unbuffered '
+             '(default: line on a terminal, buffered otherwise)'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Tree/closure/stack engines: print Kotlin function times and line hit counts after the run '
+             '(use --no-optimize to profile functions as written, without inlining or folded calls)'
+    )
+    parser.add_argument(
+        '--flamegraph',
+        metavar='FILE',
+        default=None,
+        help='Write the profile as collapsed stacks (flamegraph.pl, speedscope, inferno); implies --profile'
+    )
+    parser.add_argument(
+        '--profile-json',
+        metavar='FILE',
+        default=None,
+        help='Write a JSON summary of the profile; implies --profile'
+    )
+    parser.add_argument(
+        '--disassemble',
+        action='store_true',
+        help='Print the compiled program before running it: bytecode, or Python source with --engine py (--mode run)'
+    )
+    parser.add_argument(
+        '--stats',
+        action='store_true',
+        help='Print call graph, optimizer decisions and runtime statistics'
+    )
     
     args = parser.parse_args()
+    if args.unboxed and args.engine != 'tree':
+        parser.error('--unboxed chỉ dùng được với --engine tree')
+    if (args.max_steps is not None or args.memory_limit is not None) and args.engine in ('vm', 'py'):
+        parser.error('--max-steps và --memory-limit chỉ dùng được với --engine tree, closure hoặc stack')
+    if args.tier_threshold is not None and args.engine != 'tiered':
+        parser.error('--tier-threshold chỉ dùng được với --engine tiered')
+    profile = args.profile or args.flamegraph is not None or args.profile_json is not None
+    if profile and args.engine in ('vm', 'py'):
+        parser.error('--profile chỉ dùng được với --engine tree, closure hoặc stack')
     
-    run_file(args.file, args.mode)
+    options = RunOptions(
+        memoize=args.memoize,
+        optimize=not args.no_optimize,
+        stats=args.stats,
+        jobs=max(1, args.jobs),
+        admission=not args.no_admission,
+        time_limit=args.time_limit,
+        max_steps=args.max_steps,
+        memory_limit=args.memory_limit,
+        engine=args.engine,
+        disassemble=args.disassemble,
+        unboxed=args.unboxed,
+        quicken=not args.no_quicken,
+        max_depth=args.max_depth,
+        tier_threshold=args.tier_threshold,
+        output=args.output,
+        profile=profile,
+        flamegraph=args.flamegraph,
+        profile_json=args.profile_json
+    )
+    run_file(args.file, args.mode, options)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,34 @@
+"""
+Analysis Module
+Static analyses over the AST used by the optimizer and the runtime
+"""
+from .purity import PurityAnalysis, EffectInfo, analyze_purity
+from .tail_calls import TailCallAnalysis, TailCallInfo
+from .call_graph import CallGraph, CallSite
+from .cost import CostEstimator, CostClass, ProgramCost, FunctionCost, LoopBound
+from .jumps import loop_jumps, can_exit, has_jumps
+from .counted_loops import CountedLoopAnalysis, CountedLoop
+from .loop_idioms import LoopIdiomAnalysis, ReductionLoop, Accumulation
+
+__all__ = [
+    'PurityAnalysis',
+    'EffectInfo',
+    'analyze_purity',
+    'TailCallAnalysis',
+    'TailCallInfo',
+    'CallGraph',
+    'CallSite',
+    'CostEstimator',
+    'CostClass',
+    'ProgramCost',
+    'FunctionCost',
+    'LoopBound',
+    'loop_jumps',
+    'can_exit',
+    'has_jumps',
+    'CountedLoopAnalysis',
+    'CountedLoop',
+    'LoopIdiomAnalysis',
+    'ReductionLoop',
+    'Accumulation'
+]
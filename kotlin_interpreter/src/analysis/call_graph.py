@@ -0,0 +1,229 @@
+"""
+Call graph over user functions.
+
+Nodes are FunctionDeclarations, edges are direct calls between them.
+Built from the program roots: 'main' plus the initializers of global
+variables, which run before main.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from ..parser.ast_nodes import *
+
+
+# Pseudo-node for calls made by global variable initializers
+GLOBALS_ROOT = "<globals>"
+
+
+@dataclass
+class CallSite:
+    """A single call from one function to another."""
+    caller: str
+    callee: str
+    node: CallExpression
+
+    def __repr__(self) -> str:
+        return f"{self.caller} -> {self.callee} at {self.node.location}"
+
+
+class CallGraph:
+    """
+    Directed graph of calls between user functions.
+
+    Calls to built-ins (println, print) are recorded separately and do not
+    create edges.
+    """
+
+    def __init__(self):
+        """Initialize empty graph."""
+        self.functions: Dict[str, FunctionDeclaration] = {}
+        self.edges: Dict[str, Set[str]] = {}
+        self.call_sites: List[CallSite] = []
+        self.builtin_calls: Dict[str, Set[str]] = {}
+        self.roots: List[str] = []
+        self.reachable: Set[str] = set()
+        self._recursive: Set[str] = set()
+        self._cycles: Dict[str, List[str]] = {}
+
+    @classmethod
+    def build(cls, program: Program) -> 'CallGraph':
+        """Build call graph for a program."""
+        graph = cls()
+
+        for decl in program.declarations:
+            if isinstance(decl, FunctionDeclaration):
+                graph.functions[decl.name] = decl
+
+        graph.edges[GLOBALS_ROOT] = set()
+        graph.builtin_calls[GLOBALS_ROOT] = set()
+        for decl in program.declarations:
+            if isinstance(decl, FunctionDeclaration):
+                graph.edges[decl.name] = set()
+                graph.builtin_calls[decl.name] = set()
+                graph._collect_calls(decl.name, decl.body)
+            elif isinstance(decl, VariableDeclaration) and decl.initializer:
+                graph._collect_calls(GLOBALS_ROOT, decl.initializer)
+
+        graph.roots = [GLOBALS_ROOT]
+        if "main" in graph.functions:
+            graph.roots.append("main")
+
+        graph._compute_reachable()
+        graph._compute_recursive()
+        return graph
+
+    def _collect_calls(self, caller: str, node: ASTNode):
+        """Record all calls made inside node."""
+        for child in walk(node):
+            if isinstance(child, CallExpression):
+                if child.function_name in self.functions:
+                    self.edges[caller].add(child.function_name)
+                    self.call_sites.append(CallSite(caller, child.function_name, child))
+                else:
+                    self.builtin_calls[caller].add(child.function_name)
+            elif isinstance(child, IdentifierExpression) and child.name in self.functions:
+                # Function used as a value may be called later
+                self.edges[caller].add(child.name)
+
+    def _compute_reachable(self):
+        """Mark functions reachable from the roots."""
+        self.reachable = set()
+        worklist = list(self.roots)
+        while worklist:
+            name = worklist.pop()
+            if name in self.reachable:
+                continue
+            self.reachable.add(name)
+            worklist.extend(self.edges.get(name, ()))
+        self.reachable.discard(GLOBALS_ROOT)
+
+    def _compute_recursive(self):
+        """Find functions that are part of a call cycle (iterative Tarjan SCC)."""
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        self._recursive = set()
+        self._cycles = {}
+
+        for start in self.functions:
+            if start in index:
+                continue
+            # Explicit DFS stack of (node, iterator over callees)
+            work = [(start, iter(sorted(self.edges[start])))]
+            index[start] = lowlink[start] = len(index)
+            stack.append(start)
+            on_stack.add(start)
+
+            while work:
+                name, callees = work[-1]
+                advanced = False
+                for callee in callees:
+                    if callee not in index:
+                        index[callee] = lowlink[callee] = len(index)
+                        stack.append(callee)
+                        on_stack.add(callee)
+                        work.append((callee, iter(sorted(self.edges[callee]))))
+                        advanced = True
+                        break
+                    if callee in on_stack:
+                        lowlink[name] = min(lowlink[name], index[callee])
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[name])
+
+                if lowlink[name] == index[name]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == name:
+                            break
+                    if len(component) > 1 or name in self.edges[name]:
+                        self._recursive.update(component)
+                        for member in component:
+                            self._cycles[member] = component
+
+    # Queries
+
+    def callees(self, name: str) -> Set[str]:
+        """User functions called directly by a function."""
+        return self.edges.get(name, set())
+
+    def callers(self, name: str) -> Set[str]:
+        """Functions that call a function directly."""
+        return {caller for caller, callees in self.edges.items() if name in callees}
+
+    def is_reachable(self, name: str) -> bool:
+        """Check if function can be called starting from the roots."""
+        return name in self.reachable
+
+    def is_recursive(self, name: str) -> bool:
+        """Check if function is part of a call cycle."""
+        return name in self._recursive
+
+    def cycle(self, name: str) -> List[str]:
+        """Functions in the same call cycle as a function (empty if not recursive)."""
+        return list(self._cycles.get(name, ()))
+
+    def is_leaf(self, name: str) -> bool:
+        """Check if function calls no user functions (built-ins allowed)."""
+        return not self.edges.get(name)
+
+    def unreachable(self) -> List[str]:
+        """Functions that can never be called, in declaration order."""
+        return [name for name in self.functions if name not in self.reachable]
+
+    def postorder(self) -> List[str]:
+        """Functions ordered callees-first (for bottom-up transformations)."""
+        visited: Set[str] = set()
+        order: List[str] = []
+
+        for start in self.functions:
+            if start in visited:
+                continue
+            visited.add(start)
+            work = [(start, iter(sorted(self.edges[start])))]
+            while work:
+                name, callees = work[-1]
+                for callee in callees:
+                    if callee not in visited:
+                        visited.add(callee)
+                        work.append((callee, iter(sorted(self.edges[callee]))))
+                        break
+                else:
+                    work.pop()
+                    order.append(name)
+        return order
+
+    def to_text(self) -> str:
+        """Format the graph for display."""
+        lines = []
+        for caller in [GLOBALS_ROOT] + list(self.functions):
+            callees = sorted(self.edges.get(caller, ()))
+            builtins = sorted(self.builtin_calls.get(caller, ()))
+            if caller == GLOBALS_ROOT and not callees and not builtins:
+                continue
+            flags = []
+            if caller != GLOBALS_ROOT:
+                if not self.is_reachable(caller):
+                    flags.append("unreachable")
+                if self.is_recursive(caller):
+                    flags.append("recursive")
+                if self.is_leaf(caller):
+                    flags.append("leaf")
+            flag_str = f" [{', '.join(flags)}]" if flags else ""
+            targets = callees + [f"{b} (builtin)" for b in builtins]
+            target_str = ", ".join(targets) if targets else "-"
+            lines.append(f"{caller}{flag_str} -> {target_str}")
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        edge_count = sum(len(callees) for callees in self.edges.values())
+        return f"CallGraph({len(self.functions)} functions, {edge_count} edges)"
@@ -0,0 +1,532 @@
+"""
+Static cost estimation.
+
+Estimates how long a program runs, in evaluation steps (roughly the
+number of AST nodes the evaluator visits), without running it:
+- loop trip counts are bounded for induction variables with a known start
+  value, a constant step and a constant bound ('while (i < 10)'), and for
+  for loops over a constant range; a for loop always terminates;
+- 'while (true)' loops without a way out, loops whose condition can never
+  change and call cycles without any conditional are flagged as unbounded;
+- other loops and recursion depend on run-time data.
+
+Each function and the whole program get a CostClass; the runner uses it to
+reject, time-box or speed up programs before executing them.
+"""
+
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Dict, List, Optional, Set
+
+from ..lexer.token import SourceLocation
+from ..parser.ast_nodes import *
+from .call_graph import CallGraph
+from .jumps import loop_jumps, targets, can_exit
+
+
+class CostClass(IntEnum):
+    """Cost classes, from cheapest to most expensive."""
+    CONSTANT = 0    # No loops, no recursion
+    BOUNDED = 1     # All loop trip counts known
+    UNKNOWN = 2     # Depends on run-time data (loops, recursion depth)
+    UNBOUNDED = 3   # Does not terminate (or very likely does not)
+
+    def __str__(self) -> str:
+        return self.name.lower()
+
+
+@dataclass
+class LoopBound:
+    """Trip count of one loop, if known."""
+    location: SourceLocation
+    trip_count: Optional[int]
+    cost_class: CostClass
+    reason: str
+
+    def __str__(self) -> str:
+        trips = f"{self.trip_count} iterations" if self.trip_count is not None else str(self.cost_class)
+        return f"loop at {self.location}: {trips} ({self.reason})"
+
+
+@dataclass
+class FunctionCost:
+    """Estimated cost of one call of a function."""
+    name: str
+    cost_class: CostClass
+    steps: Optional[int]  # None unless CONSTANT or BOUNDED
+    reasons: List[str] = field(default_factory=list)
+    loops: List[LoopBound] = field(default_factory=list)
+    recursive: bool = False
+
+    def __str__(self) -> str:
+        steps = f", ~{self.steps} steps" if self.steps is not None else ""
+        return f"{self.name}: {self.cost_class}{steps}"
+
+
+@dataclass
+class ProgramCost:
+    """Estimated cost of running a program (globals + main)."""
+    cost_class: CostClass
+    steps: Optional[int]
+    functions: Dict[str, FunctionCost] = field(default_factory=dict)
+    reasons: List[str] = field(default_factory=list)
+
+    @property
+    def recursive_functions(self) -> List[str]:
+        """Functions whose cost depends on recursion depth."""
+        return [name for name, cost in self.functions.items() if cost.recursive]
+
+    def to_text(self) -> str:
+        """Format the estimate for display."""
+        steps = f" (~{self.steps} steps)" if self.steps is not None else ""
+        lines = [f"Program: {self.cost_class}{steps}"]
+        for reason in self.reasons:
+            lines.append(f"  - {reason}")
+        for cost in self.functions.values():
+            lines.append(f"  {cost}")
+            for loop in cost.loops:
+                lines.append(f"    {loop}")
+            for reason in cost.reasons:
+                lines.append(f"    - {reason}")
+        return "\n".join(lines)
+
+
+class Cost:
+    """Running total while walking a function: class, steps and reasons."""
+
+    def __init__(self):
+        self.cost_class = CostClass.CONSTANT
+        self.steps = 0
+        self.reasons: List[str] = []
+
+    def add(self, steps: Optional[int], cost_class: CostClass = CostClass.CONSTANT,
+            reason: Optional[str] = None):
+        """Add a sequential part."""
+        self.cost_class = max(self.cost_class, cost_class)
+        if steps is not None:
+            self.steps += steps
+        if reason and reason not in self.reasons:
+            self.reasons.append(reason)
+
+
+COMPARISONS = {"<", "<=", ">", ">=", "!="}
+FLIPPED = {"<": ">", "<=": ">=", ">": "<", ">=": "<=", "!=": "!="}
+
+
+def assigned_names(node: ASTNode) -> Set[str]:
+    """Variables assigned anywhere inside node."""
+    return {n.target for n in walk(node) if isinstance(n, AssignmentExpression)}
+
+
+def has_conditional(node: ASTNode) -> bool:
+    """Check if a subtree can choose between paths (if, while, &&, ||)."""
+    for n in walk(node):
+        if isinstance(n, (IfStatement, IfExpression, WhileStatement, ForStatement)):
+            return True
+        if isinstance(n, BinaryExpression) and n.operator in ("&&", "||"):
+            return True
+    return False
+
+
+class CostEstimator:
+    """
+    Estimates per-function and whole-program cost.
+
+    Functions are estimated callees-first, so a call adds the callee's
+    estimate. Known constant values of local variables are tracked through
+    straight-line code to find loop start values; a variable assigned in a
+    branch or a loop is unknown afterwards.
+    """
+
+    def __init__(self):
+        """Initialize estimator."""
+        self.functions: Dict[str, FunctionCost] = {}
+        self.graph: Optional[CallGraph] = None
+        self.global_constants: Dict[str, int] = {}
+        self.loops: List[LoopBound] = []
+        self.local_names: Set[str] = set()
+
+    def estimate(self, program: Program, graph: Optional[CallGraph] = None) -> ProgramCost:
+        """Estimate cost of every reachable function and of the program."""
+        self.graph = graph or CallGraph.build(program)
+        self.functions = {}
+        self.global_constants = {}
+
+        for decl in program.declarations:
+            if isinstance(decl, VariableDeclaration) and not decl.is_mutable and decl.initializer:
+                value = self.constant_value(decl.initializer, self.global_constants)
+                if value is not None:
+                    self.global_constants[decl.name] = value
+
+        for name in self.graph.postorder():
+            self.functions[name] = self.estimate_function(self.graph.functions[name])
+
+        total = Cost()
+        self.loops = []
+        self.local_names = set()
+        for decl in program.declarations:
+            if isinstance(decl, VariableDeclaration) and decl.initializer:
+                self.expression_cost(decl.initializer, total)
+        if "main" in self.graph.functions:
+            main = self.functions["main"]
+            total.add(main.steps, main.cost_class)
+
+        reachable = {name: cost for name, cost in self.functions.items()
+                     if self.graph.is_reachable(name)}
+        for cost in reachable.values():
+            if cost.cost_class == total.cost_class and cost.cost_class >= CostClass.UNKNOWN:
+                for reason in cost.reasons:
+                    total.add(None, cost.cost_class, f"{cost.name}: {reason}")
+
+        steps = total.steps if total.cost_class <= CostClass.BOUNDED else None
+        return ProgramCost(total.cost_class, steps, reachable, total.reasons)
+
+    # Functions
+
+    def estimate_function(self, func: FunctionDeclaration) -> FunctionCost:
+        """Estimate the cost of one call of func."""
+        self.loops = []
+        self.local_names = {param.name for param in func.parameters} | {
+            n.name for n in walk(func.body) if isinstance(n, VariableDeclaration)
+        } | {n.variable for n in walk(func.body) if isinstance(n, ForStatement)}
+        cost = Cost()
+        cost.add(1 + len(func.parameters))
+        self.block_cost(func.body.statements, cost, {})
+
+        if self.graph.is_recursive(func.name):
+            # The base case may be in any function of the cycle (even/odd)
+            cycle = [self.graph.functions[name].body for name in self.graph.cycle(func.name)]
+            if any(has_conditional(body) for body in cycle):
+                cost.add(None, CostClass.UNKNOWN, "recursion depth depends on arguments")
+            else:
+                cost.add(None, CostClass.UNBOUNDED, "recursion without a base case")
+
+        steps = cost.steps if cost.cost_class <= CostClass.BOUNDED else None
+        return FunctionCost(func.name, cost.cost_class, steps, cost.reasons, self.loops,
+                            self.graph.is_recursive(func.name))
+
+    # Statements
+
+    def block_cost(self, statements: List[Statement], cost: Cost, known: Dict[str, int]):
+        """Add cost of statements run in order, tracking constant locals."""
+        for stmt in statements:
+            self.statement_cost(stmt, cost, known)
+
+    def statement_cost(self, node: Statement, cost: Cost, known: Dict[str, int]):
+        """Add cost of one statement."""
+        cost.add(1)
+        if isinstance(node, BlockStatement):
+            self.block_cost(node.statements, cost, known)
+        elif isinstance(node, ExpressionStatement):
+            self.expression_cost(node.expression, cost)
+            self.track_assignment(node.expression, known)
+        elif isinstance(node, DeclarationStatement):
+            decl = node.declaration
+            if isinstance(decl, VariableDeclaration):
+                known.pop(decl.name, None)
+                if decl.initializer:
+                    self.expression_cost(decl.initializer, cost)
+                    for name in assigned_names(decl.initializer):
+                        known.pop(name, None)
+                    value = self.constant_value(decl.initializer, known)
+                    if value is not None:
+                        known[decl.name] = value
+        elif isinstance(node, ReturnStatement):
+            if node.value:
+                self.expression_cost(node.value, cost)
+        elif isinstance(node, IfStatement):
+            self.expression_cost(node.condition, cost)
+            for name in assigned_names(node.condition):
+                known.pop(name, None)
+            branches = [node.then_branch] + ([node.else_branch] if node.else_branch else [])
+            branch_costs = []
+            for branch in branches:
+                branch_cost = Cost()
+                self.statement_cost(branch, branch_cost, dict(known))
+                branch_costs.append(branch_cost)
+            self.add_branches(branch_costs, cost)
+            for name in assigned_names(node):
+                known.pop(name, None)
+        elif isinstance(node, WhileStatement):
+            self.loop_cost(node, cost, known)
+        elif isinstance(node, ForStatement):
+            self.for_cost(node, cost, known)
+
+    def add_branches(self, branch_costs: List[Cost], cost: Cost):
+        """Add the most expensive of alternative branches."""
+        worst = max(branch_costs, key=lambda c: (c.cost_class, c.steps))
+        cost.add(worst.steps)
+        for branch in branch_costs:
+            for reason in branch.reasons:
+                cost.add(None, branch.cost_class, reason)
+            cost.add(None, branch.cost_class)
+
+    def loop_cost(self, node: WhileStatement, cost: Cost, known: Dict[str, int]):
+        """Add cost of a while loop: trip count times condition and body cost."""
+        bound = self.loop_bound(node, known)
+        self.loops.append(bound)
+
+        # Assignments in the condition count too: 'while ((i = i + 1) < 4)'
+        changed = assigned_names(node)
+        body = Cost()
+        body_known = {name: value for name, value in known.items() if name not in changed}
+        self.expression_cost(node.condition, body)
+        self.statement_cost(node.body, body, body_known)
+
+        if bound.trip_count is not None:
+            cost.add(body.steps * bound.trip_count + 1, body.cost_class)
+            cost.add(None, CostClass.BOUNDED if bound.trip_count else CostClass.CONSTANT)
+        else:
+            cost.add(None, bound.cost_class, bound.reason)
+        for reason in body.reasons:
+            cost.add(None, body.cost_class, reason)
+
+        for name in changed:
+            known.pop(name, None)
+
+    def for_cost(self, node: ForStatement, cost: Cost, known: Dict[str, int]):
+        """Add cost of a for loop: its range once, then trip count times the body cost."""
+        for part in (node.start, node.end, node.step):
+            if part is not None:
+                self.expression_cost(part, cost)
+        bound = self.for_bound(node, known)
+        self.loops.append(bound)
+
+        body = Cost()
+        changed = assigned_names(node)
+        body_known = {name: value for name, value in known.items()
+                      if name not in changed and name != node.variable}
+        self.statement_cost(node.body, body, body_known)
+
+        if bound.trip_count is not None:
+            cost.add(body.steps * bound.trip_count + 1, body.cost_class)
+            cost.add(None, CostClass.BOUNDED if bound.trip_count else CostClass.CONSTANT)
+        else:
+            cost.add(None, bound.cost_class, bound.reason)
+        for reason in body.reasons:
+            cost.add(None, body.cost_class, reason)
+
+        for name in changed:
+            known.pop(name, None)
+
+    def for_bound(self, node: ForStatement, known: Dict[str, int]) -> LoopBound:
+        """Find the trip count of a for loop (at most the size of its range)."""
+        constants = {**self.global_constants, **known}
+        start = self.constant_value(node.start, constants)
+        end = self.constant_value(node.end, constants)
+        step = self.constant_value(node.step, constants) if node.step is not None else 1
+        if any(type(value) is not int for value in (start, end, step)):
+            return LoopBound(node.location, None, CostClass.UNKNOWN, "range depends on run-time values")
+        if step <= 0:
+            return LoopBound(node.location, 0, CostClass.CONSTANT, "step is not positive (fails)")
+        if node.kind == "until":
+            trips = len(range(start, end, step))
+        elif node.kind == "..":
+            trips = len(range(start, end + 1, step))
+        else:
+            trips = len(range(start, end - 1, -step))
+        return LoopBound(node.location, trips, CostClass.BOUNDED if trips else CostClass.CONSTANT,
+                         "for loop over a constant range")
+
+    def loop_bound(self, node: WhileStatement, known: Dict[str, int]) -> LoopBound:
+        """Find the trip count of a while loop."""
+        location = node.location
+        changed = assigned_names(node)
+        has_exit = can_exit(node)
+        # 'continue' may skip the induction variable update
+        has_continue = any(isinstance(jump, ContinueStatement) and targets(jump, node)
+                           for jump in loop_jumps(node))
+
+        condition = self.constant_value(node.condition, {})
+        if condition is not None:
+            if not condition:
+                return LoopBound(location, 0, CostClass.CONSTANT, "condition is always false")
+            if has_exit:
+                return LoopBound(location, None, CostClass.UNKNOWN, "infinite loop left by return or break")
+            return LoopBound(location, None, CostClass.UNBOUNDED, "'while (true)' without exit")
+
+        # Induction variable bounds; for '&&' any bounded conjunct bounds the loop
+        conjuncts = [] if has_continue else self.conjuncts(node.condition)
+        trips = []
+        for conjunct in conjuncts:
+            result = self.induction_trip_count(conjunct, node, known)
+            if isinstance(result, LoopBound):
+                if result.cost_class == CostClass.UNBOUNDED and len(conjuncts) == 1 and not has_exit:
+                    result.location = location
+                    return result
+            elif result is not None:
+                trips.append(result)
+        if trips:
+            trip_count = min(trips)
+            return LoopBound(location, trip_count, CostClass.BOUNDED if trip_count else CostClass.CONSTANT,
+                             "induction variable")
+
+        # Nothing in the condition can change inside the loop
+        condition_names = {n.name for n in walk(node.condition) if isinstance(n, IdentifierExpression)}
+        condition_calls = any(isinstance(n, CallExpression) for n in walk(node.condition))
+        # Called user functions may change globals, not locals
+        user_calls = any(isinstance(n, CallExpression) and n.function_name in self.graph.functions
+                         for n in walk(node.body))
+        may_change = bool(condition_names & changed) or condition_calls or \
+            (user_calls and bool(condition_names - self.local_names))
+        if not may_change and not has_exit:
+            if self.constant_value(node.condition, {**self.global_constants, **known}):
+                return LoopBound(location, None, CostClass.UNBOUNDED, "condition never changes")
+            return LoopBound(location, None, CostClass.UNKNOWN,
+                             "condition never changes (runs forever if entered)")
+
+        return LoopBound(location, None, CostClass.UNKNOWN, "trip count depends on run-time values")
+
+    def conjuncts(self, node: Expression) -> List[Expression]:
+        """Split 'a && b && c' into its parts."""
+        if isinstance(node, BinaryExpression) and node.operator == "&&":
+            return self.conjuncts(node.left) + self.conjuncts(node.right)
+        return [node]
+
+    def induction_trip_count(self, condition: Expression, loop: WhileStatement, known: Dict[str, int]):
+        """
+        Trip count for 'i < bound' style conditions.
+
+        Returns an int, a LoopBound for a loop that provably never ends, or
+        None if the pattern does not apply.
+        """
+        if not isinstance(condition, BinaryExpression) or condition.operator not in COMPARISONS:
+            return None
+        op = condition.operator
+        if isinstance(condition.left, IdentifierExpression):
+            var, bound_expr = condition.left.name, condition.right
+        elif isinstance(condition.right, IdentifierExpression):
+            var, bound_expr, op = condition.right.name, condition.left, FLIPPED[op]
+        else:
+            return None
+
+        changed = assigned_names(loop)
+        if any(isinstance(n, IdentifierExpression) and n.name in changed for n in walk(bound_expr)):
+            return None
+        if var in assigned_names(loop.condition):
+            return None  # Updated by the condition, not once per iteration of the body
+        bound = self.constant_value(bound_expr, {**self.global_constants, **known})
+        start = known.get(var)
+        step = self.induction_step(var, loop.body)
+        if bound is None or start is None or step is None:
+            return None
+
+        if not self.compare(start, op, bound):
+            return 0
+        distance = bound - start
+        if op == "!=":
+            if step != 0 and distance % step == 0 and distance // step > 0:
+                return distance // step
+        elif op in ("<", "<=") and step > 0:
+            return (distance + step - 1) // step if op == "<" else distance // step + 1
+        elif op in (">", ">=") and step < 0:
+            return (-distance - step - 1) // -step if op == ">" else -distance // -step + 1
+        return LoopBound(loop.body.location, None, CostClass.UNBOUNDED,
+                         f"'{var}' never reaches the loop bound")
+
+    def induction_step(self, var: str, body: Statement) -> Optional[int]:
+        """Constant step of 'var = var +/- k' run exactly once per iteration."""
+        assignments = [n for n in walk(body) if isinstance(n, AssignmentExpression) and n.target == var]
+        declares = any(isinstance(n, VariableDeclaration) and n.name == var
+                       or isinstance(n, ForStatement) and n.variable == var for n in walk(body))
+        if len(assignments) != 1 or declares:
+            return None
+
+        statements = body.statements if isinstance(body, BlockStatement) else [body]
+        top_level = [s.expression for s in statements if isinstance(s, ExpressionStatement)]
+        assignment = assignments[0]
+        if assignment not in top_level:
+            return None  # Conditional or nested update
+
+        value = assignment.value
+        if not isinstance(value, BinaryExpression) or value.operator not in ("+", "-"):
+            return None
+        if isinstance(value.left, IdentifierExpression) and value.left.name == var:
+            delta = self.constant_value(value.right, self.global_constants)
+            if delta is not None:
+                return delta if value.operator == "+" else -delta
+        if value.operator == "+" and isinstance(value.right, IdentifierExpression) \
+                and value.right.name == var:
+            return self.constant_value(value.left, self.global_constants)
+        return None
+
+    @staticmethod
+    def compare(left: int, op: str, right: int) -> bool:
+        """Evaluate a comparison operator on ints."""
+        return {"<": left < right, "<=": left <= right, ">": left > right,
+                ">=": left >= right, "!=": left != right}[op]
+
+    def track_assignment(self, node: Expression, known: Dict[str, int]):
+        """Update known constants after an expression statement."""
+        for n in walk(node):
+            if isinstance(n, AssignmentExpression):
+                value = self.constant_value(n.value, known) if n is node else None
+                if value is None or n.target not in self.local_names:
+                    known.pop(n.target, None)
+                else:
+                    known[n.target] = value
+
+    # Expressions
+
+    def expression_cost(self, node: Expression, cost: Cost):
+        """Add cost of evaluating an expression, including calls."""
+        for n in walk(node):
+            cost.add(1)
+            if isinstance(n, CallExpression) and n.function_name in self.graph.functions:
+                callee = self.functions.get(n.function_name)
+                if callee is None:
+                    # Same recursive cycle, not estimated yet
+                    cost.add(None, CostClass.UNKNOWN)
+                else:
+                    cost.add(callee.steps, callee.cost_class)
+            elif isinstance(n, (IfExpression, BlockExpression)):
+                # Counted by walking into them; blocks may hold loops
+                if isinstance(n, BlockExpression):
+                    for stmt in n.statements:
+                        if isinstance(stmt, WhileStatement):
+                            self.loop_cost(stmt, cost, {})
+                        elif isinstance(stmt, ForStatement):
+                            self.for_cost(stmt, cost, {})
+
+    def constant_value(self, node: Expression, known: Dict[str, int]):
+        """Value of a constant Int/Boolean expression, or None."""
+        if isinstance(node, LiteralExpression):
+            if node.literal_type in ("Int", "Boolean"):
+                return node.value
+            return None
+        if isinstance(node, IdentifierExpression):
+            return known.get(node.name)
+        if isinstance(node, UnaryExpression):
+            operand = self.constant_value(node.operand, known)
+            if operand is None:
+                return None
+            if node.operator == "-" and not isinstance(operand, bool):
+                return -operand
+            if node.operator == "!" and isinstance(operand, bool):
+                return not operand
+            return None
+        if isinstance(node, BinaryExpression):
+            left = self.constant_value(node.left, known)
+            right = self.constant_value(node.right, known)
+            if left is None or right is None:
+                return None
+            op = node.operator
+            if isinstance(left, bool) or isinstance(right, bool):
+                if op == "&&":
+                    return left and right
+                if op == "||":
+                    return left or right
+                if op in ("==", "!="):
+                    return (left == right) == (op == "==")
+                return None
+            if op == "+":
+                return left + right
+            if op == "-":
+                return left - right
+            if op == "*":
+                return left * right
+            if op in ("<", "<=", ">", ">=", "!="):
+                return self.compare(left, op, right)
+            if op == "==":
+                return left == right
+        return None
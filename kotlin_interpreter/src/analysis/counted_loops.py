@@ -0,0 +1,139 @@
+"""
+Counted-loop analysis: while loops driven by an induction variable.
+
+    var i = 0
+    while (i < n) { ...; i = i + 1 }
+
+A while loop is counted when:
+- its condition compares a variable (the counter) with a bound built from
+  literals, variables and arithmetic (no calls, no assignments);
+- the last statement of its body adds a non-zero Int literal to the
+  counter, moving it towards the bound ('i = i + c' or 'i = i - c');
+- nothing else in the body assigns or redeclares the counter or a
+  variable of the bound, and no continue targets the loop (it would skip
+  the increment).
+
+Such a loop visits exactly the Ints of a range(start, bound, step), so the
+evaluator can run it as a Python for loop over that range, writing each
+value into the Environment slot that holds the counter instead of
+evaluating the condition and the increment on every iteration. The
+analysis only marks the loop (WhileStatement.counted); the guards that
+need run-time values (Int counter and bound, no global that a called
+function could change) stay with the evaluator.
+
+Run after ScopeAnalysis: the body without its increment keeps the body
+block's needs_scope.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Set
+
+from ..parser.ast_nodes import *
+from .jumps import loop_jumps, targets
+
+
+# Comparison -> sign the step must have for the counter to reach the bound
+DIRECTIONS = {"<": 1, "<=": 1, ">": -1, ">=": -1}
+
+ARITHMETIC = {"+", "-", "*", "/", "%"}
+
+
+@dataclass
+class CountedLoop:
+    """Induction-variable plan of a counted while loop."""
+    counter: str
+    operator: str  # Comparison in the condition: <, <=, > or >=
+    bound: Expression
+    step: int  # Signed: what the increment adds to the counter
+    body: BlockStatement  # The loop body without its increment
+    names: List[str]  # Variables read by the bound
+    calls: bool  # The body calls functions (which may change globals)
+
+    def numbers(self, start: int, bound: int) -> range:
+        """Counter values the loop runs its body with, from the counter's entry value."""
+        if self.operator == "<=":
+            bound += 1
+        elif self.operator == ">=":
+            bound -= 1
+        return range(start, bound, self.step)
+
+    def __repr__(self) -> str:
+        return f"CountedLoop({self.counter} {self.operator} {self.bound}, step {self.step})"
+
+
+class CountedLoopAnalysis:
+    """Marks counted while loops on the AST (WhileStatement.counted)."""
+
+    def analyze(self, program: Program) -> List[WhileStatement]:
+        """Mark every while loop of the program; returns the counted ones."""
+        counted = []
+        for node in walk(program):
+            if isinstance(node, WhileStatement):
+                node.counted = self.plan(node)
+                if node.counted is not None:
+                    counted.append(node)
+        return counted
+
+    def plan(self, loop: WhileStatement) -> Optional[CountedLoop]:
+        """Induction-variable plan of a while loop, or None if it is not counted."""
+        condition = loop.condition
+        if not (isinstance(condition, BinaryExpression) and condition.operator in DIRECTIONS
+                and isinstance(condition.left, IdentifierExpression)):
+            return None
+        counter = condition.left.name
+
+        names: Set[str] = set()
+        if not self._invariant(condition.right, names) or counter in names:
+            return None
+
+        body = loop.body
+        if not isinstance(body, BlockStatement) or not body.statements:
+            return None
+        step = self._increment(body.statements[-1], counter)
+        if step is None or step * DIRECTIONS[condition.operator] <= 0:
+            return None
+
+        rest = body.statements[:-1]
+        fixed = names | {counter}
+        for stmt in rest:
+            for node in walk(stmt):
+                if isinstance(node, AssignmentExpression) and node.target in fixed:
+                    return None
+                if isinstance(node, VariableDeclaration) and node.name in fixed:
+                    return None
+                if isinstance(node, ForStatement) and node.variable in fixed:
+                    return None
+        if any(isinstance(jump, ContinueStatement) and targets(jump, loop) for jump in loop_jumps(loop)):
+            return None
+
+        calls = any(isinstance(node, CallExpression) for stmt in rest for node in walk(stmt))
+        shortened = BlockStatement(body.location, rest, body.needs_scope)
+        return CountedLoop(counter, condition.operator, condition.right, step, shortened,
+                           sorted(names), calls)
+
+    def _invariant(self, node: Expression, names: Set[str]) -> bool:
+        """Check if an expression only reads variables and literals; collect the variables."""
+        if isinstance(node, LiteralExpression):
+            return True
+        if isinstance(node, IdentifierExpression):
+            names.add(node.name)
+            return True
+        if isinstance(node, BinaryExpression) and node.operator in ARITHMETIC:
+            return self._invariant(node.left, names) and self._invariant(node.right, names)
+        if isinstance(node, UnaryExpression) and node.operator == "-":
+            return self._invariant(node.operand, names)
+        return False
+
+    def _increment(self, stmt: Statement, counter: str) -> Optional[int]:
+        """Step of 'counter = counter + c' / 'counter = counter - c', or None."""
+        if not isinstance(stmt, ExpressionStatement):
+            return None
+        assign = stmt.expression
+        if not (isinstance(assign, AssignmentExpression) and assign.target == counter):
+            return None
+        value = assign.value
+        if not (isinstance(value, BinaryExpression) and value.operator in ("+", "-")
+                and isinstance(value.left, IdentifierExpression) and value.left.name == counter
+                and isinstance(value.right, LiteralExpression) and value.right.literal_type == "Int"):
+            return None
+        return value.right.value if value.operator == "+" else -value.right.value
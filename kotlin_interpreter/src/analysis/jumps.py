@@ -0,0 +1,56 @@
+"""
+Jump analysis for loops.
+
+Finds which break/continue statements leave a loop body (while or for):
+those that target the loop itself or an enclosing loop (an unlabeled jump
+targets the innermost loop around it, a labeled one the innermost loop
+with that label). Jumps that stay inside a nested loop are not reported.
+"""
+
+from typing import List, Optional, Set, Union
+
+from ..parser.ast_nodes import *
+
+
+Loop = Union[WhileStatement, ForStatement]
+
+
+def loop_jumps(loop: Loop) -> List[Statement]:
+    """break/continue statements of a loop body that target this loop or an outer one."""
+    found: List[Statement] = []
+
+    def visit(node: ASTNode, nested: Optional[Set[Optional[str]]]):
+        # nested: labels of the loops between node and `loop` (None if there are none)
+        for child in iter_child_nodes(node):
+            if isinstance(child, (BreakStatement, ContinueStatement)):
+                if nested is None or (child.label is not None and child.label not in nested):
+                    found.append(child)
+            elif isinstance(child, (WhileStatement, ForStatement)):
+                # The condition (or range) runs in the enclosing loop
+                for part in iter_child_nodes(child):
+                    if part is not child.body:
+                        visit(part, nested)
+                visit(child.body, (nested or set()) | {child.label})
+            else:
+                visit(child, nested)
+
+    visit(loop.body, None)
+    return found
+
+
+def targets(jump: Statement, loop: Loop) -> bool:
+    """Check if a jump returned by loop_jumps(loop) targets loop itself."""
+    return jump.label is None or jump.label == loop.label
+
+
+def can_exit(loop: Loop) -> bool:
+    """Check if a loop can be left other than by its condition (return, break, outer jumps)."""
+    if any(isinstance(n, ReturnStatement) for n in walk(loop.body)):
+        return True
+    return any(not (isinstance(jump, ContinueStatement) and targets(jump, loop))
+               for jump in loop_jumps(loop))
+
+
+def has_jumps(node: ASTNode) -> bool:
+    """Check if a subtree contains any return, break or continue."""
+    return any(isinstance(n, (ReturnStatement, BreakStatement, ContinueStatement)) for n in walk(node))
@@ -0,0 +1,156 @@
+"""
+Loop idiom analysis: counted while loops that only accumulate.
+
+    var i = 0
+    while (i < n) {
+        sum = sum + i * i
+        count = count + (if (i % 3 == 0) 1 else 0)
+        i = i + 1
+    }
+
+A counted loop (see counted_loops.py) is a reduction when every statement
+of its body other than the increment is 'acc = acc + term' or
+'acc = acc - term', where:
+- term is built from Int literals, the counter, loop-invariant variables,
+  + - * / %, unary minus and if-expressions whose conditions compare such
+  terms (with &&, || and !);
+- no term reads an accumulator, and no accumulator is the counter or a
+  variable of the bound.
+
+The terms have no calls and no assignments, so they have no side
+effects, and each accumulator ends up as its entry value plus the sum of
+its terms over the counter's range. The evaluator computes that sum in
+closed form or vectorized (see runtime/reductions.py) instead of running
+the body once per value; the guards that need run-time values (all
+inputs are Ints) stay with the evaluator.
+
+Run after CountedLoopAnalysis.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Set
+
+from ..parser.ast_nodes import *
+
+
+TERM_OPERATORS = {"+", "-", "*", "/", "%"}
+
+COMPARISONS = {"<", "<=", ">", ">=", "==", "!="}
+
+
+@dataclass
+class Accumulation:
+    """One 'acc = acc + term' (sign 1) or 'acc = acc - term' (sign -1) of a reduction."""
+    target: str
+    term: Expression
+    sign: int
+
+
+@dataclass
+class ReductionLoop:
+    """Accumulations of a counted while loop whose body does nothing else."""
+    counter: str
+    accumulations: List[Accumulation]
+    inputs: List[str]  # Loop-invariant variables read by the terms
+
+    @property
+    def targets(self) -> List[str]:
+        """Accumulators, in order of first update."""
+        return list(dict.fromkeys(acc.target for acc in self.accumulations))
+
+    def __repr__(self) -> str:
+        return f"ReductionLoop({self.counter}: {', '.join(self.targets)})"
+
+
+class LoopIdiomAnalysis:
+    """Marks counted while loops that are reductions (WhileStatement.idiom)."""
+
+    def analyze(self, program: Program) -> List[WhileStatement]:
+        """Mark every while loop of the program; returns the reductions."""
+        found = []
+        for node in walk(program):
+            if isinstance(node, WhileStatement):
+                node.idiom = self.plan(node)
+                if node.idiom is not None:
+                    found.append(node)
+        return found
+
+    def plan(self, loop: WhileStatement) -> Optional[ReductionLoop]:
+        """Reduction plan of a while loop, or None if it is not a counted accumulation loop."""
+        counted = loop.counted
+        if counted is None or not counted.body.statements:
+            return None
+
+        accumulations = []
+        for stmt in counted.body.statements:
+            accumulation = self._accumulation(stmt)
+            if accumulation is None:
+                return None
+            accumulations.append(accumulation)
+
+        targets = {acc.target for acc in accumulations}
+        if counted.counter in targets or targets & set(counted.names):
+            return None
+        inputs: Set[str] = set()
+        for acc in accumulations:
+            if not self._term(acc.term, targets, inputs):
+                return None
+        inputs.discard(counted.counter)
+        return ReductionLoop(counted.counter, accumulations, sorted(inputs))
+
+    def _accumulation(self, stmt: Statement) -> Optional[Accumulation]:
+        """'acc = acc + term', 'acc = term + acc' or 'acc = acc - term', or None."""
+        if not isinstance(stmt, ExpressionStatement):
+            return None
+        assign = stmt.expression
+        if not (isinstance(assign, AssignmentExpression) and isinstance(assign.value, BinaryExpression)):
+            return None
+        target, value = assign.target, assign.value
+        left_is_target = isinstance(value.left, IdentifierExpression) and value.left.name == target
+        if value.operator == "+":
+            if left_is_target:
+                return Accumulation(target, value.right, 1)
+            if isinstance(value.right, IdentifierExpression) and value.right.name == target:
+                return Accumulation(target, value.left, 1)
+        elif value.operator == "-" and left_is_target:
+            return Accumulation(target, value.right, -1)
+        return None
+
+    def _term(self, node: Expression, targets: Set[str], inputs: Set[str]) -> bool:
+        """Check if an expression is an Int term; collect the variables it reads."""
+        if isinstance(node, LiteralExpression):
+            return node.literal_type == "Int"
+        if isinstance(node, IdentifierExpression):
+            inputs.add(node.name)
+            return node.name not in targets
+        if isinstance(node, BinaryExpression) and node.operator in TERM_OPERATORS:
+            return self._term(node.left, targets, inputs) and self._term(node.right, targets, inputs)
+        if isinstance(node, UnaryExpression) and node.operator == "-":
+            return self._term(node.operand, targets, inputs)
+        if isinstance(node, IfExpression):
+            return (self._condition(node.condition, targets, inputs)
+                    and self._term(unwrap(node.then_branch), targets, inputs)
+                    and self._term(unwrap(node.else_branch), targets, inputs))
+        return False
+
+    def _condition(self, node: Expression, targets: Set[str], inputs: Set[str]) -> bool:
+        """Check if an expression is a Boolean condition over Int terms."""
+        if isinstance(node, LiteralExpression):
+            return node.literal_type == "Boolean"
+        if isinstance(node, BinaryExpression):
+            if node.operator in COMPARISONS:
+                return self._term(node.left, targets, inputs) and self._term(node.right, targets, inputs)
+            if node.operator in ("&&", "||"):
+                return (self._condition(node.left, targets, inputs)
+                        and self._condition(node.right, targets, inputs))
+        if isinstance(node, UnaryExpression) and node.operator == "!":
+            return self._condition(node.operand, targets, inputs)
+        return False
+
+
+def unwrap(node: Expression) -> Expression:
+    """The expression of a branch written as a block '{ e }'."""
+    while (isinstance(node, BlockExpression) and len(node.statements) == 1
+           and isinstance(node.statements[0], ExpressionStatement)):
+        node = node.statements[0].expression
+    return node
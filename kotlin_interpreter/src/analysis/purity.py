@@ -0,0 +1,162 @@
+"""
+Purity (effect) analysis for user functions.
+
+Interprocedural analysis that decides which functions are pure, i.e. whose
+result depends only on their arguments and which have no observable effects.
+Pure functions can safely be memoized by the evaluator.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from ..parser.ast_nodes import *
+
+
+# Built-in functions that produce output
+IO_BUILTINS = {"println", "print"}
+
+
+@dataclass
+class EffectInfo:
+    """Effect summary for a single user function."""
+    name: str
+    is_pure: bool = True
+    reasons: List[str] = field(default_factory=list)  # Why the function is impure
+    callees: Set[str] = field(default_factory=set)  # User functions called directly
+
+    def __repr__(self) -> str:
+        status = "pure" if self.is_pure else "impure"
+        return f"EffectInfo({self.name}: {status})"
+
+
+class PurityAnalysis:
+    """
+    Marks user functions as pure or impure.
+
+    A function is pure when:
+    1. It does not call println/print
+    2. It does not assign to global variables
+    3. It does not read mutable (var) global variables
+    4. It only calls pure functions
+
+    Rule 3 is needed so that memoized results stay valid when globals change.
+    Recursion is handled by a greatest fixpoint: every function starts pure
+    and impurity is propagated backwards along call edges until stable.
+    """
+
+    def __init__(self):
+        """Initialize analysis state."""
+        self.functions: Dict[str, FunctionDeclaration] = {}
+        self.global_vars: Dict[str, bool] = {}  # name -> is_mutable
+        self.effects: Dict[str, EffectInfo] = {}
+
+    def analyze(self, program: Program) -> Dict[str, EffectInfo]:
+        """Analyze program and return effect info for every user function."""
+        self.functions = {}
+        self.global_vars = {}
+        self.effects = {}
+
+        for decl in program.declarations:
+            if isinstance(decl, FunctionDeclaration):
+                self.functions[decl.name] = decl
+            elif isinstance(decl, VariableDeclaration):
+                self.global_vars[decl.name] = decl.is_mutable
+
+        # Local effects of each function body
+        for name, func in self.functions.items():
+            info = EffectInfo(name)
+            scopes = [{param.name for param in func.parameters}]
+            self._visit(func.body, info, scopes)
+            self.effects[name] = info
+
+        # Propagate impurity through the call graph
+        changed = True
+        while changed:
+            changed = False
+            for info in self.effects.values():
+                if not info.is_pure:
+                    continue
+                for callee in sorted(info.callees):
+                    if not self.effects[callee].is_pure:
+                        info.is_pure = False
+                        info.reasons.append(f"calls impure function '{callee}'")
+                        changed = True
+                        break
+
+        return self.effects
+
+    def is_pure(self, name: str) -> bool:
+        """Check if a function was found pure."""
+        info = self.effects.get(name)
+        return info is not None and info.is_pure
+
+    def pure_functions(self) -> List[str]:
+        """Names of all pure functions, in declaration order."""
+        return [name for name, info in self.effects.items() if info.is_pure]
+
+    # AST traversal with lexical scoping
+
+    def _is_local(self, name: str, scopes: List[Set[str]]) -> bool:
+        """Check if name refers to a parameter or local variable."""
+        return any(name in scope for scope in scopes)
+
+    def _mark_impure(self, info: EffectInfo, reason: str):
+        """Record a local effect."""
+        info.is_pure = False
+        if reason not in info.reasons:
+            info.reasons.append(reason)
+
+    def _visit(self, node: ASTNode, info: EffectInfo, scopes: List[Set[str]]):
+        """Visit node, tracking declared names per block."""
+        if isinstance(node, (BlockStatement, BlockExpression)):
+            scopes.append(set())
+            for stmt in node.statements:
+                self._visit(stmt, info, scopes)
+            scopes.pop()
+            return
+
+        if isinstance(node, VariableDeclaration):
+            if node.initializer:
+                self._visit(node.initializer, info, scopes)
+            scopes[-1].add(node.name)
+            return
+
+        if isinstance(node, ForStatement):
+            for bound in (node.start, node.end, node.step):
+                if bound is not None:
+                    self._visit(bound, info, scopes)
+            scopes.append({node.variable})
+            self._visit(node.body, info, scopes)
+            scopes.pop()
+            return
+
+        if isinstance(node, AssignmentExpression):
+            self._visit(node.value, info, scopes)
+            if not self._is_local(node.target, scopes):
+                self._mark_impure(info, f"writes global '{node.target}'")
+            return
+
+        if isinstance(node, IdentifierExpression):
+            if not self._is_local(node.name, scopes) and self.global_vars.get(node.name):
+                self._mark_impure(info, f"reads mutable global '{node.name}'")
+            return
+
+        if isinstance(node, CallExpression):
+            for arg in node.arguments:
+                self._visit(arg, info, scopes)
+            name = node.function_name
+            if name in IO_BUILTINS:
+                self._mark_impure(info, f"calls '{name}'")
+            elif name in self.functions:
+                info.callees.add(name)
+            else:
+                self._mark_impure(info, f"calls unknown function '{name}'")
+            return
+
+        for child in iter_child_nodes(node):
+            self._visit(child, info, scopes)
+
+
+def analyze_purity(program: Program) -> Dict[str, EffectInfo]:
+    """Convenience wrapper: run purity analysis on a program."""
+    return PurityAnalysis().analyze(program)
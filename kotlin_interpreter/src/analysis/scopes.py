@@ -0,0 +1,150 @@
+"""
+Scope (escape) analysis for blocks.
+
+The evaluator creates an Environment for every block it runs, including
+every iteration of a while body. A block only needs its own Environment
+when running it in the enclosing frame could be observed. This analysis
+finds blocks that do not, and clears their needs_scope flag:
+- blocks that declare nothing;
+- blocks whose locals cannot collide with any other binding and are only
+  referenced inside the block (their declarations can go in a flat frame).
+
+The function body itself is flattened into the parameter frame when its
+locals neither repeat nor shadow a parameter.
+
+Capture: the language has no lambdas and no local functions, and user
+functions close over the global environment only, so no local variable
+can be captured or outlive its frame. Every local of a flattened block is
+therefore non-escaping; if closures are added, captured names must be
+excluded in _can_flatten.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+
+from ..parser.ast_nodes import *
+
+
+BUILTIN_NAMES = {"println", "print"}
+
+
+@dataclass
+class ScopeInfo:
+    """Scope decisions for one function."""
+    name: str
+    flat_body: bool = False
+    flat_locals: Set[str] = field(default_factory=set)  # Locals stored in an enclosing frame
+    captured: Set[str] = field(default_factory=set)  # Locals referenced by a closure
+    scoped_blocks: int = 0
+    flat_blocks: int = 0
+
+    def __repr__(self) -> str:
+        return (f"ScopeInfo({self.name}: {self.flat_blocks} flat, "
+                f"{self.scoped_blocks} scoped blocks)")
+
+
+def declared_names(statements: List[Statement]) -> List[str]:
+    """Names declared directly in a block (not in nested blocks)."""
+    return [
+        stmt.declaration.name for stmt in statements
+        if isinstance(stmt, DeclarationStatement)
+        and isinstance(stmt.declaration, VariableDeclaration)
+    ]
+
+
+def referenced_name(node: ASTNode):
+    """Variable name read or written by a node, if any."""
+    if isinstance(node, IdentifierExpression):
+        return node.name
+    if isinstance(node, AssignmentExpression):
+        return node.target
+    if isinstance(node, CallExpression):
+        return node.function_name
+    return None
+
+
+class ScopeAnalysis:
+    """
+    Marks blocks that can run without their own Environment.
+
+    Blocks in global variable initializers are only flattened when they
+    declare nothing, since their locals would otherwise become globals.
+    """
+
+    def analyze(self, program: Program) -> Dict[str, ScopeInfo]:
+        """Analyze all functions and global initializers, marking blocks on the AST."""
+        self.global_names = BUILTIN_NAMES | {
+            decl.name for decl in program.declarations
+            if isinstance(decl, (FunctionDeclaration, VariableDeclaration))
+        }
+
+        results = {}
+        for decl in program.declarations:
+            if isinstance(decl, FunctionDeclaration):
+                results[decl.name] = self.analyze_function(decl)
+            elif isinstance(decl, VariableDeclaration) and decl.initializer:
+                for node in walk(decl.initializer):
+                    if isinstance(node, (BlockStatement, BlockExpression)):
+                        node.needs_scope = bool(declared_names(node.statements))
+        return results
+
+    def analyze_function(self, func: FunctionDeclaration) -> ScopeInfo:
+        """Analyze a single function and mark its blocks."""
+        info = ScopeInfo(func.name)
+        params = {param.name for param in func.parameters}
+
+        declaration_count: Dict[str, int] = {}
+        for node in walk(func.body):
+            if isinstance(node, VariableDeclaration):
+                declaration_count[node.name] = declaration_count.get(node.name, 0) + 1
+            elif isinstance(node, ForStatement):
+                # The loop variable is a binding too (in the loop's own scope)
+                declaration_count[node.variable] = declaration_count.get(node.variable, 0) + 1
+
+        # Function body: locals go in the parameter frame
+        body_names = declared_names(func.body.statements)
+        func.body.needs_scope = not all(
+            declaration_count[name] == 1 and name not in params for name in body_names
+        )
+        info.flat_body = not func.body.needs_scope
+        if info.flat_body:
+            info.flat_locals.update(body_names)
+
+        references: Dict[str, List[int]] = {}
+        for node in walk(func.body):
+            name = referenced_name(node)
+            if name is not None:
+                references.setdefault(name, []).append(id(node))
+
+        for node in walk(func.body):
+            if node is func.body or not isinstance(node, (BlockStatement, BlockExpression)):
+                continue
+            names = declared_names(node.statements)
+            if self._can_flatten(node, names, params, declaration_count, references):
+                node.needs_scope = False
+                info.flat_blocks += 1
+                info.flat_locals.update(names)
+            else:
+                node.needs_scope = True
+                info.scoped_blocks += 1
+
+        return info
+
+    def _can_flatten(self, block: ASTNode, names: List[str], params: Set[str],
+                     declaration_count: Dict[str, int],
+                     references: Dict[str, List[int]]) -> bool:
+        """Check if a block's declarations can live in the enclosing frame."""
+        if not names:
+            return True
+
+        for name in names:
+            # Another binding with this name could be read before the declaration
+            # runs again (loops) or be overwritten by it
+            if declaration_count[name] != 1 or name in params or name in self.global_names:
+                return False
+
+        inside = {id(node) for node in walk(block)}
+        for name in names:
+            if any(ref not in inside for ref in references.get(name, ())):
+                return False
+        return True
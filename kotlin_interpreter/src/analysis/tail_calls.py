@@ -0,0 +1,111 @@
+"""
+Tail-call analysis for self-recursive functions.
+
+Finds self-recursive calls in tail position and marks them on the AST
+(CallExpression.tail_call) so the evaluator can run them as a loop that
+rebinds parameters in place instead of growing the Python stack.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from ..parser.ast_nodes import *
+
+
+@dataclass
+class TailCallInfo:
+    """Self-recursive call sites of one function."""
+    name: str
+    is_tailrec: bool
+    tail_calls: List[CallExpression] = field(default_factory=list)
+    non_tail_calls: List[CallExpression] = field(default_factory=list)
+
+    @property
+    def has_tail_calls(self) -> bool:
+        """Check if any self-call is in tail position."""
+        return len(self.tail_calls) > 0
+
+    def __repr__(self) -> str:
+        return (f"TailCallInfo({self.name}: {len(self.tail_calls)} tail, "
+                f"{len(self.non_tail_calls)} non-tail)")
+
+
+class TailCallAnalysis:
+    """
+    Detects self-recursive calls in tail position.
+
+    Tail positions in a function body:
+    - the value of a return statement
+    - the last statement of the body block (its value is the call result)
+    - both branches of an if statement/expression in tail position
+    - the last statement of a block in tail position
+
+    Detection is automatic for every function; the 'tailrec' modifier only
+    adds diagnostics when the function has no tail calls or has
+    self-calls that are not in tail position.
+    """
+
+    def analyze(self, program: Program) -> Dict[str, TailCallInfo]:
+        """Analyze all functions and mark tail calls on the AST."""
+        results = {}
+        for decl in program.declarations:
+            if isinstance(decl, FunctionDeclaration):
+                results[decl.name] = self.analyze_function(decl)
+        return results
+
+    def analyze_function(self, func: FunctionDeclaration) -> TailCallInfo:
+        """Analyze a single function and mark its tail calls."""
+        info = TailCallInfo(func.name, func.is_tailrec)
+
+        # Functions whose parameters shadow their own name cannot self-call
+        if any(param.name == func.name for param in func.parameters):
+            return info
+
+        tail_ids = set()
+        self._visit_tail_statement(func.body, func, info, tail_ids)
+
+        # Return statements anywhere in the body are tail positions
+        for node in walk(func.body):
+            if isinstance(node, ReturnStatement) and node.value is not None:
+                self._visit_tail_expression(node.value, func, info, tail_ids)
+
+        for node in walk(func.body):
+            if isinstance(node, CallExpression) and node.function_name == func.name:
+                if id(node) in tail_ids:
+                    node.tail_call = True
+                else:
+                    node.tail_call = False
+                    info.non_tail_calls.append(node)
+
+        return info
+
+    def _visit_tail_statement(self, node: Statement, func: FunctionDeclaration,
+                              info: TailCallInfo, tail_ids: set):
+        """Visit a statement whose value is the function result."""
+        if isinstance(node, BlockStatement):
+            self._visit_tail_block(node.statements, func, info, tail_ids)
+        elif isinstance(node, ExpressionStatement):
+            self._visit_tail_expression(node.expression, func, info, tail_ids)
+        elif isinstance(node, IfStatement):
+            self._visit_tail_statement(node.then_branch, func, info, tail_ids)
+            if node.else_branch:
+                self._visit_tail_statement(node.else_branch, func, info, tail_ids)
+
+    def _visit_tail_block(self, statements: List[Statement], func: FunctionDeclaration,
+                          info: TailCallInfo, tail_ids: set):
+        """Only the last statement of a block in tail position is a tail position."""
+        if statements:
+            self._visit_tail_statement(statements[-1], func, info, tail_ids)
+
+    def _visit_tail_expression(self, node: Expression, func: FunctionDeclaration,
+                               info: TailCallInfo, tail_ids: set):
+        """Visit an expression whose value is the function result."""
+        if isinstance(node, CallExpression):
+            if node.function_name == func.name and id(node) not in tail_ids:
+                tail_ids.add(id(node))
+                info.tail_calls.append(node)
+        elif isinstance(node, IfExpression):
+            self._visit_tail_expression(node.then_branch, func, info, tail_ids)
+            self._visit_tail_expression(node.else_branch, func, info, tail_ids)
+        elif isinstance(node, BlockExpression):
+            self._visit_tail_block(node.statements, func, info, tail_ids)
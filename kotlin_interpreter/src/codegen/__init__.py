@@ -1,6 +1,6 @@
 """
 Code Generation Module
-Generates platform-specific code from IR
+Generates platform-specific code from IR, and Python source from the AST
 """
 from .generators import (
     CodeGenerator,
@@ -8,10 +8,16 @@ from .generators import (
     JavaScriptGenerator,
     NativeCodeGenerator
 )
+from .python_transpiler import PythonTranspiler, PythonModule
+from .python_runtime import PythonEngine, CodeCache
 
 __all__ = [
     'CodeGenerator',
     'JVMBytecodeGenerator',
     'JavaScriptGenerator',
-    'NativeCodeGenerator'
+    'NativeCodeGenerator',
+    'PythonTranspiler',
+    'PythonModule',
+    'PythonEngine',
+    'CodeCache'
 ]
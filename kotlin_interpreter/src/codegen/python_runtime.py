@@ -0,0 +1,342 @@
+"""
+Runtime for transpiled programs ("py" engine).
+
+PythonEngine transpiles a Program (PythonTranspiler), compiles the source
+with compile() and runs it. Compiled code objects are cached on disk as
+marshal data, keyed by a hash of the generated source and the running
+Python's bytecode magic number, so unchanged programs skip compile().
+Loading a code object runs it, so the cache lives in the user's own cache
+directory (mode 0700) and entries not owned by the user are ignored.
+
+The helpers below are the globals of the generated module: type-checked
+operators with the Evaluator's error messages and the checked call used
+for function values; the print/println builtins are added per engine,
+bound to its OutputSink.
+"""
+
+import hashlib
+import importlib.util
+import marshal
+import os
+import time
+from pathlib import Path
+from types import CodeType, FunctionType
+from typing import Any, Dict, Optional
+
+from ..parser.ast_nodes import Program
+from ..runtime.runtime_objects import RuntimeValue
+from ..runtime.operators import int_divide, int_remainder
+from ..runtime.evaluator import ExecutionTimeout, DEADLINE_CHECK_INTERVAL
+from ..runtime.output import OutputSink
+from ..runtime.ropes import Rope, concat
+from ..runtime.unboxed import UNIT, box, type_name, int_range
+from .python_transpiler import PythonTranspiler, PythonModule
+
+
+FILENAME = "<kotlin>"
+CACHE_HOME = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+DEFAULT_CACHE_DIR = CACHE_HOME / "kotlin_interpreter" / "py_cache"
+
+
+class Builtin:
+    """A builtin function value."""
+
+    def __init__(self, name: str, func):
+        self.name = name
+        self.func = func
+
+    def __str__(self) -> str:
+        return f"<builtin {self.name}>"
+
+
+def text(value: Any) -> str:
+    """Format a value like println does."""
+    kind = type(value)
+    if kind is str:
+        return value
+    if kind is Rope:
+        return str(value)
+    if kind is bool:
+        return "true" if value else "false"
+    if value is UNIT:
+        return "kotlin.Unit"
+    if kind is FunctionType:
+        return f"<function({', '.join(value.kotlin_parameters)})>"
+    return str(value)
+
+
+# Helpers used by generated code
+
+def _operands_error(op: str, left: Any, right: Any):
+    raise RuntimeError(f"Invalid operands for {op}: {type_name(left)}, {type_name(right)}")
+
+
+def _add(left, right):
+    if type(left) is int and type(right) is int:
+        return left + right
+    if type(left) is str or type(left) is Rope:
+        return concat(left, text(right))
+    if type(right) is str or type(right) is Rope:
+        return concat(text(left), text(right))
+    _operands_error("+", left, right)
+
+
+def _concat(left, right):
+    return concat(left, right if type(right) is str else str(right))
+
+
+def _sub(left, right):
+    if type(left) is int and type(right) is int:
+        return left - right
+    _operands_error("-", left, right)
+
+
+def _mul(left, right):
+    if type(left) is int and type(right) is int:
+        return left * right
+    _operands_error("*", left, right)
+
+
+def _div(left, right):
+    if type(left) is int and type(right) is int:
+        if right == 0:
+            raise RuntimeError("Division by zero")
+        return int_divide(left, right)
+    _operands_error("/", left, right)
+
+
+def _mod(left, right):
+    if type(left) is int and type(right) is int:
+        if right == 0:
+            raise RuntimeError("Modulo by zero")
+        return int_remainder(left, right)
+    _operands_error("%", left, right)
+
+
+def _compare(op: str):
+    def compare(left, right):
+        if type(left) is int and type(right) is int:
+            return COMPARE[op](left, right)
+        _operands_error(op, left, right)
+    return compare
+
+
+COMPARE = {
+    "<": int.__lt__, "<=": int.__le__, ">": int.__gt__, ">=": int.__ge__,
+}
+
+
+def _eq(left, right):
+    return type_name(left) == type_name(right) and left == right
+
+
+def _and(left, right):
+    if type(left) is bool and type(right) is bool:
+        return left and right
+    _operands_error("&&", left, right)
+
+
+def _or(left, right):
+    if type(left) is bool and type(right) is bool:
+        return left or right
+    _operands_error("||", left, right)
+
+
+def _neg(operand):
+    if type(operand) is int:
+        return -operand
+    raise RuntimeError(f"Invalid operand for -: {type_name(operand)}")
+
+
+def _not(operand):
+    if type(operand) is bool:
+        return not operand
+    raise RuntimeError(f"Invalid operand for !: {type_name(operand)}")
+
+
+def _cond(value):
+    if type(value) is bool:
+        return value
+    raise RuntimeError(f"Type {type_name(value)} cannot be used as condition")
+
+
+def _arity(expected: int, *args):
+    raise RuntimeError(f"Function expects {expected} arguments, got {len(args)}")
+
+
+def _call(name: str, func, *args):
+    if type(func) is FunctionType:
+        if func.__code__.co_argcount != len(args):
+            _arity(func.__code__.co_argcount, *args)
+        return func(*args)
+    if type(func) is Builtin:
+        return func.func(*args)
+    raise RuntimeError(f"'{name}' is not a function")
+
+
+def _undefined(name: str, *value):
+    raise RuntimeError(f"Undefined variable: '{name}'")
+
+
+def _fail(message: str, *operands):
+    raise RuntimeError(message)
+
+
+RUNTIME = {
+    "_UNIT": UNIT,
+    "_add": _add, "_concat": _concat, "_sub": _sub, "_mul": _mul, "_div": _div, "_mod": _mod,
+    "_lt": _compare("<"), "_le": _compare("<="), "_gt": _compare(">"), "_ge": _compare(">="),
+    "_eq": _eq, "_and": _and, "_or": _or, "_neg": _neg, "_not": _not, "_cond": _cond,
+    "_range": int_range,
+    "_arity": _arity, "_call": _call, "_undefined": _undefined, "_fail": _fail,
+}
+
+
+class CodeCache:
+    """On-disk cache of compiled code objects (marshal format)."""
+
+    def __init__(self, directory: Path):
+        """Initialize cache in directory (created on first store)."""
+        self.directory = Path(directory)
+
+    @staticmethod
+    def key(source: str) -> str:
+        """Cache key: hash of the source and of the bytecode format."""
+        digest = hashlib.sha256(importlib.util.MAGIC_NUMBER)
+        digest.update(source.encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def owned(path: Path) -> bool:
+        """Check if path belongs to the current user (always true where there are no uids)."""
+        if not hasattr(os, "getuid"):
+            return True
+        return path.stat().st_uid == os.getuid()
+
+    def load(self, key: str) -> Optional[CodeType]:
+        """Cached code object, or None (missing, unreadable or foreign entries are ignored)."""
+        path = self.directory / f"{key}.marshal"
+        try:
+            if not (self.owned(self.directory) and self.owned(path)):
+                return None
+            code = marshal.loads(path.read_bytes())
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+        return code if isinstance(code, CodeType) else None
+
+    def store(self, key: str, code: CodeType):
+        """Save a code object (best effort: an unwritable or foreign cache is skipped)."""
+        try:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            if not self.owned(self.directory):
+                return
+            path = self.directory / f"{key}.marshal"
+            partial = path.with_suffix(f".{os.getpid()}.tmp")
+            partial.write_bytes(marshal.dumps(code))
+            os.replace(partial, path)
+        except OSError:
+            pass
+
+
+class PythonEngine:
+    """
+    Runs programs as transpiled Python.
+
+    Same interface as the Evaluator for running a program: evaluate()
+    returns main's result (as a RuntimeValue). Run-time errors carry the
+    Kotlin line they happened on as kotlin_line.
+    """
+
+    def __init__(self, time_limit: Optional[float] = None, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+                 output: Optional[OutputSink] = None):
+        """
+        Initialize engine.
+
+        Args:
+            time_limit: Abort with ExecutionTimeout after this many seconds
+            cache_dir: Directory for cached code objects (None disables caching)
+            output: Sink for print/println (default: buffered, to sys.stdout)
+        """
+        self.time_limit = time_limit
+        self.output = output if output is not None else OutputSink()
+        self.cache = CodeCache(cache_dir) if cache_dir is not None else None
+        self.module: Optional[PythonModule] = None
+        self.cache_hit = False
+
+    def compile(self, program: Program) -> CodeType:
+        """Transpile and compile a program (through the cache)."""
+        self.module = PythonTranspiler(deadline_checks=self.time_limit is not None).transpile(program)
+        key = CodeCache.key(self.module.source)
+        code = self.cache.load(key) if self.cache else None
+        self.cache_hit = code is not None
+        if code is None:
+            code = compile(self.module.source, FILENAME, "exec")
+            if self.cache:
+                self.cache.store(key, code)
+        return code
+
+    def evaluate(self, program: Program) -> RuntimeValue:
+        """Compile and run a program."""
+        code = self.compile(program)
+        namespace: Dict[str, Any] = dict(RUNTIME)
+        namespace.update(self._make_output())
+        if self.time_limit is not None:
+            namespace["_tick"] = self._make_tick()
+        try:
+            exec(code, namespace)
+            result = namespace["_init"]()
+            main = namespace.get("k_main")
+            if "main" in self.module.functions and type(main) is FunctionType:
+                result = _call("main", main)
+        except NameError as e:
+            # A global read before its initializer ran
+            name = self.module.global_names.get(e.name, e.name)
+            error = RuntimeError(f"Undefined variable: '{name}'")
+            error.kotlin_line = self._kotlin_line(e)
+            raise error from None
+        except Exception as e:
+            e.kotlin_line = self._kotlin_line(e)
+            raise
+        finally:
+            self.output.flush()
+        return box(result)
+
+    def _kotlin_line(self, error: Exception) -> Optional[int]:
+        """Kotlin line of the innermost generated frame of a traceback."""
+        line = None
+        tb = error.__traceback__
+        while tb is not None:
+            if tb.tb_frame.f_code.co_filename == FILENAME:
+                line = self.module.kotlin_line(tb.tb_lineno) or line
+            tb = tb.tb_next
+        return line
+
+    def _make_output(self) -> Dict[str, Any]:
+        """print/println helpers (and their function values) writing to the sink."""
+        write = self.output.write
+
+        def _println(*args):
+            write(text(args[0]) + "\n" if args else "\n")
+            return UNIT
+
+        def _print(*args):
+            if args:
+                write(text(args[0]))
+            return UNIT
+
+        return {"_println": _println, "_print": _print,
+                "k_println": Builtin("println", _println), "k_print": Builtin("print", _print)}
+
+    def _make_tick(self):
+        """Deadline check called by generated code (reads the clock rarely)."""
+        deadline = time.monotonic() + self.time_limit
+        ticks = [DEADLINE_CHECK_INTERVAL]
+        time_limit = self.time_limit
+
+        def _tick():
+            ticks[0] -= 1
+            if ticks[0] <= 0:
+                ticks[0] = DEADLINE_CHECK_INTERVAL
+                if time.monotonic() > deadline:
+                    raise ExecutionTimeout(f"Time limit of {time_limit}s exceeded")
+        return _tick
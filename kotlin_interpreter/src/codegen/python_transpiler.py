@@ -0,0 +1,853 @@
+"""
+Kotlin → Python source transpiler.
+
+Turns a Program into a Python module that CPython compiles and runs
+directly (see python_runtime.PythonEngine):
+- Kotlin functions become defs; global variables are assigned in _init();
+- every local declaration gets its own Python name, so block scoping and
+  shadowing need no scope objects (x, x_2, ...);
+- if/while map to Python if/while and for loops to a Python for over a
+  range; a self-call in tail position rebinds
+  the parameters and restarts the body loop;
+- break/continue map to Python break/continue when their loop is the
+  innermost Python loop; jumps to an outer loop set a flag variable that
+  is checked after each Python loop they leave;
+- block expressions are hoisted into statements assigning a temporary,
+  keeping left-to-right evaluation order.
+
+Semantics are those of the Evaluator (&& and || short-circuit, as
+Python's 'and' and 'or' when both operands are known Booleans): operators
+whose operand types are known statically (from a small flow-insensitive inference over locals)
+compile to plain Python operators; everything else calls helpers that
+check types and raise the Evaluator's error messages. Int division and
+remainder truncate toward zero, as in Kotlin.
+
+Each generated line records the Kotlin line it came from (line_map), so
+run-time errors can be reported at Kotlin locations.
+"""
+
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from ..parser.ast_nodes import *
+from ..analysis.tail_calls import TailCallAnalysis
+
+
+BUILTINS = ("println", "print")
+
+# Kinds of values known at compile time; BOTTOM means "no information yet"
+INT, STRING, BOOLEAN, UNIT_KIND = "Int", "String", "Boolean", "Unit"
+BOTTOM = ""
+
+ARITHMETIC = {"-": "_sub", "*": "_mul", "/": "_div", "%": "_mod"}
+COMPARISONS = {"<": "_lt", "<=": "_le", ">": "_gt", ">=": "_ge"}
+# Operator -> (Python operator, value that decides the result, checked helper)
+LOGICAL = {"&&": ("and", "False", "_and"), "||": ("or", "True", "_or")}
+
+
+def join(left: Optional[str], right: Optional[str]) -> Optional[str]:
+    """Least upper bound of two kinds (None: unknown)."""
+    if left == BOTTOM:
+        return right
+    if right == BOTTOM:
+        return left
+    return left if left == right else None
+
+
+@dataclass
+class PythonModule:
+    """Result of transpiling a Program."""
+    source: str
+    line_map: Dict[int, int]  # Python line -> Kotlin line
+    global_names: Dict[str, str]  # Python global name -> Kotlin name
+    functions: List[str]  # Kotlin names of the transpiled functions
+
+    def kotlin_line(self, python_line: int) -> Optional[int]:
+        """Kotlin line of a generated line, if known."""
+        return self.line_map.get(python_line)
+
+
+@dataclass
+class Evaluated(Expression):
+    """An operand already evaluated into a Python temporary."""
+    location: SourceLocation
+    python: str
+    known_kind: Optional[str] = None
+
+
+@dataclass(eq=False)
+class PythonLoop:
+    """A Python while loop being emitted for a Kotlin loop."""
+    label: Optional[str]
+    active: bool = False  # Body being emitted (jumps in a hoisted condition target outer loops)
+    flag: Optional[str] = None  # Set to BREAK/CONTINUE by jumps from nested Python loops
+    escapes: List['PythonLoop'] = field(default_factory=list)  # Outer targets of jumps leaving this loop
+
+
+# Values of a PythonLoop flag
+BREAK, CONTINUE = 1, 2
+
+
+@dataclass
+class Binding:
+    """A parameter or local declaration of the function being transpiled."""
+    python_name: str
+    kind: Optional[str] = BOTTOM
+    is_parameter: bool = False
+    values: List[Expression] = field(default_factory=list)  # Everything assigned to it
+
+
+class FunctionContext:
+    """Per-function state: resolved names, temporaries and loop nesting."""
+
+    def __init__(self, name: Optional[str], reserved: Set[str]):
+        self.name = name
+        self.used: Set[str] = set(reserved)
+        self.bindings: Dict[int, Binding] = {}  # id(node) -> binding
+        self.parameters: List[Binding] = []
+        self.global_assignments: Set[str] = set()
+        self.temp_count = 0
+        self.loop_depth = 0
+        self.loops: List[PythonLoop] = []
+        self.flags: List[str] = []
+        self.tail_loop = False
+
+    def fresh(self, base: str) -> str:
+        """Allocate an unused Python local name."""
+        name = base
+        counter = 2
+        while name in self.used:
+            name = f"{base}_{counter}"
+            counter += 1
+        self.used.add(name)
+        return name
+
+    def temp(self) -> str:
+        """Allocate a temporary."""
+        self.temp_count += 1
+        return self.fresh(f"_t{self.temp_count}")
+
+
+def python_identifier(name: str) -> str:
+    """Kotlin name → Python name (prefixed, so it never clashes with keywords or helpers)."""
+    name = re.sub(r"\W", "_", name)
+    return f"k_{name}"
+
+
+class PythonTranspiler:
+    """
+    Transpiles a Program to Python source.
+
+    Args:
+        deadline_checks: Call _tick() at every function entry and loop
+            iteration (needed for the time limit)
+    """
+
+    def __init__(self, deadline_checks: bool = False):
+        """Initialize transpiler."""
+        self.deadline_checks = deadline_checks
+        self.lines: List[str] = []
+        self.line_map: Dict[int, int] = {}
+        self.indent = 0
+        self.kotlin_line = 0
+        self.globals: Dict[str, str] = {}  # Kotlin name -> Python name
+        self.functions: Dict[str, FunctionDeclaration] = {}
+        self.callables: Set[str] = set()
+        self.context: Optional[FunctionContext] = None
+        self.hoist_cache: Dict[int, bool] = {}
+
+    # Output
+
+    def emit(self, text: str):
+        """Append a line at the current indentation."""
+        self.lines.append("    " * self.indent + text)
+        if self.kotlin_line:
+            self.line_map[len(self.lines)] = self.kotlin_line
+
+    @contextmanager
+    def suite(self):
+        """Indented block; emits 'pass' if nothing was written in it."""
+        self.indent += 1
+        start = len(self.lines)
+        yield
+        if len(self.lines) == start:
+            self.emit("pass")
+        self.indent -= 1
+
+    # Entry point
+
+    def transpile(self, program: Program) -> PythonModule:
+        """Transpile a whole program."""
+        TailCallAnalysis().analyze(program)
+        self.lines = []
+        self.line_map = {}
+        self.hoist_cache = {}
+
+        functions = [decl for decl in program.declarations if isinstance(decl, FunctionDeclaration)]
+        variables = [decl for decl in program.declarations if isinstance(decl, VariableDeclaration)]
+        self.functions = {func.name: func for func in functions}
+
+        self.globals = {}
+        taken: Set[str] = set()
+        for name in list(BUILTINS) + [decl.name for decl in functions + variables]:
+            if name not in self.globals:
+                python_name = python_identifier(name)
+                counter = 2
+                while python_name in taken:
+                    python_name = f"{python_identifier(name)}_{counter}"
+                    counter += 1
+                taken.add(python_name)
+                self.globals[name] = python_name
+        # A global variable named like a function replaces it once initialized
+        self.callables = (set(BUILTINS) | set(self.functions)) - {var.name for var in variables}
+
+        self.kotlin_line = 0
+        self.emit("# Generated from Kotlin by PythonTranspiler")
+        for func in self.functions.values():
+            self.function(func)
+        self.init_function(variables)
+
+        return PythonModule(
+            source="\n".join(self.lines) + "\n",
+            line_map=dict(self.line_map),
+            global_names={python: kotlin for kotlin, python in self.globals.items()},
+            functions=list(self.functions),
+        )
+
+    # Functions
+
+    @contextmanager
+    def capture(self):
+        """Emit into a separate buffer (yields [lines, line_map] once done)."""
+        outer = self.lines, self.line_map, self.indent
+        self.lines, self.line_map, self.indent = [], {}, 0
+        result = []
+        try:
+            yield result
+        finally:
+            result.extend([self.lines, self.line_map])
+            self.lines, self.line_map, self.indent = outer
+
+    def append(self, lines: List[str], line_map: Dict[int, int], indent: int):
+        """Append captured lines at an extra indentation."""
+        for number, line in enumerate(lines, 1):
+            self.lines.append("    " * indent + line)
+            if number in line_map:
+                self.line_map[len(self.lines)] = line_map[number]
+
+    def function(self, func: FunctionDeclaration):
+        """Transpile one function to a def."""
+        context = FunctionContext(func.name, set(self.globals.values()))
+        for param in func.parameters:
+            context.parameters.append(Binding(context.fresh(python_identifier(param.name)), None, True))
+        self.resolve(context, func.parameters, func.body.statements)
+        self.context = context
+
+        # Body first: the header depends on the globals it assigns and on tail calls
+        with self.capture() as body:
+            self.statements(func.body.statements, "return")
+
+        self.kotlin_line = func.location.line
+        params = ", ".join(binding.python_name for binding in context.parameters)
+        self.emit(f"def {self.globals[func.name]}({params}):")
+        self.indent = 1
+        if context.global_assignments:
+            self.emit(f"global {', '.join(sorted(context.global_assignments))}")
+        for flag in context.flags:
+            self.emit(f"{flag} = 0")
+        if context.tail_loop:
+            self.emit("while True:")
+            self.indent = 2
+        if self.deadline_checks:
+            self.emit("_tick()")
+        self.append(*body, self.indent)
+        self.indent = 0
+        names = "".join(f"{param.name!r}, " for param in func.parameters)
+        self.emit(f"{self.globals[func.name]}.kotlin_parameters = ({names.rstrip(' ')})")
+        self.emit("")
+        self.context = None
+
+    def init_function(self, variables: List[VariableDeclaration]):
+        """Transpile the global initializers, in order, into _init()."""
+        context = FunctionContext(None, set(self.globals.values()))
+        for var in variables:
+            if var.initializer:
+                self.resolve_expression(context, [], var.initializer)
+        self.context = context
+
+        with self.capture() as body:
+            for var in variables:
+                self.kotlin_line = var.location.line
+                value = self.expression(var.initializer) if var.initializer else "_UNIT"
+                self.emit(f"{self.globals[var.name]} = {value}")
+                context.global_assignments.add(self.globals[var.name])
+            self.emit("return _UNIT")
+
+        self.kotlin_line = 0
+        self.emit("def _init():")
+        if context.global_assignments:
+            self.emit(f"    global {', '.join(sorted(context.global_assignments))}")
+        for flag in context.flags:
+            self.emit(f"    {flag} = 0")
+        self.append(*body, 1)
+        self.context = None
+
+    # Name resolution and kind inference (before emitting a function)
+
+    def resolve(self, context: FunctionContext, parameters: List[Parameter], statements: List[Statement]):
+        """Bind every local read and write of a function body; infer local kinds."""
+        scopes = [{param.name: binding for param, binding in zip(parameters, context.parameters)}]
+        # Body locals get their own scope, so they may shadow parameters
+        scopes.append({})
+        for stmt in statements:
+            self.resolve_statement(context, scopes, stmt)
+
+        bindings = {id(binding): binding for binding in context.bindings.values()}.values()
+        changed = True
+        while changed:
+            changed = False
+            for binding in bindings:
+                if binding.is_parameter:
+                    continue
+                kind = BOTTOM
+                for value in binding.values:
+                    kind = join(kind, self.kind(value, context))
+                if kind != binding.kind:
+                    binding.kind = kind
+                    changed = True
+        for binding in bindings:
+            if binding.kind == BOTTOM:
+                binding.kind = None
+
+    def resolve_statement(self, context: FunctionContext, scopes: List[Dict[str, Binding]], node: Statement):
+        """Resolve names in a statement."""
+        if isinstance(node, ExpressionStatement):
+            self.resolve_expression(context, scopes, node.expression)
+        elif isinstance(node, DeclarationStatement) and isinstance(node.declaration, VariableDeclaration):
+            decl = node.declaration
+            if decl.initializer:
+                self.resolve_expression(context, scopes, decl.initializer)
+            # Declared after the initializer: 'val x = x + 1' reads the outer x
+            binding = Binding(context.fresh(python_identifier(decl.name)))
+            binding.values.append(decl.initializer or LiteralExpression(decl.location, None, UNIT_KIND))
+            scopes[-1][decl.name] = binding
+            context.bindings[id(decl)] = binding
+        elif isinstance(node, BlockStatement):
+            scopes.append({})
+            for stmt in node.statements:
+                self.resolve_statement(context, scopes, stmt)
+            scopes.pop()
+        elif isinstance(node, IfStatement):
+            self.resolve_expression(context, scopes, node.condition)
+            self.resolve_statement(context, scopes, node.then_branch)
+            if node.else_branch:
+                self.resolve_statement(context, scopes, node.else_branch)
+        elif isinstance(node, WhileStatement):
+            self.resolve_expression(context, scopes, node.condition)
+            self.resolve_statement(context, scopes, node.body)
+        elif isinstance(node, ForStatement):
+            for bound in (node.start, node.end, node.step):
+                if bound is not None:
+                    self.resolve_expression(context, scopes, bound)
+            binding = Binding(context.fresh(python_identifier(node.variable)))
+            binding.values.append(LiteralExpression(node.location, 0, INT))  # Ints of the range
+            context.bindings[id(node)] = binding
+            scopes.append({node.variable: binding})
+            self.resolve_statement(context, scopes, node.body)
+            scopes.pop()
+        elif isinstance(node, ReturnStatement) and node.value:
+            self.resolve_expression(context, scopes, node.value)
+
+    def resolve_expression(self, context: FunctionContext, scopes: List[Dict[str, Binding]], node: Expression):
+        """Resolve names in an expression."""
+        if isinstance(node, IdentifierExpression):
+            binding = self.lookup(scopes, node.name)
+            if binding is not None:
+                context.bindings[id(node)] = binding
+        elif isinstance(node, AssignmentExpression):
+            self.resolve_expression(context, scopes, node.value)
+            binding = self.lookup(scopes, node.target)
+            if binding is not None:
+                context.bindings[id(node)] = binding
+                binding.values.append(node.value)
+        elif isinstance(node, CallExpression):
+            binding = self.lookup(scopes, node.function_name)
+            if binding is not None:
+                context.bindings[id(node)] = binding
+            for arg in node.arguments:
+                self.resolve_expression(context, scopes, arg)
+        elif isinstance(node, BlockExpression):
+            scopes.append({})
+            for stmt in node.statements:
+                self.resolve_statement(context, scopes, stmt)
+            scopes.pop()
+        else:
+            for child in iter_child_nodes(node):
+                self.resolve_expression(context, scopes, child)
+
+    @staticmethod
+    def lookup(scopes: List[Dict[str, Binding]], name: str) -> Optional[Binding]:
+        """Innermost local binding of name, if any."""
+        for scope in reversed(scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def kind(self, node: Expression, context: Optional[FunctionContext] = None) -> Optional[str]:
+        """Statically known kind of an expression's value (None: unknown)."""
+        context = context or self.context
+        if isinstance(node, Evaluated):
+            return node.known_kind
+        if isinstance(node, LiteralExpression):
+            return node.literal_type if node.literal_type in (INT, STRING, BOOLEAN, UNIT_KIND) else None
+        if isinstance(node, IdentifierExpression):
+            binding = context.bindings.get(id(node)) if context else None
+            return binding.kind if binding is not None else None
+        if isinstance(node, BinaryExpression):
+            if node.operator in ARITHMETIC:
+                return INT  # Int or an error
+            if node.operator == "+":
+                left, right = self.kind(node.left, context), self.kind(node.right, context)
+                if STRING in (left, right):
+                    return STRING
+                if left == INT and right == INT:
+                    return INT
+                return BOTTOM if BOTTOM in (left, right) else None
+            return BOOLEAN
+        if isinstance(node, UnaryExpression):
+            return INT if node.operator == "-" else BOOLEAN
+        if isinstance(node, AssignmentExpression):
+            return self.kind(node.value, context)
+        if isinstance(node, IfExpression):
+            return join(self.kind(node.then_branch, context), self.kind(node.else_branch, context))
+        if isinstance(node, BlockExpression):
+            if not node.statements:
+                return UNIT_KIND
+            last = node.statements[-1]
+            return self.kind(last.expression, context) if isinstance(last, ExpressionStatement) else None
+        return None
+
+    def known(self, node: Expression) -> Optional[str]:
+        """Kind of an expression while emitting (unknown kinds are None)."""
+        kind = self.kind(node)
+        return kind or None
+
+    # Statements
+    #
+    # mode: None (discard the value), "return" (the value is the function
+    # result) or the name of a variable receiving the value.
+
+    def statements(self, statements: List[Statement], mode: Optional[str]):
+        """Transpile statements; the last one gets mode."""
+        for stmt in statements[:-1]:
+            self.statement(stmt, None)
+        if statements:
+            self.statement(statements[-1], mode)
+        else:
+            self.finish(mode, "_UNIT")
+
+    def finish(self, mode: Optional[str], value: str):
+        """Deliver a statement's value according to mode."""
+        if mode == "return":
+            self.emit(f"return {value}")
+        elif mode is not None:
+            self.emit(f"{mode} = {value}")
+
+    def statement(self, node: Statement, mode: Optional[str]):
+        """Transpile one statement."""
+        self.kotlin_line = node.location.line
+        if isinstance(node, ExpressionStatement):
+            self.expression_statement(node.expression, mode)
+        elif isinstance(node, DeclarationStatement):
+            decl = node.declaration
+            if isinstance(decl, VariableDeclaration):
+                value = self.expression(decl.initializer) if decl.initializer else "_UNIT"
+                self.emit(f"{self.context.bindings[id(decl)].python_name} = {value}")
+            else:
+                self.emit(f"_fail({f'Unknown declaration type in statement: {type(decl)}'!r})")
+            self.finish(mode, "_UNIT")
+        elif isinstance(node, BlockStatement):
+            self.statements(node.statements, mode)
+        elif isinstance(node, IfStatement):
+            self.if_statement(node, mode)
+        elif isinstance(node, WhileStatement):
+            self.while_statement(node, mode)
+        elif isinstance(node, ForStatement):
+            self.for_statement(node)
+            self.finish(mode, "_UNIT")
+        elif isinstance(node, ReturnStatement):
+            self.return_value(node.value)
+        elif isinstance(node, (BreakStatement, ContinueStatement)):
+            self.jump_statement(node)
+        else:
+            self.emit(f"_fail({f'Unknown statement type: {type(node)}'!r})")
+            self.finish(mode, "_UNIT")
+
+    def expression_statement(self, node: Expression, mode: Optional[str]):
+        """Transpile an expression used as a statement."""
+        if mode == "return":
+            self.return_value(node)
+            return
+        if isinstance(node, AssignmentExpression) and mode is None:
+            value = self.expression(node.value)
+            target = self.assignment_target(node)
+            self.emit(f"{target} = {value}" if target else f"_undefined({node.target!r}, {value})")
+            return
+        value = self.expression(node)
+        if mode is not None:
+            self.finish(mode, value)
+        elif not self.is_inert(node):
+            self.emit(value)
+
+    def is_inert(self, node: Expression) -> bool:
+        """Evaluating node has no effect and cannot fail (literals, locals)."""
+        return isinstance(node, LiteralExpression) or (
+            isinstance(node, IdentifierExpression) and id(node) in self.context.bindings
+        )
+
+    def return_value(self, node: Optional[Expression]):
+        """Return a value (self-calls in tail position restart the body loop)."""
+        if node is None:
+            self.emit("return _UNIT")
+            return
+        if self.is_self_tail_call(node):
+            values = [self.expression(arg) for arg in self.operands(node.arguments)]
+            params = self.context.parameters
+            if params:
+                targets = ", ".join(binding.python_name for binding in params)
+                self.emit(f"{targets} = {', '.join(values)}")
+            self.emit("continue")
+            self.context.tail_loop = True
+            return
+        if isinstance(node, (IfExpression, BlockExpression)) and self.has_self_tail_call(node):
+            self.return_branches(node)
+            return
+        self.emit(f"return {self.expression(node)}")
+
+    def has_self_tail_call(self, node: Expression) -> bool:
+        """Does a returned expression contain a self-call that can be a loop iteration?"""
+        return any(isinstance(n, CallExpression) and self.is_self_tail_call(n) for n in walk(node))
+
+    def return_branches(self, node: Expression):
+        """Return an if or block expression as statements, so its tail calls restart the loop."""
+        if isinstance(node, BlockExpression):
+            self.statements(node.statements, "return")
+            return
+        self.emit(f"if {self.condition(node.condition)}:")
+        with self.suite():
+            self.return_value(node.then_branch)
+        self.kotlin_line = node.location.line
+        self.emit("else:")
+        with self.suite():
+            self.return_value(node.else_branch)
+
+    def is_self_tail_call(self, node: Expression) -> bool:
+        """Self-call marked by tail-call analysis that can be a loop iteration here."""
+        context = self.context
+        return (
+            isinstance(node, CallExpression) and node.tail_call
+            and context.name == node.function_name
+            and id(node) not in context.bindings
+            and node.function_name in self.callables
+            and len(node.arguments) == len(self.functions[node.function_name].parameters)
+            and context.loop_depth == 0
+        )
+
+    def if_statement(self, node: IfStatement, mode: Optional[str]):
+        """Transpile if/else."""
+        self.emit(f"if {self.condition(node.condition)}:")
+        with self.suite():
+            self.statement(node.then_branch, mode)
+        self.kotlin_line = node.location.line
+        if node.else_branch is not None:
+            self.emit("else:")
+            with self.suite():
+                self.statement(node.else_branch, mode)
+        elif mode is not None:
+            self.emit("else:")
+            with self.suite():
+                self.finish(mode, "_UNIT")
+
+    def while_statement(self, node: WhileStatement, mode: Optional[str]):
+        """Transpile a while loop; its value (if needed) is the last body value."""
+        result = None
+        if mode is not None:
+            result = mode if mode != "return" else self.context.temp()
+            self.emit(f"{result} = _UNIT")
+
+        context = self.context
+        loop = PythonLoop(node.label)
+        context.loops.append(loop)
+        context.loop_depth += 1
+        if self.needs_hoist(node.condition):
+            self.emit("while True:")
+            self.indent += 1
+            if self.deadline_checks:
+                self.emit("_tick()")
+            self.emit(f"if not {self.condition(node.condition)}:")
+            self.emit("    break")
+            self.indent -= 1
+        else:
+            self.emit(f"while {self.condition(node.condition)}:")
+            if self.deadline_checks:
+                self.emit("    _tick()")
+        loop.active = True
+        with self.suite():
+            self.statement(node.body, result)
+        context.loop_depth -= 1
+        context.loops.pop()
+
+        self.kotlin_line = node.location.line
+        self.forward_jumps(loop)
+        if mode == "return":
+            self.emit(f"return {result}")
+
+    def for_statement(self, node: ForStatement):
+        """Transpile a for loop to a Python for over the range."""
+        bounds = [self.expression(bound) for bound in self.operands(
+            [node.start, node.end] + ([node.step] if node.step is not None else []))]
+        if node.step is None:
+            bounds.append("1")
+        variable = self.context.bindings[id(node)].python_name
+        self.emit(f"for {variable} in _range({node.kind!r}, {', '.join(bounds)}):")
+
+        context = self.context
+        loop = PythonLoop(node.label, active=True)
+        context.loops.append(loop)
+        context.loop_depth += 1
+        with self.suite():
+            if self.deadline_checks:
+                self.emit("_tick()")
+            self.statement(node.body, None)
+        context.loop_depth -= 1
+        context.loops.pop()
+
+        self.kotlin_line = node.location.line
+        self.forward_jumps(loop)
+
+    def jump_statement(self, node: Statement):
+        """Transpile break/continue (the parser guarantees a target loop)."""
+        loops = self.context.loops
+        target = next(loop for loop in reversed(loops)
+                      if loop.active and (node.label is None or loop.label == node.label))
+        keyword = "break" if isinstance(node, BreakStatement) else "continue"
+        if target is loops[-1]:
+            self.emit(keyword)
+            return
+        # Leave the inner Python loops first; each checks the flag after it ends
+        if target.flag is None:
+            target.flag = self.context.fresh("_jump")
+            self.context.flags.append(target.flag)
+        self.emit(f"{target.flag} = {BREAK if keyword == 'break' else CONTINUE}")
+        if target not in loops[-1].escapes:
+            loops[-1].escapes.append(target)
+        self.emit("break")
+
+    def forward_jumps(self, loop: PythonLoop):
+        """After a Python loop: carry out the jumps that left it for outer loops."""
+        if not loop.escapes:
+            return
+        parent = self.context.loops[-1]
+        for target in loop.escapes:
+            if target is parent:
+                self.emit(f"if {target.flag} == {BREAK}:")
+                self.emit(f"    {target.flag} = 0")
+                self.emit("    break")
+                self.emit(f"if {target.flag} == {CONTINUE}:")
+                self.emit(f"    {target.flag} = 0")
+                self.emit("    continue")
+            else:
+                self.emit(f"if {target.flag}:")
+                self.emit("    break")
+                if target not in parent.escapes:
+                    parent.escapes.append(target)
+
+    def condition(self, node: Expression) -> str:
+        """Transpile a condition (non-Boolean values raise)."""
+        value = self.expression(node)
+        return value if self.known(node) == BOOLEAN else f"_cond({value})"
+
+    # Expressions
+
+    def needs_hoist(self, node: ASTNode) -> bool:
+        """Does the expression contain statements (block expressions)?"""
+        key = id(node)
+        if key not in self.hoist_cache:
+            self.hoist_cache[key] = any(isinstance(child, BlockExpression) for child in walk(node))
+        return self.hoist_cache[key]
+
+    def operands(self, nodes: List[Expression]) -> List[Expression]:
+        """
+        Prepare operands evaluated left to right.
+
+        When a later operand is hoisted into statements, earlier ones are
+        evaluated into temporaries first so they still run first.
+        """
+        prepared = []
+        for index, node in enumerate(nodes):
+            if not isinstance(node, LiteralExpression) and any(self.needs_hoist(n) for n in nodes[index + 1:]):
+                temp = self.context.temp()
+                self.emit(f"{temp} = {self.expression(node)}")
+                node = Evaluated(node.location, temp, self.known(node))
+            prepared.append(node)
+        return prepared
+
+    def expression(self, node: Expression) -> str:
+        """Transpile an expression (may emit hoisted statements first)."""
+        if isinstance(node, Evaluated):
+            return node.python
+        if isinstance(node, LiteralExpression):
+            return self.literal(node)
+        if isinstance(node, IdentifierExpression):
+            return self.name(node, node.name)
+        if isinstance(node, BinaryExpression):
+            return self.binary(node)
+        if isinstance(node, UnaryExpression):
+            operand = self.expression(node.operand)
+            kind = self.known(node.operand)
+            if node.operator == "-":
+                return f"(-{operand})" if kind == INT else f"_neg({operand})"
+            if node.operator == "!":
+                return f"(not {operand})" if kind == BOOLEAN else f"_not({operand})"
+            return f"_fail({f'Unknown unary operator: {node.operator}'!r}, {operand})"
+        if isinstance(node, CallExpression):
+            return self.call(node)
+        if isinstance(node, AssignmentExpression):
+            value = self.expression(node.value)
+            target = self.assignment_target(node)
+            return f"({target} := {value})" if target else f"_undefined({node.target!r}, {value})"
+        if isinstance(node, IfExpression):
+            return self.if_expression(node)
+        if isinstance(node, BlockExpression):
+            temp = self.context.temp()
+            self.statements(node.statements, temp)
+            return temp
+        return f"_fail({f'Unknown expression type: {type(node)}'!r})"
+
+    def literal(self, node: LiteralExpression) -> str:
+        """Transpile a literal."""
+        if node.literal_type in (INT, STRING, BOOLEAN):
+            return repr(node.value)
+        if node.literal_type == UNIT_KIND:
+            return "_UNIT"
+        return f"_fail({f'Unknown literal type: {node.literal_type}'!r})"
+
+    def name(self, node: ASTNode, name: str) -> str:
+        """Python expression reading a Kotlin variable."""
+        binding = self.context.bindings.get(id(node))
+        if binding is not None:
+            return binding.python_name
+        if name in self.globals:
+            return self.globals[name]
+        return f"_undefined({name!r})"
+
+    def assignment_target(self, node: AssignmentExpression) -> Optional[str]:
+        """Python name assigned by an assignment (None for undeclared names)."""
+        binding = self.context.bindings.get(id(node))
+        if binding is not None:
+            return binding.python_name
+        if node.target in self.globals and node.target not in BUILTINS:
+            self.context.global_assignments.add(self.globals[node.target])
+            return self.globals[node.target]
+        return None
+
+    def binary(self, node: BinaryExpression) -> str:
+        """Transpile a binary operator: plain Python when the kinds allow it."""
+        if node.operator in LOGICAL:
+            return self.logical(node)
+        left_node, right_node = self.operands([node.left, node.right])
+        left, right = self.expression(left_node), self.expression(right_node)
+        left_kind, right_kind = self.known(left_node), self.known(right_node)
+        both_int = left_kind == INT and right_kind == INT
+        op = node.operator
+
+        if op == "+":
+            if both_int:
+                return f"({left} + {right})"
+            if left_kind == STRING and right_kind == STRING:
+                return f"_concat({left}, {right})"  # Strings may be ropes
+            return f"_add({left}, {right})"
+        if op in ("-", "*"):
+            return f"({left} {op} {right})" if both_int else f"{ARITHMETIC[op]}({left}, {right})"
+        if op in ("/", "%"):
+            # Kotlin truncates; Python's // and % agree for a non-negative dividend
+            if (both_int and isinstance(right_node, LiteralExpression) and right_node.value > 0
+                    and isinstance(left_node, (IdentifierExpression, LiteralExpression, Evaluated))):
+                python_op = "//" if op == "/" else "%"
+                negative = f"-(-{left} {python_op} {right})" if op == "/" else f"-(-{left} % {right})"
+                return f"({left} {python_op} {right} if {left} >= 0 else {negative})"
+            return f"{ARITHMETIC[op]}({left}, {right})"
+        if op in COMPARISONS:
+            return f"({left} {op} {right})" if both_int else f"{COMPARISONS[op]}({left}, {right})"
+        if op in ("==", "!="):
+            if left_kind is not None and left_kind == right_kind:
+                return f"({left} {op} {right})"
+            return f"_eq({left}, {right})" if op == "==" else f"(not _eq({left}, {right}))"
+        return f"_fail({f'Unknown binary operator: {op}'!r}, {left}, {right})"
+
+    def logical(self, node: BinaryExpression) -> str:
+        """Transpile && / ||: the right operand only runs if the left one does not decide."""
+        python_op, decided, helper = LOGICAL[node.operator]
+        left = self.expression(node.left)
+        if self.needs_hoist(node.right):
+            # The right operand's statements must only run when it is needed
+            temp = self.context.temp()
+            self.emit(f"{temp} = {left}")
+            self.emit(f"if {temp} is not {decided}:")
+            with self.suite():
+                right = self.expression(node.right)
+                self.emit(f"{temp} = {helper}({temp}, {right})")
+            return temp
+        right = self.expression(node.right)
+        if self.known(node.left) == BOOLEAN:
+            if self.known(node.right) == BOOLEAN:
+                return f"({left} {python_op} {right})"
+            # Only the right operand needs checking
+            undecided = "False" if decided == "True" else "True"
+            return f"({left} {python_op} {helper}({undecided}, {right}))"
+        # The helper reports non-Boolean operands (evaluating the right one first)
+        temp = self.context.temp()
+        return f"({decided} if ({temp} := {left}) is {decided} else {helper}({temp}, {right}))"
+
+    def call(self, node: CallExpression) -> str:
+        """Transpile a call: direct for known functions, checked otherwise."""
+        name = node.function_name
+        if id(node) not in self.context.bindings and name in self.callables:
+            args = [self.expression(arg) for arg in self.operands(node.arguments)]
+            if name in BUILTINS and name not in self.functions:
+                return f"_{name}({', '.join(args)})"
+            expected = len(self.functions[name].parameters)
+            if len(args) != expected:
+                return f"_arity({expected}{''.join(', ' + arg for arg in args)})"
+            return f"{self.globals[name]}({', '.join(args)})"
+        # Locals, global variables, undefined names: checked at run time
+        callee = self.name(node, name)
+        if any(self.needs_hoist(arg) for arg in node.arguments):
+            temp = self.context.temp()
+            self.emit(f"{temp} = {callee}")
+            callee = temp
+        args = [self.expression(arg) for arg in self.operands(node.arguments)]
+        return f"_call({name!r}, {callee}{''.join(', ' + arg for arg in args)})"
+
+    def if_expression(self, node: IfExpression) -> str:
+        """Transpile an if expression (to a statement when a branch has statements)."""
+        condition = self.condition(node.condition)
+        if not (self.needs_hoist(node.then_branch) or self.needs_hoist(node.else_branch)):
+            return f"({self.expression(node.then_branch)} if {condition} else {self.expression(node.else_branch)})"
+        temp = self.context.temp()
+        self.emit(f"if {condition}:")
+        with self.suite():
+            self.branch(node.then_branch, temp)
+        self.emit("else:")
+        with self.suite():
+            self.branch(node.else_branch, temp)
+        return temp
+
+    def branch(self, node: Expression, target: str):
+        """Assign the value of an if-expression branch to target."""
+        if isinstance(node, BlockExpression):
+            self.statements(node.statements, target)
+        else:
+            self.emit(f"{target} = {self.expression(node)}")
@@ -14,15 +14,25 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from src.lexer.lexer import Lexer
 from src.parser.parser import Parser
-from src.semantic.collection_pass import CollectionPass
 from src.semantic.symbol_table import SymbolTable
-from src.semantic.errors import ErrorCollector
+from src.semantic.incremental import IncrementalChecker
 from src.runtime.evaluator import Evaluator
+from src.runtime.output import CaptureSink
+from src.runtime.governor import ResourceLimitExceeded
+from src.runtime.profiler import Profiler
+from src.runtime.admission import AdmissionPolicy
 from src.runtime.environment import Environment
+from src.optimizer.optimizer import Optimizer
 from src.ir.ir_generator import IRGenerator
 from src.codegen.generators import JVMBytecodeGenerator, JavaScriptGenerator, NativeCodeGenerator
 
 
+# Giới hạn cho mọi chương trình chạy trong GUI (một vòng lặp vô hạn không làm treo phiên)
+GUI_TIME_LIMIT = 10.0
+GUI_MAX_STEPS = 50_000_000
+GUI_MEMORY_LIMIT = 256 * 1024 * 1024
+
+
 @dataclass
 class InterpreterState:
     """Lưu trữ trạng thái của interpreter"""
@@ -30,11 +40,15 @@ class InterpreterState:
     tokens: List = field(default_factory=list)
     ast: Optional[Any] = None
     symbol_table: Optional[SymbolTable] = None
+    semantic_summary: str = ""
+    optimization_report: Optional[Any] = None
+    admission: Optional[Any] = None
     ir_instructions: List = field(default_factory=list)
     jvm_code: str = ""
     js_code: str = ""
     native_code: str = ""
     output: str = ""
+    profile: Optional[Profiler] = None
     errors: List[str] = field(default_factory=list)
     execution_steps: List[Dict] = field(default_factory=list)
     current_step: int = 0
@@ -55,6 +69,10 @@ class StateManager:
                 source_code=default_code  # ← Set default code
             )
         
+        if 'semantic_checker' not in st.session_state:
+            # Giữ kết quả phân tích ngữ nghĩa từng hàm giữa các lần chạy
+            st.session_state.semantic_checker = IncrementalChecker()
+        
         if 'show_details' not in st.session_state:
             st.session_state.show_details = True
         
@@ -81,18 +99,22 @@ class StateManager:
     def run_interpreter(source_code: str) -> Dict[str, Any]:
         """
         Chạy interpreter với source code
-        Returns dict với keys: success, tokens, ast, symbol_table, ir_instructions, jvm_code, js_code, native_code, output, errors
+        Returns dict với keys: success, tokens, ast, symbol_table, semantic_summary, optimization_report, admission, ir_instructions, jvm_code, js_code, native_code, output, profile, errors
         """
         result = {
             'success': False,
             'tokens': [],
             'ast': None,
             'symbol_table': None,
+            'semantic_summary': '',
+            'optimization_report': None,
+            'admission': None,
             'ir_instructions': [],
             'jvm_code': '',
             'js_code': '',
             'native_code': '',
             'output': '',
+            'profile': None,
             'errors': []
         }
         
@@ -107,22 +129,28 @@ class StateManager:
             ast = parser.parse()
             result['ast'] = ast
             
-            # Step 3: Semantic Analysis
-            symbol_table = SymbolTable()
-            error_collector = ErrorCollector()
-            collection_pass = CollectionPass(symbol_table, error_collector)
-            collection_pass.collect(ast)
+            # Step 3: Semantic Analysis (incremental: chỉ kiểm tra lại các hàm bị ảnh hưởng)
+            if 'semantic_checker' not in st.session_state:
+                st.session_state.semantic_checker = IncrementalChecker()
+            semantic = st.session_state.semantic_checker.check(ast)
+            error_collector = semantic.errors
             
             # Check for semantic errors
             if error_collector.has_errors():
                 for error in error_collector.errors:
                     result['errors'].append(str(error))
             
-            result['symbol_table'] = symbol_table
+            result['symbol_table'] = semantic.symbol_table
+            result['semantic_summary'] = semantic.summary()
+            
+            # Optimization: dead-function elimination + inlining (AST gốc giữ nguyên để hiển thị)
+            optimizer = Optimizer()
+            program = optimizer.optimize(ast)
+            result['optimization_report'] = optimizer.report
             
             # Step 4: IR Generation
             ir_generator = IRGenerator()
-            ir_instructions = ir_generator.generate(ast)
+            ir_instructions = ir_generator.generate(program)
             result['ir_instructions'] = ir_instructions
             
             # Step 5: Code Generation
@@ -135,35 +163,52 @@ class StateManager:
             native_generator = NativeCodeGenerator(ir_instructions)
             result['native_code'] = native_generator.generate()
             
-            # Step 6: Execution
-            evaluator = Evaluator()
-            
-            # Capture output
-            import io
-            from contextlib import redirect_stdout
-            
-            output_buffer = io.StringIO()
-            with redirect_stdout(output_buffer):
-                evaluator.evaluate(ast)
-            
-            result['output'] = output_buffer.getvalue()
+            # Step 6: Execution (ước lượng chi phí trước: từ chối vòng lặp vô hạn, giới hạn thời gian)
+            decision = AdmissionPolicy().decide(program)
+            result['admission'] = decision
+            if not decision.admitted:
+                result['errors'].append(f"Chương trình bị từ chối: {decision.reason}")
+                return StateManager._store_result(source_code, result)
+            # Output giữ trong bộ nhớ (không đụng tới sys.stdout)
+            # Profile luôn được ghi (chi phí thấp) cho panel Profile
+            output = CaptureSink()
+            profiler = Profiler()
+            evaluator = Evaluator(memoize=decision.memoize, time_limit=decision.time_limit or GUI_TIME_LIMIT,
+                                  max_steps=GUI_MAX_STEPS, memory_limit=GUI_MEMORY_LIMIT, output=output,
+                                  profiler=profiler)
+            try:
+                evaluator.evaluate(program)
+            finally:
+                result['output'] = output.getvalue()
+                result['profile'] = profiler
             result['success'] = True
             
+        except ResourceLimitExceeded as e:
+            result['errors'].append(f"Dừng chương trình (vượt giới hạn {e.limit}): {e}")
+            result['success'] = False
         except Exception as e:
             result['errors'].append(str(e))
             result['success'] = False
         
-        # Update state
+        return StateManager._store_result(source_code, result)
+    
+    @staticmethod
+    def _store_result(source_code: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Lưu kết quả chạy vào state"""
         state = StateManager.get_state()
         state.source_code = source_code
         state.tokens = result['tokens']
         state.ast = result['ast']
         state.symbol_table = result['symbol_table']
+        state.semantic_summary = result['semantic_summary']
+        state.optimization_report = result['optimization_report']
+        state.admission = result['admission']
         state.ir_instructions = result['ir_instructions']
         state.jvm_code = result['jvm_code']
         state.js_code = result['js_code']
         state.native_code = result['native_code']
         state.output = result['output']
+        state.profile = result['profile']
         state.errors = result['errors']
         
         return result
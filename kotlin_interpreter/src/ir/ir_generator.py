@@ -80,6 +80,14 @@ class IRGenerator:
             # Simplified: just process body
             self._visit_statement(node.body)
         
+        elif isinstance(node, ForStatement):
+            # Simplified: bind the start to the loop variable, then process body
+            start = self._visit_expression(node.start)
+            self.instructions.append(
+                IRAssignment(node.variable, start)
+            )
+            self._visit_statement(node.body)
+        
         elif isinstance(node, ReturnStatement):
             # Return statement
             if node.value:
@@ -1,6 +1,6 @@
 """Lexer module for Kotlin interpreter."""
 
 from .token import Token, TokenType, SourceLocation, KEYWORDS
-from .lexer import Lexer
+from .lexer import Lexer, LexerError
 
-__all__ = ['Token', 'TokenType', 'SourceLocation', 'KEYWORDS', 'Lexer']
+__all__ = ['Token', 'TokenType', 'SourceLocation', 'KEYWORDS', 'Lexer', 'LexerError']
@@ -160,6 +160,11 @@ class Lexer:
         elif token_type == TokenType.FALSE:
             return Token(token_type, False, location)
         
+        # Label definition: name@ (break@name is a keyword and a reference)
+        if token_type == TokenType.IDENTIFIER and self.current_char == '@':
+            self.advance()
+            return Token(TokenType.LABEL, identifier, location)
+        
         return Token(token_type, identifier, location)
     
     def tokenize(self) -> List[Token]:
@@ -208,6 +213,16 @@ class Lexer:
                 self.tokens.append(self.read_identifier())
                 continue
             
+            # Label reference: @name
+            if self.current_char == '@' and self.peek() and (self.peek().isalpha() or self.peek() == '_'):
+                location = self.current_location
+                self.advance()
+                label = self.read_identifier()
+                if label.type != TokenType.IDENTIFIER:
+                    raise LexerError(f"Invalid label: '@{label.value}'", location)
+                self.tokens.append(Token(TokenType.AT_LABEL, label.value, location))
+                continue
+            
             # Two-character operators
             location = self.current_location
             char = self.current_char
@@ -262,6 +277,13 @@ class Lexer:
                 self.tokens.append(Token(TokenType.ARROW, '->', location))
                 continue
             
+            # ..
+            if char == '.' and next_char == '.':
+                self.advance()
+                self.advance()
+                self.tokens.append(Token(TokenType.RANGE, '..', location))
+                continue
+            
             # Single-character tokens
             single_char_tokens = {
                 '+': TokenType.PLUS,
@@ -22,9 +22,14 @@ class TokenType(Enum):
     IF = auto()
     ELSE = auto()
     WHILE = auto()
+    FOR = auto()
+    IN = auto()
     RETURN = auto()
+    BREAK = auto()
+    CONTINUE = auto()
     TRUE = auto()
     FALSE = auto()
+    TAILREC = auto()       # tailrec modifier
     
     # Types
     INT_TYPE = auto()      # Int
@@ -38,6 +43,8 @@ class TokenType(Enum):
     
     # Identifiers
     IDENTIFIER = auto()
+    LABEL = auto()         # name@ (labels a loop)
+    AT_LABEL = auto()      # @name (target of break/continue)
     
     # Operators
     PLUS = auto()          # +
@@ -71,6 +78,7 @@ class TokenType(Enum):
     COLON = auto()         # :
     SEMICOLON = auto()     # ;
     ARROW = auto()         # ->
+    RANGE = auto()         # .. (for loops)
     DOLLAR = auto()        # $ (for string templates)
     
     # Special
@@ -115,8 +123,9 @@ class Token:
         """Check if token is a keyword."""
         return self.type in {
             TokenType.FUN, TokenType.VAL, TokenType.VAR,
-            TokenType.IF, TokenType.ELSE, TokenType.WHILE,
-            TokenType.RETURN, TokenType.TRUE, TokenType.FALSE
+            TokenType.IF, TokenType.ELSE, TokenType.WHILE, TokenType.FOR, TokenType.IN,
+            TokenType.RETURN, TokenType.BREAK, TokenType.CONTINUE,
+            TokenType.TRUE, TokenType.FALSE, TokenType.TAILREC
         }
     
     @property
@@ -156,9 +165,14 @@ KEYWORDS = {
     'if': TokenType.IF,
     'else': TokenType.ELSE,
     'while': TokenType.WHILE,
+    'for': TokenType.FOR,
+    'in': TokenType.IN,
     'return': TokenType.RETURN,
+    'break': TokenType.BREAK,
+    'continue': TokenType.CONTINUE,
     'true': TokenType.TRUE,
     'false': TokenType.FALSE,
+    'tailrec': TokenType.TAILREC,
     'Int': TokenType.INT_TYPE,
     'String': TokenType.STRING_TYPE,
     'Boolean': TokenType.BOOLEAN_TYPE,
@@ -0,0 +1,18 @@
+"""
+Optimizer Module
+AST-to-AST transformations applied before IR generation and execution
+"""
+from .optimizer import Optimizer, OptimizationReport
+from .dead_code import eliminate_dead_functions
+from .inliner import Inliner, InlineDecision
+from .partial_eval import PartialEvaluator, SpecializationDecision
+
+__all__ = [
+    'Optimizer',
+    'OptimizationReport',
+    'eliminate_dead_functions',
+    'Inliner',
+    'InlineDecision',
+    'PartialEvaluator',
+    'SpecializationDecision'
+]
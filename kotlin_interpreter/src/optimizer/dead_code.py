@@ -0,0 +1,37 @@
+"""
+Dead-function elimination.
+
+Removes functions that cannot be reached from 'main' or from global
+variable initializers, so later phases (IR, code generation, execution)
+never see them.
+"""
+
+from typing import List, Tuple
+
+from ..parser.ast_nodes import *
+from ..analysis.call_graph import CallGraph
+
+
+def eliminate_dead_functions(program: Program, graph: CallGraph) -> Tuple[Program, List[str]]:
+    """
+    Drop unreachable functions.
+
+    Programs without 'main' are left untouched: nothing is known about how
+    their functions will be used.
+
+    Returns:
+        (new program, names of removed functions)
+    """
+    if "main" not in graph.functions:
+        return program, []
+
+    removed = graph.unreachable()
+    if not removed:
+        return program, []
+
+    dead = set(removed)
+    declarations = [
+        decl for decl in program.declarations
+        if not (isinstance(decl, FunctionDeclaration) and decl.name in dead)
+    ]
+    return Program(declarations), removed
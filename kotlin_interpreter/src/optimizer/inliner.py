@@ -0,0 +1,279 @@
+"""
+Inlining of small leaf functions.
+
+Replaces calls to small, non-recursive functions that call no other user
+functions with the function body, avoiding the per-call cost of the
+evaluator (argument check, Environment creation, return unwinding).
+"""
+
+import copy
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from ..lexer.token import SourceLocation
+from ..parser.ast_nodes import *
+from ..analysis.call_graph import CallGraph, GLOBALS_ROOT
+
+
+@dataclass
+class InlineDecision:
+    """Outcome of considering one call site for inlining."""
+    caller: str
+    callee: str
+    location: SourceLocation
+    inlined: bool
+    reason: str
+
+    def __str__(self) -> str:
+        status = "inlined" if self.inlined else "kept"
+        return f"{self.caller} -> {self.callee} at {self.location}: {status} ({self.reason})"
+
+
+def node_size(node: ASTNode) -> int:
+    """Number of AST nodes in a subtree."""
+    return sum(1 for _ in walk(node))
+
+
+def is_trivial_argument(node: Expression) -> bool:
+    """Arguments that can be duplicated or dropped without changing behavior."""
+    return isinstance(node, (LiteralExpression, IdentifierExpression))
+
+
+class Inliner:
+    """
+    Inlines calls to small leaf functions.
+
+    Two forms are produced:
+    - Expression form: for bodies that are a single 'return expr' and
+      calls whose arguments are literals or identifiers, the call is
+      replaced by expr with parameters substituted.
+    - Block form: otherwise the call becomes a block expression that binds
+      renamed parameters to the arguments (in order), runs the renamed
+      body and yields the returned value.
+
+    Functions are processed callees-first, so a function becomes a leaf
+    (and an inlining candidate) once its own callees were inlined.
+    """
+
+    def __init__(self, max_callee_size: int = 24, max_total_growth: int = 400):
+        """
+        Initialize inliner.
+
+        Args:
+            max_callee_size: Largest function body (in AST nodes) to inline
+            max_total_growth: Total number of AST nodes inlining may add
+        """
+        self.max_callee_size = max_callee_size
+        self.max_total_growth = max_total_growth
+        self.growth = 0
+        self.rename_counter = 0
+        self.decisions: List[InlineDecision] = []
+        self.functions: Dict[str, FunctionDeclaration] = {}
+        self.global_names: Set[str] = set()
+
+    def inline(self, program: Program, graph: CallGraph) -> Program:
+        """Inline eligible calls in program (modified in place)."""
+        self.growth = 0
+        self.decisions = []
+        self.functions = {
+            decl.name: decl for decl in program.declarations
+            if isinstance(decl, FunctionDeclaration)
+        }
+        self.global_names = set(self.functions) | {
+            decl.name for decl in program.declarations
+            if isinstance(decl, VariableDeclaration)
+        } | {"println", "print"}
+
+        # Callees first, so their bodies are final before being copied
+        for name in graph.postorder():
+            func = self.functions[name]
+            local_names = self._declared_names(func)
+            func.body = self._rewrite(func.body, name, local_names, graph)
+
+        for decl in program.declarations:
+            if isinstance(decl, VariableDeclaration) and decl.initializer:
+                decl.initializer = self._rewrite(decl.initializer, GLOBALS_ROOT, set(), graph)
+
+        return program
+
+    # Eligibility
+
+    def _declared_names(self, func: FunctionDeclaration) -> Set[str]:
+        """Parameters and all local variable names of a function."""
+        names = {param.name for param in func.parameters}
+        for node in walk(func.body):
+            if isinstance(node, VariableDeclaration):
+                names.add(node.name)
+            elif isinstance(node, ForStatement):
+                names.add(node.variable)
+        return names
+
+    def _free_names(self, func: FunctionDeclaration) -> Set[str]:
+        """Names the body refers to that are not parameters or locals."""
+        local = self._declared_names(func)
+        free = set()
+        for node in walk(func.body):
+            if isinstance(node, IdentifierExpression):
+                name = node.name
+            elif isinstance(node, CallExpression):
+                name = node.function_name
+            elif isinstance(node, AssignmentExpression):
+                name = node.target
+            else:
+                continue
+            if name not in local:
+                free.add(name)
+        return free
+
+    def _check_callee(self, name: str, graph: CallGraph) -> Optional[str]:
+        """Return reason why a function cannot be inlined, or None."""
+        func = self.functions[name]
+        if name == "main":
+            return "entry point"
+        if graph.is_recursive(name):
+            return "recursive"
+        for node in walk(func.body):
+            if isinstance(node, CallExpression) and node.function_name in self.functions:
+                return f"not a leaf (calls '{node.function_name}')"
+            if isinstance(node, IdentifierExpression) and node.name in self.functions:
+                return f"uses function '{node.name}' as a value"
+
+        size = node_size(func.body)
+        if size > self.max_callee_size:
+            return f"too large (size {size} > {self.max_callee_size})"
+
+        statements = func.body.statements
+        for stmt in statements[:-1]:
+            if any(isinstance(node, ReturnStatement) for node in walk(stmt)):
+                return "early return"
+        if statements:
+            last = statements[-1]
+            # A return nested in the final one ('return if (c) { return 1 } else 2') is early too
+            tail = last.value if isinstance(last, ReturnStatement) else last
+            if tail is not None and any(isinstance(node, ReturnStatement) for node in walk(tail)):
+                return "early return"
+
+        params = [param.name for param in func.parameters]
+        if len(set(params)) != len(params):
+            return "duplicate parameter names"
+        for node in walk(func.body):
+            if isinstance(node, VariableDeclaration):
+                if node.name in params:
+                    return f"local '{node.name}' shadows a parameter"
+                if node.name in self.global_names:
+                    return f"local '{node.name}' shadows a global"
+            if isinstance(node, ForStatement):
+                if node.variable in params:
+                    return f"loop variable '{node.variable}' shadows a parameter"
+                if node.variable in self.global_names:
+                    return f"loop variable '{node.variable}' shadows a global"
+        return None
+
+    # Rewriting
+
+    def _rewrite(self, node: ASTNode, caller: str, caller_names: Set[str],
+                 graph: CallGraph) -> ASTNode:
+        """Rewrite node bottom-up, inlining eligible calls."""
+        map_children(node, lambda child: self._rewrite(child, caller, caller_names, graph))
+
+        if isinstance(node, CallExpression) and node.function_name in self.functions:
+            return self._try_inline(node, caller, caller_names, graph)
+        return node
+
+    def _try_inline(self, call: CallExpression, caller: str, caller_names: Set[str],
+                    graph: CallGraph) -> Expression:
+        """Inline one call site if allowed, recording the decision."""
+        callee = self.functions[call.function_name]
+
+        reason = self._check_callee(callee.name, graph)
+        if reason is None and len(call.arguments) != len(callee.parameters):
+            reason = "argument count mismatch"
+        if reason is None:
+            shadowed = sorted(self._free_names(callee) & caller_names)
+            if shadowed:
+                reason = f"'{shadowed[0]}' is shadowed at call site"
+        if reason is None:
+            size = node_size(callee.body)
+            if self.growth + size > self.max_total_growth:
+                reason = "inlining budget exhausted"
+
+        if reason is not None:
+            self.decisions.append(InlineDecision(caller, callee.name, call.location, False, reason))
+            return call
+
+        statements = callee.body.statements
+        if (len(statements) == 1 and isinstance(statements[0], ReturnStatement)
+                and statements[0].value is not None
+                and all(is_trivial_argument(arg) for arg in call.arguments)
+                and not any(isinstance(n, AssignmentExpression) for n in walk(statements[0].value))):
+            result = self._inline_expression(callee, call)
+            form = "expression"
+        else:
+            result = self._inline_block(callee, call)
+            form = "block"
+
+        size = node_size(callee.body)
+        self.growth += size
+        self.decisions.append(
+            InlineDecision(caller, callee.name, call.location, True, f"{form} form, size {size}")
+        )
+        return result
+
+    def _inline_expression(self, callee: FunctionDeclaration, call: CallExpression) -> Expression:
+        """Substitute arguments for parameters in the returned expression."""
+        bindings = {
+            param.name: arg for param, arg in zip(callee.parameters, call.arguments)
+        }
+        # The callee's own locals get fresh names, so they cannot capture argument names
+        params = set(bindings)
+        renames = self._fresh_names(self._declared_names(callee) - params)
+        body = self._renamer(renames)(copy.deepcopy(callee.body.statements[0].value))
+
+        def substitute(node: ASTNode) -> ASTNode:
+            if isinstance(node, IdentifierExpression) and node.name in bindings:
+                return copy.deepcopy(bindings[node.name])
+            return map_children(node, substitute)
+
+        return substitute(body)
+
+    def _inline_block(self, callee: FunctionDeclaration, call: CallExpression) -> Expression:
+        """Build a block expression binding renamed parameters and locals."""
+        renames = self._fresh_names(self._declared_names(callee))
+        rename = self._renamer(renames)
+
+        statements: List[Statement] = []
+        for param, arg in zip(callee.parameters, call.arguments):
+            decl = VariableDeclaration(call.location, False, renames[param.name], param.type, arg)
+            statements.append(DeclarationStatement(call.location, decl))
+
+        body = [rename(stmt) for stmt in copy.deepcopy(callee.body.statements)]
+        if body and isinstance(body[-1], ReturnStatement):
+            ret = body.pop()
+            value = ret.value if ret.value is not None else LiteralExpression(ret.location, None, "Unit")
+            body.append(ExpressionStatement(ret.location, value))
+        elif not body:
+            body.append(ExpressionStatement(call.location, LiteralExpression(call.location, None, "Unit")))
+        statements.extend(body)
+
+        return BlockExpression(call.location, statements)
+
+    def _fresh_names(self, names: Set[str]) -> Dict[str, str]:
+        """Map names to new names unique to one inlined copy."""
+        self.rename_counter += 1
+        suffix = f"$inline{self.rename_counter}"
+        return {name: name + suffix for name in names}
+
+    @staticmethod
+    def _renamer(renames: Dict[str, str]):
+        """Function renaming declarations and uses of names in a (copied) subtree."""
+        def rename(node: ASTNode) -> ASTNode:
+            if isinstance(node, IdentifierExpression) and node.name in renames:
+                node.name = renames[node.name]
+            elif isinstance(node, AssignmentExpression) and node.target in renames:
+                node.target = renames[node.target]
+            elif isinstance(node, VariableDeclaration) and node.name in renames:
+                node.name = renames[node.name]
+            elif isinstance(node, ForStatement) and node.variable in renames:
+                node.variable = renames[node.variable]
+            return map_children(node, rename)
+        return rename
@@ -0,0 +1,116 @@
+"""
+AST optimizer.
+
+Runs the AST-to-AST optimization passes between semantic analysis and
+the back ends (IRGenerator, code generators, Evaluator).
+"""
+
+import copy
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from ..parser.ast_nodes import *
+from ..analysis.call_graph import CallGraph
+from .dead_code import eliminate_dead_functions
+from .inliner import Inliner, InlineDecision
+from .partial_eval import PartialEvaluator, SpecializationDecision
+
+
+@dataclass
+class OptimizationReport:
+    """What the optimizer did to a program."""
+    call_graph: Optional[CallGraph] = None
+    removed_functions: List[str] = field(default_factory=list)
+    specializations: List[SpecializationDecision] = field(default_factory=list)
+    inline_decisions: List[InlineDecision] = field(default_factory=list)
+
+    @property
+    def inlined_calls(self) -> int:
+        """Number of call sites that were inlined."""
+        return sum(1 for decision in self.inline_decisions if decision.inlined)
+
+    @property
+    def folded_calls(self) -> int:
+        """Number of calls replaced by their value at compile time."""
+        return sum(1 for decision in self.specializations if decision.action == "folded")
+
+    def to_text(self) -> str:
+        """Format report for display (used by --stats)."""
+        lines = ["Call graph:"]
+        if self.call_graph is not None:
+            lines.extend(f"  {line}" for line in self.call_graph.to_text().splitlines())
+
+        lines.append("Dead functions removed: " + (", ".join(self.removed_functions) or "none"))
+
+        folded = self.folded_calls
+        specialized = sum(1 for decision in self.specializations if decision.action == "specialized")
+        lines.append(f"Partial evaluation: {folded} calls folded, {specialized} specialized")
+        for decision in self.specializations:
+            lines.append(f"  {decision}")
+
+        lines.append(f"Inlining: {self.inlined_calls}/{len(self.inline_decisions)} call sites inlined")
+        for decision in self.inline_decisions:
+            lines.append(f"  {decision}")
+        return "\n".join(lines)
+
+
+class Optimizer:
+    """
+    Runs optimization passes on a copy of the program.
+
+    Passes:
+    1. Dead-function elimination (call graph reachability from main)
+    2. Partial evaluation of calls with constant arguments
+    3. Inlining of small non-recursive leaf functions
+    4. Dead-function elimination again (folded and inlined helpers may
+       become unused)
+
+    The input AST is never modified, so it can still be displayed as parsed.
+    """
+
+    def __init__(
+        self,
+        inline: bool = True,
+        eliminate_dead: bool = True,
+        max_inline_size: int = 24,
+        inline_budget: int = 400,
+        partial_eval: bool = True,
+        fuel: int = 10_000
+    ):
+        """Initialize optimizer with pass options."""
+        self.inline = inline
+        self.eliminate_dead = eliminate_dead
+        self.partial_eval = partial_eval
+        self.fuel = fuel
+        self.max_inline_size = max_inline_size
+        self.inline_budget = inline_budget
+        self.report = OptimizationReport()
+
+    def optimize(self, program: Program) -> Program:
+        """Return an optimized copy of program."""
+        self.report = OptimizationReport()
+        program = copy.deepcopy(program)
+
+        graph = CallGraph.build(program)
+        self.report.call_graph = graph
+
+        if self.eliminate_dead:
+            program, removed = eliminate_dead_functions(program, graph)
+            self.report.removed_functions.extend(removed)
+
+        if self.partial_eval:
+            evaluator = PartialEvaluator(self.fuel)
+            program = evaluator.specialize(program)
+            self.report.specializations = evaluator.decisions
+
+        if self.inline:
+            graph = CallGraph.build(program)
+            inliner = Inliner(self.max_inline_size, self.inline_budget)
+            program = inliner.inline(program, graph)
+            self.report.inline_decisions = inliner.decisions
+
+        if self.eliminate_dead and (self.partial_eval or self.inline):
+            program, removed = eliminate_dead_functions(program, CallGraph.build(program))
+            self.report.removed_functions.extend(removed)
+
+        return program
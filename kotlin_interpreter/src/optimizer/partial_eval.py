@@ -0,0 +1,311 @@
+"""
+Offline partial evaluation of calls with constant arguments.
+
+A call such as factorial(5) or add(5, 3) whose arguments are all
+literals is evaluated at optimization time:
+- pure functions (see PurityAnalysis) are run with a fuel budget; when
+  they finish, the call is replaced by the resulting literal;
+- otherwise (impure function, fuel exhausted, run-time error) a residual
+  function is emitted: a copy of the callee without parameters, with the
+  constant arguments substituted and the body simplified, and the call is
+  redirected to it.
+
+Operators and conditions whose operands become literals are folded along
+the way, so residual bodies lose the branches the constants rule out.
+Folding uses the Evaluator itself, so folded values are exactly what the
+program would have computed at run time.
+"""
+
+import copy
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..lexer.token import SourceLocation
+from ..parser.ast_nodes import *
+from ..analysis.purity import PurityAnalysis
+from ..runtime.evaluator import Evaluator
+from ..runtime.runtime_objects import RuntimeValue, IntValue, StringValue, BooleanValue
+from ..runtime.unboxed import to_text
+
+
+class FuelExhausted(Exception):
+    """Raised when a compile-time evaluation runs out of fuel."""
+    pass
+
+
+class FuelEvaluator(Evaluator):
+    """Evaluator that stops after a fixed number of evaluation steps."""
+
+    def __init__(self, fuel: int):
+        """Initialize evaluator with a step budget."""
+        # No quickening: compile-time runs must not leave handlers on the nodes
+        super().__init__(quicken=False)
+        self.fuel = fuel
+
+    def eval_statement(self, node: Statement) -> RuntimeValue:
+        """Evaluate a statement, spending one unit of fuel."""
+        self.fuel -= 1
+        if self.fuel < 0:
+            raise FuelExhausted()
+        return super().eval_statement(node)
+
+    def eval_expression(self, node: Expression) -> RuntimeValue:
+        """Evaluate an expression, spending one unit of fuel."""
+        self.fuel -= 1
+        if self.fuel < 0:
+            raise FuelExhausted()
+        return super().eval_expression(node)
+
+
+@dataclass
+class SpecializationDecision:
+    """Outcome of partially evaluating one call site."""
+    caller: str
+    callee: str
+    location: SourceLocation
+    action: str  # "folded", "specialized" or "kept"
+    detail: str
+
+    def __str__(self) -> str:
+        return f"{self.caller} -> {self.callee} at {self.location}: {self.action} ({self.detail})"
+
+
+def literal_of(value: RuntimeValue, location: SourceLocation) -> Optional[LiteralExpression]:
+    """Convert a runtime value back to a literal, if it has a literal form."""
+    if isinstance(value, BooleanValue):
+        return LiteralExpression(location, value.value, "Boolean")
+    if isinstance(value, IntValue):
+        return LiteralExpression(location, value.value, "Int")
+    if isinstance(value, StringValue):
+        return LiteralExpression(location, value.value, "String")
+    return None
+
+
+def calls_user_function(node: ASTNode, functions: Dict[str, FunctionDeclaration]) -> bool:
+    """Check if a subtree calls any user function."""
+    return any(
+        isinstance(child, CallExpression) and child.function_name in functions
+        for child in walk(node)
+    )
+
+
+class PartialEvaluator:
+    """
+    Specializes calls whose arguments are compile-time constants.
+
+    Global initializers are processed first, in declaration order: a call
+    there only sees the constant globals declared before it, like at run
+    time. Function bodies only see constant globals that are initialized
+    before any user code runs.
+
+    Residual functions are named '<callee>$spec<n>' and are shared by call
+    sites with the same arguments. Their bodies are simplified but not
+    specialized further, which bounds the number of residuals.
+    """
+
+    def __init__(self, fuel: int = 10_000, max_residuals: int = 16, max_residual_size: int = 200):
+        """
+        Initialize partial evaluator.
+
+        Args:
+            fuel: Evaluation steps allowed per folded call
+            max_residuals: Most residual functions to emit
+            max_residual_size: Largest callee body (in AST nodes) to copy
+        """
+        self.fuel = fuel
+        self.max_residuals = max_residuals
+        self.max_residual_size = max_residual_size
+        self.decisions: List[SpecializationDecision] = []
+        self.residuals: List[FunctionDeclaration] = []
+        self.functions: Dict[str, FunctionDeclaration] = {}
+        self.pure: Set[str] = set()
+        self.evaluator: Optional[FuelEvaluator] = None
+        self.results: Dict[Tuple, Tuple[Optional[LiteralExpression], str]] = {}
+        self.residual_names: Dict[Tuple, str] = {}
+
+    def specialize(self, program: Program) -> Program:
+        """Partially evaluate program (modified in place)."""
+        self.decisions = []
+        self.residuals = []
+        self.results = {}
+        self.residual_names = {}
+        self.functions = {
+            decl.name: decl for decl in program.declarations
+            if isinstance(decl, FunctionDeclaration)
+        }
+        purity = PurityAnalysis()
+        purity.analyze(program)
+        self.pure = set(purity.pure_functions())
+
+        # Globals: each initializer sees the constants declared before it
+        self.evaluator = self._make_evaluator({})
+        constants: Dict[str, RuntimeValue] = {}
+        safe_constants: Optional[Dict[str, RuntimeValue]] = None
+        for decl in program.declarations:
+            if not isinstance(decl, VariableDeclaration) or decl.initializer is None:
+                continue
+            if safe_constants is None and calls_user_function(decl.initializer, self.functions):
+                safe_constants = dict(constants)
+            decl.initializer = self._rewrite(decl.initializer, "<globals>", True)
+            if not decl.is_mutable and isinstance(decl.initializer, LiteralExpression):
+                value = self.evaluator.eval_literal(decl.initializer)
+                constants[decl.name] = value
+                self.evaluator.global_env.define(decl.name, value)
+
+        # Bodies: only constants initialized before user code first runs
+        self.evaluator = self._make_evaluator(constants if safe_constants is None else safe_constants)
+        self.results = {}
+        for func in list(self.functions.values()):
+            func.body = self._rewrite(func.body, func.name, True)
+
+        # Residuals go right after the function they specialize
+        declarations = []
+        for decl in program.declarations:
+            declarations.append(decl)
+            if decl is self.functions.get(getattr(decl, "name", None)):
+                declarations.extend(r for r in self.residuals if r.name.rsplit("$", 1)[0] == decl.name)
+        program.declarations = declarations
+        return program
+
+    def _make_evaluator(self, constants: Dict[str, RuntimeValue]) -> FuelEvaluator:
+        """Evaluator with all functions and the given constant globals defined."""
+        evaluator = FuelEvaluator(self.fuel)
+        for func in self.functions.values():
+            evaluator.eval_function_declaration(func)
+        for name, value in constants.items():
+            evaluator.global_env.define(name, value)
+        return evaluator
+
+    # Rewriting
+
+    def _rewrite(self, node: ASTNode, caller: str, specialize: bool) -> ASTNode:
+        """Rewrite node bottom-up, folding constants and specializing calls."""
+        map_children(node, lambda child: self._rewrite(child, caller, specialize))
+
+        if isinstance(node, (BinaryExpression, UnaryExpression)):
+            operands = [node.left, node.right] if isinstance(node, BinaryExpression) else [node.operand]
+            if all(isinstance(operand, LiteralExpression) for operand in operands):
+                return self._fold(node)
+        elif isinstance(node, (IfStatement, IfExpression)):
+            condition = node.condition
+            if isinstance(condition, LiteralExpression) and condition.literal_type == "Boolean":
+                branch = node.then_branch if condition.value else node.else_branch
+                return branch if branch is not None else BlockStatement(node.location, [])
+        elif isinstance(node, WhileStatement):
+            condition = node.condition
+            if isinstance(condition, LiteralExpression) and condition.value is False:
+                return BlockStatement(node.location, [])
+        elif isinstance(node, CallExpression) and node.function_name in self.functions:
+            if all(isinstance(arg, LiteralExpression) for arg in node.arguments):
+                return self._specialize_call(node, caller, specialize)
+        return node
+
+    def _fold(self, node: Expression) -> Expression:
+        """Replace an operator on literals by its value (kept if evaluation fails)."""
+        self.evaluator.fuel = self.fuel
+        try:
+            value = self.evaluator.eval_expression(node)
+        except Exception:
+            return node
+        return literal_of(value, node.location) or node
+
+    def _specialize_call(self, call: CallExpression, caller: str, specialize: bool) -> Expression:
+        """Fold or specialize one call with constant arguments."""
+        callee = self.functions[call.function_name]
+        key = (callee.name,) + tuple((arg.literal_type, arg.value) for arg in call.arguments)
+
+        if callee.name in self.pure and len(call.arguments) == len(callee.parameters):
+            if key not in self.results:
+                self.results[key] = self._evaluate_call(call)
+            result, reason = self.results[key]
+            if result is not None:
+                self.decisions.append(SpecializationDecision(
+                    caller, callee.name, call.location, "folded", f"= {to_text(result.value)}, {reason}"
+                ))
+                return LiteralExpression(call.location, result.value, result.literal_type)
+        else:
+            reason = "impure" if callee.name not in self.pure else "argument count mismatch"
+
+        if not specialize:
+            return call
+
+        residual = self.residual_names.get(key)
+        if residual is None:
+            problem = self._check_residual(callee, call)
+            if problem is not None:
+                self.decisions.append(SpecializationDecision(
+                    caller, callee.name, call.location, "kept", f"{reason}; {problem}"
+                ))
+                return call
+            residual = self._make_residual(callee, call, key)
+
+        self.decisions.append(SpecializationDecision(
+            caller, callee.name, call.location, "specialized", f"{reason}; {residual}"
+        ))
+        return CallExpression(call.location, residual, [])
+
+    def _evaluate_call(self, call: CallExpression) -> Tuple[Optional[LiteralExpression], str]:
+        """Run a pure call with the fuel budget; return (literal or None, detail)."""
+        self.evaluator.fuel = self.fuel
+        self.evaluator.current_env = self.evaluator.global_env
+        self.evaluator.current_function = None
+        try:
+            value = self.evaluator.eval_call_expression(call)
+        except FuelExhausted:
+            return None, f"out of fuel after {self.fuel} steps"
+        except RecursionError:
+            return None, "recursion too deep"
+        except Exception as e:
+            return None, f"fails at compile time: {e}"
+        literal = literal_of(value, call.location)
+        if literal is None:
+            return None, f"{value.type_name} result has no literal form"
+        return literal, f"{self.fuel - self.evaluator.fuel} steps"
+
+    # Residual functions
+
+    def _check_residual(self, callee: FunctionDeclaration, call: CallExpression) -> Optional[str]:
+        """Return reason why a residual cannot be emitted, or None."""
+        if callee.name == "main":
+            return "entry point"
+        if not callee.parameters:
+            return "no parameters"
+        if len(call.arguments) != len(callee.parameters):
+            return "argument count mismatch"
+        if len(self.residuals) >= self.max_residuals:
+            return "residual budget exhausted"
+        size = sum(1 for _ in walk(callee.body))
+        if size > self.max_residual_size:
+            return f"too large (size {size} > {self.max_residual_size})"
+
+        params = {param.name for param in callee.parameters}
+        for node in walk(callee.body):
+            if isinstance(node, AssignmentExpression) and node.target in params:
+                return f"parameter '{node.target}' is reassigned"
+            if isinstance(node, VariableDeclaration) and node.name in params:
+                return f"local '{node.name}' shadows a parameter"
+            if isinstance(node, ForStatement) and node.variable in params:
+                return f"loop variable '{node.variable}' shadows a parameter"
+        return None
+
+    def _make_residual(self, callee: FunctionDeclaration, call: CallExpression, key: Tuple) -> str:
+        """Emit a copy of callee with the constant arguments substituted."""
+        name = f"{callee.name}$spec{len(self.residuals) + 1}"
+        bindings = {
+            param.name: arg for param, arg in zip(callee.parameters, call.arguments)
+        }
+
+        def substitute(node: ASTNode) -> ASTNode:
+            if isinstance(node, IdentifierExpression) and node.name in bindings:
+                return copy.deepcopy(bindings[node.name])
+            return map_children(node, substitute)
+
+        body = substitute(copy.deepcopy(callee.body))
+        body = self._rewrite(body, name, False)
+        if not isinstance(body, BlockStatement):
+            body = BlockStatement(callee.body.location, [body])
+
+        residual = FunctionDeclaration(callee.location, name, [], callee.return_type, body)
+        self.residuals.append(residual)
+        self.residual_names[key] = name
+        return name
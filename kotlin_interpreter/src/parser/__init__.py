@@ -18,7 +18,10 @@ __all__ = [
     'ExpressionStatement',
     'IfStatement',
     'WhileStatement',
+    'ForStatement',
     'ReturnStatement',
+    'BreakStatement',
+    'ContinueStatement',
     'LiteralExpression',
     'IdentifierExpression',
     'BinaryExpression',
@@ -27,4 +30,7 @@ __all__ = [
     'AssignmentExpression',
     'IfExpression',
     'StringTemplateExpression',
+    'iter_child_nodes',
+    'map_children',
+    'walk',
 ]
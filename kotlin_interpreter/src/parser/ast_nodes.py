@@ -5,13 +5,17 @@ This module defines all AST node types representing Kotlin constructs.
 Each node represents a syntactic element in the parsed program.
 """
 
-from dataclasses import dataclass
-from typing import List, Optional, Any
+from dataclasses import dataclass, field, fields
+from typing import List, Optional, Any, Iterator
 from abc import ABC, abstractmethod
 
 from ..lexer.token import SourceLocation
 
 
+# Field metadata of annotations set by analyses or at run time (not part of the source)
+ANNOTATION = {"runtime": True}
+
+
 # Base classes
 
 class ASTNode(ABC):
@@ -62,11 +66,13 @@ class FunctionDeclaration(Declaration):
     parameters: List['Parameter']
     return_type: Optional[str]  # None means Unit (inferred)
     body: 'BlockStatement'
+    is_tailrec: bool = False  # Declared with 'tailrec' modifier
     
     def __repr__(self) -> str:
         params = ', '.join(str(p) for p in self.parameters)
         ret_type = f": {self.return_type}" if self.return_type else ""
-        return f"FunctionDeclaration({self.name}({params}){ret_type})"
+        modifier = "tailrec " if self.is_tailrec else ""
+        return f"FunctionDeclaration({modifier}{self.name}({params}){ret_type})"
 
 
 @dataclass
@@ -103,6 +109,8 @@ class BlockStatement(Statement):
     """Block of statements: { statement1; statement2; ... }"""
     location: SourceLocation  # Inherited from Statement, must come first
     statements: List[Statement]
+    # Cleared by scope analysis when the block can run in the enclosing frame
+    needs_scope: bool = field(default=True, metadata=ANNOTATION)
     
     def __repr__(self) -> str:
         return f"Block({len(self.statements)} statements)"
@@ -133,13 +141,43 @@ class IfStatement(Statement):
 
 @dataclass
 class WhileStatement(Statement):
-    """While loop: while (condition) body"""
+    """While loop: label@? while (condition) body"""
     location: SourceLocation  # Inherited from Statement, must come first
     condition: Expression
     body: Statement
+    label: Optional[str] = None
+    # Induction-variable plan (CountedLoop), set by the counted-loop analysis
+    counted: Any = field(default=None, repr=False, compare=False, metadata=ANNOTATION)
+    # Accumulations (ReductionLoop) of a counted loop, set by the loop idiom analysis
+    idiom: Any = field(default=None, repr=False, compare=False, metadata=ANNOTATION)
+    
+    def __repr__(self) -> str:
+        label_str = f"{self.label}@" if self.label else ""
+        return f"{label_str}While({self.condition})"
+
+
+@dataclass
+class ForStatement(Statement):
+    """
+    Counted loop: label@? for (variable in start until|..|downTo end (step s)?) body
+    
+    The bounds and the step are Int expressions evaluated once, before the
+    first iteration; variable is a val scoped to the loop. repeat(n) { body }
+    is parsed as for (it in 0 until n) body.
+    """
+    location: SourceLocation  # Inherited from Statement, must come first
+    variable: str
+    start: Expression
+    end: Expression
+    step: Optional[Expression]  # None means 1
+    body: Statement
+    kind: str = "until"  # "until" (end excluded), ".." or "downTo" (end included)
+    label: Optional[str] = None
     
     def __repr__(self) -> str:
-        return f"While({self.condition})"
+        label_str = f"{self.label}@" if self.label else ""
+        step_str = f" step {self.step}" if self.step else ""
+        return f"{label_str}For({self.variable} in {self.start} {self.kind} {self.end}{step_str})"
 
 
 @dataclass
@@ -153,6 +191,26 @@ class ReturnStatement(Statement):
         return f"Return({val_str})"
 
 
+@dataclass
+class BreakStatement(Statement):
+    """Break statement: break or break@label"""
+    location: SourceLocation  # Inherited from Statement, must come first
+    label: Optional[str] = None
+    
+    def __repr__(self) -> str:
+        return f"Break@{self.label}" if self.label else "Break"
+
+
+@dataclass
+class ContinueStatement(Statement):
+    """Continue statement: continue or continue@label"""
+    location: SourceLocation  # Inherited from Statement, must come first
+    label: Optional[str] = None
+    
+    def __repr__(self) -> str:
+        return f"Continue@{self.label}" if self.label else "Continue"
+
+
 @dataclass
 class DeclarationStatement(Statement):
     """Declaration as statement (for local variables in function bodies)."""
@@ -181,6 +239,9 @@ class IdentifierExpression(Expression):
     """Variable reference: variableName"""
     location: SourceLocation  # Inherited from Expression, must come first
     name: str
+    # Specialized handler and deopt count, set at run time by quickening
+    quick: Any = field(default=None, repr=False, compare=False, metadata=ANNOTATION)
+    deopts: int = field(default=0, repr=False, compare=False, metadata=ANNOTATION)
     
     def __repr__(self) -> str:
         return f"Identifier({self.name})"
@@ -193,6 +254,9 @@ class BinaryExpression(Expression):
     left: Expression
     operator: str  # +, -, *, /, %, ==, !=, <, <=, >, >=, &&, ||
     right: Expression
+    # Specialized handler and deopt count, set at run time by quickening
+    quick: Any = field(default=None, repr=False, compare=False, metadata=ANNOTATION)
+    deopts: int = field(default=0, repr=False, compare=False, metadata=ANNOTATION)
     
     def __repr__(self) -> str:
         return f"Binary({self.left} {self.operator} {self.right})"
@@ -204,6 +268,9 @@ class UnaryExpression(Expression):
     location: SourceLocation  # Inherited from Expression, must come first
     operator: str  # -, !
     operand: Expression
+    # Specialized handler and deopt count, set at run time by quickening
+    quick: Any = field(default=None, repr=False, compare=False, metadata=ANNOTATION)
+    deopts: int = field(default=0, repr=False, compare=False, metadata=ANNOTATION)
     
     def __repr__(self) -> str:
         return f"Unary({self.operator}{self.operand})"
@@ -215,6 +282,10 @@ class CallExpression(Expression):
     location: SourceLocation  # Inherited from Expression, must come first
     function_name: str
     arguments: List[Expression]
+    # Set by tail-call analysis for self-calls in tail position
+    tail_call: bool = field(default=False, metadata=ANNOTATION)
+    # Inline cache (resolved callee and binding plan), set at run time
+    cache: Any = field(default=None, repr=False, compare=False, metadata=ANNOTATION)
     
     def __repr__(self) -> str:
         args = ', '.join(str(arg) for arg in self.arguments)
@@ -253,6 +324,8 @@ class BlockExpression(Expression):
     """
     location: SourceLocation  # Inherited from Expression, must come first
     statements: List[Statement]
+    # Cleared by scope analysis when the block can run in the enclosing frame
+    needs_scope: bool = field(default=True, metadata=ANNOTATION)
     
     def __repr__(self) -> str:
         return f"BlockExpr({len(self.statements)} statements)"
@@ -290,3 +363,41 @@ def is_statement(node: ASTNode) -> bool:
 def is_declaration(node: ASTNode) -> bool:
     """Check if node is a declaration."""
     return isinstance(node, Declaration)
+
+
+def iter_child_nodes(node: ASTNode) -> Iterator[ASTNode]:
+    """Yield direct child nodes of an AST node in field order."""
+    for f in fields(node):
+        value = getattr(node, f.name)
+        if isinstance(value, ASTNode):
+            yield value
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, ASTNode):
+                    yield item
+
+
+def map_children(node: ASTNode, fn) -> ASTNode:
+    """
+    Replace each direct child of node with fn(child), in place.
+    
+    Used by AST-to-AST transformations. Returns node for convenience.
+    """
+    for f in fields(node):
+        value = getattr(node, f.name)
+        if isinstance(value, ASTNode):
+            setattr(node, f.name, fn(value))
+        elif isinstance(value, list):
+            setattr(node, f.name, [
+                fn(item) if isinstance(item, ASTNode) else item for item in value
+            ])
+    return node
+
+
+def walk(node: ASTNode) -> Iterator[ASTNode]:
+    """Yield node and all its descendants in pre-order."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(list(iter_child_nodes(current))))
@@ -10,6 +10,10 @@ from ..lexer.token import Token, TokenType
 from .ast_nodes import *
 
 
+# Calls that add to the builder inside buildString { ... }
+BUILDER_CALLS = ("append", "appendLine")
+
+
 class ParseError(Exception):
     """Exception raised for parsing errors."""
     def __init__(self, message: str, token: Token):
@@ -25,15 +29,21 @@ class Parser:
     Grammar (simplified):
         program         → declaration* EOF
         declaration     → funDecl | varDecl
-        funDecl         → "fun" IDENTIFIER "(" parameters? ")" (":" type)? block
+        funDecl         → "tailrec"? "fun" IDENTIFIER "(" parameters? ")" (":" type)? block
         varDecl         → ("val" | "var") IDENTIFIER (":" type)? ("=" expression)?
         
-        statement       → exprStmt | ifStmt | whileStmt | returnStmt | block
+        statement       → exprStmt | ifStmt | whileStmt | forStmt | repeatStmt
+                        | returnStmt | breakStmt | continueStmt | block
         block           → "{" statement* "}"
         exprStmt        → expression
         ifStmt          → "if" "(" expression ")" statement ("else" statement)?
-        whileStmt       → "while" "(" expression ")" statement
+        whileStmt       → (LABEL)? "while" "(" expression ")" statement
+        forStmt         → (LABEL)? "for" "(" IDENTIFIER "in" expression
+                          ("until" | ".." | "downTo") expression ("step" expression)? ")" statement
+        repeatStmt      → "repeat" "(" expression ")" block
         returnStmt      → "return" expression?
+        breakStmt       → "break" AT_LABEL?
+        continueStmt    → "continue" AT_LABEL?
         
         expression      → assignment
         assignment      → IDENTIFIER "=" assignment | logicalOr
@@ -44,7 +54,7 @@ class Parser:
         addition        → multiplication (("+" | "-") multiplication)*
         multiplication  → unary (("*" | "/" | "%") unary)*
         unary           → ("!" | "-") unary | call
-        call            → primary ("(" arguments? ")")?
+        call            → primary ("(" arguments? ")")? | "buildString" block
         primary         → literal | IDENTIFIER | "(" expression ")" | ifExpr
         ifExpr          → "if" "(" expression ")" expression "else" expression
     """
@@ -53,6 +63,10 @@ class Parser:
         """Initialize parser with token list."""
         self.tokens = tokens
         self.current = 0
+        # Labels of the enclosing loops (None for unlabeled), innermost last
+        self.loop_labels: List[Optional[str]] = []
+        # Hidden variables of the enclosing buildString blocks, innermost last
+        self.builders: List[str] = []
     
     # Token management
     
@@ -110,6 +124,9 @@ class Parser:
     def declaration(self) -> Declaration:
         """Parse a declaration (function or variable)."""
         try:
+            if self.match(TokenType.TAILREC):
+                self.consume(TokenType.FUN, "Expected 'fun' after 'tailrec'")
+                return self.function_declaration(is_tailrec=True)
             if self.match(TokenType.FUN):
                 return self.function_declaration()
             if self.match(TokenType.VAL, TokenType.VAR):
@@ -124,7 +141,7 @@ class Parser:
             self.synchronize()
             raise
     
-    def function_declaration(self) -> FunctionDeclaration:
+    def function_declaration(self, is_tailrec: bool = False) -> FunctionDeclaration:
         """Parse function declaration."""
         location = self.previous().location
         
@@ -148,10 +165,14 @@ class Parser:
         
         # Function body - must start with '{'
         self.consume(TokenType.LBRACE, "Expected '{' before function body")
-        body = self.block_statement()
+        outer_loops, self.loop_labels = self.loop_labels, []
+        try:
+            body = self.block_statement()
+        finally:
+            self.loop_labels = outer_loops
         
         # dataclass: location comes FIRST (inherited from parent)
-        return FunctionDeclaration(location, name, parameters, return_type, body)
+        return FunctionDeclaration(location, name, parameters, return_type, body, is_tailrec)
     
     def parameter(self) -> Parameter:
         """Parse function parameter: name: type"""
@@ -200,8 +221,21 @@ class Parser:
             return self.if_statement()
         if self.match(TokenType.WHILE):
             return self.while_statement()
+        if self.match(TokenType.FOR):
+            return self.for_statement()
+        if self.match(TokenType.LABEL):
+            label = self.previous()
+            if self.match(TokenType.FOR):
+                return self.for_statement(label)
+            self.consume(TokenType.WHILE, "Expected 'while' or 'for' after label")
+            return self.while_statement(label)
+        if (self.check(TokenType.IDENTIFIER) and self.peek().value == "repeat"
+                and self.peek(1).type == TokenType.LPAREN):
+            return self.repeat_statement()
         if self.match(TokenType.RETURN):
             return self.return_statement()
+        if self.match(TokenType.BREAK, TokenType.CONTINUE):
+            return self.jump_statement()
         if self.match(TokenType.LBRACE):
             return self.block_statement()
         if self.match(TokenType.VAL, TokenType.VAR):
@@ -241,18 +275,93 @@ class Parser:
         # dataclass: location comes FIRST
         return IfStatement(location, condition, then_branch, else_branch)
     
-    def while_statement(self) -> WhileStatement:
-        """Parse while statement."""
-        location = self.previous().location
+    def while_statement(self, label: Optional[Token] = None) -> WhileStatement:
+        """Parse while statement (label is the 'name@' token before it, if any)."""
+        location = label.location if label else self.previous().location
+        name = label.value if label else None
         
         self.consume(TokenType.LPAREN, "Expected '(' after 'while'")
+        # The condition belongs to the enclosing loop (if any)
         condition = self.expression()
         self.consume(TokenType.RPAREN, "Expected ')' after condition")
         
-        body = self.statement()
+        self.loop_labels.append(name)
+        try:
+            body = self.statement()
+        finally:
+            self.loop_labels.pop()
+        
+        # dataclass: location comes FIRST
+        return WhileStatement(location, condition, body, name)
+    
+    def for_statement(self, label: Optional[Token] = None) -> ForStatement:
+        """Parse for loop over an Int range (label is the 'name@' token before it, if any)."""
+        location = label.location if label else self.previous().location
+        name = label.value if label else None
+        
+        self.consume(TokenType.LPAREN, "Expected '(' after 'for'")
+        variable = self.consume(TokenType.IDENTIFIER, "Expected loop variable name").value
+        self.consume(TokenType.IN, "Expected 'in' after loop variable")
+        # The range belongs to the enclosing loop (if any)
+        start = self.expression()
+        if self.match(TokenType.RANGE):
+            kind = ".."
+        elif self.check(TokenType.IDENTIFIER) and self.peek().value in ("until", "downTo"):
+            kind = self.advance().value
+        else:
+            raise ParseError("Expected 'until', '..' or 'downTo' in for loop range", self.peek())
+        end = self.expression()
+        step = None
+        if self.check(TokenType.IDENTIFIER) and self.peek().value == "step":
+            self.advance()
+            step = self.expression()
+        self.consume(TokenType.RPAREN, "Expected ')' after for loop range")
+        
+        self.loop_labels.append(name)
+        try:
+            body = self.statement()
+        finally:
+            self.loop_labels.pop()
+        
+        # dataclass: location comes FIRST
+        return ForStatement(location, variable, start, end, step, body, kind, name)
+    
+    def repeat_statement(self) -> Statement:
+        """Parse repeat(n) { body } as for (it in 0 until n), or a plain call to repeat."""
+        call = self.expression_statement()
+        expr = call.expression
+        if not (isinstance(expr, CallExpression) and expr.function_name == "repeat"
+                and self.check(TokenType.LBRACE)):
+            return call
+        if len(expr.arguments) != 1:
+            raise ParseError("repeat expects 1 argument", self.peek())
+        self.advance()  # consume '{'
+        # The body is a lambda: break/continue cannot leave it
+        outer_loops, self.loop_labels = self.loop_labels, []
+        try:
+            body = self.block_statement()
+        finally:
+            self.loop_labels = outer_loops
+        zero = LiteralExpression(expr.location, 0, "Int")
+        # dataclass: location comes FIRST
+        return ForStatement(expr.location, "it", zero, expr.arguments[0], None, body)
+    
+    def jump_statement(self) -> Statement:
+        """Parse break/continue, optionally with a @label."""
+        keyword = self.previous()
+        label = None
+        if self.match(TokenType.AT_LABEL):
+            label = self.previous().value
+        
+        if not self.loop_labels:
+            raise ParseError(f"'{keyword.value}' is only allowed inside a loop", keyword)
+        if label is not None and label not in self.loop_labels:
+            raise ParseError(f"Unresolved label: '@{label}'", self.previous())
         
         # dataclass: location comes FIRST
-        return WhileStatement(location, condition, body)
+        if keyword.type == TokenType.BREAK:
+            return BreakStatement(keyword.location, label)
+        return ContinueStatement(keyword.location, label)
     
     def return_statement(self) -> ReturnStatement:
         """Parse return statement."""
@@ -390,9 +499,15 @@ class Parser:
         """Parse function call."""
         expr = self.primary()
         
-        # Check for function call
-        if isinstance(expr, IdentifierExpression) and self.match(TokenType.LPAREN):
-            return self.finish_call(expr)
+        if isinstance(expr, IdentifierExpression):
+            if expr.name == "buildString" and self.check(TokenType.LBRACE):
+                return self.build_string(expr)
+            # Check for function call
+            if self.match(TokenType.LPAREN):
+                call = self.finish_call(expr)
+                if self.builders and call.function_name in BUILDER_CALLS:
+                    return self.builder_append(call)
+                return call
         
         return expr
     
@@ -410,6 +525,50 @@ class Parser:
         # dataclass: location comes FIRST
         return CallExpression(callee.location, callee.name, arguments)
     
+    def build_string(self, callee: IdentifierExpression) -> BlockExpression:
+        """
+        Parse buildString { body } as a block that builds a String.
+        
+        The builder is a hidden String variable; append(x) and
+        appendLine(x) in the body become assignments 'builder = builder + x'
+        (cheap: long Strings are ropes at run time), and the block's value
+        is the variable.
+        """
+        location = callee.location
+        builder = f"$builder{len(self.builders)}"
+        self.advance()  # consume '{'
+        # The body is a lambda: break/continue cannot leave it
+        outer_loops, self.loop_labels = self.loop_labels, []
+        self.builders.append(builder)
+        try:
+            body = self.block_statement()
+        finally:
+            self.loop_labels = outer_loops
+            self.builders.pop()
+        empty = LiteralExpression(location, "", "String")
+        # dataclass: location comes FIRST
+        declaration = VariableDeclaration(location, True, builder, "String", empty)
+        statements = ([DeclarationStatement(location, declaration)] + body.statements
+                      + [ExpressionStatement(location, IdentifierExpression(location, builder))])
+        return BlockExpression(location, statements)
+    
+    def builder_append(self, call: CallExpression) -> AssignmentExpression:
+        """append(x) / appendLine(x) inside buildString: add the text to the builder."""
+        location = call.location
+        builder = self.builders[-1]
+        arguments = list(call.arguments)
+        if call.function_name == "appendLine":
+            if len(arguments) > 1:
+                raise ParseError("appendLine expects at most 1 argument", self.previous())
+            arguments.append(LiteralExpression(location, "\n", "String"))
+        elif len(arguments) != 1:
+            raise ParseError("append expects 1 argument", self.previous())
+        value: Expression = IdentifierExpression(location, builder)
+        for argument in arguments:
+            value = BinaryExpression(location, value, "+", argument)
+        # dataclass: location comes FIRST
+        return AssignmentExpression(location, builder, value)
+    
     def primary(self) -> Expression:
         """Parse primary expression."""
         # Literals
@@ -505,8 +664,9 @@ class Parser:
                 return
             
             if self.peek().type in [
-                TokenType.FUN, TokenType.VAL, TokenType.VAR,
-                TokenType.IF, TokenType.WHILE, TokenType.RETURN
+                TokenType.FUN, TokenType.TAILREC, TokenType.VAL, TokenType.VAR,
+                TokenType.IF, TokenType.WHILE, TokenType.FOR, TokenType.RETURN,
+                TokenType.BREAK, TokenType.CONTINUE, TokenType.LABEL
             ]:
                 return
             
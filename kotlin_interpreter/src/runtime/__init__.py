@@ -21,7 +21,11 @@ from .runtime_objects import (
     is_function,
 )
 from .environment import Environment
-from .evaluator import Evaluator, ReturnException
+from .evaluator import Evaluator, PendingJump, ExecutionTimeout, StackOverflowError
+from .admission import AdmissionPolicy, AdmissionDecision
+from .output import OutputSink, CaptureSink
+from .governor import Governor, ResourceLimitExceeded
+from .profiler import Profiler
 
 __all__ = [
     'RuntimeValue',
@@ -44,5 +48,14 @@ __all__ = [
     'is_function',
     'Environment',
     'Evaluator',
-    'ReturnException',
+    'PendingJump',
+    'ExecutionTimeout',
+    'StackOverflowError',
+    'AdmissionPolicy',
+    'AdmissionDecision',
+    'OutputSink',
+    'CaptureSink',
+    'Governor',
+    'ResourceLimitExceeded',
+    'Profiler',
 ]
@@ -0,0 +1,88 @@
+"""
+Admission control for user programs.
+
+Before a program runs, its static cost estimate decides what happens:
+- unbounded programs (infinite loops, recursion without base case) are
+  rejected;
+- programs whose cost depends on run-time data, or whose estimate is
+  large, run with a time limit;
+- pure recursive functions in such programs are routed to memoized
+  execution, which turns exponential recursion like fib() linear.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+from ..parser.ast_nodes import Program
+from ..analysis.cost import CostEstimator, CostClass, ProgramCost
+from ..analysis.purity import PurityAnalysis
+
+
+@dataclass
+class AdmissionDecision:
+    """What the runner should do with a program."""
+    action: str  # "run", "time-box" or "reject"
+    reason: str
+    cost: ProgramCost
+    time_limit: Optional[float] = None
+    memoize: bool = False
+
+    @property
+    def admitted(self) -> bool:
+        """Check if the program may run."""
+        return self.action != "reject"
+
+    def __str__(self) -> str:
+        details = []
+        if self.time_limit is not None:
+            details.append(f"limit {self.time_limit:g}s")
+        if self.memoize:
+            details.append("memoize")
+        suffix = f" [{', '.join(details)}]" if details else ""
+        return f"{self.action}{suffix}: {self.reason}"
+
+
+class AdmissionPolicy:
+    """
+    Decides how to run a program from its cost estimate.
+
+    Thresholds:
+        max_steps: Largest bounded estimate that runs without a time limit
+        time_limit: Seconds allowed for time-boxed programs
+    """
+
+    def __init__(self, max_steps: int = 5_000_000, time_limit: float = 10.0):
+        """Initialize policy."""
+        self.max_steps = max_steps
+        self.time_limit = time_limit
+
+    def decide(self, program: Program) -> AdmissionDecision:
+        """Estimate program cost and choose an action."""
+        cost = CostEstimator().estimate(program)
+
+        if cost.cost_class == CostClass.UNBOUNDED:
+            return AdmissionDecision("reject", "; ".join(cost.reasons) or "does not terminate", cost)
+
+        if cost.cost_class == CostClass.UNKNOWN:
+            memoize = self._has_pure_recursion(program, cost)
+            return AdmissionDecision(
+                "time-box", "; ".join(cost.reasons) or "cost depends on run-time data",
+                cost, self.time_limit, memoize
+            )
+
+        if cost.steps is not None and cost.steps > self.max_steps:
+            return AdmissionDecision(
+                "time-box", f"estimated {cost.steps} steps > {self.max_steps}",
+                cost, self.time_limit
+            )
+
+        return AdmissionDecision("run", f"{cost.cost_class}, ~{cost.steps} steps", cost)
+
+    def _has_pure_recursion(self, program: Program, cost: ProgramCost) -> bool:
+        """Check if some recursive function in the estimate is pure."""
+        recursive: List[str] = cost.recursive_functions
+        if not recursive:
+            return False
+        purity = PurityAnalysis()
+        purity.analyze(program)
+        return any(purity.is_pure(name) for name in recursive)
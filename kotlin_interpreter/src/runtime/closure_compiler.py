@@ -0,0 +1,769 @@
+"""
+Closure compiler for the "closure" execution engine.
+
+The tree-walker dispatches on the node type (isinstance ladder) and then
+on the operator string for every node it evaluates. The closure compiler
+does that dispatch once per node: each function body is turned into a
+tree of nested Python closures, each doing one specialized thing, e.g.
+
+    def add(env):
+        left_value = left(env)
+        right_value = right(env)
+        if type(left_value) is IntValue and type(right_value) is IntValue:
+            return IntValue(left_value.value + right_value.value)
+        return apply(op, left_value, right_value)
+
+Every closure takes the current Environment and returns a RuntimeValue.
+Fast paths only cover the common Int/Boolean cases; everything else goes
+through the operator code shared by all engines (operators.py), so values
+and error messages are identical to the tree-walker.
+
+Conditions of if and while compile to closures returning a Python bool
+(compile_condition): an Int comparison there compares the payloads and
+branches on the result, and && / || short-circuit on Python bools, so
+no BooleanValue is built.
+
+return, break and continue use the Evaluator's jump flag: the statement
+sets evaluator.jump and produces its value, and statement sequences and
+loops that contain a jump check the flag (sequences without one do not).
+Statements in tail position of a function body are compiled in "tail
+mode": 'return e' there just evaluates to e, and
+'if (c) { ...; return a } rest' is compiled as an if/else.
+"""
+
+from typing import Callable, List, TYPE_CHECKING
+
+from ..parser.ast_nodes import *
+from .runtime_objects import (
+    RuntimeValue, IntValue, StringValue, BooleanValue, UnitValue,
+    FunctionValue, BuiltinFunctionValue,
+)
+from .environment import Environment
+from .operators import binary_operation, unary_operation, int_range, LOGICAL_OPERATORS, INT_COMPARISONS
+from . import inline_cache
+from ..analysis.jumps import has_jumps
+from ..analysis.counted_loops import CountedLoop
+
+if TYPE_CHECKING:
+    from .evaluator import Evaluator
+
+
+Code = Callable[[Environment], RuntimeValue]
+Condition = Callable[[Environment], bool]
+
+
+def always_returns(node: Statement) -> bool:
+    """Check if every path through a statement ends in a return."""
+    if isinstance(node, ReturnStatement):
+        return True
+    if isinstance(node, BlockStatement):
+        return bool(node.statements) and always_returns(node.statements[-1])
+    if isinstance(node, IfStatement):
+        return (node.else_branch is not None
+                and always_returns(node.then_branch) and always_returns(node.else_branch))
+    return False
+
+
+class ClosureCompiler:
+    """
+    Compiles AST nodes into closures for an Evaluator.
+
+    The evaluator is used for everything the closures do not specialize:
+    calls (memoization, tail-call loop, time limit) and node types
+    without a compiled form.
+    """
+
+    def __init__(self, evaluator: 'Evaluator'):
+        """Initialize compiler for an evaluator."""
+        self.evaluator = evaluator
+        self.compiled_nodes = 0
+        if evaluator.profiler is not None:
+            self.compile_statement = self.profiled_statement
+
+    # Entry points
+
+    def compile_function(self, node: FunctionDeclaration) -> Code:
+        """Compile a function body; the closure runs it in the body Environment."""
+        return self._sequence(node.body.statements, tail=True)
+
+    def compile_expression(self, node: Expression) -> Code:
+        """Compile an expression."""
+        self.compiled_nodes += 1
+        if isinstance(node, LiteralExpression):
+            return self._literal(node)
+        elif isinstance(node, IdentifierExpression):
+            return self._identifier(node)
+        elif isinstance(node, BinaryExpression):
+            return self._binary(node)
+        elif isinstance(node, UnaryExpression):
+            return self._unary(node)
+        elif isinstance(node, CallExpression):
+            return self._call(node)
+        elif isinstance(node, AssignmentExpression):
+            return self._assignment(node)
+        elif isinstance(node, IfExpression):
+            return self._if_expression(node)
+        elif isinstance(node, BlockExpression):
+            return self._block_expression(node)
+        return self._fallback_expression(node)
+
+    def compile_statement(self, node: Statement, tail: bool = False) -> Code:
+        """Compile a statement; in tail mode its value is the function result."""
+        self.compiled_nodes += 1
+        if isinstance(node, ExpressionStatement):
+            return self.compile_expression(node.expression)
+        elif isinstance(node, DeclarationStatement):
+            return self._declaration(node)
+        elif isinstance(node, BlockStatement):
+            return self._block(node.statements, node.needs_scope, tail)
+        elif isinstance(node, IfStatement):
+            return self._if_statement(node, tail)
+        elif isinstance(node, WhileStatement):
+            if node.counted is not None:
+                return self._counted_while(node, node.counted)
+            return self._while(node)
+        elif isinstance(node, ForStatement):
+            return self._for(node)
+        elif isinstance(node, ReturnStatement):
+            return self._return(node, tail)
+        elif isinstance(node, (BreakStatement, ContinueStatement)):
+            return self._jump(node)
+        return self._fallback_statement(node)
+
+    def profiled_statement(self, node: Statement, tail: bool = False) -> Code:
+        """compile_statement for profiling: the code counts a hit on the statement's line."""
+        code = ClosureCompiler.compile_statement(self, node, tail)
+        if isinstance(node, BlockStatement):
+            return code
+        return self.counting_hits(node, code)
+
+    def counting_hits(self, node: Statement, code: Code) -> Code:
+        """Code for node that also counts a hit on its line when profiling."""
+        if self.evaluator.profiler is None:
+            return code
+        lines, line = self.evaluator.profiler.lines, node.location.line
+
+        def counted(env):
+            lines[line] += 1
+            return code(env)
+        return counted
+
+    # Statements
+
+    def _sequence(self, statements: List[Statement], tail: bool) -> Code:
+        """Compile statements run in order; the value is the last statement's."""
+        if tail:
+            # 'if (c) { ... return } rest' == 'if (c) { ... return } else { rest }'
+            for index, stmt in enumerate(statements[:-1]):
+                if (isinstance(stmt, IfStatement) and stmt.else_branch is None
+                        and always_returns(stmt.then_branch)):
+                    prefix = statements[:index]
+                    split = self.counting_hits(stmt, self._tail_if(stmt, statements[index + 1:]))
+                    if not prefix:
+                        return split
+                    codes = [self.compile_statement(s) for s in prefix] + [split]
+                    if any(has_jumps(s) for s in prefix):
+                        return self._checked_chain(codes)
+                    return self._chain(codes)
+
+        codes = [self.compile_statement(stmt) for stmt in statements[:-1]]
+        if statements:
+            codes.append(self.compile_statement(statements[-1], tail))
+        if any(has_jumps(stmt) for stmt in statements[:-1]):
+            return self._checked_chain(codes)
+        return self._chain(codes)
+
+    def _chain(self, codes: List[Code]) -> Code:
+        """Run closures in order, returning the last value (Unit if none)."""
+        unit = UnitValue()
+        if not codes:
+            return lambda env: unit
+        if len(codes) == 1:
+            return codes[0]
+        if len(codes) == 2:
+            first, second = codes
+
+            def run_two(env):
+                first(env)
+                return second(env)
+            return run_two
+
+        *init, last = codes
+
+        def run_all(env):
+            for code in init:
+                code(env)
+            return last(env)
+        return run_all
+
+    def _checked_chain(self, codes: List[Code]) -> Code:
+        """Run closures in order until one of them jumps."""
+        evaluator = self.evaluator
+
+        def run_until_jump(env):
+            for code in codes:
+                result = code(env)
+                if evaluator.jump is not None:
+                    return result
+            return result
+        return run_until_jump
+
+    def _tail_if(self, node: IfStatement, rest: List[Statement]) -> Code:
+        """Compile an early-return if whose fall-through is the rest of the body."""
+        condition = self.compile_condition(node.condition)
+        then_code = self.compile_statement(node.then_branch, tail=True)
+        else_code = self._sequence(rest, tail=True)
+
+        def tail_if(env):
+            if condition(env):
+                return then_code(env)
+            return else_code(env)
+        return tail_if
+
+    def _block(self, statements: List[Statement], needs_scope: bool, tail: bool) -> Code:
+        """Compile a block, with its own Environment only if it needs one."""
+        body = self._sequence(statements, tail)
+        evaluator = self.evaluator
+
+        if not needs_scope:
+            def flat_block(env):
+                evaluator.scopes_avoided += 1
+                return body(env)
+            return flat_block
+
+        pool = evaluator.env_pool
+
+        def scoped_block(env):
+            evaluator.scopes_allocated += 1
+            block_env = pool.acquire(env)
+            try:
+                return body(block_env)
+            finally:
+                pool.release(block_env)
+        return scoped_block
+
+    def _block_expression(self, node: BlockExpression) -> Code:
+        """Compile a block expression; a jump out of it abandons the enclosing expression."""
+        from .evaluator import PendingJump
+
+        block = self._block(node.statements, node.needs_scope, tail=False)
+        if not has_jumps(node):
+            return block
+        evaluator = self.evaluator
+
+        def jumping_block(env):
+            result = block(env)
+            if evaluator.jump is not None:
+                raise PendingJump(result)
+            return result
+        return jumping_block
+
+    def _declaration(self, node: DeclarationStatement) -> Code:
+        """Compile a local variable declaration."""
+        decl = node.declaration
+        if not isinstance(decl, VariableDeclaration):
+            return self._fallback_statement(node)
+        name = decl.name
+        unit = UnitValue()
+
+        if decl.initializer is None:
+            def declare_unit(env):
+                env.variables[name] = UnitValue()
+                return unit
+            return declare_unit
+
+        initializer = self.compile_expression(decl.initializer)
+
+        def declare(env):
+            env.variables[name] = initializer(env)
+            return unit
+        return declare
+
+    def _if_statement(self, node: IfStatement, tail: bool) -> Code:
+        """Compile an if statement (Unit when no branch runs)."""
+        condition = self.compile_condition(node.condition)
+        then_code = self.compile_statement(node.then_branch, tail)
+        unit = UnitValue()
+        else_code = (self.compile_statement(node.else_branch, tail)
+                     if node.else_branch else lambda env: unit)
+
+        def if_statement(env):
+            if condition(env):
+                return then_code(env)
+            return else_code(env)
+        return if_statement
+
+    def _while(self, node: WhileStatement) -> Code:
+        """Compile a while loop; its value is the last completed body value."""
+        condition = self.compile_condition(node.condition)
+        body = self.compile_statement(node.body)
+        evaluator = self.evaluator
+        unit = UnitValue()
+
+        if has_jumps(node.body):
+            return self._jumping_while(node, condition, body)
+
+        governor = evaluator.governor
+        if governor is None:
+            def while_loop(env):
+                result = unit
+                while True:
+                    if not condition(env):
+                        return result
+                    result = body(env)
+            return while_loop
+
+        def timed_while_loop(env):
+            result = unit
+            while True:
+                governor.tick(node)
+                if not condition(env):
+                    return result
+                result = body(env)
+        return timed_while_loop
+
+    def _jumping_while(self, node: WhileStatement, condition: Condition, body: Code) -> Code:
+        """Compile a while loop whose body may return, break or continue."""
+        from .evaluator import PendingJump
+
+        evaluator = self.evaluator
+        governor = evaluator.governor
+        timed = governor is not None
+        label = node.label
+        unit = UnitValue()
+
+        def jumping_while_loop(env):
+            result = unit
+            while True:
+                if timed:
+                    governor.tick(node)
+                if not condition(env):
+                    return result
+                try:
+                    value = body(env)
+                except PendingJump as pending:
+                    value = pending.value
+                jump = evaluator.jump
+                if jump is None:
+                    result = value
+                    continue
+                if type(jump) is ReturnStatement or (jump.label is not None and jump.label != label):
+                    return value
+                evaluator.jump = None
+                if type(jump) is BreakStatement:
+                    return result
+        return jumping_while_loop
+
+    def _counted_while(self, node: WhileStatement, plan: CountedLoop) -> Code:
+        """Compile a counted while loop to a Python for loop over a range (see counted_loops.py)."""
+        from .evaluator import PendingJump
+
+        generic = self._while(node)
+        bound = self.compile_expression(plan.bound)
+        body = self.compile_statement(plan.body)
+        evaluator = self.evaluator
+        governor = evaluator.governor
+        timed = governor is not None
+        jumps = has_jumps(plan.body)
+        counter, names, step, label, idiom = plan.counter, plan.names, plan.step, node.label, node.idiom
+        global_env = evaluator.global_env
+        unit = UnitValue()
+
+        def counted_while_loop(env):
+            counter_env = env.owner(counter)
+            if counter_env is None:
+                return generic(env)
+            if plan.calls and (counter_env is global_env
+                               or any(env.owner(name) is global_env for name in names)):
+                return generic(env)
+            variables = counter_env.variables
+            start, limit = variables[counter], bound(env)
+            if type(start) is not IntValue or type(limit) is not IntValue:
+                return generic(env)
+            start = start.value
+            numbers = plan.numbers(start, limit.value)
+            if idiom is not None and numbers and evaluator.eval_reduction(idiom, numbers, env, node):
+                last = IntValue(numbers[-1] + step)
+                variables[counter] = last
+                return last
+            number = None
+            for number in numbers:
+                if timed:
+                    governor.tick(node)
+                variables[counter] = IntValue(number)
+                if not jumps:
+                    body(env)
+                    continue
+                try:
+                    value = body(env)
+                except PendingJump as pending:
+                    value = pending.value
+                jump = evaluator.jump
+                if jump is None:
+                    continue
+                if type(jump) is ReturnStatement or (jump.label is not None and jump.label != label):
+                    return value
+                evaluator.jump = None
+                return IntValue(number) if number != start else unit
+            if number is None:
+                return unit
+            last = IntValue(number + step)
+            variables[counter] = last
+            return last
+        return counted_while_loop
+
+    def _for(self, node: ForStatement) -> Code:
+        """Compile a for loop; the variable lives in a scope of its own."""
+        from .evaluator import PendingJump
+
+        start = self.compile_expression(node.start)
+        end = self.compile_expression(node.end)
+        step = self.compile_expression(node.step) if node.step is not None else None
+        body = self.compile_statement(node.body)
+        evaluator = self.evaluator
+        pool = evaluator.env_pool
+        governor = evaluator.governor
+        timed = governor is not None
+        jumps = has_jumps(node.body)
+        kind, name, label = node.kind, node.variable, node.label
+        unit = UnitValue()
+
+        def for_loop(env):
+            numbers = int_range(kind, start(env), end(env), step(env) if step is not None else None)
+            evaluator.scopes_allocated += 1
+            loop_env = pool.acquire(env)
+            variables = loop_env.variables
+            try:
+                for number in numbers:
+                    if timed:
+                        governor.tick(node)
+                    variables[name] = IntValue(number)
+                    if not jumps:
+                        body(loop_env)
+                        continue
+                    try:
+                        value = body(loop_env)
+                    except PendingJump as pending:
+                        value = pending.value
+                    jump = evaluator.jump
+                    if jump is None:
+                        continue
+                    if type(jump) is ReturnStatement or (jump.label is not None and jump.label != label):
+                        return value
+                    evaluator.jump = None
+                    if type(jump) is BreakStatement:
+                        break
+            finally:
+                pool.release(loop_env)
+            return unit
+        return for_loop
+
+    def _return(self, node: ReturnStatement, tail: bool) -> Code:
+        """Compile a return; in tail position it just produces the value."""
+        if node.value:
+            value = self.compile_expression(node.value)
+        else:
+            unit = UnitValue()
+            value = lambda env: unit
+        if tail:
+            return value
+
+        evaluator = self.evaluator
+
+        def return_statement(env):
+            result = value(env)
+            evaluator.jump = node
+            return result
+        return return_statement
+
+    def _jump(self, node: Statement) -> Code:
+        """Compile break/continue: set the jump flag for the enclosing loops."""
+        evaluator = self.evaluator
+        unit = UnitValue()
+
+        def jump_statement(env):
+            evaluator.jump = node
+            return unit
+        return jump_statement
+
+    # Expressions
+
+    def _literal(self, node: LiteralExpression) -> Code:
+        """Compile a literal to a constant."""
+        if node.literal_type == "Int":
+            constant = IntValue(node.value)
+        elif node.literal_type == "String":
+            constant = StringValue(node.value)
+        elif node.literal_type == "Boolean":
+            constant = BooleanValue(node.value)
+        elif node.literal_type == "Unit":
+            constant = UnitValue()
+        else:
+            return self._fallback_expression(node)
+        return lambda env: constant
+
+    def _identifier(self, node: IdentifierExpression) -> Code:
+        """Compile a variable read."""
+        name = node.name
+
+        def identifier(env):
+            variables = env.variables
+            if name in variables:
+                return variables[name]
+            return env.get(name)
+        return identifier
+
+    def compile_condition(self, node: Expression) -> Condition:
+        """Compile an if/while condition into a closure returning a Python bool."""
+        apply = binary_operation
+        if isinstance(node, BinaryExpression):
+            op = node.operator
+            compare = INT_COMPARISONS.get(op)
+            if compare is not None:
+                left = self.compile_expression(node.left)
+                right = self.compile_expression(node.right)
+
+                def int_condition(env):
+                    a, b = left(env), right(env)
+                    if type(a) is IntValue and type(b) is IntValue:
+                        return compare(a.value, b.value)
+                    return apply(op, a, b).is_truthy()
+                return int_condition
+            if op in LOGICAL_OPERATORS:
+                left = self._condition_operand(node.left)
+                right = self._condition_operand(node.right)
+                right_value = self.compile_expression(node.right)
+                decided = op == "||"
+
+                def logical_condition(env):
+                    a = left(env)
+                    if type(a) is bool:
+                        if a == decided:
+                            return a
+                        b = right(env)
+                        if type(b) is bool:
+                            return b
+                        a = BooleanValue(a)
+                    else:
+                        b = right_value(env)
+                    # A non-Boolean operand: report it like any operator
+                    return apply(op, a, b).is_truthy()
+                return logical_condition
+
+        code = self.compile_expression(node)
+
+        def condition(env):
+            value = code(env)
+            return value.value if type(value) is BooleanValue else value.is_truthy()
+        return condition
+
+    def _condition_operand(self, node: Expression) -> Code:
+        """Compile an operand of a condition's &&/||: a Python bool, or the non-Boolean value."""
+        if isinstance(node, BinaryExpression) and (node.operator in INT_COMPARISONS
+                                                   or node.operator in LOGICAL_OPERATORS):
+            return self.compile_condition(node)
+        code = self.compile_expression(node)
+
+        def operand(env):
+            value = code(env)
+            return value.value if type(value) is BooleanValue else value
+        return operand
+
+    def _binary(self, node: BinaryExpression) -> Code:
+        """Compile a binary operator with an Int/Boolean fast path."""
+        left = self.compile_expression(node.left)
+        right = self.compile_expression(node.right)
+        op = node.operator
+        apply = binary_operation
+
+        if op == "+":
+            def add(env):
+                a, b = left(env), right(env)
+                if type(a) is IntValue and type(b) is IntValue:
+                    return IntValue(a.value + b.value)
+                return apply(op, a, b)
+            return add
+        if op == "-":
+            def sub(env):
+                a, b = left(env), right(env)
+                if type(a) is IntValue and type(b) is IntValue:
+                    return IntValue(a.value - b.value)
+                return apply(op, a, b)
+            return sub
+        if op == "*":
+            def mul(env):
+                a, b = left(env), right(env)
+                if type(a) is IntValue and type(b) is IntValue:
+                    return IntValue(a.value * b.value)
+                return apply(op, a, b)
+            return mul
+        if op == "<":
+            def less(env):
+                a, b = left(env), right(env)
+                if type(a) is IntValue and type(b) is IntValue:
+                    return BooleanValue(a.value < b.value)
+                return apply(op, a, b)
+            return less
+        if op == "<=":
+            def less_equal(env):
+                a, b = left(env), right(env)
+                if type(a) is IntValue and type(b) is IntValue:
+                    return BooleanValue(a.value <= b.value)
+                return apply(op, a, b)
+            return less_equal
+        if op == ">":
+            def greater(env):
+                a, b = left(env), right(env)
+                if type(a) is IntValue and type(b) is IntValue:
+                    return BooleanValue(a.value > b.value)
+                return apply(op, a, b)
+            return greater
+        if op == ">=":
+            def greater_equal(env):
+                a, b = left(env), right(env)
+                if type(a) is IntValue and type(b) is IntValue:
+                    return BooleanValue(a.value >= b.value)
+                return apply(op, a, b)
+            return greater_equal
+        if op == "==":
+            def equal(env):
+                a, b = left(env), right(env)
+                if type(a) is IntValue and type(b) is IntValue:
+                    return BooleanValue(a.value == b.value)
+                return apply(op, a, b)
+            return equal
+        if op == "!=":
+            def not_equal(env):
+                a, b = left(env), right(env)
+                if type(a) is IntValue and type(b) is IntValue:
+                    return BooleanValue(a.value != b.value)
+                return apply(op, a, b)
+            return not_equal
+
+        if op in LOGICAL_OPERATORS:
+            decided = op == "||"
+
+            def logical(env):
+                a = left(env)
+                if type(a) is BooleanValue:
+                    if a.value == decided:
+                        return a
+                    b = right(env)
+                    if type(b) is BooleanValue:
+                        return b
+                else:
+                    b = right(env)
+                return apply(op, a, b)
+            return logical
+
+        # '/', '%' and unknown operators: shared implementation
+        def binary(env):
+            return apply(op, left(env), right(env))
+        return binary
+
+    def _unary(self, node: UnaryExpression) -> Code:
+        """Compile a unary operator."""
+        operand = self.compile_expression(node.operand)
+        op = node.operator
+        apply = unary_operation
+
+        if op == "-":
+            def negate(env):
+                value = operand(env)
+                if type(value) is IntValue:
+                    return IntValue(-value.value)
+                return apply(op, value)
+            return negate
+        if op == "!":
+            def logical_not(env):
+                value = operand(env)
+                if type(value) is BooleanValue:
+                    return BooleanValue(not value.value)
+                return apply(op, value)
+            return logical_not
+
+        def unary(env):
+            return apply(op, operand(env))
+        return unary
+
+    def _call(self, node: CallExpression) -> Code:
+        """Compile a call; user functions go through the Evaluator (with its inline caches)."""
+        from .evaluator import TailCall
+
+        name = node.function_name
+        arguments = [self.compile_expression(arg) for arg in node.arguments]
+        evaluator = self.evaluator
+        call_function = evaluator.call_function
+        run_function = evaluator.run_function
+        global_env = evaluator.global_env
+        tail_call = node.tail_call
+
+        def call(env):
+            cache = node.cache
+            if cache is not None and cache.version == global_env.version:
+                evaluator.call_cache_hits += 1
+                func = cache.callee
+            else:
+                evaluator.call_cache_misses += 1
+                func = env.get(name)
+                cache = inline_cache.fill(node, env, global_env, func)
+            args = [argument(env) for argument in arguments]
+            if tail_call and func is evaluator.current_function:
+                return TailCall(args)
+            if cache is not None:
+                if cache.parameters is None:
+                    return func.call(args)
+                if func.memo is None:
+                    return run_function(func, cache.parameters, args)
+                return call_function(func, args)
+            if type(func) is FunctionValue:
+                return call_function(func, args)
+            if isinstance(func, BuiltinFunctionValue):
+                return func.call(args)
+            if isinstance(func, FunctionValue):
+                return call_function(func, args)
+            raise RuntimeError(f"'{name}' is not a function")
+        return call
+
+    def _assignment(self, node: AssignmentExpression) -> Code:
+        """Compile an assignment; its value is the assigned value."""
+        target = node.target
+        value_code = self.compile_expression(node.value)
+
+        def assign(env):
+            value = value_code(env)
+            env.set(target, value)
+            return value
+        return assign
+
+    def _if_expression(self, node: IfExpression) -> Code:
+        """Compile an if expression."""
+        condition = self.compile_condition(node.condition)
+        then_code = self.compile_expression(node.then_branch)
+        else_code = self.compile_expression(node.else_branch)
+
+        def if_expression(env):
+            if condition(env):
+                return then_code(env)
+            return else_code(env)
+        return if_expression
+
+    # Nodes without a compiled form run on the tree-walker
+
+    def _fallback_expression(self, node: Expression) -> Code:
+        """Evaluate an expression with the tree-walker."""
+        evaluator = self.evaluator
+
+        def tree_walk(env):
+            evaluator.current_env = env
+            return evaluator.eval_expression(node)
+        return tree_walk
+
+    def _fallback_statement(self, node: Statement) -> Code:
+        """Evaluate a statement with the tree-walker."""
+        evaluator = self.evaluator
+
+        def tree_walk(env):
+            evaluator.current_env = env
+            return evaluator.eval_statement(node)
+        return tree_walk
@@ -2,10 +2,15 @@
 Runtime environment for variable storage.
 
 Manages variable scopes during program execution.
+
+Call frames and block scopes live only while their function or block
+runs, so the evaluator recycles them through an EnvironmentPool instead
+of leaving one garbage object (plus its dict) per call and per block.
 """
 
-from typing import Dict, Optional
-from .runtime_objects import RuntimeValue
+import itertools
+from typing import Dict, List, Optional
+from .runtime_objects import RuntimeValue, FunctionValue, BuiltinFunctionValue
 
 
 class Environment:
@@ -14,8 +19,14 @@ class Environment:
     
     Implements lexical scoping with parent pointers.
     Similar to SymbolTable but for runtime values instead of symbols.
+    
+    Slotted: one is created for most calls and blocks. An environment
+    referenced by a function value (its closure_env) is pinned and never
+    returned to an EnvironmentPool.
     """
     
+    __slots__ = ('parent', 'variables', 'pinned')
+    
     def __init__(self, parent: Optional['Environment'] = None):
         """
         Initialize environment.
@@ -25,6 +36,7 @@ class Environment:
         """
         self.parent = parent
         self.variables: Dict[str, RuntimeValue] = {}
+        self.pinned = False
     
     def define(self, name: str, value: RuntimeValue):
         """
@@ -86,11 +98,108 @@ class Environment:
             return self.parent.has(name)
         return False
     
+    def owner(self, name: str) -> Optional['Environment']:
+        """Environment (this one or a parent) holding the variable, or None."""
+        env = self
+        while env is not None and name not in env.variables:
+            env = env.parent
+        return env
+    
     def has_local(self, name: str) -> bool:
         """Check if variable exists in this environment only."""
         return name in self.variables
     
+    def pin(self):
+        """Keep this environment and its parents out of any pool (captured by a function)."""
+        env = self
+        while env is not None and not env.pinned:
+            env.pinned = True
+            env = env.parent
+    
     def __repr__(self) -> str:
         vars_str = ", ".join(self.variables.keys())
         parent_str = "with parent" if self.parent else "no parent"
         return f"Environment([{vars_str}], {parent_str})"
+
+
+class GlobalEnvironment(Environment):
+    """
+    Global scope with a version stamp for inline caches.
+    
+    version is bumped whenever a binding a cached call could have resolved
+    to may change: a global is defined or redefined, or a global holding a
+    function is reassigned. Call-site caches remember the version they were filled at
+    and re-resolve when it differs. Versions come from one counter shared
+    by all global environments, so a cache left on an AST by an earlier
+    run never matches another run's globals.
+    """
+    
+    __slots__ = ('version',)
+    
+    _versions = itertools.count()
+    
+    def __init__(self):
+        """Initialize the global environment (no parent)."""
+        super().__init__()
+        self.pinned = True
+        self.version = next(self._versions)
+    
+    def define(self, name: str, value: RuntimeValue):
+        """Define a global and invalidate call-site caches."""
+        self.variables[name] = value
+        self.version = next(self._versions)
+    
+    def set(self, name: str, value: RuntimeValue):
+        """Set a global; reassigning a function invalidates call-site caches."""
+        if name not in self.variables:
+            raise RuntimeError(f"Undefined variable: '{name}'")
+        if isinstance(self.variables[name], (FunctionValue, BuiltinFunctionValue)):
+            self.version = next(self._versions)
+        self.variables[name] = value
+
+
+class EnvironmentPool:
+    """
+    Free list of environments for call frames and block scopes.
+    
+    acquire() reuses a released environment when there is one; release()
+    clears it and keeps it for later, unless it is pinned or the pool
+    already holds `limit` environments (limit=0 disables recycling).
+    Only release an environment nothing can reach any more.
+    """
+    
+    def __init__(self, limit: int = 1024):
+        """Initialize an empty pool keeping at most limit free environments."""
+        self.limit = limit
+        self.free: List[Environment] = []
+        self.created = 0
+        self.reused = 0
+        self.dropped = 0  # Released while the pool was full (or pinned)
+    
+    def acquire(self, parent: Optional[Environment]) -> Environment:
+        """An empty environment with the given parent."""
+        free = self.free
+        if free:
+            env = free.pop()
+            env.parent = parent
+            self.reused += 1
+            return env
+        self.created += 1
+        return Environment(parent)
+    
+    def release(self, env: Environment):
+        """Return an environment that is no longer used."""
+        if env.pinned or len(self.free) >= self.limit:
+            self.dropped += 1
+            return
+        env.variables.clear()
+        env.parent = None
+        self.free.append(env)
+    
+    def live(self) -> int:
+        """Environments handed out and not released (approximately those in use)."""
+        return self.created - len(self.free) - self.dropped
+    
+    def stats(self) -> Dict[str, int]:
+        """Environments created and reused."""
+        return {'created': self.created, 'reused': self.reused}
@@ -4,52 +4,295 @@ Evaluator - executes Kotlin AST.
 Visitor pattern implementation for interpreting Kotlin programs.
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from ..parser.ast_nodes import *
+from ..analysis.purity import PurityAnalysis
+from ..analysis.tail_calls import TailCallAnalysis
+from ..analysis.scopes import ScopeAnalysis
+from ..analysis.counted_loops import CountedLoopAnalysis, CountedLoop
+from ..analysis.loop_idioms import LoopIdiomAnalysis, ReductionLoop
 from .runtime_objects import *
-from .environment import Environment
+from .environment import Environment, GlobalEnvironment, EnvironmentPool
+from .memo import MemoCache
+from .output import OutputSink
+from .profiler import Profiler
+from .tiering import TierController, TIER_THRESHOLD
+from .governor import Governor, ResourceLimitExceeded, ExecutionTimeout, CHECK_INTERVAL, ACTIVE
+from .operators import binary_operation, unary_operation, values_equal, int_range, LOGICAL_OPERATORS, INT_COMPARISONS
+from . import unboxed as raw
+from .unboxed import UNIT, to_text
+from .closure_compiler import ClosureCompiler
+from .quickening import Quickener, DEOPT, MAX_DEOPTS
+from . import inline_cache
+from . import reductions
 
 
-class ReturnException(Exception):
-    """Exception used to implement return statements."""
+class PendingJump(Exception):
+    """
+    Unwinds a return/break/continue out of an unfinished expression.
+    
+    Jumps are normally signaled with Evaluator.jump and need no exception;
+    only a jump inside a block expression ('f(if (c) { return 1 } else { 2 })')
+    must also abandon the expression around it. Caught by the enclosing
+    loop or function call, which then handles Evaluator.jump as usual.
+    """
     def __init__(self, value: RuntimeValue):
         self.value = value
         super().__init__()
 
 
+class StackOverflowError(RuntimeError):
+    """
+    Raised when Kotlin calls nest deeper than the stack engine's max_depth.
+    
+    kotlin_stack lists the Kotlin frames, innermost first, as (function
+    name, line it is running); the message shows them with runs of
+    identical frames collapsed.
+    """
+    def __init__(self, limit: int, kotlin_stack: List[Tuple[str, Optional[int]]]):
+        self.limit = limit
+        self.kotlin_stack = kotlin_stack
+        lines = [f"StackOverflowError: more than {limit} nested calls"]
+        index = 0
+        while index < len(kotlin_stack):
+            name, line = frame = kotlin_stack[index]
+            run = 1
+            while index + run < len(kotlin_stack) and kotlin_stack[index + run] == frame:
+                run += 1
+            lines.append(f"    at {name}" + (f" (line {line})" if line is not None else ""))
+            if run > 1:
+                lines.append(f"    ... {run - 1} more identical frames")
+            index += run
+        super().__init__("\n".join(lines))
+
+
+# Loop iterations and calls between two clock reads when a time limit is set
+DEADLINE_CHECK_INTERVAL = CHECK_INTERVAL
+
+
+class TailCall:
+    """
+    Marker produced by a self-call in tail position.
+    
+    Flows out of the function body like a return value; the function's
+    call loop then rebinds the parameters in place and runs the body again.
+    """
+    __slots__ = ('args',)
+    
+    def __init__(self, args: List[RuntimeValue]):
+        self.args = args
+
+
 class Evaluator:
     """
     Tree-walking interpreter for Kotlin.
     
     Evaluates AST nodes and produces runtime values.
     Uses visitor pattern to traverse the AST.
+    
+    With memoize=True, calls to functions that the purity analysis proves
+    pure are cached in a bounded LRU per function.
+    
+    Self-recursive calls in tail position are always executed as a loop,
+    so tail-recursive functions run in constant Python stack.
+    
+    Blocks marked by the scope analysis run in the enclosing Environment
+    instead of allocating their own; env_stats() reports how many
+    allocations were avoided. The frames and block scopes that are needed
+    come from an EnvironmentPool and go back to it when the call or block
+    ends.
+    
+    Call sites that resolve to a global function keep it in an inline
+    cache guarded by the global environment's version (see
+    inline_cache.py), so repeated calls skip the lookup and the checks;
+    call_cache_stats() reports hits and misses.
+    
+    && and || short-circuit. Conditions of if and while are evaluated by
+    eval_condition straight to a Python bool: comparisons and &&/|| there
+    branch on the compared values without building a Boolean value.
+    
+    Counted while loops (see counted_loops.py) run as Python for loops
+    over a range; those that only accumulate sums (see loop_idioms.py)
+    do not run their body at all: reductions.py computes the sums, and
+    reduction_stats() reports how.
+    
+    return, break and continue do not raise: the statement sets self.jump
+    to itself and evaluates to its value, and statement lists stop as soon
+    as self.jump is set. Loops consume the break/continue that target them
+    and function calls consume returns, so a return costs no more than
+    evaluating its value.
+    
+    Engines:
+    - "tree": walk the AST of every statement and expression as it runs;
+    - "closure": compile each function body once into nested closures
+      (see ClosureCompiler) and run those; global initializers still use
+      the tree-walker since they run only once;
+    - "stack": walk the AST like "tree", but keep Kotlin call frames and
+      the expressions waiting on calls on a heap stack (see Trampoline),
+      so recursion depth is limited by max_depth instead of the Python
+      stack; deeper recursion raises StackOverflowError;
+    - "tiered": start like "tree" and compile functions and loop bodies
+      that reach tier_threshold calls / back-edges to closures, switching
+      running loops over at their header (see tiering.py); tier_stats()
+      reports the promotions.
+    
+    With unboxed=True (tree engine only), Int, String and Boolean values
+    are plain Python int, str and bool and Unit is the UNIT singleton
+    (see unboxed.py), so operators allocate no wrappers; only functions
+    stay FunctionValue / BuiltinFunctionValue. evaluate() still returns a
+    RuntimeValue.
+    
+    With quicken=True (the default), operator and variable nodes specialize
+    themselves to the operand types they see and deoptimize when a guard
+    fails (see quickening.py); quicken_stats() reports both.
+    
+    print and println write to an OutputSink (see output.py), buffered and
+    flushed when evaluate() ends unless another sink is given.
     """
     
-    def __init__(self):
-        """Initialize evaluator with global environment."""
-        self.global_env = Environment()
+    ENGINES = ("tree", "closure", "stack", "tiered")
+    
+    def __init__(
+        self,
+        memoize: bool = False,
+        memo_cache_size: int = 128,
+        memo_limits: Optional[Dict[str, int]] = None,
+        time_limit: Optional[float] = None,
+        max_steps: Optional[int] = None,
+        memory_limit: Optional[int] = None,
+        engine: str = "tree",
+        unboxed: bool = False,
+        quicken: bool = True,
+        max_depth: int = 20_000,
+        output: Optional[OutputSink] = None,
+        profiler: Optional[Profiler] = None,
+        tier_threshold: int = TIER_THRESHOLD
+    ):
+        """
+        Initialize evaluator with global environment.
+        
+        Args:
+            memoize: Cache results of pure function calls
+            memo_cache_size: Default cache size limit per function
+            memo_limits: Per-function cache size limits (overrides default)
+            time_limit: Abort with ExecutionTimeout after this many seconds
+            max_steps: Abort with ResourceLimitExceeded after this many loop iterations and calls
+            memory_limit: Abort with ResourceLimitExceeded when Strings and environments
+                hold about this many bytes
+            engine: Execution engine, "tree", "closure", "stack" or "tiered" (tree-walks,
+                then compiles hot functions and loops to closures; see tiering.py)
+            unboxed: Represent values as plain Python objects
+            quicken: Specialize operator and variable nodes to observed types
+            max_depth: Most nested Kotlin calls on the stack engine (each costs ~2 KB)
+            output: Sink for print/println (default: buffered, to sys.stdout)
+            profiler: Records Kotlin calls and line hits of the run (see profiler.py)
+            tier_threshold: Tiered engine only: calls plus loop back-edges of a function
+                before it is compiled for later calls, and back-edges of a running loop
+                before its body is compiled (on-stack replacement)
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}' (expected one of {', '.join(self.ENGINES)})")
+        if unboxed and engine != "tree":
+            raise ValueError("Unboxed values are only supported by the tree engine")
+        self.engine = engine
+        
+        # Value representation: the operations are bound once, not tested per node
+        self.unboxed = unboxed
+        if unboxed:
+            self.make_unit = lambda: UNIT
+            self.make_boolean = bool
+            self.make_int = int
+            self.binary_operation = raw.binary_operation
+            self.unary_operation = raw.unary_operation
+            self.int_range = raw.int_range
+            self.is_true = raw.is_true
+            self.int_type, self.boolean_type = int, bool
+        else:
+            self.make_unit = make_unit
+            self.make_boolean = make_boolean
+            self.make_int = IntValue
+            self.binary_operation = binary_operation
+            self.unary_operation = unary_operation
+            self.int_range = int_range
+            self.is_true = RuntimeValue.is_truthy
+            self.int_type, self.boolean_type = IntValue, BooleanValue
+        
+        # Quickening: swap in the self-specializing node handlers
+        self.quickener: Optional[Quickener] = None
+        if quicken:
+            self.quickener = Quickener()
+            self.eval_identifier = self.quickened_identifier
+            self.eval_binary_expression = self.quickened_binary_expression
+            self.eval_unary_expression = self.quickened_unary_expression
+        self.compiler: Optional[ClosureCompiler] = None
+        self.tier_threshold = tier_threshold
+        self.tiers: Optional[TierController] = None
+        self.max_depth = max_depth
+        self.trampoline = None
+        self.global_env = GlobalEnvironment()
         self.current_env = self.global_env
+        self.current_function: Optional[FunctionValue] = None
+        
+        # Pending return/break/continue statement (None while running normally)
+        self.jump: Optional[Statement] = None
+        
+        # Memoization of pure functions
+        self.memoize = memoize
+        self.memo_cache_size = memo_cache_size
+        self.memo_limits = memo_limits or {}
+        
+        # Limits of a run, checked by its governor every CHECK_INTERVAL loop iterations/calls
+        self.time_limit = time_limit
+        self.max_steps = max_steps
+        self.memory_limit = memory_limit
+        self.governor: Optional[Governor] = None
+        self.memo_caches: Dict[str, MemoCache] = {}
+        
+        # Block scope allocations (made / avoided thanks to scope analysis)
+        self.scopes_allocated = 0
+        self.scopes_avoided = 0
+        
+        # Recycled call frames and block scopes
+        self.env_pool = EnvironmentPool()
+        
+        # Inline call caches (calls served from the cache / resolved by lookup)
+        self.call_cache_hits = 0
+        self.call_cache_misses = 0
+        
+        # Reduction loop terms summed without running the loop, per method
+        self.reduction_methods: Dict[str, int] = {}
+        
+        # Where print/println write
+        self.output = output if output is not None else OutputSink()
+        
+        # Profiling: swap in the handlers that report calls and statements
+        self.profiler = profiler
+        if profiler is not None:
+            self.run_function = self.profiled_run_function
+            self.eval_statement = self.profiled_statement
         
         # Add built-in functions
         self._add_builtins()
     
     def _add_builtins(self):
         """Add built-in functions to global environment."""
+        write = self.output.write
+        
         # println function
         def builtin_println(args: List[RuntimeValue]) -> RuntimeValue:
             if len(args) > 0:
-                print(str(args[0]))
+                write(to_text(args[0]) + "\n")
             else:
-                print()
-            return make_unit()
+                write("\n")
+            return self.make_unit()
         
         self.global_env.define("println", make_builtin("println", builtin_println))
         
         # print function (no newline)
         def builtin_print(args: List[RuntimeValue]) -> RuntimeValue:
             if len(args) > 0:
-                print(str(args[0]), end='')
-            return make_unit()
+                write(to_text(args[0]))
+            return self.make_unit()
         
         self.global_env.define("print", make_builtin("print", builtin_print))
     
@@ -59,36 +302,95 @@ class Evaluator:
         """
         Evaluate entire program.
         
-        Returns result of last expression or Unit.
+        Returns result of last expression or Unit. The output is flushed
+        when the program ends, also on errors. With limits set, a governor
+        watches the run (and the Strings it builds, see governor.py).
         """
-        result = make_unit()
+        self.governor = None
+        if self.time_limit is not None or self.max_steps is not None or self.memory_limit is not None:
+            self.governor = Governor(self.max_steps, self.time_limit, self.memory_limit,
+                                     self.env_pool.live)
+        token = ACTIVE.set(self.governor)
+        if self.profiler is not None:
+            self.profiler.start()
+        try:
+            return self.run_program(program)
+        finally:
+            ACTIVE.reset(token)
+            if self.profiler is not None:
+                self.profiler.stop()
+            self.output.flush()
+    
+    def run_program(self, program: Program) -> RuntimeValue:
+        """Analyze and run a program: global declarations, then main()."""
+        result = self.make_unit()
+        self.jump = None
+        
+        # Mark self-recursive tail calls so they run as loops
+        TailCallAnalysis().analyze(program)
+        
+        # Mark blocks that can run without their own scope
+        ScopeAnalysis().analyze(program)
+        
+        # Mark while loops that can run over a Python range (needs the scope marks),
+        # and those of them that only accumulate sums
+        CountedLoopAnalysis().analyze(program)
+        LoopIdiomAnalysis().analyze(program)
+        
+        # Closure engine: function bodies are compiled as they are declared
+        if self.engine == "closure":
+            self.compiler = ClosureCompiler(self)
+        
+        # Tiered engine: functions and loops are compiled once they are hot
+        if self.engine == "tiered":
+            self.tiers = TierController(self, self.tier_threshold)
+        
+        # Stack engine: calls run on the trampoline's heap stack
+        if self.engine == "stack":
+            from .trampoline import Trampoline
+            self.trampoline = Trampoline(self, self.max_depth)
         
         # First pass: collect all function declarations
         for decl in program.declarations:
             if isinstance(decl, FunctionDeclaration):
                 self.eval_function_declaration(decl)
         
+        if self.memoize:
+            self.enable_memoization(program)
+        
         # Second pass: evaluate everything (including main execution)
         for decl in program.declarations:
             if isinstance(decl, VariableDeclaration):
-                result = self.eval_variable_declaration(decl)
+                if self.trampoline is not None:
+                    result = self.trampoline.run(decl)
+                else:
+                    result = self.eval_variable_declaration(decl)
         
         # Try to call main function if it exists
         if self.global_env.has("main"):
             main_func = self.global_env.get("main")
             if isinstance(main_func, FunctionValue):
-                result = self.call_function(main_func, [])
+                if self.trampoline is not None:
+                    result = self.trampoline.call(main_func, [])
+                else:
+                    result = self.call_function(main_func, [])
         
-        return result
+        return raw.box(result) if self.unboxed else result
     
     # Declaration evaluation
     
     def eval_function_declaration(self, node: FunctionDeclaration) -> RuntimeValue:
         """Evaluate function declaration."""
         param_names = [param.name for param in node.parameters]
-        func_value = make_function(param_names, node.body, self.current_env)
+        # The defining scope outlives this call: never recycle it
+        self.current_env.pin()
+        func_value = make_function(param_names, node.body, self.current_env, node.name)
+        if self.compiler is not None:
+            func_value.compiled = self.compiler.compile_function(node)
+        elif self.tiers is not None:
+            self.tiers.declare(node, func_value)
         self.current_env.define(node.name, func_value)
-        return make_unit()
+        return self.make_unit()
     
     def eval_variable_declaration(self, node: VariableDeclaration) -> RuntimeValue:
         """Evaluate variable declaration."""
@@ -97,10 +399,10 @@ class Evaluator:
             value = self.eval_expression(node.initializer)
         else:
             # Uninitialized variables default to Unit (simplified)
-            value = make_unit()
+            value = self.make_unit()
         
         self.current_env.define(node.name, value)
-        return make_unit()
+        return self.make_unit()
     
     # Statement evaluation
     
@@ -114,28 +416,51 @@ class Evaluator:
             return self.eval_if_statement(node)
         elif isinstance(node, WhileStatement):
             return self.eval_while_statement(node)
+        elif isinstance(node, ForStatement):
+            return self.eval_for_statement(node)
         elif isinstance(node, ReturnStatement):
             return self.eval_return_statement(node)
+        elif isinstance(node, (BreakStatement, ContinueStatement)):
+            return self.eval_jump_statement(node)
         elif isinstance(node, DeclarationStatement):
             return self.eval_declaration_statement(node)
         else:
             raise RuntimeError(f"Unknown statement type: {type(node)}")
     
+    def profiled_statement(self, node: Statement) -> RuntimeValue:
+        """eval_statement counting a hit on the statement's line (blocks are not counted)."""
+        if type(node) is not BlockStatement:
+            self.profiler.lines[node.location.line] += 1
+        return Evaluator.eval_statement(self, node)
+    
     def eval_block_statement(self, node: BlockStatement) -> RuntimeValue:
         """Evaluate block statement with new scope."""
+        if not node.needs_scope:
+            # Nothing declared here can be observed outside: use the enclosing scope
+            self.scopes_avoided += 1
+            return self.eval_statements(node.statements)
+        
         # Create new environment for block scope
-        block_env = Environment(parent=self.current_env)
+        self.scopes_allocated += 1
         previous_env = self.current_env
+        block_env = self.env_pool.acquire(previous_env)
         self.current_env = block_env
         
         try:
-            result = make_unit()
-            for stmt in node.statements:
-                result = self.eval_statement(stmt)
-            return result
+            return self.eval_statements(node.statements)
         finally:
             # Restore previous environment
             self.current_env = previous_env
+            self.env_pool.release(block_env)
+    
+    def eval_statements(self, statements: List[Statement]) -> RuntimeValue:
+        """Run statements in order until one jumps; the value is the last one run."""
+        result = self.make_unit()
+        for stmt in statements:
+            result = self.eval_statement(stmt)
+            if self.jump is not None:
+                break
+        return result
     
     def eval_expression_statement(self, node: ExpressionStatement) -> RuntimeValue:
         """Evaluate expression statement."""
@@ -143,36 +468,201 @@ class Evaluator:
     
     def eval_if_statement(self, node: IfStatement) -> RuntimeValue:
         """Evaluate if statement."""
-        condition = self.eval_expression(node.condition)
-        
-        if condition.is_truthy():
+        if self.eval_condition(node.condition):
             return self.eval_statement(node.then_branch)
         elif node.else_branch:
             return self.eval_statement(node.else_branch)
         else:
-            return make_unit()
+            return self.make_unit()
     
     def eval_while_statement(self, node: WhileStatement) -> RuntimeValue:
-        """Evaluate while statement."""
-        result = make_unit()
+        """Evaluate while statement (its value is the last completed body value)."""
+        if node.counted is not None:
+            result = self.eval_counted_while(node, node.counted)
+            if result is not None:
+                return result
+        result = self.make_unit()
+        tiers, compiled = self.tiers, None
         
         while True:
-            condition = self.eval_expression(node.condition)
-            if not condition.is_truthy():
+            if self.governor is not None:
+                self.governor.tick(node)
+            if not self.eval_condition(node.condition):
+                break
+            if compiled is None and tiers is not None:
+                compiled = tiers.back_edge(node, node.body)
+            try:
+                if compiled is not None:
+                    value = compiled(self.current_env)
+                else:
+                    value = self.eval_statement(node.body)
+            except PendingJump as pending:
+                value = pending.value
+            
+            jump = self.jump
+            if jump is None:
+                result = value
+                continue
+            if type(jump) is ReturnStatement or (jump.label is not None and jump.label != node.label):
+                # Return, or a jump to an enclosing loop: pass it on
+                return value
+            self.jump = None
+            if type(jump) is BreakStatement:
                 break
-            result = self.eval_statement(node.body)
         
         return result
     
+    def eval_counted_while(self, node: WhileStatement, plan: CountedLoop) -> Optional[RuntimeValue]:
+        """
+        Run a counted while loop over a Python range (see counted_loops.py).
+        
+        The counter's Environment slot is written once per iteration and
+        the condition and increment are not evaluated; afterwards the
+        counter and the loop's value are what the while loop would have
+        left. Returns None when a run-time guard fails (the counter or
+        bound is not an Int, or a call in the body could change a global
+        the loop depends on), and the generic loop runs instead.
+        """
+        counter_env = self.current_env.owner(plan.counter)
+        if counter_env is None:
+            return None
+        if plan.calls and (counter_env is self.global_env or any(
+                self.current_env.owner(name) is self.global_env for name in plan.names)):
+            return None
+        variables = counter_env.variables
+        start = variables[plan.counter]
+        bound = self.eval_expression(plan.bound)
+        int_type = self.int_type
+        if type(start) is not int_type or type(bound) is not int_type:
+            return None
+        if not self.unboxed:
+            start, bound = start.value, bound.value
+        
+        make_int = self.make_int
+        counter = plan.counter
+        numbers = plan.numbers(start, bound)
+        if node.idiom is not None and numbers and self.eval_reduction(node.idiom, numbers, self.current_env, node):
+            last = make_int(numbers[-1] + plan.step)
+            variables[counter] = last
+            return last
+        
+        body = plan.body
+        tiers, compiled = self.tiers, None
+        number = None
+        for number in numbers:
+            if self.governor is not None:
+                self.governor.tick(node)
+            variables[counter] = make_int(number)
+            if compiled is None and tiers is not None:
+                compiled = tiers.back_edge(node, body)
+            try:
+                if compiled is not None:
+                    value = compiled(self.current_env)
+                else:
+                    value = self.eval_statement(body)
+            except PendingJump as pending:
+                value = pending.value
+            
+            jump = self.jump
+            if jump is None:
+                continue
+            if type(jump) is ReturnStatement or (jump.label is not None and jump.label != node.label):
+                return value
+            self.jump = None
+            # break: the increment of this iteration never ran
+            return make_int(number) if number != start else self.make_unit()
+        
+        if number is None:
+            return self.make_unit()
+        # The last increment and the value it produced
+        last = make_int(number + plan.step)
+        variables[counter] = last
+        return last
+    
+    def eval_reduction(self, plan: ReductionLoop, numbers: range, env: Environment,
+                       node: Optional[ASTNode] = None) -> bool:
+        """
+        Add a reduction loop's sums to its accumulators (see reductions.py).
+        
+        node is the loop, charged to the governor for the terms summed one
+        by one. Returns False, changing nothing, when an input or accumulator is not
+        an Int or a term would fail: the loop must then run.
+        """
+        values = {}
+        for name in plan.inputs + plan.targets:
+            owner = env.owner(name)
+            if owner is None:
+                return False
+            value = owner.variables[name]
+            if type(value) is not self.int_type:
+                return False
+            values[name] = value if self.unboxed else value.value
+        governor = self.governor
+        tick = (lambda ticks: governor.tick(node, ticks)) if governor is not None else None
+        totals = reductions.reduce(plan, numbers, values, tick, self.reduction_methods)
+        if totals is None:
+            return False
+        for name, total in totals.items():
+            env.set(name, self.make_int(values[name] + total))
+        return True
+    
+    def eval_for_statement(self, node: ForStatement) -> RuntimeValue:
+        """Evaluate a for loop: the variable takes each Int of the range in a scope of its own."""
+        start = self.eval_expression(node.start)
+        end = self.eval_expression(node.end)
+        step = self.eval_expression(node.step) if node.step is not None else None
+        numbers = self.int_range(node.kind, start, end, step)
+        
+        make_int = self.make_int
+        name = node.variable
+        self.scopes_allocated += 1
+        previous_env = self.current_env
+        loop_env = self.env_pool.acquire(previous_env)
+        variables = loop_env.variables
+        self.current_env = loop_env
+        tiers, compiled = self.tiers, None
+        try:
+            for number in numbers:
+                if self.governor is not None:
+                    self.governor.tick(node)
+                variables[name] = make_int(number)
+                if compiled is None and tiers is not None:
+                    compiled = tiers.back_edge(node, node.body)
+                try:
+                    if compiled is not None:
+                        value = compiled(loop_env)
+                    else:
+                        value = self.eval_statement(node.body)
+                except PendingJump as pending:
+                    value = pending.value
+                
+                jump = self.jump
+                if jump is None:
+                    continue
+                if type(jump) is ReturnStatement or (jump.label is not None and jump.label != node.label):
+                    return value
+                self.jump = None
+                if type(jump) is BreakStatement:
+                    break
+        finally:
+            self.current_env = previous_env
+            self.env_pool.release(loop_env)
+        return self.make_unit()
+    
     def eval_return_statement(self, node: ReturnStatement) -> RuntimeValue:
-        """Evaluate return statement."""
+        """Evaluate return statement: its value becomes the function result."""
         if node.value:
             value = self.eval_expression(node.value)
         else:
-            value = make_unit()
+            value = self.make_unit()
         
-        # Use exception to unwind stack
-        raise ReturnException(value)
+        self.jump = node
+        return value
+    
+    def eval_jump_statement(self, node: Statement) -> RuntimeValue:
+        """Evaluate break/continue (the target loop is found by label as the jump unwinds)."""
+        self.jump = node
+        return self.make_unit()
     
     def eval_declaration_statement(self, node: DeclarationStatement) -> RuntimeValue:
         """Evaluate declaration statement (variable declaration in function body)."""
@@ -206,6 +696,8 @@ class Evaluator:
     
     def eval_literal(self, node: LiteralExpression) -> RuntimeValue:
         """Evaluate literal expression."""
+        if self.unboxed and node.literal_type in ("Int", "String", "Boolean"):
+            return node.value
         if node.literal_type == "Int":
             return make_int(node.value)
         elif node.literal_type == "String":
@@ -213,7 +705,7 @@ class Evaluator:
         elif node.literal_type == "Boolean":
             return make_boolean(node.value)
         elif node.literal_type == "Unit":
-            return make_unit()
+            return self.make_unit()
         else:
             raise RuntimeError(f"Unknown literal type: {node.literal_type}")
     
@@ -223,123 +715,146 @@ class Evaluator:
     
     def eval_binary_expression(self, node: BinaryExpression) -> RuntimeValue:
         """Evaluate binary expression."""
+        if node.operator in LOGICAL_OPERATORS:
+            return self.eval_logical_expression(node)
         left = self.eval_expression(node.left)
         right = self.eval_expression(node.right)
-        op = node.operator
-        
-        # Arithmetic operators
-        if op == "+":
-            if is_int(left) and is_int(right):
-                return make_int(left.value + right.value)
-            # String concatenation
-            elif is_string(left) or is_string(right):
-                return make_string(str(left) + str(right))
-            else:
-                raise RuntimeError(f"Invalid operands for +: {left.type_name}, {right.type_name}")
-        
-        elif op == "-":
-            if is_int(left) and is_int(right):
-                return make_int(left.value - right.value)
-            else:
-                raise RuntimeError(f"Invalid operands for -: {left.type_name}, {right.type_name}")
-        
-        elif op == "*":
-            if is_int(left) and is_int(right):
-                return make_int(left.value * right.value)
-            else:
-                raise RuntimeError(f"Invalid operands for *: {left.type_name}, {right.type_name}")
-        
-        elif op == "/":
-            if is_int(left) and is_int(right):
-                if right.value == 0:
-                    raise RuntimeError("Division by zero")
-                return make_int(left.value // right.value)  # Integer division
-            else:
-                raise RuntimeError(f"Invalid operands for /: {left.type_name}, {right.type_name}")
-        
-        elif op == "%":
-            if is_int(left) and is_int(right):
-                if right.value == 0:
-                    raise RuntimeError("Modulo by zero")
-                return make_int(left.value % right.value)
-            else:
-                raise RuntimeError(f"Invalid operands for %: {left.type_name}, {right.type_name}")
-        
-        # Comparison operators
-        elif op == "==":
-            return make_boolean(self.values_equal(left, right))
-        
-        elif op == "!=":
-            return make_boolean(not self.values_equal(left, right))
-        
-        elif op == "<":
-            if is_int(left) and is_int(right):
-                return make_boolean(left.value < right.value)
-            else:
-                raise RuntimeError(f"Invalid operands for <: {left.type_name}, {right.type_name}")
-        
-        elif op == "<=":
-            if is_int(left) and is_int(right):
-                return make_boolean(left.value <= right.value)
-            else:
-                raise RuntimeError(f"Invalid operands for <=: {left.type_name}, {right.type_name}")
-        
-        elif op == ">":
-            if is_int(left) and is_int(right):
-                return make_boolean(left.value > right.value)
-            else:
-                raise RuntimeError(f"Invalid operands for >: {left.type_name}, {right.type_name}")
-        
-        elif op == ">=":
-            if is_int(left) and is_int(right):
-                return make_boolean(left.value >= right.value)
-            else:
-                raise RuntimeError(f"Invalid operands for >=: {left.type_name}, {right.type_name}")
-        
-        # Logical operators
-        elif op == "&&":
-            if is_boolean(left) and is_boolean(right):
-                return make_boolean(left.value and right.value)
-            else:
-                raise RuntimeError(f"Invalid operands for &&: {left.type_name}, {right.type_name}")
-        
-        elif op == "||":
-            if is_boolean(left) and is_boolean(right):
-                return make_boolean(left.value or right.value)
-            else:
-                raise RuntimeError(f"Invalid operands for ||: {left.type_name}, {right.type_name}")
-        
+        return self.binary_operation(node.operator, left, right)
+    
+    def eval_logical_expression(self, node: BinaryExpression) -> RuntimeValue:
+        """Evaluate && or ||, evaluating the right operand only if needed."""
+        left = self.eval_expression(node.left)
+        if type(left) is self.boolean_type:
+            if self.is_true(left) == (node.operator == "||"):
+                return left
+            right = self.eval_expression(node.right)
+            if type(right) is self.boolean_type:
+                return right
         else:
-            raise RuntimeError(f"Unknown binary operator: {op}")
+            right = self.eval_expression(node.right)
+        # A non-Boolean operand: report it like any operator
+        return self.binary_operation(node.operator, left, right)
+    
+    def eval_condition(self, node: Expression) -> bool:
+        """Evaluate an if/while condition to a Python bool.
+        
+        Int comparisons compare the payloads directly and &&/|| combine
+        their operands as Python bools, so no Boolean value is built;
+        anything else is evaluated as an expression. Errors are the same
+        as evaluating the condition as an expression.
+        """
+        if type(node) is BinaryExpression:
+            op = node.operator
+            compare = INT_COMPARISONS.get(op)
+            if compare is not None:
+                left = self.eval_expression(node.left)
+                right = self.eval_expression(node.right)
+                int_type = self.int_type
+                if type(left) is int_type and type(right) is int_type:
+                    if int_type is IntValue:
+                        return compare(left.value, right.value)
+                    return compare(left, right)
+                return self.is_true(self.binary_operation(op, left, right))
+            if op in LOGICAL_OPERATORS:
+                left = self.condition_operand(node.left)
+                if type(left) is bool:
+                    if left == (op == "||"):
+                        return left
+                    right = self.condition_operand(node.right)
+                    if type(right) is bool:
+                        return right
+                    left = self.make_boolean(left)
+                else:
+                    right = self.eval_expression(node.right)
+                # A non-Boolean operand: report it like any operator
+                return self.is_true(self.binary_operation(op, left, right))
+        return self.is_true(self.eval_expression(node))
+    
+    def condition_operand(self, node: Expression) -> Any:
+        """Operand of a fused &&/||: a Python bool, or the non-Boolean value it evaluated to."""
+        if type(node) is BinaryExpression and (node.operator in INT_COMPARISONS
+                                               or node.operator in LOGICAL_OPERATORS):
+            return self.eval_condition(node)
+        value = self.eval_expression(node)
+        if type(value) is self.boolean_type:
+            return self.is_true(value)
+        return value
     
     def eval_unary_expression(self, node: UnaryExpression) -> RuntimeValue:
         """Evaluate unary expression."""
         operand = self.eval_expression(node.operand)
-        op = node.operator
-        
-        if op == "-":
-            if is_int(operand):
-                return make_int(-operand.value)
-            else:
-                raise RuntimeError(f"Invalid operand for -: {operand.type_name}")
-        
-        elif op == "!":
-            if is_boolean(operand):
-                return make_boolean(not operand.value)
-            else:
-                raise RuntimeError(f"Invalid operand for !: {operand.type_name}")
-        
-        else:
-            raise RuntimeError(f"Unknown unary operator: {op}")
+        return self.unary_operation(node.operator, operand)
+    
+    # Quickened node handlers (installed by __init__ when quicken=True)
+    
+    def quickened_identifier(self, node: IdentifierExpression) -> RuntimeValue:
+        """Evaluate identifier through its specialized handler, if any."""
+        quick = node.quick
+        if quick is not None:
+            value = quick(self.current_env, node.name)
+            if value is not DEOPT:
+                return value
+            self.quickener.deoptimize(node)
+        elif node.deopts < MAX_DEOPTS:
+            self.quickener.specialize_identifier(node, self.current_env)
+        return self.current_env.get(node.name)
+    
+    def quickened_binary_expression(self, node: BinaryExpression) -> RuntimeValue:
+        """Evaluate binary expression through its specialized handler, if any."""
+        if node.operator in LOGICAL_OPERATORS:
+            return self.eval_logical_expression(node)
+        left = self.eval_expression(node.left)
+        right = self.eval_expression(node.right)
+        quick = node.quick
+        if quick is not None:
+            result = quick(left, right)
+            if result is not DEOPT:
+                return result
+            self.quickener.deoptimize(node)
+        elif node.deopts < MAX_DEOPTS:
+            self.quickener.specialize_binary(node, left, right)
+        return self.binary_operation(node.operator, left, right)
+    
+    def quickened_unary_expression(self, node: UnaryExpression) -> RuntimeValue:
+        """Evaluate unary expression through its specialized handler, if any."""
+        operand = self.eval_expression(node.operand)
+        quick = node.quick
+        if quick is not None:
+            result = quick(operand)
+            if result is not DEOPT:
+                return result
+            self.quickener.deoptimize(node)
+        elif node.deopts < MAX_DEOPTS:
+            self.quickener.specialize_unary(node, operand)
+        return self.unary_operation(node.operator, operand)
     
     def eval_call_expression(self, node: CallExpression) -> RuntimeValue:
         """Evaluate function call."""
-        # Get function value
-        func = self.current_env.get(node.function_name)
+        # Get function value: from the inline cache, or by lookup (refilling it)
+        cache = node.cache
+        if cache is not None and cache.version == self.global_env.version:
+            self.call_cache_hits += 1
+            func = cache.callee
+        else:
+            self.call_cache_misses += 1
+            func = self.current_env.get(node.function_name)
+            cache = inline_cache.fill(node, self.current_env, self.global_env, func)
         
         # Evaluate arguments
         args = [self.eval_expression(arg) for arg in node.arguments]
         
+        # Self-call in tail position: let the running call loop rebind parameters
+        if node.tail_call and func is self.current_function:
+            return TailCall(args)
+        
+        # Cached call: kind and argument count were checked when the cache was filled
+        if cache is not None:
+            if cache.parameters is None:
+                return func.call(args)
+            if func.memo is None:
+                return self.run_function(func, cache.parameters, args)
+            return self.call_function(func, args)
+        
         # Call function
         if isinstance(func, BuiltinFunctionValue):
             return func.call(args)
@@ -356,9 +871,7 @@ class Evaluator:
     
     def eval_if_expression(self, node: IfExpression) -> RuntimeValue:
         """Evaluate if expression."""
-        condition = self.eval_expression(node.condition)
-        
-        if condition.is_truthy():
+        if self.eval_condition(node.condition):
             return self.eval_expression(node.then_branch)
         else:
             return self.eval_expression(node.else_branch)
@@ -369,54 +882,174 @@ class Evaluator:
         In Kotlin, a block can be an expression. The value of the block
         is the value of the last expression in the block.
         """
-        # Create new environment for block scope
-        block_env = Environment(parent=self.current_env)
-        previous_env = self.current_env
-        self.current_env = block_env
+        if not node.needs_scope:
+            self.scopes_avoided += 1
+            result = self.eval_statements(node.statements)
+        else:
+            # Create new environment for block scope
+            self.scopes_allocated += 1
+            previous_env = self.current_env
+            block_env = self.env_pool.acquire(previous_env)
+            self.current_env = block_env
+            
+            try:
+                result = self.eval_statements(node.statements)
+            finally:
+                # Restore previous environment
+                self.current_env = previous_env
+                self.env_pool.release(block_env)
         
-        try:
-            result = make_unit()
-            for stmt in node.statements:
-                result = self.eval_statement(stmt)
-            return result
-        finally:
-            # Restore previous environment
-            self.current_env = previous_env
+        if self.jump is not None:
+            # The expression around this block must not complete
+            raise PendingJump(result)
+        return result
+    
+    # Memoization
+    
+    def enable_memoization(self, program: Program):
+        """Attach memo caches to all pure user functions."""
+        analysis = PurityAnalysis()
+        analysis.analyze(program)
+        
+        for name in analysis.pure_functions():
+            func = self.global_env.get(name)
+            if not isinstance(func, FunctionValue):
+                continue
+            cache = MemoCache(name, self.memo_limits.get(name, self.memo_cache_size))
+            func.memo = cache
+            self.memo_caches[name] = cache
+    
+    def memo_stats(self) -> List[Dict[str, Any]]:
+        """Get hit/miss statistics for every memoized function."""
+        return [cache.stats() for cache in self.memo_caches.values()]
+    
+    def call_cache_stats(self) -> Dict[str, int]:
+        """Calls whose callee came from an inline cache, and calls that looked it up."""
+        return {
+            'hits': self.call_cache_hits,
+            'misses': self.call_cache_misses,
+        }
+    
+    def env_stats(self) -> Dict[str, int]:
+        """Block scopes allocated and avoided during execution."""
+        return {
+            'allocated': self.scopes_allocated,
+            'avoided': self.scopes_avoided,
+        }
+    
+    def pool_stats(self) -> Dict[str, int]:
+        """Frames and block scopes created, and reused from the pool."""
+        return self.env_pool.stats()
+    
+    def reduction_stats(self) -> Dict[str, int]:
+        """Reduction loop terms summed in closed form, vectorized or scalar."""
+        return dict(self.reduction_methods)
+    
+    def tier_stats(self) -> List[Any]:
+        """Functions and loops promoted to the closure tier (tiered engine), in order."""
+        return self.tiers.stats() if self.tiers is not None else []
+    
+    def quicken_stats(self) -> Dict[str, Any]:
+        """Specializations, deopts and generic nodes (empty if quickening is off)."""
+        return self.quickener.stats() if self.quickener else {}
     
     # Helper methods
     
     def call_function(self, func: FunctionValue, args: List[RuntimeValue]) -> RuntimeValue:
-        """Call a user-defined function."""
+        """Call a user-defined function, consulting its memo cache if any."""
+        if func.memo is not None and len(args) == len(func.parameters):
+            key = MemoCache.make_key(args)
+            if key is not None:
+                cached = func.memo.get(key)
+                if cached is not None:
+                    return cached
+                result = self.invoke_function(func, args)
+                func.memo.put(key, result)
+                return result
+        
+        return self.invoke_function(func, args)
+    
+    def invoke_function(self, func: FunctionValue, args: List[RuntimeValue]) -> RuntimeValue:
+        """Execute a user-defined function body."""
         # Check argument count
         if len(args) != len(func.parameters):
             raise RuntimeError(
                 f"Function expects {len(func.parameters)} arguments, got {len(args)}"
             )
+        return self.run_function(func, func.parameters, args)
+    
+    def run_function(self, func: FunctionValue, parameters: Sequence[str], args: List[RuntimeValue]) -> RuntimeValue:
+        """Run a function body with args bound to parameters (count already checked)."""
+        # Tiered engine: count the call, compiling the function once it is hot
+        if func.compiled is None and self.tiers is not None:
+            self.tiers.called(func)
         
-        # Create new environment for function execution
-        func_env = Environment(parent=func.closure_env)
-        
-        # Bind parameters
-        for param_name, arg_value in zip(func.parameters, args):
-            func_env.define(param_name, arg_value)
+        # Create new environment for function execution and bind parameters
+        pool = self.env_pool
+        func_env = pool.acquire(func.closure_env)
+        func_env.variables.update(zip(parameters, args))
         
         # Save and switch environment
         previous_env = self.current_env
-        self.current_env = func_env
+        previous_function = self.current_function
+        self.current_function = func
+        
+        # Scope for the body block, reused across tail-call iterations;
+        # bodies whose locals cannot clash with parameters share func_env
+        if not func.body.needs_scope:
+            self.scopes_avoided += 1
+            body_env = func_env
+        else:
+            self.scopes_allocated += 1
+            body_env = pool.acquire(func_env)
         
         try:
-            # Execute function body
-            result = self.eval_statement(func.body)
-            return result
-        except ReturnException as ret:
-            # Return statement was executed
-            return ret.value
+            while True:
+                if self.governor is not None:
+                    self.governor.tick(func.body)
+                self.current_env = body_env
+                try:
+                    # Execute function body
+                    if func.compiled is not None:
+                        result = func.compiled(body_env)
+                    else:
+                        result = self.eval_statements(func.body.statements)
+                except PendingJump as pending:
+                    result = pending.value
+                # A return statement was executed (break/continue never leave a function)
+                self.jump = None
+                
+                if type(result) is not TailCall:
+                    return result
+                
+                # Tail call: rebind parameters in place and loop
+                if len(result.args) != len(func.parameters):
+                    raise RuntimeError(
+                        f"Function expects {len(func.parameters)} arguments, got {len(result.args)}"
+                    )
+                body_env.variables.clear()
+                for param_name, arg_value in zip(func.parameters, result.args):
+                    func_env.variables[param_name] = arg_value
         finally:
-            # Restore environment
+            # Restore environment and recycle the frame
             self.current_env = previous_env
+            self.current_function = previous_function
+            if body_env is not func_env:
+                pool.release(body_env)
+            pool.release(func_env)
+    
+    def profiled_run_function(self, func: FunctionValue, parameters: Sequence[str],
+                              args: List[RuntimeValue]) -> RuntimeValue:
+        """run_function timed by the profiler."""
+        profiler = self.profiler
+        profiler.enter(func.name)
+        try:
+            return Evaluator.run_function(self, func, parameters, args)
+        finally:
+            profiler.exit()
     
     def values_equal(self, left: RuntimeValue, right: RuntimeValue) -> bool:
         """Check if two runtime values are equal."""
-        if left.type_name != right.type_name:
-            return False
-        return left.value == right.value
+        if self.unboxed:
+            return raw.values_equal(left, right)
+        return values_equal(left, right)
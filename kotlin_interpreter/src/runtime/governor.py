@@ -0,0 +1,161 @@
+"""
+Execution governor: step budget, deadline and memory cap of a run.
+
+The Evaluator's engines call tick(node) on every loop back-edge and
+every call, with the loop or function body being run. Counting is all a
+tick does; every CHECK_INTERVAL ticks the governor checks its limits:
+- steps: ticks so far against max_steps;
+- time: the clock against the deadline (time_limit seconds after start);
+- memory: approximate bytes held, against memory_limit.
+
+The memory estimate adds up
+- String text: ropes.py reports each long String it builds (charge_text)
+  to the governor in ACTIVE, set for the thread or task running it;
+  text appended to a rope is counted once, as it shares the chunks before
+  it. Counted when built and never released, so this is an upper bound
+  for programs that drop long Strings;
+- environments: those the evaluator's pool handed out and did not get
+  back (frames and block scopes still in use), ENVIRONMENT_BYTES each.
+
+A limit that is exceeded stops the program with ResourceLimitExceeded,
+which names the limit and carries the Kotlin location of the loop or call
+running when it was detected. Loops computed without running them
+(counted loops with nothing to do, reductions in closed form) cost no
+steps.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from ..parser.ast_nodes import ASTNode
+
+
+# Ticks between two checks of the limits (the clock is read at each check)
+CHECK_INTERVAL = 1000
+
+# Approximate size of an Environment and its variables dict
+ENVIRONMENT_BYTES = 400
+
+
+class ResourceLimitExceeded(RuntimeError):
+    """
+    Raised when a program exceeds one of its limits.
+
+    limit names it ("steps", "time" or "memory"), maximum is its value and
+    used how much the program had used when it was stopped; location is
+    the SourceLocation of the loop or function running then (or None).
+    """
+    def __init__(self, message: str, limit: str, maximum: Any = None, used: Any = None,
+                 location: Any = None):
+        self.limit = limit
+        self.maximum = maximum
+        self.used = used
+        self.location = location
+        if location is not None:
+            message = f"{message} (line {location.line})"
+        super().__init__(message)
+
+
+class ExecutionTimeout(ResourceLimitExceeded):
+    """Raised when a program runs past its time limit."""
+    def __init__(self, message: str, maximum: Any = None, used: Any = None, location: Any = None):
+        super().__init__(message, "time", maximum, used, location)
+
+
+# Governor of the program running in this thread / task, for ropes.concat
+ACTIVE: ContextVar[Optional["Governor"]] = ContextVar("governor", default=None)
+
+
+class Governor:
+    """Limits of one run; tick() and charge_text() are called while it runs."""
+
+    def __init__(self, max_steps: Optional[int] = None, time_limit: Optional[float] = None,
+                 memory_limit: Optional[int] = None, live_environments: Optional[Callable[[], int]] = None):
+        """
+        Initialize governor (the clock starts now).
+
+        Args:
+            max_steps: Most loop iterations and calls
+            time_limit: Seconds the program may run
+            memory_limit: Most bytes of String text and environments
+            live_environments: Count of environments in use (for the memory estimate)
+        """
+        self.max_steps = max_steps
+        self.time_limit = time_limit
+        self.memory_limit = memory_limit
+        self.live_environments = live_environments
+        self.started = time.monotonic()
+        self.deadline = self.started + time_limit if time_limit is not None else None
+        self.steps = 0  # Ticks counted up to the last check
+        self.countdown = CHECK_INTERVAL
+        self.node: Optional[ASTNode] = None  # Loop or function of the last tick
+        self.string_bytes = 0
+        self.environment_bytes = 0
+
+    @property
+    def memory(self) -> int:
+        """Approximate bytes held by the program."""
+        return self.string_bytes + self.environment_bytes
+
+    def tick(self, node: Optional[ASTNode], ticks: int = 1):
+        """Count loop iterations or calls; check the limits every CHECK_INTERVAL of them."""
+        self.node = node
+        self.countdown -= ticks
+        if self.countdown <= 0:
+            self.check()
+
+    def check(self):
+        """Check all limits now."""
+        self.steps += CHECK_INTERVAL - self.countdown
+        self.countdown = CHECK_INTERVAL
+        if self.max_steps is not None and self.steps > self.max_steps:
+            self.exceeded(ResourceLimitExceeded, f"Step limit of {self.max_steps} exceeded",
+                          "steps", self.max_steps, self.steps)
+        if self.deadline is not None:
+            now = time.monotonic()
+            if now > self.deadline:
+                self.exceeded(ExecutionTimeout, f"Time limit of {self.time_limit}s exceeded",
+                              self.time_limit, round(now - self.started, 3))
+        if self.memory_limit is not None:
+            if self.live_environments is not None:
+                self.environment_bytes = self.live_environments() * ENVIRONMENT_BYTES
+            self.check_memory()
+
+    def charge_text(self, length: int):
+        """Count the characters of String text just built."""
+        self.string_bytes += length
+        if self.memory_limit is not None:
+            self.check_memory()
+
+    def check_memory(self):
+        """Stop the program if it holds more than memory_limit bytes."""
+        memory = self.memory
+        if memory > self.memory_limit:
+            self.exceeded(ResourceLimitExceeded,
+                          f"Memory limit of {self.memory_limit} bytes exceeded (about {memory} bytes)",
+                          "memory", self.memory_limit, memory)
+
+    def exceeded(self, error: type, message: str, *args):
+        """Raise error for the loop or function being run."""
+        raise error(message, *args, location=self.location)
+
+    @property
+    def location(self):
+        """Location of the loop or function of the last tick, if any."""
+        return self.node.location if self.node is not None else None
+
+    def stats(self) -> dict:
+        """Steps, seconds and approximate bytes used so far."""
+        return {
+            'steps': self.steps + CHECK_INTERVAL - self.countdown,
+            'seconds': round(time.monotonic() - self.started, 3),
+            'string_bytes': self.string_bytes,
+            'environment_bytes': self.environment_bytes,
+        }
+
+    def __repr__(self) -> str:
+        limits = [f"{name}={value}" for name, value in
+                  (("steps", self.max_steps), ("time", self.time_limit), ("memory", self.memory_limit))
+                  if value is not None]
+        return f"Governor({', '.join(limits)})"
@@ -0,0 +1,56 @@
+"""
+Inline caches for call sites.
+
+Without a cache, every call walks the environment chain from the current
+scope up to the globals to find the callee, tests what kind of function
+it found and checks the argument count. A CallExpression instead keeps
+the callee it resolved last time (node.cache) together with a binding
+plan: the parameter names to bind the arguments to, with the argument
+count already checked against the call site.
+
+Validity: a call site is cached only when its name resolved to a global.
+Locals and parameters are lexically scoped (and the scope analysis never
+flattens a block local that has a global's name), so a site that once
+reached the globals always does; what can change is the global binding
+itself. The cache is therefore guarded by GlobalEnvironment.version,
+which is bumped on every global definition and on reassignment of a
+global function.
+"""
+
+from typing import Optional, Tuple
+
+from ..parser.ast_nodes import CallExpression
+from .runtime_objects import RuntimeValue, FunctionValue, BuiltinFunctionValue
+from .environment import Environment, GlobalEnvironment
+
+
+class CallSiteCache:
+    """Callee of one call site, valid while the global version is unchanged."""
+
+    __slots__ = ('version', 'callee', 'parameters')
+
+    def __init__(self, version: int, callee: RuntimeValue, parameters: Optional[Tuple[str, ...]]):
+        self.version = version
+        self.callee = callee
+        # Binding plan: parameter names of a user function (None for builtins)
+        self.parameters = parameters
+
+
+def fill(node: CallExpression, env: Environment, global_env: GlobalEnvironment,
+         callee: RuntimeValue) -> Optional[CallSiteCache]:
+    """Cache the callee just resolved for node from env, if the site allows it."""
+    # Only names resolved in the global scope are cached
+    while env is not global_env:
+        if node.function_name in env.variables:
+            node.cache = None
+            return None
+        env = env.parent
+    if type(callee) is BuiltinFunctionValue:
+        cache = CallSiteCache(global_env.version, callee, None)
+    elif isinstance(callee, FunctionValue) and len(callee.parameters) == len(node.arguments):
+        cache = CallSiteCache(global_env.version, callee, tuple(callee.parameters))
+    else:
+        # Not a function, or a wrong argument count: the call reports the error
+        cache = None
+    node.cache = cache
+    return cache
@@ -0,0 +1,83 @@
+"""
+Memoization cache for pure function calls.
+
+Bounded LRU cache keyed by argument values, with hit/miss counters.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .runtime_objects import RuntimeValue
+
+
+class MemoCache:
+    """
+    Least-recently-used cache for one function.
+
+    Keys are tuples of (type_name, value) pairs so that e.g. Int 1 and
+    Boolean true never collide. Unboxed arguments (plain int, str, bool)
+    are keyed by their Python type instead.
+    """
+
+    def __init__(self, name: str, max_size: int = 128):
+        """
+        Initialize cache.
+
+        Args:
+            name: Function name (for statistics)
+            max_size: Maximum number of cached results
+        """
+        self.name = name
+        self.max_size = max_size
+        self.entries: "OrderedDict[Tuple, RuntimeValue]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(args: List[RuntimeValue]) -> Optional[Tuple]:
+        """Build cache key from argument values (None if not cacheable)."""
+        key = tuple(
+            (arg.type_name, arg.value) if isinstance(arg, RuntimeValue) else (type(arg), arg)
+            for arg in args
+        )
+        # Function values carry no comparable payload
+        if any(type_name == "Function" for type_name, _ in key):
+            return None
+        return key
+
+    def get(self, key: Tuple) -> Optional[RuntimeValue]:
+        """Look up cached result, updating LRU order and counters."""
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: Tuple, value: RuntimeValue):
+        """Store result, evicting the least recently used entry if full."""
+        if self.max_size <= 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        total = self.hits + self.misses
+        return {
+            'function': self.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self.entries),
+            'max_size': self.max_size,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    def __repr__(self) -> str:
+        return f"MemoCache({self.name}, {len(self.entries)}/{self.max_size}, hits={self.hits}, misses={self.misses})"
@@ -0,0 +1,179 @@
+"""
+Operator semantics shared by all execution engines.
+
+The tree-walker, the closure engine and the bytecode VM all fall back to
+these functions, so every engine computes the same values and raises the
+same errors.
+"""
+
+import operator
+from typing import Optional
+
+from .runtime_objects import *
+from .ropes import concat
+
+
+# && and || short-circuit: every engine evaluates the right operand only
+# when the left one is a Boolean that does not decide the result, and
+# returns that operand. A non-Boolean operand is an error, reported by
+# binary_operation exactly as if both operands had been evaluated (a
+# non-Boolean left operand still evaluates the right one first).
+LOGICAL_OPERATORS = ("&&", "||")
+
+# Int comparisons, which engines may fuse with the branch on their result
+INT_COMPARISONS = {
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+    "==": operator.eq, "!=": operator.ne,
+}
+
+
+def int_divide(left: int, right: int) -> int:
+    """Kotlin Int division: truncates toward zero (Python's // floors)."""
+    quotient = abs(left) // abs(right)
+    return quotient if (left < 0) == (right < 0) else -quotient
+
+
+def int_remainder(left: int, right: int) -> int:
+    """Kotlin Int remainder: has the sign of the dividend."""
+    remainder = abs(left) % abs(right)
+    return -remainder if left < 0 else remainder
+
+
+def counted_range(kind: str, start: int, end: int, step: int) -> range:
+    """The Ints a for loop visits: start until / .. / downTo end, by step (> 0)."""
+    if step <= 0:
+        raise RuntimeError(f"Step must be positive, was: {step}.")
+    if kind == "until":
+        return range(start, end, step)
+    if kind == "..":
+        return range(start, end + 1, step)
+    return range(start, end - 1, -step)
+
+
+def int_range(kind: str, start: RuntimeValue, end: RuntimeValue, step: Optional[RuntimeValue]) -> range:
+    """Range of a for loop from its evaluated bounds and step (None means 1)."""
+    if not (is_int(start) and is_int(end)):
+        raise RuntimeError(f"Invalid operands for {kind}: {start.type_name}, {end.type_name}")
+    if step is None:
+        return counted_range(kind, start.value, end.value, 1)
+    if not is_int(step):
+        raise RuntimeError(f"Invalid operand for step: {step.type_name}")
+    return counted_range(kind, start.value, end.value, step.value)
+
+
+def values_equal(left: RuntimeValue, right: RuntimeValue) -> bool:
+    """Check if two runtime values are equal."""
+    if left.type_name != right.type_name:
+        return False
+    return left.value == right.value
+
+
+def concatenate(left: RuntimeValue, right: RuntimeValue) -> StringValue:
+    """String + anything (either side): Kotlin text of both, as a rope once long."""
+    return make_string(concat(left.text if is_string(left) else str(left), str(right)))
+
+
+def binary_operation(op: str, left: RuntimeValue, right: RuntimeValue) -> RuntimeValue:
+    """Apply a binary operator to evaluated operands."""
+    # Arithmetic operators
+    if op == "+":
+        if is_int(left) and is_int(right):
+            return make_int(left.value + right.value)
+        # String concatenation
+        elif is_string(left) or is_string(right):
+            return concatenate(left, right)
+        else:
+            raise RuntimeError(f"Invalid operands for +: {left.type_name}, {right.type_name}")
+    
+    elif op == "-":
+        if is_int(left) and is_int(right):
+            return make_int(left.value - right.value)
+        else:
+            raise RuntimeError(f"Invalid operands for -: {left.type_name}, {right.type_name}")
+    
+    elif op == "*":
+        if is_int(left) and is_int(right):
+            return make_int(left.value * right.value)
+        else:
+            raise RuntimeError(f"Invalid operands for *: {left.type_name}, {right.type_name}")
+    
+    elif op == "/":
+        if is_int(left) and is_int(right):
+            if right.value == 0:
+                raise RuntimeError("Division by zero")
+            return make_int(int_divide(left.value, right.value))
+        else:
+            raise RuntimeError(f"Invalid operands for /: {left.type_name}, {right.type_name}")
+    
+    elif op == "%":
+        if is_int(left) and is_int(right):
+            if right.value == 0:
+                raise RuntimeError("Modulo by zero")
+            return make_int(int_remainder(left.value, right.value))
+        else:
+            raise RuntimeError(f"Invalid operands for %: {left.type_name}, {right.type_name}")
+    
+    # Comparison operators
+    elif op == "==":
+        return make_boolean(values_equal(left, right))
+    
+    elif op == "!=":
+        return make_boolean(not values_equal(left, right))
+    
+    elif op == "<":
+        if is_int(left) and is_int(right):
+            return make_boolean(left.value < right.value)
+        else:
+            raise RuntimeError(f"Invalid operands for <: {left.type_name}, {right.type_name}")
+    
+    elif op == "<=":
+        if is_int(left) and is_int(right):
+            return make_boolean(left.value <= right.value)
+        else:
+            raise RuntimeError(f"Invalid operands for <=: {left.type_name}, {right.type_name}")
+    
+    elif op == ">":
+        if is_int(left) and is_int(right):
+            return make_boolean(left.value > right.value)
+        else:
+            raise RuntimeError(f"Invalid operands for >: {left.type_name}, {right.type_name}")
+    
+    elif op == ">=":
+        if is_int(left) and is_int(right):
+            return make_boolean(left.value >= right.value)
+        else:
+            raise RuntimeError(f"Invalid operands for >=: {left.type_name}, {right.type_name}")
+    
+    # Logical operators
+    elif op == "&&":
+        if is_boolean(left) and is_boolean(right):
+            return make_boolean(left.value and right.value)
+        else:
+            raise RuntimeError(f"Invalid operands for &&: {left.type_name}, {right.type_name}")
+    
+    elif op == "||":
+        if is_boolean(left) and is_boolean(right):
+            return make_boolean(left.value or right.value)
+        else:
+            raise RuntimeError(f"Invalid operands for ||: {left.type_name}, {right.type_name}")
+    
+    else:
+        raise RuntimeError(f"Unknown binary operator: {op}")
+
+
+def unary_operation(op: str, operand: RuntimeValue) -> RuntimeValue:
+    """Apply a unary operator to an evaluated operand."""
+    if op == "-":
+        if is_int(operand):
+            return make_int(-operand.value)
+        else:
+            raise RuntimeError(f"Invalid operand for -: {operand.type_name}")
+    
+    elif op == "!":
+        if is_boolean(operand):
+            return make_boolean(not operand.value)
+        else:
+            raise RuntimeError(f"Invalid operand for !: {operand.type_name}")
+    
+    else:
+        raise RuntimeError(f"Unknown unary operator: {op}")
@@ -0,0 +1,113 @@
+"""
+Output sinks for print/println.
+
+Calling Python's print() once per Kotlin println goes through the stream
+machinery (and a redirect_stdout wrapper when output is captured) for
+every line. An OutputSink collects the text instead and writes it to its
+stream in large pieces, according to its mode:
+- "buffered": pieces are kept in a list and written once they add up to
+  buffer_size characters, and when the program ends (flush());
+- "line": written and flushed after every newline (interactive use);
+- "unbuffered": written and flushed on every call.
+
+The engines flush their sink when evaluate() ends, normally or with an
+error, so output comes before any message printed after it. The stream
+is sys.stdout unless one is given, looked up when writing so that
+redirections made after the sink is created still apply.
+
+A CaptureSink keeps all output in memory (getvalue()) and never touches
+a stream: the GUI captures program output with one.
+"""
+
+import sys
+from typing import List, Optional, TextIO
+
+
+# Characters buffered before a write in "buffered" mode
+BUFFER_SIZE = 64 * 1024
+
+
+class OutputSink:
+    """Buffered writer behind the print and println builtins."""
+
+    MODES = ("buffered", "line", "unbuffered")
+
+    def __init__(self, stream: Optional[TextIO] = None, mode: str = "buffered",
+                 buffer_size: int = BUFFER_SIZE):
+        """
+        Initialize sink.
+
+        Args:
+            stream: Text stream written to (None: sys.stdout at write time)
+            mode: Flush policy, "buffered", "line" or "unbuffered"
+            buffer_size: Characters kept before writing in "buffered" mode
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown output mode '{mode}' (expected one of {', '.join(self.MODES)})")
+        self.mode = mode
+        self._stream = stream
+        self.buffer_size = buffer_size
+        self.pieces: List[str] = []
+        self.size = 0
+        self.writes = 0  # Writes to the stream
+        # Flush policy: the write method is bound once, not tested per call
+        if mode == "line":
+            self.write = self._write_line_buffered
+        elif mode == "unbuffered":
+            self.write = self._write_unbuffered
+
+    @property
+    def stream(self) -> TextIO:
+        """Stream the output goes to."""
+        return self._stream if self._stream is not None else sys.stdout
+
+    def write(self, text: str):
+        """Add text to the output ("buffered" mode)."""
+        self.pieces.append(text)
+        self.size += len(text)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def _write_line_buffered(self, text: str):
+        self.pieces.append(text)
+        if "\n" in text:
+            self.flush()
+
+    def _write_unbuffered(self, text: str):
+        self.pieces.append(text)
+        self.flush()
+
+    def flush(self):
+        """Write the buffered text to the stream."""
+        if self.pieces:
+            stream = self.stream
+            stream.write("".join(self.pieces))
+            self.pieces.clear()
+            self.size = 0
+            self.writes += 1
+            if self.mode != "buffered":
+                stream.flush()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.mode}, {self.size} chars pending)"
+
+
+class CaptureSink(OutputSink):
+    """Sink keeping all output in memory (no stream)."""
+
+    def __init__(self):
+        super().__init__(mode="buffered")
+
+    def write(self, text: str):
+        """Add text to the output."""
+        self.pieces.append(text)
+
+    def flush(self):
+        """Nothing to write: the output stays in memory."""
+        pass
+
+    def getvalue(self) -> str:
+        """All output so far."""
+        if len(self.pieces) > 1:
+            self.pieces[:] = ["".join(self.pieces)]
+        return self.pieces[0] if self.pieces else ""
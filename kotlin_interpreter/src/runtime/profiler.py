@@ -0,0 +1,165 @@
+"""
+Kotlin-level profiler for the Evaluator engines.
+
+cProfile sees the interpreter, not the program: its report is mostly
+eval_expression. A Profiler given to an Evaluator records instead
+- per Kotlin function: calls, self time and total time (a recursive
+  function's total time counts its outermost frames only);
+- per source line: how many times a statement on it was run;
+- the call tree with the self time of every path, for flame graphs.
+
+The engines report to it only when one is attached (the methods doing so
+are bound in place of the plain ones), so runs without a profiler pay
+nothing; with one, every call reads the clock twice and every statement
+increments a counter. Tail calls run as a loop and count as one call;
+memoized results served from the cache are not calls.
+
+Exports: to_collapsed() gives the collapsed-stack text read by
+flamegraph.pl, speedscope or inferno ("main;fib;fib 1234", self time in
+microseconds), summary() / to_json() a JSON summary, to_text() a table.
+"""
+
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, DefaultDict, Dict, List, Optional
+
+
+@dataclass
+class FunctionProfile:
+    """Calls and time (seconds) of one Kotlin function."""
+    name: str
+    calls: int = 0
+    self_time: float = 0.0
+    total_time: float = 0.0
+
+
+class CallNode:
+    """Node of the call tree: a call path, its self time and its callees."""
+
+    __slots__ = ("self_time", "children")
+
+    def __init__(self):
+        self.self_time = 0.0
+        self.children: Dict[str, "CallNode"] = {}
+
+
+class Profiler:
+    """Records the calls and statements of a Kotlin program as it runs."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        """Initialize an empty profile (clock returns seconds)."""
+        self.clock = clock
+        self.functions: Dict[str, FunctionProfile] = {}
+        self.lines: DefaultDict[int, int] = defaultdict(int)
+        self.root = CallNode()
+        # Running calls: [name, call tree node, start, time spent in callees]
+        self.frames: List[list] = []
+        self.active: DefaultDict[str, int] = defaultdict(int)  # Running frames per function
+        self.started: Optional[float] = None
+        self.elapsed = 0.0
+
+    # Recording (called by the engines)
+
+    def start(self):
+        """The program starts running."""
+        self.started = self.clock()
+
+    def stop(self):
+        """The program stopped (normally or with an error)."""
+        if self.started is not None:
+            self.elapsed += self.clock() - self.started
+            self.started = None
+
+    def enter(self, name: Optional[str]):
+        """A call to a Kotlin function starts."""
+        name = name or "<anonymous>"
+        frames = self.frames
+        parent = frames[-1][1] if frames else self.root
+        node = parent.children.get(name)
+        if node is None:
+            node = parent.children[name] = CallNode()
+        self.active[name] += 1
+        frames.append([name, node, self.clock(), 0.0])
+
+    def exit(self):
+        """The innermost running call ends (returns or raises)."""
+        name, node, start, callees = self.frames.pop()
+        total = self.clock() - start
+        own = total - callees
+        if self.frames:
+            self.frames[-1][3] += total
+        node.self_time += own
+        function = self.functions.get(name)
+        if function is None:
+            function = self.functions[name] = FunctionProfile(name)
+        function.calls += 1
+        function.self_time += own
+        self.active[name] -= 1
+        if not self.active[name]:
+            function.total_time += total
+
+    # Reports
+
+    def stacks(self) -> Dict[str, float]:
+        """Self time of every call path ("main;fib;fib"), in seconds."""
+        paths = {}
+        pending = [(name, child) for name, child in self.root.children.items()]
+        while pending:
+            path, node = pending.pop()
+            paths[path] = node.self_time
+            pending.extend((f"{path};{name}", child) for name, child in node.children.items())
+        return paths
+
+    def to_collapsed(self) -> str:
+        """Collapsed-stack text for flame graph tools (self time in microseconds)."""
+        lines = []
+        for path, seconds in sorted(self.stacks().items()):
+            micros = round(seconds * 1_000_000)
+            if micros > 0:
+                lines.append(f"{path} {micros}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def ranked_functions(self) -> List[FunctionProfile]:
+        """Functions, most self time first."""
+        return sorted(self.functions.values(), key=lambda function: -function.self_time)
+
+    def hot_lines(self, limit: Optional[int] = None) -> List[tuple]:
+        """(line, hits) pairs, most run first."""
+        ranked = sorted(self.lines.items(), key=lambda item: (-item[1], item[0]))
+        return ranked if limit is None else ranked[:limit]
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-ready summary: functions, line hits and call paths."""
+        return {
+            'elapsed': self.elapsed,
+            'functions': [
+                {'name': f.name, 'calls': f.calls, 'self_time': f.self_time, 'total_time': f.total_time}
+                for f in self.ranked_functions()
+            ],
+            'lines': {str(line): hits for line, hits in sorted(self.lines.items())},
+            'stacks': self.stacks(),
+        }
+
+    def to_json(self) -> str:
+        """The summary as JSON text."""
+        return json.dumps(self.summary(), indent=2)
+
+    def to_text(self, source: Optional[str] = None, limit: int = 10) -> str:
+        """Table of functions and of the most run lines (with their text if source is given)."""
+        elapsed = self.elapsed or sum(f.self_time for f in self.functions.values()) or 1.0
+        out = [f"Profile: {self.elapsed * 1000:.1f} ms",
+               f"{'function':<24}{'calls':>10}{'self ms':>11}{'self %':>8}{'total ms':>11}"]
+        for function in self.ranked_functions():
+            out.append(f"{function.name:<24}{function.calls:>10}{function.self_time * 1000:>11.2f}"
+                       f"{100 * function.self_time / elapsed:>7.1f}%{function.total_time * 1000:>11.2f}")
+        source_lines = source.splitlines() if source is not None else []
+        out.append(f"{'line':<8}{'hits':>10}")
+        for line, hits in self.hot_lines(limit):
+            text = source_lines[line - 1].strip() if 0 < line <= len(source_lines) else ""
+            out.append(f"{line:<8}{hits:>10}  {text}".rstrip())
+        return "\n".join(out)
+
+    def __repr__(self) -> str:
+        return f"Profiler({len(self.functions)} functions, {len(self.lines)} lines)"
@@ -0,0 +1,245 @@
+"""
+Quickening: self-specializing operator and variable nodes for the tree-walker.
+
+The generic path for 'a < b' compares the operator against every operator
+string and then checks both operand types, each time it runs. With
+quickening, the first execution of a BinaryExpression, UnaryExpression or
+IdentifierExpression records what it saw and installs a specialized
+handler on the node (node.quick), e.g. IntLess for two Ints:
+
+    def handler(left, right):
+        if type(left) is IntValue and type(right) is IntValue:   # guard
+            return BooleanValue(left.value < right.value)
+        return DEOPT
+
+When a guard fails the node deoptimizes: the handler is removed and the
+generic path runs; the node may specialize again on its next execution,
+until it has deoptimized MAX_DEOPTS times and stays generic.
+
+Guards test the exact value types, so a handler is correct for boxed
+(IntValue, ...) and unboxed (int, ...) evaluators alike; each
+representation has its own handlers.
+"""
+
+import operator
+from collections import Counter
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..parser.ast_nodes import BinaryExpression, UnaryExpression, IdentifierExpression
+from .runtime_objects import IntValue, StringValue, BooleanValue
+from .environment import Environment
+from .operators import concatenate
+from .ropes import Rope, concat
+from .unboxed import to_text, INT_OPERATORS, BOOLEAN_OPERATORS
+
+
+# Returned by a handler whose guard failed
+DEOPT = object()
+
+# Deoptimizations after which a node stays on the generic path
+MAX_DEOPTS = 2
+
+
+# Handler factories
+
+def _boxed(left_type: type, right_type: type, apply: Callable, wrap: Callable) -> Callable:
+    """Handler applying apply to the payloads of two boxed values."""
+    def handler(left, right):
+        if type(left) is left_type and type(right) is right_type:
+            return wrap(apply(left.value, right.value))
+        return DEOPT
+    return handler
+
+
+def _raw(left_type: type, right_type: type, apply: Callable) -> Callable:
+    """Handler applying apply to two unboxed values."""
+    def handler(left, right):
+        if type(left) is left_type and type(right) is right_type:
+            return apply(left, right)
+        return DEOPT
+    return handler
+
+
+def _boxed_concat(left, right):
+    """String + anything (either side): Kotlin text of both."""
+    if type(left) is StringValue or type(right) is StringValue:
+        return concatenate(left, right)
+    return DEOPT
+
+
+def _raw_concat(left, right):
+    """String + anything (either side), unboxed."""
+    kind = type(left)
+    if kind is str or kind is Rope:
+        return concat(left, to_text(right))
+    if type(right) is str or type(right) is Rope:
+        return concat(to_text(left), to_text(right))
+    return DEOPT
+
+
+# Operator -> (handler name, boxed result type); the operations are unboxed.py's
+INT_OPERATIONS = {
+    "+": ("IntAdd", IntValue),
+    "-": ("IntSub", IntValue),
+    "*": ("IntMul", IntValue),
+    "/": ("IntDiv", IntValue),
+    "%": ("IntMod", IntValue),
+    "<": ("IntLess", BooleanValue),
+    "<=": ("IntLessEqual", BooleanValue),
+    ">": ("IntGreater", BooleanValue),
+    ">=": ("IntGreaterEqual", BooleanValue),
+    "==": ("IntEqual", BooleanValue),
+    "!=": ("IntNotEqual", BooleanValue),
+}
+
+# && and || short-circuit and are never quickened
+BOOLEAN_OPERATIONS = {
+    "==": "BooleanEqual",
+    "!=": "BooleanNotEqual",
+}
+
+STRING_OPERATIONS = {
+    "==": ("StringEqual", operator.eq, BooleanValue),
+    "!=": ("StringNotEqual", operator.ne, BooleanValue),
+}
+
+
+def _binary_table() -> Dict[Tuple[str, type, type], Tuple[str, Callable]]:
+    """(operator, left type, right type) -> (name, handler), boxed and unboxed."""
+    table = {}
+    for op, (name, wrap) in INT_OPERATIONS.items():
+        apply = INT_OPERATORS[op]
+        table[op, IntValue, IntValue] = (name, _boxed(IntValue, IntValue, apply, wrap))
+        table[op, int, int] = (name, _raw(int, int, apply))
+    for op, name in BOOLEAN_OPERATIONS.items():
+        apply = BOOLEAN_OPERATORS[op]
+        table[op, BooleanValue, BooleanValue] = (name, _boxed(BooleanValue, BooleanValue, apply, BooleanValue))
+        table[op, bool, bool] = (name, _raw(bool, bool, apply))
+    for op, (name, apply, wrap) in STRING_OPERATIONS.items():
+        table[op, StringValue, StringValue] = (name, _boxed(StringValue, StringValue, apply, wrap))
+        table[op, str, str] = (name, _raw(str, str, apply))
+    # Concatenation keeps the left text as is (it may be or become a Rope)
+    table["+", StringValue, StringValue] = ("StringConcat", _boxed_concat)
+    table["+", str, str] = ("StringConcat", _raw_concat)
+    return table
+
+
+BINARY_HANDLERS = _binary_table()
+
+
+def _boxed_negate(operand):
+    if type(operand) is IntValue:
+        return IntValue(-operand.value)
+    return DEOPT
+
+
+def _raw_negate(operand):
+    if type(operand) is int:
+        return -operand
+    return DEOPT
+
+
+def _boxed_not(operand):
+    if type(operand) is BooleanValue:
+        return BooleanValue(not operand.value)
+    return DEOPT
+
+
+def _raw_not(operand):
+    if type(operand) is bool:
+        return not operand
+    return DEOPT
+
+
+UNARY_HANDLERS = {
+    ("-", IntValue): ("IntNegate", _boxed_negate),
+    ("-", int): ("IntNegate", _raw_negate),
+    ("!", BooleanValue): ("BooleanNot", _boxed_not),
+    ("!", bool): ("BooleanNot", _raw_not),
+}
+
+
+def local_read(env: Environment, name: str) -> Any:
+    """Variable of the current scope."""
+    try:
+        return env.variables[name]
+    except KeyError:
+        return DEOPT
+
+
+def parent_read(env: Environment, name: str) -> Any:
+    """Variable of the enclosing scope (e.g. a parameter read from the body scope)."""
+    if name in env.variables or env.parent is None:
+        return DEOPT
+    try:
+        return env.parent.variables[name]
+    except KeyError:
+        return DEOPT
+
+
+# Handler -> name, for statistics
+HANDLER_NAMES: Dict[Callable, str] = {handler: name for name, handler in BINARY_HANDLERS.values()}
+HANDLER_NAMES.update({handler: name for name, handler in UNARY_HANDLERS.values()})
+HANDLER_NAMES.update({
+    _boxed_concat: "StringConcat", _raw_concat: "StringConcat",
+    local_read: "LocalRead", parent_read: "ParentRead",
+})
+
+
+class Quickener:
+    """Installs and removes specialized handlers; counts both."""
+
+    def __init__(self):
+        """Initialize with empty counters."""
+        self.specializations: Counter = Counter()
+        self.deopts: Counter = Counter()
+        self.generic = 0  # Nodes left on the generic path for good
+
+    def specialize_binary(self, node: BinaryExpression, left: Any, right: Any):
+        """Pick a handler for the operand types seen."""
+        entry = BINARY_HANDLERS.get((node.operator, type(left), type(right)))
+        if entry is None and node.operator == "+":
+            if type(left) is StringValue or type(right) is StringValue:
+                entry = ("StringConcat", _boxed_concat)
+            elif type(left) in (str, Rope) or type(right) in (str, Rope):
+                entry = ("StringConcat", _raw_concat)
+        self._install(node, entry)
+
+    def specialize_unary(self, node: UnaryExpression, operand: Any):
+        """Pick a handler for the operand type seen."""
+        self._install(node, UNARY_HANDLERS.get((node.operator, type(operand))))
+
+    def specialize_identifier(self, node: IdentifierExpression, env: Environment):
+        """Pick a handler for the scope the variable was found in."""
+        entry = None
+        if node.name in env.variables:
+            entry = ("LocalRead", local_read)
+        elif env.parent is not None and node.name in env.parent.variables:
+            entry = ("ParentRead", parent_read)
+        self._install(node, entry)
+
+    def deoptimize(self, node):
+        """A guard failed: back to the generic path."""
+        self.deopts[HANDLER_NAMES[node.quick]] += 1
+        node.quick = None
+        node.deopts += 1
+        if node.deopts >= MAX_DEOPTS:
+            self.generic += 1
+
+    def _install(self, node, entry: Optional[Tuple[str, Callable]]):
+        """Install a handler, or keep the node generic if there is none."""
+        if entry is None:
+            node.deopts = MAX_DEOPTS
+            self.generic += 1
+            return
+        name, handler = entry
+        node.quick = handler
+        self.specializations[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Specializations and deopts per handler, and nodes left generic."""
+        return {
+            'specialized': dict(self.specializations),
+            'deopts': dict(self.deopts),
+            'generic': self.generic,
+        }
@@ -0,0 +1,281 @@
+"""
+Evaluation of reduction loops without running their bodies.
+
+A reduction loop (see analysis/loop_idioms.py) adds term(i) to each of
+its accumulators for every counter value i of a range. reduce() computes
+the sums directly, by the first method that applies to each term:
+- "closed form": the term is a polynomial in i once the invariant inputs
+  are substituted (no /, % or if) of degree <= MAX_DEGREE; the sum over
+  the arithmetic progression comes from power sums in constant time;
+- "vectorized": NumPy is installed and interval bounds prove that no
+  intermediate value of the term, nor the sum of a chunk, can leave
+  int64; the term is evaluated over numpy.arange chunks of the range;
+- "scalar": the term is evaluated for each i with Python ints.
+
+Ints are Python ints, so the loop itself never overflows; the closed form
+is exact integer arithmetic and the vectorized form only runs when int64
+cannot overflow, so all three give exactly the loop's result. / and %
+truncate toward zero as in Kotlin. A term that would fail (division by
+zero) makes reduce() give up, and the loop runs normally to raise the
+error at the right iteration.
+"""
+
+from math import comb
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..parser.ast_nodes import *
+from ..analysis.loop_idioms import ReductionLoop, unwrap
+from .unboxed import INT_OPERATORS
+
+try:
+    import numpy
+except ImportError:  # Optional: without NumPy, terms that are not polynomials run scalar
+    numpy = None
+
+
+# Highest polynomial degree summed in closed form
+MAX_DEGREE = 8
+
+# Counter values per vectorized chunk / per deadline tick of the scalar form
+CHUNK = 4096
+
+# Largest magnitude allowed for any int64 intermediate (leaves room for one more + or -)
+INT64_LIMIT = 2 ** 62
+
+# Term evaluated for one counter value, with the inputs bound
+Scalar = Callable[[int], int]
+
+
+class GiveUp(Exception):
+    """The term cannot be summed this way (or would fail): let the loop run."""
+    pass
+
+
+def reduce(plan: ReductionLoop, numbers: range, values: Dict[str, int],
+           tick: Optional[Callable[[int], None]] = None,
+           methods: Optional[Dict[str, int]] = None) -> Optional[Dict[str, int]]:
+    """
+    Sum of each accumulator's terms over the counter values, or None.
+
+    values holds the Int inputs; tick(count) is called as counter values
+    are processed by the vectorized and scalar forms (time limit). The
+    method used for each term is counted in methods.
+    """
+    totals = {target: 0 for target in plan.targets}
+    for acc in plan.accumulations:
+        try:
+            total, method = term_sum(acc.term, plan.counter, numbers, values, tick)
+        except GiveUp:
+            return None
+        totals[acc.target] += acc.sign * total
+        if methods is not None:
+            methods[method] = methods.get(method, 0) + 1
+    return totals
+
+
+def term_sum(term: Expression, counter: str, numbers: range, values: Dict[str, int],
+             tick: Optional[Callable[[int], None]]) -> Tuple[int, str]:
+    """Σ term(i) for i in numbers, and the method used."""
+    coefficients = polynomial(term, counter, values)
+    if coefficients is not None and len(coefficients) <= MAX_DEGREE + 1:
+        return progression_sum(coefficients, numbers), "closed form"
+    if numpy is not None and len(numbers) > 0:
+        largest = max(abs(numbers[0]), abs(numbers[-1]))
+        bound = magnitude(term, counter, largest, values)
+        if bound is not None and bound * CHUNK <= INT64_LIMIT:
+            return vectorized_sum(term, counter, numbers, values, tick), "vectorized"
+    return scalar_sum(term, counter, numbers, values, tick), "scalar"
+
+
+# Closed form
+
+def polynomial(node: Expression, counter: str, values: Dict[str, int]) -> Optional[List[int]]:
+    """Coefficients (lowest degree first) of a term as a polynomial in the counter, or None."""
+    if isinstance(node, LiteralExpression):
+        return [node.value]
+    if isinstance(node, IdentifierExpression):
+        return [0, 1] if node.name == counter else [values[node.name]]
+    if isinstance(node, UnaryExpression):
+        operand = polynomial(node.operand, counter, values)
+        return None if operand is None else [-c for c in operand]
+    if isinstance(node, BinaryExpression) and node.operator in ("+", "-", "*"):
+        left = polynomial(node.left, counter, values)
+        right = polynomial(node.right, counter, values)
+        if left is None or right is None:
+            return None
+        if node.operator == "*":
+            if len(left) + len(right) - 2 > MAX_DEGREE:
+                return None
+            product = [0] * (len(left) + len(right) - 1)
+            for i, a in enumerate(left):
+                for j, b in enumerate(right):
+                    product[i + j] += a * b
+            return product
+        sign = 1 if node.operator == "+" else -1
+        size = max(len(left), len(right))
+        left, right = left + [0] * (size - len(left)), right + [0] * (size - len(right))
+        return [a + sign * b for a, b in zip(left, right)]
+    return None
+
+
+def power_sums(n: int, degree: int) -> List[int]:
+    """S_k = Σ t^k for t in 0..n-1, for k = 0..degree."""
+    # n^(k+1) = Σ_{j<=k} C(k+1, j) S_j  (telescoping (t+1)^(k+1) - t^(k+1))
+    sums: List[int] = []
+    for k in range(degree + 1):
+        rest = sum(comb(k + 1, j) * sums[j] for j in range(k))
+        sums.append((n ** (k + 1) - rest) // (k + 1))
+    return sums
+
+
+def progression_sum(coefficients: List[int], numbers: range) -> int:
+    """Σ p(i) over the range, for p given by its coefficients."""
+    n = len(numbers)
+    if n == 0:
+        return 0
+    start, step = numbers.start, numbers.step
+    # p(start + step*t) as a polynomial in t
+    shifted = [0] * len(coefficients)
+    for degree, c in enumerate(coefficients):
+        if c:
+            for k in range(degree + 1):
+                shifted[k] += c * comb(degree, k) * start ** (degree - k) * step ** k
+    sums = power_sums(n, len(shifted) - 1)
+    return sum(c * s for c, s in zip(shifted, sums))
+
+
+# Vectorized (NumPy)
+
+def magnitude(node: Expression, counter: str, largest: int, values: Dict[str, int]) -> Optional[int]:
+    """Bound on |term| and on all its intermediates when |counter| <= largest (None: too large)."""
+    if isinstance(node, LiteralExpression):
+        bound = abs(node.value)
+    elif isinstance(node, IdentifierExpression):
+        bound = largest if node.name == counter else abs(values[node.name])
+    elif isinstance(node, UnaryExpression):
+        bound = magnitude(node.operand, counter, largest, values)
+    elif isinstance(node, BinaryExpression):
+        left = magnitude(node.left, counter, largest, values)
+        right = magnitude(node.right, counter, largest, values)
+        if left is None or right is None:
+            return None
+        if node.operator in ("+", "-"):
+            bound = left + right
+        elif node.operator == "*":
+            bound = left * right
+        elif node.operator in ("/", "%"):
+            bound = left  # |a / b| and |a % b| never exceed |a|
+        else:
+            bound = max(left, right)  # Comparisons, && and ||: operands must fit
+    elif isinstance(node, IfExpression):
+        parts = [magnitude(part, counter, largest, values)
+                 for part in (node.condition, unwrap(node.then_branch), unwrap(node.else_branch))]
+        bound = None if None in parts else max(parts)
+    else:
+        return None
+    return bound if bound is not None and bound <= INT64_LIMIT else None
+
+
+def vectorized_sum(term: Expression, counter: str, numbers: range, values: Dict[str, int],
+                   tick: Optional[Callable[[int], None]]) -> int:
+    """Σ term(i), evaluated on int64 arrays of CHUNK counter values."""
+    total = 0
+    for first in range(0, len(numbers), CHUNK):
+        chunk = numbers[first:first + CHUNK]
+        if tick is not None:
+            tick(len(chunk))
+        i = numpy.arange(chunk.start, chunk.stop, chunk.step, dtype=numpy.int64)
+        result = _vector(term, counter, i, values, numpy.ones(len(i), dtype=bool))
+        total += int(numpy.sum(numpy.broadcast_to(result, i.shape), dtype=numpy.int64))
+    return total
+
+
+def _vector(node: Expression, counter: str, i, values: Dict[str, int], active):
+    """Term over the counter array; active marks the positions whose value is used."""
+    if isinstance(node, LiteralExpression):
+        return node.value
+    if isinstance(node, IdentifierExpression):
+        return i if node.name == counter else values[node.name]
+    if isinstance(node, UnaryExpression):
+        operand = _vector(node.operand, counter, i, values, active)
+        return numpy.logical_not(operand) if node.operator == "!" else -operand
+    if isinstance(node, IfExpression):
+        condition = numpy.broadcast_to(_vector(node.condition, counter, i, values, active), i.shape)
+        then_value = _vector(unwrap(node.then_branch), counter, i, values, active & condition)
+        else_value = _vector(unwrap(node.else_branch), counter, i, values, active & ~condition)
+        return numpy.where(condition, then_value, else_value)
+
+    op = node.operator
+    left = _vector(node.left, counter, i, values, active)
+    if op in ("&&", "||"):
+        # Short-circuit: the right operand only matters where the left one does not decide
+        decided = left if op == "||" else numpy.logical_not(left)
+        right = _vector(node.right, counter, i, values, active & ~numpy.broadcast_to(decided, i.shape))
+        return numpy.logical_or(left, right) if op == "||" else numpy.logical_and(left, right)
+    right = _vector(node.right, counter, i, values, active)
+    if op in ("/", "%"):
+        zero = numpy.broadcast_to(numpy.asarray(right) == 0, i.shape)
+        if numpy.any(zero & active):
+            raise GiveUp()  # The loop raises the error at the right iteration
+        divisor = numpy.where(zero, 1, right)
+        quotient = numpy.abs(left) // numpy.abs(divisor)
+        quotient = numpy.where((numpy.asarray(left) < 0) != (divisor < 0), -quotient, quotient)
+        return quotient if op == "/" else left - quotient * divisor
+    return VECTOR_OPERATORS[op](left, right)
+
+
+VECTOR_OPERATORS = {
+    "+": lambda a, b: a + b, "-": lambda a, b: a - b, "*": lambda a, b: a * b,
+    "<": lambda a, b: a < b, "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b, ">=": lambda a, b: a >= b,
+    "==": lambda a, b: a == b, "!=": lambda a, b: a != b,
+}
+
+
+# Scalar
+
+def scalar_sum(term: Expression, counter: str, numbers: range, values: Dict[str, int],
+               tick: Optional[Callable[[int], None]]) -> int:
+    """Σ term(i), one counter value at a time."""
+    function = scalar(term, counter, values)
+    total = 0
+    for first in range(0, len(numbers), CHUNK):
+        chunk = numbers[first:first + CHUNK]
+        if tick is not None:
+            tick(len(chunk))
+        try:
+            total += sum(map(function, chunk))
+        except RuntimeError:
+            raise GiveUp()  # The loop raises the error at the right iteration
+    return total
+
+
+def scalar(node: Expression, counter: str, values: Dict[str, int]) -> Scalar:
+    """Compile a term (or condition) into a function of the counter."""
+    if isinstance(node, LiteralExpression):
+        constant = node.value
+        return lambda i: constant
+    if isinstance(node, IdentifierExpression):
+        if node.name == counter:
+            return lambda i: i
+        constant = values[node.name]
+        return lambda i: constant
+    if isinstance(node, UnaryExpression):
+        operand = scalar(node.operand, counter, values)
+        if node.operator == "!":
+            return lambda i: not operand(i)
+        return lambda i: -operand(i)
+    if isinstance(node, IfExpression):
+        condition = scalar(node.condition, counter, values)
+        then_value = scalar(unwrap(node.then_branch), counter, values)
+        else_value = scalar(unwrap(node.else_branch), counter, values)
+        return lambda i: then_value(i) if condition(i) else else_value(i)
+
+    left = scalar(node.left, counter, values)
+    right = scalar(node.right, counter, values)
+    if node.operator == "&&":
+        return lambda i: left(i) and right(i)
+    if node.operator == "||":
+        return lambda i: left(i) or right(i)
+    apply = INT_OPERATORS[node.operator]
+    return lambda i: apply(left(i), right(i))
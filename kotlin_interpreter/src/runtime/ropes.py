@@ -0,0 +1,99 @@
+"""
+Ropes: Kotlin Strings built by repeated concatenation.
+
+With Python str values 's = s + x' copies all of s, so a loop building
+its output this way takes O(n²) time. Once a concatenation gives at
+least MIN_LENGTH characters, concat() returns a Rope instead: a list of
+chunks and how many of them belong to this string. Appending to a rope
+appends to its chunk list in place, and the new rope covers one more
+chunk; the old rope still covers its own prefix, so both stay valid
+(appending to the old one again first copies its chunk references).
+
+The text is joined only when it is observed (printed, compared, hashed,
+str()), and the joined text then replaces the rope's chunks. A rope of
+many small chunks is joined while it grows, so it never holds more than
+about one chunk per MIN_CHUNK characters and stays amortized O(1) per
+character appended.
+
+Wherever values are unboxed (unboxed.py, the VM, the transpiled Python)
+a Kotlin String is a str or a Rope; a StringValue may hold a Rope and
+joins it when its value is read.
+
+The text of every rope built is charged to the governor of the running
+program, if any (governor.py), so memory limits see long Strings.
+"""
+
+from typing import List, Union
+
+from .governor import ACTIVE
+
+
+# Shortest concatenation result kept as a Rope (shorter ones are copied)
+MIN_LENGTH = 256
+
+# A rope of at least MAX_CHUNKS chunks shorter than MIN_CHUNK characters on
+# average is joined before the next append
+MAX_CHUNKS = 64
+MIN_CHUNK = 32
+
+
+class Rope:
+    """Text of a String: the first count chunks of a shared, append-only list."""
+
+    __slots__ = ("chunks", "count", "length")
+
+    def __init__(self, chunks: List[str], count: int, length: int):
+        self.chunks = chunks
+        self.count = count
+        self.length = length
+
+    def __str__(self) -> str:
+        if self.count > 1:
+            # A new list: other ropes may share (and extend) the old one
+            self.chunks = ["".join(self.chunks[:self.count])]
+            self.count = 1
+        return self.chunks[0]
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __eq__(self, other) -> bool:
+        if type(other) is str or type(other) is Rope:
+            return self.length == len(other) and str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __repr__(self) -> str:
+        return f"Rope({self.length} chars, {self.count} chunks)"
+
+
+# Kotlin String text: str or Rope
+Text = Union[str, Rope]
+
+
+def concat(left: Text, right: str) -> Text:
+    """left + right (right already converted to text)."""
+    if type(left) is not Rope:
+        length = len(left) + len(right)
+        if length < MIN_LENGTH:
+            return left + right
+        governor = ACTIVE.get()
+        if governor is not None:
+            governor.charge_text(length)
+        return Rope([left, right], 2, length)
+
+    count = left.count
+    if count >= MAX_CHUNKS and count * MIN_CHUNK > left.length:
+        str(left)  # Join the small chunks
+        count = 1
+    elif count != len(left.chunks):
+        # The shared list was extended past this rope: continue on a copy
+        left.chunks = left.chunks[:count]
+    chunks = left.chunks
+    chunks.append(right)
+    governor = ACTIVE.get()
+    if governor is not None:
+        governor.charge_text(len(right))
+    return Rope(chunks, count + 1, left.length + len(right))
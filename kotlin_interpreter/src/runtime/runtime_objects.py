@@ -53,9 +53,25 @@ class IntValue(RuntimeValue):
 
 @dataclass
 class StringValue(RuntimeValue):
-    """String runtime value."""
-    def __init__(self, value: str):
+    """
+    String runtime value.
+    
+    The text may be a Rope (see ropes.py) while the string is built by
+    concatenation; reading value joins it.
+    """
+    def __init__(self, value: Any):
         super().__init__(value, "String")
+    
+    @property
+    def value(self) -> str:
+        text = self.text
+        if type(text) is not str:
+            text = self.text = str(text)
+        return text
+    
+    @value.setter
+    def value(self, text: Any):
+        self.text = text
 
 
 @dataclass
@@ -82,12 +98,18 @@ class FunctionValue(RuntimeValue):
     parameters: List[str]  # Parameter names
     body: Any  # AST node for function body (BlockStatement)
     closure_env: Any  # Environment where function was defined (for closures)
+    name: Optional[str] = None  # Declared name (None for anonymous functions)
+    memo: Any = None  # MemoCache when calls are memoized
+    compiled: Any = None  # Compiled body when running on the closure engine
     
-    def __init__(self, parameters: List[str], body: Any, closure_env: Any):
+    def __init__(self, parameters: List[str], body: Any, closure_env: Any, name: Optional[str] = None):
         super().__init__(None, "Function")
         self.parameters = parameters
         self.body = body
         self.closure_env = closure_env
+        self.name = name
+        self.memo = None
+        self.compiled = None
     
     def __str__(self) -> str:
         param_list = ", ".join(self.parameters)
@@ -124,8 +146,8 @@ def make_int(value: int) -> IntValue:
     return IntValue(value)
 
 
-def make_string(value: str) -> StringValue:
-    """Create string runtime value."""
+def make_string(value: Any) -> StringValue:
+    """Create string runtime value (value is a str or a Rope)."""
     return StringValue(value)
 
 
@@ -139,9 +161,11 @@ def make_unit() -> UnitValue:
     return UnitValue()
 
 
-def make_function(parameters: List[str], body: Any, closure_env: Any) -> FunctionValue:
+def make_function(
+    parameters: List[str], body: Any, closure_env: Any, name: Optional[str] = None
+) -> FunctionValue:
     """Create function runtime value."""
-    return FunctionValue(parameters, body, closure_env)
+    return FunctionValue(parameters, body, closure_env, name)
 
 
 def make_builtin(name: str, func: Callable) -> BuiltinFunctionValue:
@@ -0,0 +1,153 @@
+"""
+Tiered execution for the "tiered" engine.
+
+Every function starts in the tree-walker, which costs nothing to set up,
+and the ones that run a lot move to the closure tier (ClosureCompiler),
+which runs several times faster but must compile first. The tier
+controller counts, per FunctionDeclaration, the calls to the function and
+the loop back-edges taken inside it; once the count reaches the
+threshold the body is compiled, and the FunctionValue's compiled code
+runs every later call (Evaluator.run_function already uses it).
+
+A call that is already running keeps walking the tree, which matters for
+a main() that spends all its time in one loop. For those the controller
+does on-stack replacement at the loop header: it also counts the
+back-edges of each loop, and once a loop reaches the threshold its body
+(and nothing else) is compiled. The running loop calls the compiled
+body from its next iteration on, with the same environment, so the
+loop's counter, condition and value are unaffected. Loops nested in a
+compiled body are compiled with it.
+
+Compiling happens at the point of promotion, on the thread running the
+program: under the GIL a background compiler thread would only take
+turns with the interpreter, and compiling a body is linear in its size
+(stats() reports how long each took). Generated Python (the "py"
+engine) is not used as a tier: it works on unboxed values, while tree
+and closure code share boxed values and environments.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+from ..parser.ast_nodes import FunctionDeclaration, Statement
+from .runtime_objects import FunctionValue
+from .closure_compiler import ClosureCompiler, Code
+
+if TYPE_CHECKING:
+    from .evaluator import Evaluator
+
+
+# Calls + back-edges of a function (back-edges of a loop) before it is compiled
+TIER_THRESHOLD = 1000
+
+
+@dataclass
+class Promotion:
+    """A function or loop body moved to the closure tier."""
+    kind: str  # "function" (later calls) or "loop" (on-stack replacement)
+    name: str  # Function name (the enclosing function for a loop)
+    line: int
+    calls: int  # Calls of the function so far
+    back_edges: int  # Back-edges of the function (of the loop, for "loop")
+    at: float  # Seconds since the program started
+    compile_time: float  # Seconds spent compiling
+
+    def __str__(self) -> str:
+        what = f"{self.name}()" if self.kind == "function" else f"loop in {self.name}() (line {self.line})"
+        return (f"{what}: after {self.calls} calls, {self.back_edges} back-edges, "
+                f"at {self.at * 1000:.1f} ms (compiled in {self.compile_time * 1000:.2f} ms)")
+
+
+class TierController:
+    """Counts calls and back-edges and promotes hot code to the closure tier."""
+
+    def __init__(self, evaluator: 'Evaluator', threshold: int = TIER_THRESHOLD):
+        """Initialize controller (promotion times count from now)."""
+        self.evaluator = evaluator
+        self.threshold = threshold
+        self.compiler = ClosureCompiler(evaluator)
+        self.started = time.perf_counter()
+        # Per function body (id of its BlockStatement): declaration and counters
+        self.declarations: Dict[int, FunctionDeclaration] = {}
+        self.calls: Dict[int, int] = {}
+        self.back_edges: Dict[int, int] = {}
+        self.compiled_functions: Dict[int, Code] = {}
+        # Per loop body (id of the statement run each iteration): back-edges and compiled code
+        self.loop_edges: Dict[int, int] = {}
+        self.compiled_loops: Dict[int, Code] = {}
+        self.promotions: List[Promotion] = []
+
+    def declare(self, node: FunctionDeclaration, func: FunctionValue):
+        """A function was declared: start it in the tree tier (or the closure tier if already hot)."""
+        key = id(node.body)
+        self.declarations[key] = node
+        self.calls.setdefault(key, 0)
+        self.back_edges.setdefault(key, 0)
+        func.compiled = self.compiled_functions.get(key)
+
+    def called(self, func: FunctionValue):
+        """A call to a function still in the tree tier starts; compile it if it is hot."""
+        key = id(func.body)
+        calls = self.calls.get(key)
+        if calls is None:
+            return
+        calls = self.calls[key] = calls + 1
+        if calls + self.back_edges[key] >= self.threshold:
+            func.compiled = self.promote_function(key)
+
+    def back_edge(self, node: Statement, body: Statement) -> Optional[Code]:
+        """
+        A tree-walked loop is about to run its body again.
+
+        Returns body compiled once the loop is hot (the loop then runs the
+        code instead of walking body), else None.
+        """
+        function = self.evaluator.current_function
+        if function is not None:
+            key = id(function.body)
+            if key in self.back_edges:
+                self.back_edges[key] += 1
+        loop = id(body)
+        edges = self.loop_edges[loop] = self.loop_edges.get(loop, 0) + 1
+        if edges < self.threshold:
+            return None
+        code = self.compiled_loops.get(loop)
+        if code is None:
+            code = self.promote_loop(node, body, edges)
+        return code
+
+    def promote_function(self, key: int) -> Code:
+        """Compile a function body for its later calls."""
+        code = self.compiled_functions.get(key)
+        if code is None:
+            node = self.declarations[key]
+            start = time.perf_counter()
+            code = self.compiled_functions[key] = self.compiler.compile_function(node)
+            self.record("function", node.name, node.location.line, key, self.back_edges[key], start)
+        return code
+
+    def promote_loop(self, node: Statement, body: Statement, edges: int) -> Code:
+        """Compile the body of a running loop (on-stack replacement)."""
+        start = time.perf_counter()
+        code = self.compiled_loops[id(body)] = self.compiler.compile_statement(body)
+        function = self.evaluator.current_function
+        name = function.name if function is not None else "<top-level>"
+        key = id(function.body) if function is not None else None
+        self.record("loop", name or "<anonymous>", node.location.line, key, edges, start)
+        return code
+
+    def record(self, kind: str, name: str, line: int, key: Optional[int], back_edges: int, start: float):
+        """Add a promotion to the statistics."""
+        now = time.perf_counter()
+        self.promotions.append(Promotion(
+            kind, name, line, self.calls.get(key, 0), back_edges,
+            start - self.started, now - start
+        ))
+
+    def stats(self) -> List[Promotion]:
+        """Promotions so far, in order."""
+        return list(self.promotions)
+
+    def __repr__(self) -> str:
+        return f"TierController(threshold={self.threshold}, {len(self.promotions)} promotions)"
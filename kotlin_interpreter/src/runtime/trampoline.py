@@ -0,0 +1,431 @@
+"""
+Trampoline for the "stack" execution engine.
+
+The tree-walker evaluates a call with several nested Python calls
+(eval_call_expression, run_function, eval_statements, eval_statement,
+...), so Kotlin recursion a few thousand calls deep exhausts the Python
+stack. The stack engine keeps Kotlin call frames and the unfinished
+expressions around them on a heap stack instead:
+
+- every node whose subtree contains a call is evaluated by a generator
+  that yields the child nodes it needs and receives their values;
+- Trampoline.run() is the only Python-level loop: it pushes the generator
+  for each yielded node, sends each result to the generator below and
+  throws exceptions into it, so finally blocks (scopes, frames) and the
+  PendingJump handlers run exactly as in the tree-walker;
+- subtrees without a call cannot recurse, so they are evaluated directly
+  by the Evaluator (their Python depth is bounded by the source nesting).
+
+Kotlin recursion depth is therefore bounded only by max_depth; a call
+beyond it raises StackOverflowError with the Kotlin call stack.
+"""
+
+from types import GeneratorType
+from typing import Any, Callable, Dict, Generator, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from ..parser.ast_nodes import *
+from .runtime_objects import RuntimeValue, FunctionValue, BuiltinFunctionValue
+from .operators import LOGICAL_OPERATORS
+from .memo import MemoCache
+from .evaluator import PendingJump, TailCall, StackOverflowError
+from . import inline_cache
+
+if TYPE_CHECKING:
+    from .evaluator import Evaluator
+
+
+# A suspended evaluation: yields nodes (or generators) and returns a value
+Step = Generator[Any, RuntimeValue, RuntimeValue]
+
+
+class Trampoline:
+    """
+    Runs an Evaluator's program on a heap stack of generators.
+
+    The evaluator holds all run-time state (environments, jump flag,
+    pools, caches, governor); the trampoline only replaces the Python
+    recursion of nodes that contain calls. frames is the Kotlin call
+    stack: (function name, call site) pairs, outermost first.
+    """
+
+    def __init__(self, evaluator: 'Evaluator', max_depth: int):
+        """Initialize trampoline for an evaluator."""
+        self.evaluator = evaluator
+        self.max_depth = max_depth
+        self.frames: List[Tuple[str, Optional[CallExpression]]] = []
+        self.has_calls: Dict[int, bool] = {}  # id(node) -> its subtree contains a call
+        self.steps = {
+            BlockStatement: self.block_statement,
+            ExpressionStatement: self.expression_statement,
+            IfStatement: self.if_statement,
+            WhileStatement: self.while_statement,
+            ForStatement: self.for_statement,
+            ReturnStatement: self.return_statement,
+            DeclarationStatement: self.declaration_statement,
+            VariableDeclaration: self.variable_declaration,
+            BinaryExpression: self.binary_expression,
+            UnaryExpression: self.unary_expression,
+            CallExpression: self.call_expression,
+            AssignmentExpression: self.assignment_expression,
+            IfExpression: self.if_expression,
+            BlockExpression: self.block_expression,
+        }
+        if evaluator.profiler is not None:
+            lines = evaluator.profiler.lines
+            for kind in (ExpressionStatement, IfStatement, WhileStatement, ForStatement,
+                         ReturnStatement, DeclarationStatement):
+                self.steps[kind] = self.counting_hits(self.steps[kind], lines)
+
+    @staticmethod
+    def counting_hits(step: Callable[[Any], Step], lines: Dict[int, int]) -> Callable[[Any], Step]:
+        """Step function that also counts a hit on the statement's line (profiling)."""
+        def counted(node):
+            lines[node.location.line] += 1
+            return step(node)
+        return counted
+
+    # Driver
+
+    def run(self, item: Any) -> RuntimeValue:
+        """Evaluate a node (or run a step) to its value, without Python recursion."""
+        stack: List[Step] = []
+        value = error = None
+        while True:
+            # item: what the top step asked for (a node, a statement list or a step)
+            if item is not None:
+                kind = type(item)
+                try:
+                    if kind is GeneratorType:
+                        stack.append(item)
+                    elif kind is list:
+                        stack.append(self.statements(item))
+                    elif kind in self.steps and self.contains_call(item):
+                        stack.append(self.steps[kind](item))
+                    else:
+                        value = self.direct(item)
+                except Exception as e:
+                    error = e
+                item = None
+            if not stack:
+                if error is not None:
+                    raise error
+                return value
+            step = stack[-1]
+            try:
+                if error is not None:
+                    thrown, error = error, None
+                    # Tracebacks would grow with every frame unwound
+                    thrown.__traceback__ = None
+                    item = step.throw(thrown)
+                else:
+                    item = step.send(value)
+                value = None
+            except StopIteration as done:
+                stack.pop()
+                value = done.value
+            except Exception as e:
+                stack.pop()
+                error = e
+
+    def direct(self, node: ASTNode) -> RuntimeValue:
+        """Evaluate a call-free node with the tree-walker."""
+        evaluator = self.evaluator
+        if isinstance(node, Expression):
+            return evaluator.eval_expression(node)
+        if isinstance(node, VariableDeclaration):
+            return evaluator.eval_variable_declaration(node)
+        return evaluator.eval_statement(node)
+
+    def contains_call(self, node: ASTNode) -> bool:
+        """Check (once per node) if a subtree contains a call."""
+        key = id(node)
+        found = self.has_calls.get(key)
+        if found is None:
+            found = type(node) is CallExpression
+            for child in iter_child_nodes(node):
+                found = self.contains_call(child) or found
+            self.has_calls[key] = found
+        return found
+
+    def call(self, func: FunctionValue, args: List[RuntimeValue]) -> RuntimeValue:
+        """Call a user function (main) on the trampoline."""
+        if len(args) != len(func.parameters):
+            raise RuntimeError(f"Function expects {len(func.parameters)} arguments, got {len(args)}")
+        return self.run(self.invoke(func, func.parameters, args, None))
+
+    # Statements
+
+    def statements(self, statements: List[Statement]) -> Step:
+        """Run statements in order until one jumps."""
+        evaluator = self.evaluator
+        result = evaluator.make_unit()
+        for stmt in statements:
+            result = yield stmt
+            if evaluator.jump is not None:
+                break
+        return result
+
+    def block_statement(self, node: BlockStatement) -> Step:
+        """Block statement, with its own scope unless the scope analysis removed it."""
+        evaluator = self.evaluator
+        if not node.needs_scope:
+            evaluator.scopes_avoided += 1
+            return (yield node.statements)
+        evaluator.scopes_allocated += 1
+        previous_env = evaluator.current_env
+        block_env = evaluator.env_pool.acquire(previous_env)
+        evaluator.current_env = block_env
+        try:
+            return (yield node.statements)
+        finally:
+            evaluator.current_env = previous_env
+            evaluator.env_pool.release(block_env)
+
+    def expression_statement(self, node: ExpressionStatement) -> Step:
+        return (yield node.expression)
+
+    def if_statement(self, node: IfStatement) -> Step:
+        if (yield from self.condition(node.condition)):
+            return (yield node.then_branch)
+        if node.else_branch:
+            return (yield node.else_branch)
+        return self.evaluator.make_unit()
+
+    def while_statement(self, node: WhileStatement) -> Step:
+        """While loop; jumps are handled as in Evaluator.eval_while_statement."""
+        evaluator = self.evaluator
+        result = evaluator.make_unit()
+        while True:
+            if evaluator.governor is not None:
+                evaluator.governor.tick(node)
+            if not (yield from self.condition(node.condition)):
+                break
+            try:
+                value = yield node.body
+            except PendingJump as pending:
+                value = pending.value
+            jump = evaluator.jump
+            if jump is None:
+                result = value
+                continue
+            if type(jump) is ReturnStatement or (jump.label is not None and jump.label != node.label):
+                return value
+            evaluator.jump = None
+            if type(jump) is BreakStatement:
+                break
+        return result
+
+    def for_statement(self, node: ForStatement) -> Step:
+        """For loop; scope and jumps are handled as in Evaluator.eval_for_statement."""
+        evaluator = self.evaluator
+        start = yield node.start
+        end = yield node.end
+        step = (yield node.step) if node.step is not None else None
+        numbers = evaluator.int_range(node.kind, start, end, step)
+        evaluator.scopes_allocated += 1
+        previous_env = evaluator.current_env
+        loop_env = evaluator.env_pool.acquire(previous_env)
+        evaluator.current_env = loop_env
+        try:
+            for number in numbers:
+                if evaluator.governor is not None:
+                    evaluator.governor.tick(node)
+                loop_env.variables[node.variable] = evaluator.make_int(number)
+                try:
+                    value = yield node.body
+                except PendingJump as pending:
+                    value = pending.value
+                jump = evaluator.jump
+                if jump is None:
+                    continue
+                if type(jump) is ReturnStatement or (jump.label is not None and jump.label != node.label):
+                    return value
+                evaluator.jump = None
+                if type(jump) is BreakStatement:
+                    break
+        finally:
+            evaluator.current_env = previous_env
+            evaluator.env_pool.release(loop_env)
+        return evaluator.make_unit()
+
+    def return_statement(self, node: ReturnStatement) -> Step:
+        value = yield node.value
+        self.evaluator.jump = node
+        return value
+
+    def declaration_statement(self, node: DeclarationStatement) -> Step:
+        if isinstance(node.declaration, VariableDeclaration):
+            return (yield node.declaration)
+        raise RuntimeError(f"Unknown declaration type in statement: {type(node.declaration)}")
+
+    def variable_declaration(self, node: VariableDeclaration) -> Step:
+        value = yield node.initializer
+        self.evaluator.current_env.define(node.name, value)
+        return self.evaluator.make_unit()
+
+    # Expressions
+
+    def condition(self, node: Expression) -> Step:
+        """if/while condition as a Python bool (fused by the Evaluator when call-free)."""
+        if not self.contains_call(node):
+            return self.evaluator.eval_condition(node)
+        return self.evaluator.is_true((yield node))
+
+    def binary_expression(self, node: BinaryExpression) -> Step:
+        """Binary expression; && and || evaluate the right operand only if needed."""
+        evaluator = self.evaluator
+        left = yield node.left
+        if node.operator in LOGICAL_OPERATORS and type(left) is evaluator.boolean_type:
+            if evaluator.is_true(left) == (node.operator == "||"):
+                return left
+            right = yield node.right
+            if type(right) is evaluator.boolean_type:
+                return right
+        else:
+            right = yield node.right
+        return evaluator.binary_operation(node.operator, left, right)
+
+    def unary_expression(self, node: UnaryExpression) -> Step:
+        operand = yield node.operand
+        return self.evaluator.unary_operation(node.operator, operand)
+
+    def assignment_expression(self, node: AssignmentExpression) -> Step:
+        value = yield node.value
+        self.evaluator.current_env.set(node.target, value)
+        return value
+
+    def if_expression(self, node: IfExpression) -> Step:
+        if (yield from self.condition(node.condition)):
+            return (yield node.then_branch)
+        return (yield node.else_branch)
+
+    def block_expression(self, node: BlockExpression) -> Step:
+        """Block expression; a jump out of it abandons the expression around it."""
+        evaluator = self.evaluator
+        if not node.needs_scope:
+            evaluator.scopes_avoided += 1
+            result = yield node.statements
+        else:
+            evaluator.scopes_allocated += 1
+            previous_env = evaluator.current_env
+            block_env = evaluator.env_pool.acquire(previous_env)
+            evaluator.current_env = block_env
+            try:
+                result = yield node.statements
+            finally:
+                evaluator.current_env = previous_env
+                evaluator.env_pool.release(block_env)
+        if evaluator.jump is not None:
+            raise PendingJump(result)
+        return result
+
+    def call_expression(self, node: CallExpression) -> Step:
+        """Function call: same lookup, inline cache and checks as Evaluator.eval_call_expression."""
+        evaluator = self.evaluator
+        cache = node.cache
+        if cache is not None and cache.version == evaluator.global_env.version:
+            evaluator.call_cache_hits += 1
+            func = cache.callee
+        else:
+            evaluator.call_cache_misses += 1
+            func = evaluator.current_env.get(node.function_name)
+            cache = inline_cache.fill(node, evaluator.current_env, evaluator.global_env, func)
+
+        args = []
+        for arg in node.arguments:
+            args.append((yield arg))
+
+        if node.tail_call and func is evaluator.current_function:
+            return TailCall(args)
+
+        if cache is not None:
+            if cache.parameters is None:
+                return func.call(args)
+            parameters = cache.parameters
+        elif isinstance(func, BuiltinFunctionValue):
+            return func.call(args)
+        elif isinstance(func, FunctionValue):
+            if len(args) != len(func.parameters):
+                raise RuntimeError(f"Function expects {len(func.parameters)} arguments, got {len(args)}")
+            parameters = func.parameters
+        else:
+            raise RuntimeError(f"'{node.function_name}' is not a function")
+
+        if func.memo is not None:
+            key = MemoCache.make_key(args)
+            if key is not None:
+                cached = func.memo.get(key)
+                if cached is not None:
+                    return cached
+                result = yield self.invoke(func, parameters, args, node)
+                func.memo.put(key, result)
+                return result
+        return (yield self.invoke(func, parameters, args, node))
+
+    def invoke(self, func: FunctionValue, parameters: Sequence[str], args: List[RuntimeValue],
+               site: Optional[CallExpression]) -> Step:
+        """Run a function body as a Kotlin frame (see Evaluator.run_function)."""
+        evaluator = self.evaluator
+        frames = self.frames
+        if len(frames) >= self.max_depth:
+            raise StackOverflowError(self.max_depth, self.kotlin_stack(site))
+        frames.append((func.name or "<anonymous>", site))
+        profiler = evaluator.profiler
+        if profiler is not None:
+            profiler.enter(func.name)
+
+        pool = evaluator.env_pool
+        func_env = pool.acquire(func.closure_env)
+        func_env.variables.update(zip(parameters, args))
+        previous_env = evaluator.current_env
+        previous_function = evaluator.current_function
+        evaluator.current_function = func
+        if not func.body.needs_scope:
+            evaluator.scopes_avoided += 1
+            body_env = func_env
+        else:
+            evaluator.scopes_allocated += 1
+            body_env = pool.acquire(func_env)
+
+        try:
+            while True:
+                if evaluator.governor is not None:
+                    evaluator.governor.tick(func.body)
+                evaluator.current_env = body_env
+                try:
+                    # The statement loop is inlined: one generator less per frame
+                    result = evaluator.make_unit()
+                    for stmt in func.body.statements:
+                        result = yield stmt
+                        if evaluator.jump is not None:
+                            break
+                except PendingJump as pending:
+                    result = pending.value
+                evaluator.jump = None
+
+                if type(result) is not TailCall:
+                    return result
+
+                if len(result.args) != len(func.parameters):
+                    raise RuntimeError(
+                        f"Function expects {len(func.parameters)} arguments, got {len(result.args)}"
+                    )
+                body_env.variables.clear()
+                for param_name, arg_value in zip(func.parameters, result.args):
+                    func_env.variables[param_name] = arg_value
+        finally:
+            frames.pop()
+            if profiler is not None:
+                profiler.exit()
+            evaluator.current_env = previous_env
+            evaluator.current_function = previous_function
+            if body_env is not func_env:
+                pool.release(body_env)
+            pool.release(func_env)
+
+    def kotlin_stack(self, site: Optional[CallExpression]) -> List[Tuple[str, Optional[int]]]:
+        """Kotlin call stack, innermost first: each function with the line it is running."""
+        # A frame is at the call the next frame (or, for the last one, site) came from
+        sites = [call for _, call in self.frames[1:]] + [site]
+        return [(name, call.location.line if call is not None else None)
+                for (name, _), call in reversed(list(zip(self.frames, sites)))]
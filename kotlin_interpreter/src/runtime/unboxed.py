@@ -0,0 +1,169 @@
+"""
+Unboxed value representation.
+
+Kotlin Int, String and Boolean values are plain Python int, str (or a
+Rope, see ropes.py) and bool and Unit is the single UNIT object; only functions keep a wrapper
+(FunctionValue / BuiltinFunctionValue, or an engine's own function
+object). Used by the Evaluator in unboxed mode, the bytecode VM and the
+transpiled Python.
+
+Type checks always use type(x) is int: bool is a subclass of int.
+"""
+
+import operator
+from typing import Any
+
+from .runtime_objects import RuntimeValue, IntValue, StringValue, BooleanValue, UnitValue
+from . import operators
+from .ropes import Rope, concat
+
+
+class UnitType:
+    """The Unit value."""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __repr__(self) -> str:
+        return "Unit"
+
+
+UNIT = UnitType()
+
+TYPE_NAMES = {int: "Int", str: "String", Rope: "String", bool: "Boolean", UnitType: "Unit"}
+
+
+def type_name(value: Any) -> str:
+    """Kotlin type name of an unboxed value."""
+    name = TYPE_NAMES.get(type(value))
+    if name is not None:
+        return name
+    if isinstance(value, RuntimeValue):
+        return value.type_name
+    return "Function"
+
+
+def box(value: Any) -> RuntimeValue:
+    """Convert an unboxed value to a RuntimeValue."""
+    kind = type(value)
+    if kind is int:
+        return IntValue(value)
+    if kind is bool:
+        return BooleanValue(value)
+    if kind is str or kind is Rope:
+        return StringValue(value)
+    if value is UNIT:
+        return UnitValue()
+    if isinstance(value, RuntimeValue):
+        return value
+    return RuntimeValue(None, "Function")
+
+
+def unbox(value: RuntimeValue) -> Any:
+    """Convert a RuntimeValue to its unboxed form (functions stay wrapped)."""
+    if value.type_name in ("Int", "Boolean"):
+        return value.value
+    if value.type_name == "String":
+        return value.text
+    if value.type_name == "Unit":
+        return UNIT
+    return value
+
+
+def to_text(value: Any) -> str:
+    """Format a value like println does."""
+    kind = type(value)
+    if kind is str:
+        return value
+    if kind is Rope:
+        return str(value)
+    if kind is bool:
+        return "true" if value else "false"
+    if value is UNIT:
+        return "kotlin.Unit"
+    return str(value)
+
+
+def _divide(left: int, right: int) -> int:
+    if right == 0:
+        raise RuntimeError("Division by zero")
+    return operators.int_divide(left, right)
+
+
+def _remainder(left: int, right: int) -> int:
+    if right == 0:
+        raise RuntimeError("Modulo by zero")
+    return operators.int_remainder(left, right)
+
+
+INT_OPERATORS = {
+    "+": operator.add, "-": operator.sub, "*": operator.mul,
+    "/": _divide, "%": _remainder,
+    "==": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+}
+
+BOOLEAN_OPERATORS = {
+    "&&": operator.and_, "||": operator.or_, "==": operator.eq, "!=": operator.ne,
+}
+
+
+def binary_operation(op: str, left: Any, right: Any) -> Any:
+    """Apply a binary operator to unboxed operands."""
+    kind = type(left)
+    if kind is type(right):
+        if kind is int:
+            apply = INT_OPERATORS.get(op)
+            if apply is not None:
+                return apply(left, right)
+        elif kind is bool:
+            apply = BOOLEAN_OPERATORS.get(op)
+            if apply is not None:
+                return apply(left, right)
+        elif kind is str:
+            if op == "==":
+                return left == right
+            if op == "!=":
+                return left != right
+    if op == "+":
+        if kind is str or kind is Rope:
+            return concat(left, to_text(right))
+        if type(right) is str or type(right) is Rope:
+            return concat(to_text(left), to_text(right))
+    # Everything else, including errors, through the boxed implementation
+    return unbox(operators.binary_operation(op, box(left), box(right)))
+
+
+def unary_operation(op: str, operand: Any) -> Any:
+    """Apply a unary operator to an unboxed operand."""
+    kind = type(operand)
+    if op == "-" and kind is int:
+        return -operand
+    if op == "!" and kind is bool:
+        return not operand
+    return unbox(operators.unary_operation(op, box(operand)))
+
+
+def int_range(kind: str, start: Any, end: Any, step: Any) -> range:
+    """Range of a for loop from unboxed bounds and step (None means 1)."""
+    if type(start) is int and type(end) is int and (step is None or type(step) is int):
+        return operators.counted_range(kind, start, end, 1 if step is None else step)
+    return operators.int_range(kind, box(start), box(end), None if step is None else box(step))
+
+
+def is_true(value: Any) -> bool:
+    """Value of a condition (only Booleans are allowed)."""
+    if value is True:
+        return True
+    if value is False:
+        return False
+    raise RuntimeError(f"Type {type_name(value)} cannot be used as condition")
+
+
+def values_equal(left: Any, right: Any) -> bool:
+    """Check if two unboxed values are equal."""
+    return binary_operation("==", left, right)
@@ -4,6 +4,9 @@ from .errors import ErrorCollector, SemanticError, ErrorLevel, TypeErrors
 from .symbol_table import SymbolTable, Symbol, FunctionSymbol, Scope, SymbolKind
 from .type_system import TypeSystem, KotlinType, INT, STRING, BOOLEAN, UNIT, ANY, NOTHING
 from .collection_pass import CollectionPass
+from .type_check_pass import TypeCheckPass, FunctionAnalysis
+from .incremental import IncrementalChecker, SemanticResult
+from .parallel import ParallelChecker, GlobalSnapshot
 
 __all__ = [
     'ErrorCollector',
@@ -24,4 +27,10 @@ __all__ = [
     'ANY',
     'NOTHING',
     'CollectionPass',
+    'TypeCheckPass',
+    'FunctionAnalysis',
+    'IncrementalChecker',
+    'SemanticResult',
+    'ParallelChecker',
+    'GlobalSnapshot',
 ]
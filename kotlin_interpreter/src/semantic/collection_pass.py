@@ -7,6 +7,7 @@ into symbol table before type checking. This allows forward references.
 
 from typing import Dict
 from ..parser.ast_nodes import *
+from ..analysis.tail_calls import TailCallAnalysis
 from .symbol_table import SymbolTable, Symbol, FunctionSymbol, SymbolKind
 from .errors import ErrorCollector, TypeErrors
 from .type_system import TypeSystem
@@ -21,12 +22,18 @@ class CollectionPass:
     2. Registers global variables
     3. Creates function parameter symbols
     4. Validates type annotations
+    5. Checks 'tailrec' functions for tail calls
+    
+    With check_bodies=False only signatures are collected; the incremental
+    checker runs the 'tailrec' body check per function instead.
     """
     
-    def __init__(self, symbol_table: SymbolTable, error_collector: ErrorCollector):
+    def __init__(self, symbol_table: SymbolTable, error_collector: ErrorCollector,
+                 check_bodies: bool = True):
         """Initialize collection pass."""
         self.symbols = symbol_table
         self.errors = error_collector
+        self.check_bodies = check_bodies
     
     def collect(self, program: Program):
         """Collect declarations from program."""
@@ -80,6 +87,25 @@ class CollectionPass:
             self.errors.errors.append(
                 TypeErrors.redefinition(node.name, "function", node.location)
             )
+        
+        if node.is_tailrec and self.check_bodies:
+            self.check_tailrec(node)
+    
+    def check_tailrec(self, node: FunctionDeclaration):
+        """Warn about tailrec functions that cannot be optimized."""
+        info = TailCallAnalysis().analyze_function(node)
+        if not info.has_tail_calls:
+            self.errors.warning(
+                f"Function '{node.name}' is marked as tail-recursive but no tail calls are found",
+                node.location,
+                "Remove the 'tailrec' modifier"
+            )
+        for call in info.non_tail_calls:
+            self.errors.warning(
+                f"Recursive call to '{node.name}' is not a tail call",
+                call.location,
+                "Return the recursive call directly, e.g. with an accumulator parameter"
+            )
     
     def visit_variable_declaration(self, node: VariableDeclaration):
         """Collect variable declaration."""
@@ -0,0 +1,204 @@
+"""
+Incremental semantic analysis.
+
+Re-running CollectionPass and TypeCheckPass on every edit re-checks every
+function body. IncrementalChecker keeps the result of each function body
+and re-checks a function only when:
+- its own declaration changed (parameters, return type, body), or
+- a global name its body resolved changed signature (a callee's parameter
+  or return types, a global variable's type or mutability, or a name that
+  became defined or undefined).
+
+Signatures and global variable initializers are cheap and always
+re-collected. A function that only moved (lines inserted above it) is
+reused: its fingerprint uses positions relative to the 'fun' keyword and
+cached diagnostics are shifted to the new position.
+"""
+
+from dataclasses import dataclass, field, fields, replace
+from typing import Dict, List, Optional, Tuple
+
+from ..lexer.token import SourceLocation
+from ..parser.ast_nodes import *
+from .symbol_table import SymbolTable, Symbol
+from .errors import ErrorCollector, SemanticError
+from .type_system import KotlinType, ANY
+from .collection_pass import CollectionPass
+from .type_check_pass import TypeCheckPass, FunctionAnalysis, describe_symbol
+
+
+def relative_location(location: SourceLocation, base: SourceLocation) -> tuple:
+    """Position relative to base: line offset, and column offset on base's line."""
+    line = location.line - base.line
+    column = location.column - base.column if line == 0 else location.column
+    return (line, column)
+
+
+def shift_location(location: SourceLocation, old_base: SourceLocation,
+                   new_base: SourceLocation) -> SourceLocation:
+    """Move a location that was relative to old_base so it is relative to new_base."""
+    line, column = relative_location(location, old_base)
+    if line == 0:
+        column += new_base.column
+    return SourceLocation(new_base.line + line, column, location.filename)
+
+
+def fingerprint(node: FunctionDeclaration) -> tuple:
+    """
+    Structural fingerprint of a function, independent of its absolute position.
+
+    Annotation fields (ANNOTATION metadata: tail calls, loop plans, quickened
+    handlers, inline caches) are skipped, so analyses and runs do not change it.
+    """
+    base = node.location
+
+    def visit(value):
+        if isinstance(value, SourceLocation):
+            return relative_location(value, base)
+        if isinstance(value, (ASTNode, Parameter)):
+            return (type(value).__name__,) + tuple(
+                visit(getattr(value, f.name)) for f in fields(value)
+                if not f.metadata.get("runtime")
+            )
+        if isinstance(value, list):
+            return tuple(visit(item) for item in value)
+        return (type(value).__name__, value)
+
+    return visit(node)
+
+
+def function_keys(program: Program) -> List[Tuple[str, FunctionDeclaration]]:
+    """Functions with unique keys: the name, or 'name#n' for the n-th redefinition."""
+    keys = []
+    seen: Dict[str, int] = {}
+    for decl in program.declarations:
+        if isinstance(decl, FunctionDeclaration):
+            seen[decl.name] = seen.get(decl.name, 0) + 1
+            count = seen[decl.name]
+            keys.append((decl.name if count == 1 else f"{decl.name}#{count}", decl))
+    return keys
+
+
+@dataclass
+class CacheEntry:
+    """Cached analysis of one function."""
+    fingerprint: tuple
+    analysis: FunctionAnalysis
+
+
+@dataclass
+class SemanticResult:
+    """Result of analyzing a program (full or incremental)."""
+    program: Program
+    symbol_table: SymbolTable
+    errors: ErrorCollector
+    functions: Dict[str, FunctionAnalysis] = field(default_factory=dict)
+    rechecked: List[str] = field(default_factory=list)
+    reused: List[str] = field(default_factory=list)
+    global_types: Dict[int, KotlinType] = field(default_factory=dict)
+    _types: Optional[Dict[int, KotlinType]] = field(default=None, repr=False)
+
+    def type_of(self, node: Expression) -> KotlinType:
+        """Type of an expression of this program (Any if unknown)."""
+        if self._types is None:
+            self._types = dict(self.global_types)
+            keys = iter(self.functions)
+            for decl in self.program.declarations:
+                if isinstance(decl, FunctionDeclaration):
+                    analysis = self.functions[next(keys)]
+                    expressions = [n for n in walk(decl.body) if isinstance(n, Expression)]
+                    for expr, expr_type in zip(expressions, analysis.types):
+                        self._types[id(expr)] = expr_type
+        return self._types.get(id(node), ANY)
+
+    def summary(self) -> str:
+        """One-line description of the work done."""
+        return (f"{len(self.rechecked)} function(s) re-checked, "
+                f"{len(self.reused)} reused from cache")
+
+
+class IncrementalChecker:
+    """
+    Semantic analysis that reuses per-function results between runs.
+
+    Usage:
+        checker = IncrementalChecker()
+        result = checker.check(program)        # first run: checks everything
+        result = checker.check(edited_program) # later runs: only what changed
+
+    The result has the same diagnostics, in the same order, as a fresh
+    checker on the same program.
+    """
+
+    def __init__(self):
+        """Initialize with an empty cache."""
+        self.cache: Dict[str, CacheEntry] = {}
+
+    def invalidate(self):
+        """Drop all cached results."""
+        self.cache.clear()
+
+    def check(self, program: Program) -> SemanticResult:
+        """Analyze program, re-checking only functions affected by changes."""
+        symbols = SymbolTable()
+        errors = ErrorCollector()
+        CollectionPass(symbols, errors, check_bodies=False).collect(program)
+
+        type_checker = TypeCheckPass(symbols, errors, check_tailrec=True)
+        for decl in program.declarations:
+            if isinstance(decl, VariableDeclaration):
+                type_checker.check_global(decl)
+
+        result = SemanticResult(program, symbols, errors)
+        result.global_types = dict(type_checker.expression_types)
+
+        cache: Dict[str, CacheEntry] = {}
+        for key, decl in function_keys(program):
+            entry = self.cache.get(key)
+            current = fingerprint(decl)
+            if entry is not None and self._is_valid(entry, current, decl, symbols, type_checker):
+                analysis = self._rebase(entry.analysis, decl.location)
+                errors.errors.extend(analysis.errors)
+                errors.warnings.extend(analysis.warnings)
+                result.reused.append(key)
+            else:
+                analysis = type_checker.check_function(decl)
+                result.rechecked.append(key)
+
+            cache[key] = CacheEntry(current, analysis)
+            result.functions[key] = analysis
+
+        self.cache = cache
+        return result
+
+    def _is_valid(self, entry: CacheEntry, current: tuple, decl: FunctionDeclaration,
+                  symbols: SymbolTable, type_checker: TypeCheckPass) -> bool:
+        """Check if a cached analysis still applies to decl."""
+        if entry.fingerprint != current:
+            return False
+        if entry.analysis.signature != type_checker.signature_of(decl):
+            return False
+        for name, signature in entry.analysis.dependencies.items():
+            if describe_symbol(symbols.global_scope.lookup_local(name)) != signature:
+                return False
+        return True
+
+    def _rebase(self, analysis: FunctionAnalysis, location: SourceLocation) -> FunctionAnalysis:
+        """Copy of a cached analysis moved to a new function position."""
+        old = analysis.location
+        if old == location:
+            return analysis
+
+        def move_error(error: SemanticError) -> SemanticError:
+            return replace(error, location=shift_location(error.location, old, location))
+
+        def move_symbol(symbol: Symbol) -> Symbol:
+            return replace(symbol, location=shift_location(symbol.location, old, location))
+
+        return replace(
+            analysis,
+            location=location,
+            locals=[move_symbol(symbol) for symbol in analysis.locals],
+            errors=[move_error(error) for error in analysis.errors],
+            warnings=[move_error(error) for error in analysis.warnings],
+        )
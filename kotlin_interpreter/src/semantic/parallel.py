@@ -0,0 +1,128 @@
+"""
+Process-parallel semantic analysis.
+
+Once CollectionPass has collected the global signatures, checking one
+function body does not depend on any other body (see TypeCheckPass). The
+analysis is split in two phases:
+1. serial: collect signatures and check global initializers, which infer
+   the types of global variables;
+2. parallel: check function bodies in worker processes. Each worker gets a
+   frozen snapshot of the global scope and a contiguous chunk of
+   functions, and returns one FunctionAnalysis per function.
+
+Results are merged in declaration order, so diagnostics are identical to
+a serial run whatever the number of workers.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from ..parser.ast_nodes import *
+from .symbol_table import SymbolTable, Symbol
+from .errors import ErrorCollector
+from .collection_pass import CollectionPass
+from .type_check_pass import TypeCheckPass, FunctionAnalysis
+from .incremental import SemanticResult, function_keys
+
+
+@dataclass(frozen=True)
+class GlobalSnapshot:
+    """Read-only copy of the global scope sent to worker processes."""
+    symbols: Tuple[Symbol, ...]
+
+    @classmethod
+    def capture(cls, symbol_table: SymbolTable) -> 'GlobalSnapshot':
+        """Snapshot the global scope after collection and global inference."""
+        return cls(tuple(symbol_table.global_scope.symbols.values()))
+
+    def to_symbol_table(self) -> SymbolTable:
+        """Rebuild a symbol table with the snapshot's global scope."""
+        table = SymbolTable()
+        table.global_scope.symbols = {symbol.name: symbol for symbol in self.symbols}
+        return table
+
+
+def check_functions(snapshot: GlobalSnapshot,
+                    functions: List[FunctionDeclaration]) -> List[FunctionAnalysis]:
+    """Check a chunk of function bodies against a global snapshot (runs in a worker)."""
+    checker = TypeCheckPass(snapshot.to_symbol_table(), ErrorCollector(), check_tailrec=True)
+    return [checker.check_function(func) for func in functions]
+
+
+class ParallelChecker:
+    """
+    Semantic analysis with function bodies checked in a process pool.
+
+    Small programs are checked serially: starting processes and pickling
+    the AST costs more than checking a couple of thousand functions. If the pool
+    cannot be used (no multiprocessing support, a worker dies), the bodies
+    are checked serially as well.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, min_functions: int = 2000,
+                 chunks_per_worker: int = 4):
+        """
+        Initialize checker.
+
+        Args:
+            max_workers: Worker processes (default: CPU count)
+            min_functions: Fewest functions for which processes are used
+            chunks_per_worker: Chunks per worker, to balance uneven bodies
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_functions = min_functions
+        self.chunks_per_worker = chunks_per_worker
+        self.used_processes = False
+
+    def check(self, program: Program) -> SemanticResult:
+        """Analyze program; diagnostics are in the same order as a serial run."""
+        symbols = SymbolTable()
+        errors = ErrorCollector()
+        CollectionPass(symbols, errors, check_bodies=False).collect(program)
+
+        type_checker = TypeCheckPass(symbols, errors, check_tailrec=True)
+        for decl in program.declarations:
+            if isinstance(decl, VariableDeclaration):
+                type_checker.check_global(decl)
+
+        result = SemanticResult(program, symbols, errors)
+        result.global_types = dict(type_checker.expression_types)
+
+        keyed = function_keys(program)
+        functions = [decl for _, decl in keyed]
+        analyses = None
+        self.used_processes = False
+        if self.max_workers > 1 and len(functions) >= self.min_functions:
+            analyses = self._check_in_processes(GlobalSnapshot.capture(symbols), functions)
+        if analyses is None:
+            analyses = [type_checker.check_function(func) for func in functions]
+        else:
+            for analysis in analyses:
+                errors.errors.extend(analysis.errors)
+                errors.warnings.extend(analysis.warnings)
+
+        for (key, _), analysis in zip(keyed, analyses):
+            result.functions[key] = analysis
+            result.rechecked.append(key)
+        return result
+
+    def _check_in_processes(self, snapshot: GlobalSnapshot,
+                            functions: List[FunctionDeclaration]) -> Optional[List[FunctionAnalysis]]:
+        """Fan chunks out to worker processes; None if the pool is unusable."""
+        chunk_count = min(len(functions), self.max_workers * self.chunks_per_worker)
+        size = -(-len(functions) // chunk_count)
+        chunks = [functions[i:i + size] for i in range(0, len(functions), size)]
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [pool.submit(check_functions, snapshot, chunk) for chunk in chunks]
+                # Collect in submission order: deterministic merge
+                results = [future.result() for future in futures]
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            return None
+
+        self.used_processes = True
+        return [analysis for chunk_result in results for analysis in chunk_result]
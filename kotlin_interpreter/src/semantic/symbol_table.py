@@ -127,7 +127,7 @@ class SymbolTable:
     def _add_builtins(self):
         """Add built-in functions to global scope."""
         # println function - accepts any type, returns Unit
-        println_loc = SourceLocation("<builtin>", 0, 0)
+        println_loc = SourceLocation(0, 0, "<builtin>")
         println = FunctionSymbol(
             name="println",
             parameter_types=["Any"],  # Simplified: accepts any single argument
@@ -137,7 +137,7 @@ class SymbolTable:
         self.global_scope.define(println)
         
         # print function - similar to println but no newline
-        print_loc = SourceLocation("<builtin>", 0, 0)
+        print_loc = SourceLocation(0, 0, "<builtin>")
         print_fn = FunctionSymbol(
             name="print",
             parameter_types=["Any"],
@@ -0,0 +1,442 @@
+"""
+Type checking pass.
+
+Second pass of semantic analysis: checks global variable initializers and
+function bodies against the signatures collected by CollectionPass, and
+records the type of every expression.
+
+Function bodies are checked independently of each other: a body only sees
+the global scope (signatures and global variables) plus its own locals.
+The names it resolves in the global scope are recorded as dependencies, so
+results can be reused while those signatures do not change (see
+IncrementalChecker).
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from ..parser.ast_nodes import *
+from .symbol_table import SymbolTable, Symbol, FunctionSymbol, SymbolKind
+from .errors import ErrorCollector, SemanticError, TypeErrors
+from .type_system import TypeSystem, KotlinType, INT, STRING, BOOLEAN, UNIT, ANY
+from .collection_pass import CollectionPass
+
+
+# Built-ins that accept zero or one argument of any type
+VARIADIC_BUILTINS = {"println", "print"}
+
+
+def describe_symbol(symbol: Optional[Symbol]) -> Optional[str]:
+    """Signature of a global symbol as seen by function bodies (None if undefined)."""
+    if symbol is None:
+        return None
+    return repr(symbol)
+
+
+@dataclass
+class FunctionAnalysis:
+    """Result of checking one function body."""
+    name: str
+    signature: str
+    location: SourceLocation
+    locals: List[Symbol] = field(default_factory=list)  # Parameters and locals, in order
+    types: List[KotlinType] = field(default_factory=list)  # Expression types in pre-order
+    errors: List[SemanticError] = field(default_factory=list)
+    warnings: List[SemanticError] = field(default_factory=list)
+    dependencies: Dict[str, Optional[str]] = field(default_factory=dict)
+
+    def __repr__(self) -> str:
+        return (f"FunctionAnalysis({self.signature}: {len(self.errors)} errors, "
+                f"{len(self.warnings)} warnings, depends on {sorted(self.dependencies)})")
+
+
+class TypeCheckPass:
+    """
+    Checks expressions and statements.
+
+    Reports:
+    - undefined variables and functions
+    - wrong argument counts and argument type mismatches
+    - operators applied to incompatible types
+    - assignments to 'val' and parameters
+    - initializer, assignment and return type mismatches
+    - redefinition of a local in the same block
+
+    Types that cannot be determined are Any, which never causes an error.
+    """
+
+    def __init__(self, symbol_table: SymbolTable, error_collector: ErrorCollector,
+                 check_tailrec: bool = False):
+        """
+        Initialize type checking pass.
+
+        Args:
+            symbol_table: Symbol table filled by CollectionPass
+            error_collector: Collector for diagnostics
+            check_tailrec: Also run the 'tailrec' checks for each function
+                (when CollectionPass ran with check_bodies=False)
+        """
+        self.symbols = symbol_table
+        self.errors = error_collector
+        self.check_tailrec = check_tailrec
+        self.expression_types: Dict[int, KotlinType] = {}
+        self.functions: Dict[int, FunctionAnalysis] = {}
+
+        # State of the function being checked
+        self.function_name: Optional[str] = None
+        self.return_type: Optional[KotlinType] = None
+        self.locals: List[Symbol] = []
+        self.dependencies: Dict[str, Optional[str]] = {}
+
+    def check(self, program: Program):
+        """Check global initializers (in order), then all function bodies."""
+        for decl in program.declarations:
+            if isinstance(decl, VariableDeclaration):
+                self.check_global(decl)
+        for decl in program.declarations:
+            if isinstance(decl, FunctionDeclaration):
+                self.check_function(decl)
+
+    def type_of(self, node: Expression) -> KotlinType:
+        """Type recorded for an expression (Any if unknown)."""
+        return self.expression_types.get(id(node), ANY)
+
+    # Declarations
+
+    def check_global(self, node: VariableDeclaration):
+        """Check a global variable initializer and infer its type."""
+        self.return_type = None
+        self.locals = []
+        self.dependencies = {}
+        var_type = self.check_initializer(node)
+
+        symbol = self.symbols.global_scope.lookup_local(node.name)
+        if symbol is not None and symbol.location is node.location and node.type is None:
+            symbol.type = var_type.name
+
+    def signature_of(self, node: FunctionDeclaration) -> str:
+        """Signature of a function declaration, as used by its own body."""
+        return repr(FunctionSymbol(
+            node.name,
+            [self.resolve_type_name(param.type).name for param in node.parameters],
+            self.declared_return_type(node).name,
+            node.location
+        ))
+
+    def check_function(self, node: FunctionDeclaration) -> FunctionAnalysis:
+        """Check a function body; diagnostics go to the collector and the result."""
+        analysis = FunctionAnalysis(node.name, self.signature_of(node), node.location)
+
+        outer_errors = self.errors
+        self.errors = ErrorCollector()
+        self.function_name = node.name
+        self.return_type = self.declared_return_type(node)
+        self.locals = []
+        self.dependencies = {}
+
+        if self.check_tailrec and node.is_tailrec:
+            CollectionPass(self.symbols, self.errors).check_tailrec(node)
+
+        self.symbols.enter_scope(f"function {node.name}")
+        try:
+            for param in node.parameters:
+                symbol = Symbol(
+                    name=param.name,
+                    kind=SymbolKind.PARAMETER,
+                    type=self.resolve_type_name(param.type).name,
+                    is_mutable=False,
+                    location=param.location
+                )
+                self.define_local(symbol)
+            self.check_block(node.body.statements, f"body of {node.name}")
+        finally:
+            self.symbols.exit_scope()
+            collected = self.errors
+            self.errors = outer_errors
+
+        analysis.locals = self.locals
+        analysis.dependencies = self.dependencies
+        analysis.errors = collected.errors
+        analysis.warnings = collected.warnings
+        analysis.types = [
+            self.type_of(child) for child in walk(node.body) if isinstance(child, Expression)
+        ]
+        self.errors.errors.extend(analysis.errors)
+        self.errors.warnings.extend(analysis.warnings)
+        self.functions[id(node)] = analysis
+        self.function_name = None
+        self.return_type = None
+        return analysis
+
+    def declared_return_type(self, node: FunctionDeclaration) -> KotlinType:
+        """Declared return type (Unit if omitted or unknown)."""
+        if node.return_type is None:
+            return UNIT
+        return TypeSystem.get_type(node.return_type) or UNIT
+
+    def resolve_type_name(self, name: str) -> KotlinType:
+        """Type for an annotation (Any if unknown; reported by CollectionPass)."""
+        return TypeSystem.get_type(name) or ANY
+
+    def check_initializer(self, node: VariableDeclaration) -> KotlinType:
+        """Check a variable initializer against its annotation; return variable type."""
+        value_type = self.check_expression(node.initializer) if node.initializer else None
+
+        if node.type is not None:
+            declared = TypeSystem.get_type(node.type)
+            if declared is None:
+                return ANY
+            if value_type not in (None, ANY) and not TypeSystem.can_assign(declared, value_type):
+                self.errors.errors.append(
+                    TypeErrors.type_mismatch(declared.name, value_type.name, node.initializer.location)
+                )
+            return declared
+
+        return value_type if value_type is not None else ANY
+
+    def define_local(self, symbol: Symbol):
+        """Define a parameter or local variable in the current scope."""
+        if not self.symbols.define(symbol):
+            kind = "parameter" if symbol.kind == SymbolKind.PARAMETER else "variable"
+            self.errors.errors.append(TypeErrors.redefinition(symbol.name, kind, symbol.location))
+            return
+        self.locals.append(symbol)
+
+    def lookup(self, name: str) -> Optional[Symbol]:
+        """Resolve a name, recording dependencies on global symbols."""
+        symbol = self.symbols.lookup(name)
+        if self.return_type is not None:
+            if symbol is None or self.symbols.global_scope.lookup_local(name) is symbol:
+                self.dependencies[name] = describe_symbol(symbol)
+        return symbol
+
+    # Statements
+
+    def check_block(self, statements: List[Statement], scope_name: str) -> KotlinType:
+        """Check statements in a new scope; return the block's value type."""
+        self.symbols.enter_scope(scope_name)
+        try:
+            result = UNIT
+            for stmt in statements:
+                result = self.check_statement(stmt)
+            return result
+        finally:
+            self.symbols.exit_scope()
+
+    def check_statement(self, node: Statement) -> KotlinType:
+        """Check a statement; return the type of its value."""
+        if isinstance(node, BlockStatement):
+            self.check_block(node.statements, "block")
+            return ANY
+        elif isinstance(node, ExpressionStatement):
+            return self.check_expression(node.expression)
+        elif isinstance(node, IfStatement):
+            self.check_condition(node.condition)
+            self.check_statement(node.then_branch)
+            if node.else_branch:
+                self.check_statement(node.else_branch)
+            return ANY
+        elif isinstance(node, WhileStatement):
+            self.check_condition(node.condition)
+            self.check_statement(node.body)
+            return ANY
+        elif isinstance(node, ForStatement):
+            self.check_for(node)
+            return UNIT
+        elif isinstance(node, ReturnStatement):
+            self.check_return(node)
+            return ANY
+        elif isinstance(node, DeclarationStatement):
+            decl = node.declaration
+            if isinstance(decl, VariableDeclaration):
+                if decl.type is not None and not TypeSystem.is_valid_type(decl.type):
+                    self.errors.error(
+                        f"Unknown type: {decl.type}",
+                        decl.location,
+                        "Use Int, String, Boolean, or Unit"
+                    )
+                var_type = self.check_initializer(decl)
+                self.define_local(Symbol(
+                    name=decl.name,
+                    kind=SymbolKind.VARIABLE,
+                    type=var_type.name,
+                    is_mutable=decl.is_mutable,
+                    location=decl.location
+                ))
+            return UNIT
+        return ANY
+
+    def check_for(self, node: ForStatement):
+        """Bounds and step must be Int; the loop variable is a val Int of the loop's scope."""
+        for bound in (node.start, node.end, node.step):
+            if bound is None:
+                continue
+            bound_type = self.check_expression(bound)
+            if bound_type != INT and bound_type != ANY:
+                self.errors.errors.append(TypeErrors.type_mismatch("Int", bound_type.name, bound.location))
+        self.symbols.enter_scope("for")
+        try:
+            self.define_local(Symbol(
+                name=node.variable,
+                kind=SymbolKind.VARIABLE,
+                type=INT.name,
+                is_mutable=False,
+                location=node.location
+            ))
+            self.check_statement(node.body)
+        finally:
+            self.symbols.exit_scope()
+
+    def check_condition(self, node: Expression):
+        """Conditions must be Boolean."""
+        cond_type = self.check_expression(node)
+        if not TypeSystem.can_assign(BOOLEAN, cond_type) and cond_type != ANY:
+            self.errors.errors.append(TypeErrors.type_mismatch("Boolean", cond_type.name, node.location))
+
+    def check_return(self, node: ReturnStatement):
+        """Returned value must match the function's return type."""
+        if self.return_type is None:
+            return
+        value_type = self.check_expression(node.value) if node.value else UNIT
+        if value_type == ANY or self.return_type == ANY:
+            return
+        if not TypeSystem.can_assign(self.return_type, value_type):
+            self.errors.errors.append(TypeErrors.return_type_mismatch(
+                self.return_type.name, value_type.name, self.function_name, node.location
+            ))
+
+    # Expressions
+
+    def check_expression(self, node: Expression) -> KotlinType:
+        """Check an expression and record its type."""
+        result = self.infer_expression(node)
+        self.expression_types[id(node)] = result
+        return result
+
+    def infer_expression(self, node: Expression) -> KotlinType:
+        """Compute the type of an expression, reporting errors."""
+        if isinstance(node, LiteralExpression):
+            return TypeSystem.get_type(node.literal_type) or ANY
+
+        elif isinstance(node, IdentifierExpression):
+            symbol = self.lookup(node.name)
+            if symbol is None:
+                self.errors.errors.append(TypeErrors.undefined_variable(node.name, node.location))
+                return ANY
+            if isinstance(symbol, FunctionSymbol):
+                return ANY
+            return TypeSystem.get_type(symbol.type) or ANY
+
+        elif isinstance(node, BinaryExpression):
+            return self.check_binary(node)
+
+        elif isinstance(node, UnaryExpression):
+            operand = self.check_expression(node.operand)
+            if operand == ANY:
+                return INT if node.operator == "-" else BOOLEAN
+            result = TypeSystem.get_unary_result_type(node.operator, operand)
+            if result is None:
+                self.errors.errors.append(
+                    TypeErrors.invalid_operator(node.operator, operand.name, None, node.location)
+                )
+                return ANY
+            return result
+
+        elif isinstance(node, CallExpression):
+            return self.check_call(node)
+
+        elif isinstance(node, AssignmentExpression):
+            return self.check_assignment(node)
+
+        elif isinstance(node, IfExpression):
+            self.check_condition(node.condition)
+            then_type = self.check_expression(node.then_branch)
+            else_type = self.check_expression(node.else_branch)
+            return TypeSystem.common_supertype(then_type, else_type)
+
+        elif isinstance(node, BlockExpression):
+            return self.check_block(node.statements, "block expression")
+
+        elif isinstance(node, StringTemplateExpression):
+            for part in node.parts:
+                self.check_expression(part)
+            return STRING
+
+        return ANY
+
+    def check_binary(self, node: BinaryExpression) -> KotlinType:
+        """Check a binary operation."""
+        left = self.check_expression(node.left)
+        right = self.check_expression(node.right)
+        op = node.operator
+
+        if left == ANY or right == ANY:
+            if op == "+":
+                if left == STRING or right == STRING:
+                    return STRING
+                return ANY
+            if op in ["-", "*", "/", "%"]:
+                return INT
+            if op in ["==", "!=", "<", "<=", ">", ">=", "&&", "||"]:
+                return BOOLEAN
+            return ANY
+
+        result = TypeSystem.get_binary_result_type(left, op, right)
+        if result is None:
+            self.errors.errors.append(
+                TypeErrors.invalid_operator(op, left.name, right.name, node.location)
+            )
+            return ANY
+        return result
+
+    def check_call(self, node: CallExpression) -> KotlinType:
+        """Check a function call."""
+        arg_types = [self.check_expression(arg) for arg in node.arguments]
+        symbol = self.lookup(node.function_name)
+
+        if symbol is None:
+            self.errors.errors.append(TypeErrors.undefined_function(node.function_name, node.location))
+            return ANY
+        if not isinstance(symbol, FunctionSymbol):
+            # Function value stored in a variable: not typed in this subset
+            return ANY
+
+        if node.function_name in VARIADIC_BUILTINS and symbol.location.filename == "<builtin>":
+            if len(arg_types) > 1:
+                self.errors.errors.append(TypeErrors.wrong_argument_count(
+                    1, len(arg_types), node.function_name, node.location
+                ))
+            return UNIT
+
+        if len(arg_types) != len(symbol.parameter_types):
+            self.errors.errors.append(TypeErrors.wrong_argument_count(
+                len(symbol.parameter_types), len(arg_types), node.function_name, node.location
+            ))
+        else:
+            for arg, arg_type, param_type_name in zip(node.arguments, arg_types, symbol.parameter_types):
+                param_type = TypeSystem.get_type(param_type_name) or ANY
+                if arg_type != ANY and not TypeSystem.can_assign(param_type, arg_type):
+                    self.errors.errors.append(
+                        TypeErrors.type_mismatch(param_type.name, arg_type.name, arg.location)
+                    )
+
+        return TypeSystem.get_type(symbol.return_type) or ANY
+
+    def check_assignment(self, node: AssignmentExpression) -> KotlinType:
+        """Check an assignment to a variable."""
+        value_type = self.check_expression(node.value)
+        symbol = self.lookup(node.target)
+
+        if symbol is None:
+            self.errors.errors.append(TypeErrors.undefined_variable(node.target, node.location))
+            return value_type
+        if not symbol.is_mutable:
+            self.errors.errors.append(TypeErrors.immutable_assignment(node.target, node.location))
+            return value_type
+
+        target_type = TypeSystem.get_type(symbol.type) or ANY
+        if value_type != ANY and not TypeSystem.can_assign(target_type, value_type):
+            self.errors.errors.append(
+                TypeErrors.type_mismatch(target_type.name, value_type.name, node.value.location)
+            )
+        return value_type
@@ -0,0 +1,13 @@
+"""Bytecode compiler and virtual machine."""
+
+from .opcodes import Op
+from .compiler import BytecodeCompiler, CodeObject, Module, UNIT
+from .machine import VM
+from .disassembler import disassemble, disassemble_module
+
+__all__ = [
+    'Op',
+    'BytecodeCompiler', 'CodeObject', 'Module', 'UNIT',
+    'VM',
+    'disassemble', 'disassemble_module',
+]
@@ -0,0 +1,498 @@
+"""
+Bytecode compiler: AST → CodeObjects.
+
+Each function is compiled once into a CodeObject: integer instructions in
+an array('i'), a constant pool and a local-slot layout. Variables are
+resolved at compile time:
+- parameters and locals get slots in the function's frame (a new slot per
+  declaration, so shadowing needs no scope objects at run time);
+- every other name is a global slot, shared by functions, global
+  variables and the builtins. Names that are never declared get a slot
+  too; reading it raises "Undefined variable" when (and if) it runs.
+
+Values are plain Python objects: int, str, bool, UNIT and function
+objects. Like the tree-walker, a function without a return produces the
+value of its last statement.
+
+&& and || short-circuit with AND_JUMP / OR_JUMP. Conditions of if, while
+and if-expressions are compiled by branch_if_false: an Int comparison
+there is a single COMPARE_JUMP, and '&&' of such conditions a chain of
+them, so no Boolean is pushed.
+
+break and continue are plain jumps to the end or start of their loop. A
+for loop keeps a Python range iterator in a hidden frame slot and steps
+it with FOR_ITER. A
+jump out of a block expression first pops the operands the enclosing
+expressions have pushed (counted at compile time in FunctionCompiler.depth).
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from ..parser.ast_nodes import *
+from ..analysis.tail_calls import TailCallAnalysis
+from ..runtime.unboxed import UNIT
+from .opcodes import Op, OPERAND_COUNTS, BINARY_OPS, UNARY_OPS, COMPARISON_OPS
+
+
+BUILTINS = ("println", "print")
+
+
+def is_condition(node: Expression) -> bool:
+    """Check if an expression always produces a Boolean (or raises): comparisons, && and ||."""
+    return (isinstance(node, BinaryExpression)
+            and node.operator in ("==", "!=", "<", "<=", ">", ">=", "&&", "||"))
+
+
+@dataclass
+class CodeObject:
+    """Compiled code of one function (or of the global initializers)."""
+    name: str
+    parameters: List[str]
+    code: array = field(default_factory=lambda: array('i'))
+    constants: List[Any] = field(default_factory=list)
+    local_names: List[str] = field(default_factory=list)  # Slot -> declared name
+    lines: Dict[int, int] = field(default_factory=dict)  # Offset -> source line
+
+    @property
+    def local_count(self) -> int:
+        """Number of frame slots (parameters first)."""
+        return len(self.local_names)
+
+    def __repr__(self) -> str:
+        return f"CodeObject({self.name}, {len(self.code)} ints, {self.local_count} locals)"
+
+
+@dataclass
+class LoopContext:
+    """A loop being compiled: target of break/continue."""
+    label: Optional[str]
+    start: int
+    depth: int  # Operands on the stack when the loop starts
+    breaks: List[int] = field(default_factory=list)  # Jumps to patch with the loop end
+
+
+@dataclass
+class Module:
+    """A compiled program."""
+    functions: Dict[str, CodeObject]
+    init: CodeObject  # Global initializers, in declaration order
+    global_names: List[str]  # Global slot -> name
+
+    def global_slot(self, name: str) -> Optional[int]:
+        """Slot of a global name, if any."""
+        try:
+            return self.global_names.index(name)
+        except ValueError:
+            return None
+
+    @property
+    def size(self) -> int:
+        """Total number of instruction ints."""
+        return len(self.init.code) + sum(len(code.code) for code in self.functions.values())
+
+
+class FunctionCompiler:
+    """Emits the bytecode of one CodeObject."""
+
+    def __init__(self, code: CodeObject, module: 'BytecodeCompiler', function_name: Optional[str]):
+        """Initialize with an empty scope holding the parameters."""
+        self.code = code
+        self.module = module
+        self.function_name = function_name
+        self.scopes: List[Dict[str, int]] = [{}]
+        self.loops: List[LoopContext] = []
+        self.depth = 0  # Operands pushed by the expressions being compiled
+        self.constant_index: Dict[Any, int] = {}
+        self.line = 0
+        self.last_line = 0
+        for name in code.parameters:
+            self.declare(name)
+
+    # Emission
+
+    def emit(self, op: Op, *operands: int) -> int:
+        """Append an instruction; return its offset."""
+        offset = len(self.code.code)
+        if self.line != self.last_line:
+            self.code.lines[offset] = self.line
+            self.last_line = self.line
+        self.code.code.append(op)
+        self.code.code.extend(operands)
+        return offset
+
+    def patch(self, offset: int, target: int):
+        """Set the target of the jump at offset."""
+        self.code.code[offset + 1] = target
+
+    def here(self) -> int:
+        """Offset of the next instruction."""
+        return len(self.code.code)
+
+    def constant(self, value: Any) -> int:
+        """Index of a value in the constant pool (type-exact dedup)."""
+        key = (type(value), value)
+        if key not in self.constant_index:
+            self.constant_index[key] = len(self.code.constants)
+            self.code.constants.append(value)
+        return self.constant_index[key]
+
+    def raise_error(self, message: str):
+        """Emit code raising RuntimeError(message) when run."""
+        self.emit(Op.RAISE, self.constant(message))
+
+    # Scopes
+
+    def declare(self, name: str) -> int:
+        """Give a declaration a new frame slot in the innermost scope."""
+        slot = len(self.code.local_names)
+        self.code.local_names.append(name)
+        self.scopes[-1][name] = slot
+        return slot
+
+    def resolve(self, name: str) -> Optional[int]:
+        """Frame slot of a visible local, or None for globals."""
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def load(self, name: str):
+        """Emit a variable read."""
+        slot = self.resolve(name)
+        if slot is not None:
+            self.emit(Op.LOAD_LOCAL, slot)
+        else:
+            self.emit(Op.LOAD_GLOBAL, self.module.global_slot(name))
+
+    # Statements
+
+    def compile_body(self, statements: List[Statement]):
+        """Compile a function body: its value is the last statement's."""
+        self.statements(statements, value=True)
+        self.emit(Op.RETURN)
+
+    def statements(self, statements: List[Statement], value: bool):
+        """Compile statements; with value=True leave the last one's value."""
+        for stmt in statements[:-1]:
+            self.statement(stmt, value=False)
+        if statements:
+            self.statement(statements[-1], value)
+        elif value:
+            self.emit(Op.LOAD_CONST, self.constant(UNIT))
+
+    def statement(self, node: Statement, value: bool):
+        """Compile a statement; with value=True leave its value on the stack."""
+        self.line = node.location.line
+        if isinstance(node, ExpressionStatement):
+            self.expression(node.expression)
+            if not value:
+                self.emit(Op.POP)
+        elif isinstance(node, DeclarationStatement):
+            self.declaration(node.declaration)
+            if value:
+                self.emit(Op.LOAD_CONST, self.constant(UNIT))
+        elif isinstance(node, BlockStatement):
+            self.block(node.statements, value)
+        elif isinstance(node, IfStatement):
+            self.if_statement(node, value)
+        elif isinstance(node, WhileStatement):
+            self.while_statement(node, value)
+        elif isinstance(node, ForStatement):
+            self.for_statement(node)
+            if value:
+                self.emit(Op.LOAD_CONST, self.constant(UNIT))
+        elif isinstance(node, ReturnStatement):
+            self.return_statement(node)
+        elif isinstance(node, (BreakStatement, ContinueStatement)):
+            self.jump_statement(node)
+        else:
+            self.raise_error(f"Unknown statement type: {type(node)}")
+            if value:
+                self.emit(Op.LOAD_CONST, self.constant(UNIT))
+
+    def block(self, statements: List[Statement], value: bool):
+        """Compile a block in a new compile-time scope."""
+        self.scopes.append({})
+        self.statements(statements, value)
+        self.scopes.pop()
+
+    def declaration(self, node: Declaration):
+        """Compile a local variable declaration."""
+        if not isinstance(node, VariableDeclaration):
+            self.raise_error(f"Unknown declaration type in statement: {type(node)}")
+            return
+        if node.initializer:
+            self.expression(node.initializer)
+        else:
+            self.emit(Op.LOAD_CONST, self.constant(UNIT))
+        # Declared after the initializer: 'val x = x + 1' reads the outer x
+        self.emit(Op.STORE_LOCAL, self.declare(node.name))
+
+    def if_statement(self, node: IfStatement, value: bool):
+        """Compile if/else with jumps."""
+        jumps_else = self.branch_if_false(node.condition)
+        self.statement(node.then_branch, value)
+        jump_end = self.emit(Op.JUMP, 0)
+        for jump in jumps_else:
+            self.patch(jump, self.here())
+        if node.else_branch:
+            self.statement(node.else_branch, value)
+        elif value:
+            self.emit(Op.LOAD_CONST, self.constant(UNIT))
+        self.patch(jump_end, self.here())
+
+    def while_statement(self, node: WhileStatement, value: bool):
+        """Compile a while loop; its value (if needed) is the last body value."""
+        result = None
+        if value:
+            result = self.declare("$while")
+            self.emit(Op.LOAD_CONST, self.constant(UNIT))
+            self.emit(Op.STORE_LOCAL, result)
+
+        start = self.here()
+        jumps_end = self.branch_if_false(node.condition)
+        loop = LoopContext(node.label, start, self.depth)
+        self.loops.append(loop)
+        self.statement(node.body, value)
+        self.loops.pop()
+        if value:
+            # Skipped by break and continue: the value of the last completed iteration
+            self.emit(Op.STORE_LOCAL, result)
+        self.emit(Op.LOOP, start)
+        for jump in jumps_end + loop.breaks:
+            self.patch(jump, self.here())
+        if value:
+            self.emit(Op.LOAD_LOCAL, result)
+
+    def for_statement(self, node: ForStatement):
+        """Compile a for loop: a range iterator in a hidden slot, advanced by FOR_ITER."""
+        self.expression(node.start)
+        self.depth += 1
+        self.expression(node.end)
+        self.depth += 1
+        if node.step is not None:
+            self.expression(node.step)
+        else:
+            self.emit(Op.LOAD_CONST, self.constant(1))
+        self.depth -= 2
+        self.emit(Op.RANGE, self.constant(node.kind))
+
+        # The variable is declared after the bounds: 'for (i in 0 until i)' reads the outer i
+        self.scopes.append({})
+        iterator = self.declare("$for")
+        self.emit(Op.STORE_LOCAL, iterator)
+        variable = self.declare(node.variable)
+        start = self.here()
+        exit_jump = self.emit(Op.FOR_ITER, 0, iterator)
+        self.emit(Op.STORE_LOCAL, variable)
+        loop = LoopContext(node.label, start, self.depth)
+        self.loops.append(loop)
+        self.statement(node.body, False)
+        self.loops.pop()
+        self.emit(Op.LOOP, start)
+        for jump in [exit_jump] + loop.breaks:
+            self.patch(jump, self.here())
+        self.scopes.pop()
+
+    def return_statement(self, node: ReturnStatement):
+        """Compile a return (self-calls in tail position reuse the frame)."""
+        if node.value:
+            call = node.value
+            if (isinstance(call, CallExpression) and call.tail_call
+                    and self.resolve(call.function_name) is None
+                    and call.function_name == self.function_name):
+                self.arguments(call.arguments)
+                self.line = node.location.line
+                self.emit(Op.TAIL_CALL, self.module.global_slot(call.function_name), len(call.arguments))
+            else:
+                self.expression(node.value)
+        else:
+            self.emit(Op.LOAD_CONST, self.constant(UNIT))
+        self.emit(Op.RETURN)
+
+    def jump_statement(self, node: Statement):
+        """Compile break/continue as a jump (the parser guarantees a target loop)."""
+        loop = next(loop for loop in reversed(self.loops)
+                    if node.label is None or loop.label == node.label)
+        for _ in range(self.depth - loop.depth):
+            self.emit(Op.POP)
+        if isinstance(node, BreakStatement):
+            loop.breaks.append(self.emit(Op.JUMP, 0))
+        else:
+            self.emit(Op.LOOP, loop.start)
+
+    # Expressions
+
+    def expression(self, node: Expression):
+        """Compile an expression, leaving its value on the stack."""
+        if isinstance(node, LiteralExpression):
+            self.literal(node)
+        elif isinstance(node, IdentifierExpression):
+            self.load(node.name)
+        elif isinstance(node, BinaryExpression):
+            self.expression(node.left)
+            self.depth += 1
+            # && / ||: the right operand only runs if the left one does not decide
+            short_circuit = None
+            if node.operator == "&&":
+                short_circuit = self.emit(Op.AND_JUMP, 0)
+            elif node.operator == "||":
+                short_circuit = self.emit(Op.OR_JUMP, 0)
+            self.expression(node.right)
+            self.depth -= 1
+            op = BINARY_OPS.get(node.operator)
+            if op is None:
+                self.raise_error(f"Unknown binary operator: {node.operator}")
+            else:
+                self.emit(op)
+            if short_circuit is not None:
+                self.patch(short_circuit, self.here())
+        elif isinstance(node, UnaryExpression):
+            self.expression(node.operand)
+            op = UNARY_OPS.get(node.operator)
+            if op is None:
+                self.raise_error(f"Unknown unary operator: {node.operator}")
+            else:
+                self.emit(op)
+        elif isinstance(node, CallExpression):
+            self.call(node)
+        elif isinstance(node, AssignmentExpression):
+            self.expression(node.value)
+            self.emit(Op.DUP)
+            slot = self.resolve(node.target)
+            if slot is not None:
+                self.emit(Op.STORE_LOCAL, slot)
+            else:
+                self.emit(Op.STORE_GLOBAL, self.module.global_slot(node.target))
+        elif isinstance(node, IfExpression):
+            jumps_else = self.branch_if_false(node.condition)
+            self.expression(node.then_branch)
+            jump_end = self.emit(Op.JUMP, 0)
+            for jump in jumps_else:
+                self.patch(jump, self.here())
+            self.expression(node.else_branch)
+            self.patch(jump_end, self.here())
+        elif isinstance(node, BlockExpression):
+            self.block(node.statements, value=True)
+        else:
+            self.raise_error(f"Unknown expression type: {type(node)}")
+            self.emit(Op.LOAD_CONST, self.constant(UNIT))
+
+    def branch_if_false(self, node: Expression) -> List[int]:
+        """Compile a condition as jumps taken when it is false; return them for patching."""
+        if isinstance(node, BinaryExpression):
+            op = BINARY_OPS.get(node.operator)
+            if op in COMPARISON_OPS:
+                self.expression(node.left)
+                self.depth += 1
+                self.expression(node.right)
+                self.depth -= 1
+                return [self.emit(Op.COMPARE_JUMP, 0, op)]
+            if op == Op.AND and is_condition(node.left) and is_condition(node.right):
+                # Both sides are Booleans (or raise): no operand check needed
+                return self.branch_if_false(node.left) + self.branch_if_false(node.right)
+        self.expression(node)
+        return [self.emit(Op.JUMP_IF_FALSE, 0)]
+
+    def literal(self, node: LiteralExpression):
+        """Compile a literal to a constant."""
+        if node.literal_type in ("Int", "String", "Boolean"):
+            self.emit(Op.LOAD_CONST, self.constant(node.value))
+        elif node.literal_type == "Unit":
+            self.emit(Op.LOAD_CONST, self.constant(UNIT))
+        else:
+            self.raise_error(f"Unknown literal type: {node.literal_type}")
+            self.emit(Op.LOAD_CONST, self.constant(UNIT))
+
+    def call(self, node: CallExpression):
+        """Compile a call; known functions are called through their global slot."""
+        name = node.function_name
+        argc = len(node.arguments)
+        if self.resolve(name) is None and name in self.module.callables:
+            self.arguments(node.arguments)
+            self.emit(Op.CALL_GLOBAL, self.module.global_slot(name), argc)
+            return
+        # Locals, global variables, undefined names: look the callee up first
+        self.load(name)
+        self.depth += 1
+        self.arguments(node.arguments)
+        self.depth -= 1
+        self.emit(Op.CALL_VALUE, self.constant(name), argc)
+
+    def arguments(self, arguments: List[Expression]):
+        """Push call arguments in order."""
+        for arg in arguments:
+            self.expression(arg)
+            self.depth += 1
+        self.depth -= len(arguments)
+
+
+class BytecodeCompiler:
+    """
+    Compiles a Program into a Module.
+
+    The global slots start with the builtins, then user functions, then
+    global variables and finally any undeclared names referenced.
+    """
+
+    def __init__(self):
+        """Initialize compiler."""
+        self.global_names: List[str] = []
+        self.global_index: Dict[str, int] = {}
+        self.callables: set = set()
+
+    def global_slot(self, name: str) -> int:
+        """Slot of a global name, allocated on first use."""
+        if name not in self.global_index:
+            self.global_index[name] = len(self.global_names)
+            self.global_names.append(name)
+        return self.global_index[name]
+
+    def compile(self, program: Program) -> Module:
+        """Compile all functions and the global initializers."""
+        TailCallAnalysis().analyze(program)
+
+        self.global_names = []
+        self.global_index = {}
+        for name in BUILTINS:
+            self.global_slot(name)
+
+        functions = [decl for decl in program.declarations if isinstance(decl, FunctionDeclaration)]
+        variables = [decl for decl in program.declarations if isinstance(decl, VariableDeclaration)]
+        for func in functions:
+            self.global_slot(func.name)
+        for var in variables:
+            self.global_slot(var.name)
+        # A global variable named like a function replaces it once initialized
+        self.callables = (set(BUILTINS) | {func.name for func in functions}) - {var.name for var in variables}
+
+        compiled: Dict[str, CodeObject] = {}
+        for func in functions:
+            # Later declarations with the same name win, as in the Evaluator
+            compiled[func.name] = self.compile_function(func)
+
+        init = CodeObject("<globals>", [])
+        emitter = FunctionCompiler(init, self, None)
+        for var in variables:
+            emitter.line = var.location.line
+            if var.initializer:
+                emitter.expression(var.initializer)
+            else:
+                emitter.emit(Op.LOAD_CONST, emitter.constant(UNIT))
+            emitter.emit(Op.DEFINE_GLOBAL, self.global_slot(var.name))
+        emitter.emit(Op.LOAD_CONST, emitter.constant(UNIT))
+        emitter.emit(Op.RETURN)
+
+        return Module(compiled, init, list(self.global_names))
+
+    def compile_function(self, func: FunctionDeclaration) -> CodeObject:
+        """Compile one function."""
+        code = CodeObject(func.name, [param.name for param in func.parameters])
+        emitter = FunctionCompiler(code, self, func.name)
+        emitter.line = func.location.line
+        # Body locals get their own scope, so they may shadow parameters
+        emitter.scopes.append({})
+        emitter.compile_body(func.body.statements)
+        return code
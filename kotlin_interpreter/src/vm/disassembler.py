@@ -0,0 +1,71 @@
+"""
+Disassembler for debugging compiled code.
+
+Prints one instruction per line: source line (when it changes), offset,
+opcode name, operands and what they refer to.
+"""
+
+from typing import List, Optional
+
+from .opcodes import Op, OPERAND_COUNTS
+from .compiler import CodeObject, Module
+
+
+JUMPS = (Op.JUMP, Op.JUMP_IF_FALSE, Op.LOOP, Op.AND_JUMP, Op.OR_JUMP, Op.COMPARE_JUMP, Op.FOR_ITER)
+LOCAL_OPS = (Op.LOAD_LOCAL, Op.STORE_LOCAL)
+GLOBAL_OPS = (Op.LOAD_GLOBAL, Op.STORE_GLOBAL, Op.DEFINE_GLOBAL, Op.CALL_GLOBAL, Op.TAIL_CALL)
+
+
+def disassemble(code: CodeObject, global_names: Optional[List[str]] = None) -> str:
+    """Disassemble one CodeObject."""
+    params = ", ".join(code.parameters)
+    lines = [f"== {code.name}({params}): {len(code.code)} ints, {code.local_count} locals =="]
+    targets = {
+        code.code[offset + 1] for offset, op in _instructions(code) if op in JUMPS
+    }
+
+    for offset, op in _instructions(code):
+        operands = list(code.code[offset + 1:offset + 1 + OPERAND_COUNTS[op]])
+        line = code.lines.get(offset)
+        prefix = f"{line:>4}" if line is not None else "    "
+        marker = ">>" if offset in targets else "  "
+        text = f"{prefix} {marker} {offset:>4} {op.name:<14} {' '.join(map(str, operands)):<8}"
+        comment = _describe(code, op, operands, global_names)
+        lines.append(f"{text} ({comment})" if comment else text.rstrip())
+    return "\n".join(lines)
+
+
+def disassemble_module(module: Module) -> str:
+    """Disassemble the global initializers and every function."""
+    parts = [disassemble(module.init, module.global_names)]
+    parts.extend(disassemble(code, module.global_names) for code in module.functions.values())
+    return "\n\n".join(parts)
+
+
+def _instructions(code: CodeObject):
+    """Yield (offset, opcode) pairs."""
+    offset = 0
+    while offset < len(code.code):
+        op = Op(code.code[offset])
+        yield offset, op
+        offset += 1 + OPERAND_COUNTS[op]
+
+
+def _describe(code: CodeObject, op: Op, operands: List[int], global_names: Optional[List[str]]) -> str:
+    """Human-readable meaning of an instruction's operands."""
+    if op in (Op.LOAD_CONST, Op.RAISE, Op.RANGE):
+        return repr(code.constants[operands[0]])
+    if op in LOCAL_OPS:
+        return code.local_names[operands[0]]
+    if op in GLOBAL_OPS:
+        name = global_names[operands[0]] if global_names else f"global {operands[0]}"
+        return f"{name}, {operands[1]} args" if len(operands) == 2 else name
+    if op == Op.CALL_VALUE:
+        return f"{code.constants[operands[0]]}, {operands[1]} args"
+    if op == Op.COMPARE_JUMP:
+        return f"to {operands[0]} unless {Op(operands[1]).name}"
+    if op == Op.FOR_ITER:
+        return f"to {operands[0]} when {code.local_names[operands[1]]} is done"
+    if op in JUMPS:
+        return f"to {operands[0]}"
+    return ""
@@ -0,0 +1,458 @@
+"""
+Bytecode virtual machine.
+
+Runs a compiled Module in a single dispatch loop. Calls do not recurse
+in Python: the caller's state (code, pc, locals, operand stack) is pushed
+on a frame stack and the callee's frame is a preallocated list of slots,
+so recursion depth is bounded by max_depth instead of the Python stack.
+
+Int and Boolean operations run inline; everything else (string
+concatenation, comparisons of other types, errors) goes through the
+operator code shared with the Evaluator, so results and error messages
+are the same.
+"""
+
+import time
+from typing import Any, List, Optional
+
+from ..parser.ast_nodes import Program
+from ..runtime.runtime_objects import RuntimeValue
+from ..runtime.operators import binary_operation, unary_operation, int_divide, int_remainder, INT_COMPARISONS
+from ..runtime.unboxed import box, unbox, to_text, type_name, int_range
+from ..runtime.evaluator import ExecutionTimeout, DEADLINE_CHECK_INTERVAL
+from ..runtime.output import OutputSink
+from .opcodes import Op, COMPARISON_OPS
+from .compiler import BytecodeCompiler, CodeObject, Module, UNIT, BUILTINS
+
+
+class Missing:
+    """Marker for global slots that hold no value yet."""
+
+    def __repr__(self) -> str:
+        return "<undefined>"
+
+
+MISSING = Missing()
+
+
+class Function:
+    """A user function at run time."""
+
+    __slots__ = ("code", "name", "ops", "constants", "argc", "local_count")
+
+    def __init__(self, code: CodeObject):
+        self.code = code
+        self.name = code.name
+        # Execute from a list: indexing it is faster than indexing the array
+        self.ops = list(code.code)
+        self.constants = code.constants
+        self.argc = len(code.parameters)
+        self.local_count = code.local_count
+
+    def __str__(self) -> str:
+        return f"<function({', '.join(self.code.parameters)})>"
+
+
+class Builtin:
+    """A builtin function at run time."""
+
+    __slots__ = ("name", "func")
+
+    def __init__(self, name: str, func):
+        self.name = name
+        self.func = func
+
+    def __str__(self) -> str:
+        return f"<builtin {self.name}>"
+
+
+OPERATOR_SYMBOLS = {
+    Op.ADD: "+", Op.SUB: "-", Op.MUL: "*", Op.DIV: "/", Op.MOD: "%",
+    Op.EQ: "==", Op.NE: "!=", Op.LT: "<", Op.LE: "<=", Op.GT: ">", Op.GE: ">=",
+    Op.AND: "&&", Op.OR: "||", Op.NEG: "-", Op.NOT: "!",
+}
+
+
+# COMPARE_JUMP operand -> Int comparison
+INT_COMPARE = {int(op): INT_COMPARISONS[OPERATOR_SYMBOLS[op]] for op in COMPARISON_OPS}
+
+
+def slow_binary(op: int, left: Any, right: Any) -> Any:
+    """Binary operator through the shared implementation."""
+    return unbox(binary_operation(OPERATOR_SYMBOLS[op], box(left), box(right)))
+
+
+def slow_unary(op: int, operand: Any) -> Any:
+    """Unary operator through the shared implementation."""
+    return unbox(unary_operation(OPERATOR_SYMBOLS[op], box(operand)))
+
+
+class VM:
+    """
+    Stack-based bytecode interpreter.
+
+    Same interface as the Evaluator for running a program: evaluate()
+    compiles and runs it, returning main's result (as a RuntimeValue).
+    """
+
+    def __init__(self, time_limit: Optional[float] = None, max_depth: int = 100_000,
+                 output: Optional[OutputSink] = None):
+        """
+        Initialize VM.
+
+        Args:
+            time_limit: Abort with ExecutionTimeout after this many seconds
+            max_depth: Most nested calls before RecursionError
+            output: Sink for print/println (default: buffered, to sys.stdout)
+        """
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.output = output if output is not None else OutputSink()
+        self.module: Optional[Module] = None
+        self.globals: List[Any] = []
+        self.deadline: Optional[float] = None
+        self.deadline_ticks = DEADLINE_CHECK_INTERVAL
+
+    # Entry points
+
+    def evaluate(self, program: Program) -> RuntimeValue:
+        """Compile and run a program."""
+        return box(self.execute(BytecodeCompiler().compile(program)))
+
+    def execute(self, module: Module) -> Any:
+        """Run a compiled module: global initializers, then main() (flushes the output)."""
+        try:
+            return self.run_module(module)
+        finally:
+            self.output.flush()
+
+    def run_module(self, module: Module) -> Any:
+        """Run a compiled module's global initializers, then main()."""
+        self.module = module
+        if self.time_limit is not None:
+            self.deadline = time.monotonic() + self.time_limit
+
+        self.globals = [MISSING] * len(module.global_names)
+        self.globals[0] = Builtin("println", self._println)
+        self.globals[1] = Builtin("print", self._print)
+        for name, code in module.functions.items():
+            self.globals[module.global_slot(name)] = Function(code)
+
+        result = self.run(Function(module.init), [])
+        main_slot = module.global_slot("main")
+        if main_slot is not None and isinstance(self.globals[main_slot], Function):
+            result = self.call(self.globals[main_slot], [])
+        return result
+
+    def call(self, func: Any, args: List[Any]) -> Any:
+        """Call a function value with arguments."""
+        if type(func) is Builtin:
+            return func.func(args)
+        if func.argc != len(args):
+            raise RuntimeError(f"Function expects {func.argc} arguments, got {len(args)}")
+        return self.run(func, args)
+
+    # Builtins
+
+    def _println(self, args: List[Any]) -> Any:
+        if args:
+            self.output.write(to_text(args[0]) + "\n")
+        else:
+            self.output.write("\n")
+        return UNIT
+
+    def _print(self, args: List[Any]) -> Any:
+        if args:
+            self.output.write(to_text(args[0]))
+        return UNIT
+
+    # Dispatch loop
+
+    def check_deadline(self):
+        """Raise ExecutionTimeout once the time limit has passed (reads the clock rarely)."""
+        self.deadline_ticks -= 1
+        if self.deadline_ticks > 0:
+            return
+        self.deadline_ticks = DEADLINE_CHECK_INTERVAL
+        if time.monotonic() > self.deadline:
+            raise ExecutionTimeout(f"Time limit of {self.time_limit}s exceeded")
+
+    def run(self, func: Function, args: List[Any]) -> Any:
+        """Execute func until it returns; nested calls run in the same loop."""
+        globals_ = self.globals
+        frames = []
+        timed = self.deadline is not None
+        max_depth = self.max_depth
+
+        ops = func.ops
+        constants = func.constants
+        slots = args + [None] * (func.local_count - len(args))
+        stack = []
+        pc = 0
+
+        while True:
+            op = ops[pc]
+
+            if op == 2:  # LOAD_LOCAL
+                stack.append(slots[ops[pc + 1]])
+                pc += 2
+            elif op == 1:  # LOAD_CONST
+                stack.append(constants[ops[pc + 1]])
+                pc += 2
+            elif op == 3:  # STORE_LOCAL
+                slots[ops[pc + 1]] = stack.pop()
+                pc += 2
+            elif op == 33:  # COMPARE_JUMP
+                right = stack.pop()
+                left = stack.pop()
+                compare = ops[pc + 2]
+                if type(left) is int and type(right) is int:
+                    result = left < right if compare == 17 else INT_COMPARE[compare](left, right)
+                else:
+                    result = slow_binary(compare, left, right)
+                pc = pc + 3 if result else ops[pc + 1]
+            elif op == 31:  # JUMP_IF_FALSE
+                value = stack.pop()
+                if value is True:
+                    pc += 2
+                elif value is False:
+                    pc = ops[pc + 1]
+                else:
+                    raise RuntimeError(f"Type {type_name(value)} cannot be used as condition")
+            elif op == 10:  # ADD
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is int and type(right) is int:
+                    stack[-1] = left + right
+                else:
+                    stack[-1] = slow_binary(op, left, right)
+                pc += 1
+            elif op == 11:  # SUB
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is int and type(right) is int:
+                    stack[-1] = left - right
+                else:
+                    stack[-1] = slow_binary(op, left, right)
+                pc += 1
+            elif op == 17:  # LT
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is int and type(right) is int:
+                    stack[-1] = left < right
+                else:
+                    stack[-1] = slow_binary(op, left, right)
+                pc += 1
+            elif op == 40:  # CALL_GLOBAL
+                callee = globals_[ops[pc + 1]]
+                argc = ops[pc + 2]
+                if argc:
+                    call_args = stack[-argc:]
+                    del stack[-argc:]
+                else:
+                    call_args = []
+                pc += 3
+                if type(callee) is not Function:
+                    stack.append(self._call_other(callee, call_args, ops[pc - 2]))
+                    continue
+                if callee.argc != argc:
+                    raise RuntimeError(f"Function expects {callee.argc} arguments, got {argc}")
+                if len(frames) >= max_depth:
+                    raise RecursionError("maximum recursion depth exceeded")
+                if timed:
+                    self.check_deadline()
+                frames.append((func, ops, constants, slots, stack, pc))
+                func = callee
+                ops = callee.ops
+                constants = callee.constants
+                slots = call_args + [None] * (callee.local_count - argc)
+                stack = []
+                pc = 0
+            elif op == 43:  # RETURN
+                value = stack.pop()
+                if not frames:
+                    return value
+                func, ops, constants, slots, stack, pc = frames.pop()
+                stack.append(value)
+            elif op == 32:  # LOOP
+                if timed:
+                    self.check_deadline()
+                pc = ops[pc + 1]
+            elif op == 30:  # JUMP
+                pc = ops[pc + 1]
+            elif op == 37:  # FOR_ITER
+                number = next(slots[ops[pc + 2]], None)
+                if number is None:
+                    pc = ops[pc + 1]
+                else:
+                    stack.append(number)
+                    pc += 3
+            elif op == 12:  # MUL
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is int and type(right) is int:
+                    stack[-1] = left * right
+                else:
+                    stack[-1] = slow_binary(op, left, right)
+                pc += 1
+            elif op == 15:  # EQ
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is int and type(right) is int:
+                    stack[-1] = left == right
+                else:
+                    stack[-1] = slow_binary(op, left, right)
+                pc += 1
+            elif op == 16:  # NE
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is int and type(right) is int:
+                    stack[-1] = left != right
+                else:
+                    stack[-1] = slow_binary(op, left, right)
+                pc += 1
+            elif op == 18:  # LE
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is int and type(right) is int:
+                    stack[-1] = left <= right
+                else:
+                    stack[-1] = slow_binary(op, left, right)
+                pc += 1
+            elif op == 19:  # GT
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is int and type(right) is int:
+                    stack[-1] = left > right
+                else:
+                    stack[-1] = slow_binary(op, left, right)
+                pc += 1
+            elif op == 20:  # GE
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is int and type(right) is int:
+                    stack[-1] = left >= right
+                else:
+                    stack[-1] = slow_binary(op, left, right)
+                pc += 1
+            elif op == 7:  # POP
+                stack.pop()
+                pc += 1
+            elif op == 42:  # TAIL_CALL
+                callee = globals_[ops[pc + 1]]
+                argc = ops[pc + 2]
+                if callee is not func:
+                    # Name rebound since compilation: ordinary call
+                    if argc:
+                        call_args = stack[-argc:]
+                        del stack[-argc:]
+                    else:
+                        call_args = []
+                    stack.append(self._call_other(callee, call_args, ops[pc + 1]))
+                    pc += 3
+                    continue
+                if callee.argc != argc:
+                    raise RuntimeError(f"Function expects {callee.argc} arguments, got {argc}")
+                if timed:
+                    self.check_deadline()
+                call_args = stack[-argc:] if argc else []
+                slots = call_args + [None] * (func.local_count - argc)
+                stack = []
+                pc = 0
+            elif op == 4:  # LOAD_GLOBAL
+                value = globals_[ops[pc + 1]]
+                if value is MISSING:
+                    raise RuntimeError(f"Undefined variable: '{self.module.global_names[ops[pc + 1]]}'")
+                stack.append(value)
+                pc += 2
+            elif op == 8:  # DUP
+                stack.append(stack[-1])
+                pc += 1
+            elif op == 14:  # MOD
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is int and type(right) is int and right:
+                    # Kotlin remainder; same as Python's for non-negative operands
+                    stack[-1] = left % right if left >= 0 and right > 0 else int_remainder(left, right)
+                else:
+                    stack[-1] = slow_binary(op, left, right)
+                pc += 1
+            elif op == 13:  # DIV
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is int and type(right) is int and right:
+                    stack[-1] = left // right if left >= 0 and right > 0 else int_divide(left, right)
+                else:
+                    stack[-1] = slow_binary(op, left, right)
+                pc += 1
+            elif op == 34:  # AND_JUMP
+                pc = ops[pc + 1] if stack[-1] is False else pc + 2
+            elif op == 35:  # OR_JUMP
+                pc = ops[pc + 1] if stack[-1] is True else pc + 2
+            elif op == 21 or op == 22:  # AND, OR
+                right = stack.pop()
+                stack[-1] = slow_binary(op, stack[-1], right)
+                pc += 1
+            elif op == 23:  # NEG
+                value = stack[-1]
+                stack[-1] = -value if type(value) is int else slow_unary(op, value)
+                pc += 1
+            elif op == 24:  # NOT
+                value = stack[-1]
+                stack[-1] = (not value) if type(value) is bool else slow_unary(op, value)
+                pc += 1
+            elif op == 5:  # STORE_GLOBAL
+                slot = ops[pc + 1]
+                if globals_[slot] is MISSING:
+                    raise RuntimeError(f"Undefined variable: '{self.module.global_names[slot]}'")
+                globals_[slot] = stack.pop()
+                pc += 2
+            elif op == 6:  # DEFINE_GLOBAL
+                globals_[ops[pc + 1]] = stack.pop()
+                pc += 2
+            elif op == 41:  # CALL_VALUE
+                argc = ops[pc + 2]
+                if argc:
+                    call_args = stack[-argc:]
+                    del stack[-argc:]
+                else:
+                    call_args = []
+                callee = stack.pop()
+                pc += 3
+                if type(callee) is Function:
+                    if callee.argc != argc:
+                        raise RuntimeError(f"Function expects {callee.argc} arguments, got {argc}")
+                    if len(frames) >= max_depth:
+                        raise RecursionError("maximum recursion depth exceeded")
+                    if timed:
+                        self.check_deadline()
+                    frames.append((func, ops, constants, slots, stack, pc))
+                    func = callee
+                    ops = callee.ops
+                    constants = callee.constants
+                    slots = call_args + [None] * (callee.local_count - argc)
+                    stack = []
+                    pc = 0
+                elif type(callee) is Builtin:
+                    stack.append(callee.func(call_args))
+                else:
+                    raise RuntimeError(f"'{constants[ops[pc - 2]]}' is not a function")
+            elif op == 36:  # RANGE
+                step = stack.pop()
+                end = stack.pop()
+                stack[-1] = iter(int_range(constants[ops[pc + 1]], stack[-1], end, step))
+                pc += 2
+            elif op == 50:  # RAISE
+                raise RuntimeError(constants[ops[pc + 1]])
+            else:
+                raise RuntimeError(f"Bad opcode {op} at {pc} in {func.name}")
+
+    def _call_other(self, callee: Any, args: List[Any], slot: int) -> Any:
+        """Call a global that is not a plain user function (builtin, rebound name)."""
+        if type(callee) is Builtin:
+            return callee.func(args)
+        if type(callee) is Function:
+            return self.call(callee, args)
+        if callee is MISSING:
+            raise RuntimeError(f"Undefined variable: '{self.module.global_names[slot]}'")
+        raise RuntimeError(f"'{self.module.global_names[slot]}' is not a function")
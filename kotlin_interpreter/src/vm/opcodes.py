@@ -0,0 +1,80 @@
+"""
+Opcodes of the bytecode VM.
+
+Instructions are stored as integers in an array('i'): the opcode followed
+by its operands (OPERAND_COUNTS). Jump targets are absolute offsets.
+"""
+
+from enum import IntEnum
+
+
+class Op(IntEnum):
+    """VM instruction set (stack machine)."""
+    # Constants and variables
+    LOAD_CONST = 1      # k        push constants[k]
+    LOAD_LOCAL = 2      # slot     push locals[slot]
+    STORE_LOCAL = 3     # slot     locals[slot] = pop()
+    LOAD_GLOBAL = 4     # g        push globals[g] (error if undefined)
+    STORE_GLOBAL = 5    # g        globals[g] = pop() (error if undefined)
+    DEFINE_GLOBAL = 6   # g        globals[g] = pop()
+    POP = 7             #          drop top of stack
+    DUP = 8             #          duplicate top of stack
+
+    # Operators
+    ADD = 10
+    SUB = 11
+    MUL = 12
+    DIV = 13
+    MOD = 14
+    EQ = 15
+    NE = 16
+    LT = 17
+    LE = 18
+    GT = 19
+    GE = 20
+    AND = 21
+    OR = 22
+    NEG = 23
+    NOT = 24
+
+    # Control flow
+    JUMP = 30           # target
+    JUMP_IF_FALSE = 31  # target   pop condition, jump if false
+    LOOP = 32           # target   backward jump (checks the time limit)
+    COMPARE_JUMP = 33   # target cmp   pop right, left; jump unless 'left cmp right' (cmp: EQ..GE)
+    AND_JUMP = 34       # target   jump if top is false, keeping it (short-circuit &&)
+    OR_JUMP = 35        # target   jump if top is true, keeping it (short-circuit ||)
+    RANGE = 36          # k        pop step, end, start; push an iterator over the Ints of a for loop
+                        #          (constants[k]: until, .. or downTo)
+    FOR_ITER = 37       # target slot   push next(locals[slot]), or jump to target when exhausted
+
+    # Calls
+    CALL_GLOBAL = 40    # g argc   call globals[g] with argc arguments
+    CALL_VALUE = 41     # k argc   call the value below the arguments (constants[k]: its name)
+    TAIL_CALL = 42      # g argc   self-call in tail position: reuse the frame
+    RETURN = 43         #          return top of stack
+
+    # Errors
+    RAISE = 50          # k        raise RuntimeError(constants[k])
+
+
+OPERAND_COUNTS = {op: 0 for op in Op}
+OPERAND_COUNTS.update({
+    Op.LOAD_CONST: 1, Op.LOAD_LOCAL: 1, Op.STORE_LOCAL: 1,
+    Op.LOAD_GLOBAL: 1, Op.STORE_GLOBAL: 1, Op.DEFINE_GLOBAL: 1,
+    Op.JUMP: 1, Op.JUMP_IF_FALSE: 1, Op.LOOP: 1,
+    Op.COMPARE_JUMP: 2, Op.AND_JUMP: 1, Op.OR_JUMP: 1,
+    Op.RANGE: 1, Op.FOR_ITER: 2,
+    Op.CALL_GLOBAL: 2, Op.CALL_VALUE: 2, Op.TAIL_CALL: 2,
+    Op.RAISE: 1,
+})
+
+BINARY_OPS = {
+    "+": Op.ADD, "-": Op.SUB, "*": Op.MUL, "/": Op.DIV, "%": Op.MOD,
+    "==": Op.EQ, "!=": Op.NE, "<": Op.LT, "<=": Op.LE, ">": Op.GT, ">=": Op.GE,
+    "&&": Op.AND, "||": Op.OR,
+}
+
+UNARY_OPS = {"-": Op.NEG, "!": Op.NOT}
+
+COMPARISON_OPS = (Op.EQ, Op.NE, Op.LT, Op.LE, Op.GT, Op.GE)
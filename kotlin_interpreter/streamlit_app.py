@@ -98,6 +98,7 @@ with st.sidebar:
     show_ir = st.checkbox("Hiển thị IR", value=True)
     show_codegen = st.checkbox("Hiển thị Code Generation", value=True)
     show_output = st.checkbox("Hiển thị Output", value=True)
+    show_profile = st.checkbox("Hiển thị Profile", value=True)
     
     st.divider()
     
@@ -417,6 +418,8 @@ with col_right:
             st.caption("📥 **Input:** Abstract Syntax Tree")
             st.caption("⚙️ **Process:** Type checking, symbol collection")
             st.caption("📤 **Output:** Symbol Table (bảng ký hiệu)")
+            if state.semantic_summary:
+                st.caption(f"♻️ **Incremental:** {state.semantic_summary}")
             
             # Get all symbols from global scope
             symbols = state.symbol_table.global_scope.symbols
@@ -498,6 +501,17 @@ with col_right:
             st.code("\n".join(ir_text), language="text")
             
             st.metric("Số lượng IR instructions", len(state.ir_instructions))
+            
+            # Optimizer: call graph, dead functions, inlining decisions
+            if state.optimization_report is not None:
+                with st.expander("⚡ Tối ưu hoá AST (call graph & inlining)"):
+                    st.code(state.optimization_report.to_text(), language="text")
+            
+            # Admission control: ước lượng chi phí tĩnh trước khi thực thi
+            if state.admission is not None:
+                with st.expander(f"⏱️ Ước lượng chi phí: {state.admission.action}"):
+                    st.caption(str(state.admission))
+                    st.code(state.admission.cost.to_text(), language="text")
                     
     elif not state.ir_instructions:
         st.info("Chưa có IR. Nhấn 'Run' để sinh IR.")
@@ -610,6 +624,33 @@ with col_right:
                 st.info("Chưa có output. Nhấn 'Run' để thực thi.")
     else:
         st.info("Bật 'Hiển thị Output' trong sidebar để xem")
+    
+    # Profile: thời gian theo hàm Kotlin, số lần chạy mỗi dòng, flamegraph
+    if show_profile and state.profile is not None and state.profile.functions:
+        profile = state.profile
+        with st.expander(f"📊 Profile ({profile.elapsed * 1000:.1f} ms)"):
+            st.markdown("**Hàm Kotlin** (self = thời gian trong chính hàm, total = kể cả hàm được gọi)")
+            st.dataframe([
+                {"Hàm": f.name, "Số lần gọi": f.calls,
+                 "Self (ms)": round(f.self_time * 1000, 3), "Total (ms)": round(f.total_time * 1000, 3)}
+                for f in profile.ranked_functions()
+            ], use_container_width=True)
+            
+            st.markdown("**Dòng chạy nhiều nhất**")
+            source_lines = state.source_code.splitlines()
+            st.dataframe([
+                {"Dòng": line, "Số lần chạy": hits,
+                 "Code": source_lines[line - 1].strip() if 0 < line <= len(source_lines) else ""}
+                for line, hits in profile.hot_lines(20)
+            ], use_container_width=True)
+            
+            col_folded, col_json = st.columns(2)
+            with col_folded:
+                st.download_button("⬇️ Collapsed stacks (flamegraph)", profile.to_collapsed(),
+                                   file_name="profile.folded", mime="text/plain")
+            with col_json:
+                st.download_button("⬇️ JSON", profile.to_json(),
+                                   file_name="profile.json", mime="application/json")
 
 # Footer
 st.divider()
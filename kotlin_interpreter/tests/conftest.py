@@ -0,0 +1,7 @@
+"""
+pytest configuration: report failed asserts inside the shared test helpers in detail.
+"""
+
+import pytest
+
+pytest.register_assert_rewrite("tests.helpers")
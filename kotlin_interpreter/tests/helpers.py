@@ -0,0 +1,49 @@
+"""
+Helpers shared by the unit tests: parsing and running Kotlin source.
+"""
+
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from src.lexer import Lexer
+from src.parser import Parser, Program
+from src.runtime import Evaluator, CaptureSink
+
+
+EXAMPLES = sorted((Path(__file__).parent.parent / "examples").glob("*.kt"))
+
+
+def parse(source: str) -> Program:
+    """Parse Kotlin source into a Program."""
+    return Parser(Lexer(source).tokenize()).parse()
+
+
+def output_of(program: Program, capsys, **options) -> str:
+    """Run a program on an Evaluator and return what it printed."""
+    Evaluator(**options).evaluate(program)
+    return capsys.readouterr().out
+
+
+def capture(source: str, **options) -> Tuple[str, Evaluator]:
+    """Run a program with its output kept in memory; return (output, evaluator)."""
+    output = CaptureSink()
+    evaluator = Evaluator(output=output, **options)
+    evaluator.evaluate(parse(source))
+    return output.getvalue(), evaluator
+
+
+def run_engine(source: str, capsys, make: Callable) -> Tuple[str, Optional[str]]:
+    """Run a program with make()'s engine; return (output, error message or None)."""
+    error = None
+    try:
+        make().evaluate(parse(source))
+    except RuntimeError as e:
+        error = f"{type(e).__name__}: {e}"
+    return capsys.readouterr().out, error
+
+
+def assert_same_as_tree(source: str, capsys, make: Callable):
+    """make()'s engine prints the same output and raises the same error as the tree-walker."""
+    expected = run_engine(source, capsys, lambda: Evaluator(memoize=True))
+    assert run_engine(source, capsys, make) == expected
+    return expected
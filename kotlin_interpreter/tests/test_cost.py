@@ -0,0 +1,195 @@
+"""
+Unit tests for static cost estimation and admission control.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analysis import CostEstimator, CostClass
+from src.runtime import Evaluator, ExecutionTimeout, AdmissionPolicy
+
+from tests.helpers import parse
+
+
+def estimate(source: str):
+    """Estimate the cost of a program."""
+    return CostEstimator().estimate(parse(source))
+
+
+FACTORIAL = """
+fun factorial(n: Int): Int {
+    if (n <= 1) { return 1 }
+    return n * factorial(n - 1)
+}
+fun main() { println(factorial(5)) }
+"""
+
+FIB = """
+fun fib(n: Int): Int {
+    if (n < 2) { return n }
+    return fib(n - 1) + fib(n - 2)
+}
+fun main() { println(fib(20)) }
+"""
+
+
+class TestLoopBounds:
+    """Test trip counts of induction-variable loops."""
+
+    @pytest.mark.parametrize("init, condition, update, trips", [
+        ("0", "i < 10", "i = i + 1", 10),
+        ("0", "i <= 10", "i = i + 1", 11),
+        ("10", "i > 0", "i = i - 1", 10),
+        ("10", "i >= 0", "i = i - 2", 6),
+        ("0", "i != 9", "i = i + 3", 3),
+        ("0", "i < 100 && i < 5", "i = i + 1", 5),
+    ])
+    def test_induction_trip_count(self, init, condition, update, trips):
+        """Loops stepping a variable towards a constant bound have known trip counts."""
+        cost = estimate(f"fun main() {{ var i = {init} while ({condition}) {{ {update} }} }}")
+        loop, = cost.functions["main"].loops
+        assert loop.trip_count == trips
+        assert cost.cost_class == CostClass.BOUNDED
+
+    @pytest.mark.parametrize("header, trips", [
+        ("i in 0 until 10", 10),
+        ("i in 1..10 step 3", 4),
+        ("i in 10 downTo 1", 10),
+        ("i in 0..5 step 0", 0),
+    ])
+    def test_for_trip_count(self, header, trips):
+        """for loops over constant ranges have known trip counts."""
+        cost = estimate(f"fun main() {{ for ({header}) {{ println(i) }} }}")
+        loop, = cost.functions["main"].loops
+        assert loop.trip_count == trips
+
+    def test_for_over_run_time_range(self):
+        cost = estimate("fun f(n: Int) { for (i in 0 until n) { println(i) } }\nfun main() { f(3) }")
+        loop, = cost.functions["f"].loops
+        assert loop.trip_count is None and loop.cost_class == CostClass.UNKNOWN
+
+    def test_constant_program(self):
+        """Straight-line code is constant."""
+        cost = estimate('fun main() { val x = 1 + 2 println(x) }')
+        assert cost.cost_class == CostClass.CONSTANT
+        assert cost.steps is not None and cost.steps > 0
+
+    def test_nested_loop_with_unknown_bound(self):
+        """A bound that depends on a parameter is unknown."""
+        cost = estimate("""
+            fun f(n: Int) { var i = 0 while (i < n) { i = i + 1 } }
+            fun main() { f(10) }
+        """)
+        assert cost.cost_class == CostClass.UNKNOWN
+
+
+class TestNonTermination:
+    """Test programs flagged as unbounded."""
+
+    @pytest.mark.parametrize("source", [
+        "fun main() { var i = 0 while (true) { i = i + 1 } }",
+        "fun main() { var i = 0 while (i < 10) { println(i) } }",
+        "fun main() { var i = 10 while (i != 3) { i = i - 2 } }",
+        "fun loop(n: Int): Int { return loop(n + 1) }\nfun main() { println(loop(0)) }",
+    ])
+    def test_unbounded(self, source):
+        """Infinite loops and recursion without a base case are unbounded."""
+        assert estimate(source).cost_class == CostClass.UNBOUNDED
+
+    def test_while_true_with_return_is_not_unbounded(self):
+        """A while (true) loop with a return can terminate."""
+        cost = estimate("""
+            fun f(): Int { var i = 0 while (true) { i = i + 1 if (i > 3) { return i } } }
+            fun main() { println(f()) }
+        """)
+        assert cost.cost_class != CostClass.UNBOUNDED
+
+    def test_while_true_with_break_is_not_unbounded(self):
+        """break leaves the loop; a break of an inner loop does not."""
+        left = estimate("fun main() { var i = 0 while (true) { i = i + 1 if (i > 3) { break } } }")
+        assert left.cost_class != CostClass.UNBOUNDED
+        inner = estimate("fun main() { while (true) { while (true) { break } } }")
+        assert inner.cost_class == CostClass.UNBOUNDED
+        outer = estimate("fun main() { a@ while (true) { while (true) { break@a } } }")
+        assert outer.cost_class != CostClass.UNBOUNDED
+
+    @pytest.mark.parametrize("source", [
+        "fun main() { var i = 1 val t = (i = 4) while (i != 10) { i = i + 2 } println(i) }",
+        "fun main() { var i = 0 while ((i = i + 1) < 4) { println(i) } }",
+    ])
+    def test_assignments_outside_statements_are_tracked(self, source):
+        """Assignments in a val initializer or a loop condition change the variable too."""
+        cost = estimate(source)
+        loop, = cost.functions["main"].loops
+        assert cost.cost_class == CostClass.UNKNOWN
+        assert loop.reason == "trip count depends on run-time values"
+
+    def test_continue_disables_trip_count(self):
+        """continue may skip the induction variable update."""
+        cost = estimate("fun main() { var i = 0 while (i < 10) { if (i == 5) { continue } i = i + 1 } }")
+        loop, = cost.functions["main"].loops
+        assert loop.trip_count is None
+
+    def test_recursion_with_base_case_is_unknown(self):
+        """Recursion depth depends on arguments."""
+        cost = estimate(FACTORIAL)
+        assert cost.cost_class == CostClass.UNKNOWN
+        assert cost.recursive_functions == ["factorial"]
+
+    def test_base_case_in_other_function_of_cycle(self):
+        """Mutual recursion ends if any function of the cycle has a base case."""
+        cost = estimate("""
+            fun even(n: Int): Boolean { if (n == 0) { return true } return odd(n - 1) }
+            fun odd(n: Int): Boolean { return !even(n) }
+            fun main() { var k = 10 println(even(k)) }
+        """)
+        assert cost.cost_class == CostClass.UNKNOWN
+        assert sorted(cost.recursive_functions) == ["even", "odd"]
+        endless = estimate("""
+            fun ping(n: Int): Int { return pong(n + 1) }
+            fun pong(n: Int): Int { return ping(n) }
+            fun main() { println(ping(0)) }
+        """)
+        assert endless.cost_class == CostClass.UNBOUNDED
+
+
+class TestAdmissionPolicy:
+    """Test admission decisions."""
+
+    def test_reject_unbounded(self):
+        """Non-terminating programs are not admitted."""
+        decision = AdmissionPolicy().decide(parse("fun main() { while (true) { println(1) } }"))
+        assert decision.action == "reject"
+        assert not decision.admitted
+
+    def test_pure_recursion_is_memoized(self):
+        """Pure recursive functions run memoized under a time limit."""
+        decision = AdmissionPolicy(time_limit=2.0).decide(parse(FIB))
+        assert decision.action == "time-box"
+        assert decision.time_limit == 2.0
+        assert decision.memoize
+
+    def test_large_bounded_program_is_time_boxed(self):
+        """Bounded programs above max_steps get a time limit."""
+        source = "fun main() { var i = 0 while (i < 1000) { i = i + 1 } }"
+        assert AdmissionPolicy().decide(parse(source)).action == "run"
+        assert AdmissionPolicy(max_steps=100).decide(parse(source)).action == "time-box"
+
+
+class TestTimeLimit:
+    """Test the evaluator's time limit."""
+
+    def test_infinite_loop_times_out(self):
+        """A time-boxed infinite loop stops with ExecutionTimeout."""
+        evaluator = Evaluator(time_limit=0.05)
+        with pytest.raises(ExecutionTimeout):
+            evaluator.evaluate(parse("fun main() { var i = 0 while (true) { i = i + 1 } }"))
+
+    def test_time_limit_does_not_change_results(self, capsys):
+        """Programs that finish in time run normally."""
+        Evaluator(time_limit=5.0).evaluate(parse(FACTORIAL))
+        assert capsys.readouterr().out == "120\n"
@@ -0,0 +1,601 @@
+"""
+Unit tests for the closure-compiling engine: same output and errors as the tree-walker.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.parser import ParseError
+from src.runtime import Evaluator, ExecutionTimeout, StackOverflowError
+
+from tests.helpers import EXAMPLES, parse, run_engine
+
+
+def run(source: str, engine: str, capsys, **options):
+    """Run a program on an Evaluator engine; return (output, error message or None)."""
+    return run_engine(source, capsys, lambda: Evaluator(engine=engine, **options))
+
+
+def assert_same(source: str, capsys, **options):
+    """Both engines print the same output and raise the same error."""
+    expected = run(source, "tree", capsys, **options)
+    assert run(source, "closure", capsys, **options) == expected
+    return expected
+
+
+PROGRAMS = [
+    # Early returns, tail-if splitting, recursion
+    """
+    fun sign(x: Int): Int {
+        if (x < 0) { return -1 }
+        if (x == 0) { return 0 }
+        return 1
+    }
+    fun fact(n: Int): Int { if (n <= 1) { return 1 } return n * fact(n - 1) }
+    fun main() { println(sign(-3)) println(sign(0)) println(sign(7)) println(fact(10)) }
+    """,
+    # Returns from inside loops and block expressions
+    """
+    fun firstSquareAbove(limit: Int): Int {
+        var i = 0
+        while (true) { if (i * i > limit) { return i } i = i + 1 }
+        return -1
+    }
+    fun pick(c: Boolean): Int { val v = if (c) { return 10 } else { 20 } return v }
+    fun main() { println(firstSquareAbove(50)) println(pick(true)) println(pick(false)) }
+    """,
+    # Scopes, shadowing, strings, booleans, assignment values
+    """
+    val greeting = "hi"
+    var counter = 0
+    fun bump(): Int { counter = counter + 1 return counter }
+    fun main() {
+        var x = 1
+        { val x = 5 println(x) }
+        println(x)
+        println(greeting + " " + bump() + " " + (x == 1) + " " + !(x > 2))
+        println(x = 4)
+        println(10 / 3) println(-7 % 3) println("a" == "a") println(true != false)
+    }
+    """,
+    # Value of a function without return is its last statement's value
+    """
+    fun last(n: Int) { val y = n * 2 y + 1 }
+    fun unit() { }
+    fun main() { println(last(4)) println(unit()) }
+    """,
+    # Tail calls
+    """
+    tailrec fun count(n: Int, acc: Int): Int { if (n == 0) { return acc } return count(n - 1, acc + 1) }
+    fun main() { println(count(5000, 0)) }
+    """,
+    # break/continue, labels, jumps out of block expressions and loop conditions
+    """
+    fun firstPair(target: Int): Int {
+        var i = 0
+        var found = -1
+        outer@ while (i < 10) {
+            i = i + 1
+            var j = 0
+            while (j < 10) {
+                j = j + 1
+                if (j == i) { continue@outer }
+                if (i * j == target) { found = i * 100 + j
+                    break@outer }
+            }
+        }
+        return found
+    }
+    fun partial(n: Int): Int {
+        var i = 0
+        var s = 0
+        while (i < n) {
+            i = i + 1
+            s = s + if (i == 3) { continue } else { if (i == 6) { break } else { i } }
+        }
+        return s
+    }
+    fun lastBeforeBreak(): Int {
+        var i = 0
+        while (i < 5) { i = i + 1 if (i == 4) { break } i * 10 }
+    }
+    fun main() {
+        println(firstPair(42)) println(partial(10)) println(lastBeforeBreak())
+        var i = 0
+        a@ while (i < 3) {
+            i = i + 1
+            var j = 0
+            b@ while (if (j > 2) { break@a } else { true }) {
+                j = j + 1
+                var k = 0
+                while (k < 3) { k = k + 1 if (k == 2) { continue@b } println(i * 100 + j * 10 + k) }
+            }
+        }
+    }
+    """,
+    # Short-circuit && and ||, fused conditions
+    """
+    var calls = 0
+    fun check(v: Boolean): Boolean { calls = calls + 1 return v }
+    fun main() {
+        var i = 0
+        var hits = 0
+        while (i < 10 && check(i != 7)) {
+            if (i % 2 == 0 || check(false)) { hits = hits + 1 }
+            if (!(i > 3) && i >= 1 || i == 9) { hits = hits + 10 }
+            i = i + 1
+        }
+        println(hits) println(calls) println(i)
+        println(false && check(true)) println(true || check(false)) println(calls)
+        val b = i > 5 && check(true)
+        println(b) println(if (b && calls > 0) { "yes" } else { "no" })
+        println(if (1 < 2) { 1 } else { 2 })
+        println(false && if (check(true)) { true } else { false })
+        println(true && if (check(true)) { val t = calls > 3 t } else { false })
+        println(calls)
+    }
+    """,
+    # for loops over until / .. / downTo with step, repeat, jumps out of for bodies
+    """
+    var evaluated = 0
+    fun limit(n: Int): Int { evaluated = evaluated + 1 return n }
+    fun firstMultiple(k: Int): Int { for (i in 1..100) { if (i % k == 0) { return i } } return -1 }
+    fun main() {
+        for (i in 0 until limit(4)) { print(i) }
+        println(" " + evaluated)
+        for (i in 1..10 step 3) { print(i) }
+        println()
+        for (i in 10 downTo 0 step 4) { print(i) print(" ") }
+        println()
+        for (i in 3 until 3) { println("never") }
+        for (i in 3..2) { println("never") }
+        for (i in -2 downTo -4) { print(i) }
+        println()
+        val i = 100
+        for (i in 0..i / 50) { print(i) }
+        println(i)
+        repeat(3) { print(it * 2) }
+        println()
+        var total = 0
+        outer@ for (a in 0..3) {
+            for (b in 0..3) {
+                if (b == 2) { continue@outer }
+                if (a == 3) { break@outer }
+                total = total + a * 10 + b
+            }
+        }
+        println(total)
+        var n = 0
+        for (k in 1..10) { if (k % 2 == 0) { continue } if (k > 7) { break } n = n + k }
+        println(n)
+        println(firstMultiple(7))
+        for (k in 0 until 2) { val sq = k * k println(sq) }
+    }
+    """,
+    # Counted while loops: final counter, loop value, break, bounds, globals changed by calls
+    """
+    var g = 0
+    var bound = 5
+    fun bumpG(): Int { g = g + 1 return g }
+    fun shrink(): Int { bound = bound - 1 return bound }
+    fun upTo(n: Int): Int { var i = 0 while (i < n) { i = i + 1 } }
+    fun down(n: Int): Int { var i = n while (i >= 0) { i = i - 3 } }
+    fun stopAt(n: Int, stop: Int): Int { var i = 0 while (i <= n) { if (i == stop) { break } i = i + 2 } }
+    fun main() {
+        println(upTo(5)) println(upTo(0)) println(upTo(-3))
+        println(down(10)) println(down(-1))
+        println(stopAt(10, 0)) println(stopAt(10, 4)) println(stopAt(10, 5))
+        var i = 0
+        var s = 0
+        while (i < 10) { s = s + i i = i + 1 }
+        println(i) println(s)
+        var j = 10
+        while (j > 2 * 2) { s = s - j j = j - 2 }
+        println(j) println(s)
+        while (g < 10) { bumpG() g = g + 1 }
+        println(g)
+        var k = 0
+        while (k < bound) { shrink() k = k + 1 }
+        println(k) println(bound)
+        var m = 0
+        { var m = 7 while (m < 9) { m = m + 1 } println(m) }
+        println(m)
+    }
+    """,
+    # Long Strings built by concatenation (ropes): branching off, comparing, printing
+    """
+    fun line(n: Int): String { return "line " + n + ";" }
+    fun main() {
+        var s = ""
+        var i = 0
+        while (i < 120) { s = s + line(i) if (i % 40 == 0) { s = s + true + i } i = i + 1 }
+        val a = s + "a"
+        val b = s + "b"
+        val c = "<" + s
+        var t = a
+        t = t + "!"
+        println(a == b) println(a == s + "a") println(t == a + "!") println(s == c)
+        println(a) println(b) println(c) println(t)
+    }
+    """,
+    # buildString: append / appendLine, nested builders, loops in the body, return from inside
+    """
+    fun row(n: Int): String { return buildString { for (j in 0 until n) { append(j) append(",") } } }
+    fun firstLong(n: Int): String {
+        val s = buildString { repeat(n) { append(row(it)) if (it > 3) { return "long" } } }
+        return s
+    }
+    fun main() {
+        val text = buildString {
+            appendLine("header")
+            repeat(300) { append(row(it % 5)) }
+            appendLine()
+            append(buildString { append(1 == 1) append(-2) })
+            appendLine(buildString { })
+        }
+        print(text)
+        println("[" + buildString { append("x") } + "]")
+        println(firstLong(3)) println(firstLong(10))
+    }
+    """,
+    "fun main() { var i = 0 while (i < \"x\") { i = i + 1 } }",
+    "fun main() { var i = \"a\" while (i < 3) { i = i + 1 } }",
+    "fun main() { for (i in 1..3) { print(i) } for (i in 1..10 step 0) { print(i) } }",
+    "fun main() { for (i in 10 downTo 1 step -2) { print(i) } }",
+    "fun main() { for (i in 0 until \"x\") { print(i) } }",
+    "fun main() { for (i in true..3) { print(i) } }",
+    "fun main() { for (i in 0..3 step \"x\") { print(i) } }",
+    # Errors
+    "fun main() { println(false && 1) println(true || 1) println(true && 1) }",
+    "fun main() { println(1 || true) }",
+    "fun main() { var i = 0 while (i < 3 && i) { i = i + 1 } }",
+    "fun main() { if (false || \"x\") { println(1) } }",
+    "fun main() { if (2 && false) { println(1) } }",
+    "fun main() { if (\"a\" < 1) { println(1) } }",
+    "fun main() { println(1) println(missing) }",
+    "fun main() { println(1 / 0) }",
+    "fun main() { if (1) { println(2) } }",
+    "fun f(a: Int): Int { return a } fun main() { println(f(1, 2)) }",
+    "val v = 3\nfun main() { v(1) }",
+    'fun main() { println(true - 1) }',
+    'fun main() { println(-"x") }',
+]
+
+
+class TestClosureEngine:
+    """The closure engine behaves exactly like the tree-walker."""
+
+    @pytest.mark.parametrize("path", EXAMPLES, ids=lambda p: p.name)
+    def test_examples(self, path, capsys):
+        """Example programs print the same output (memoized to keep fibonacci fast)."""
+        output, error = assert_same(path.read_text(), capsys, memoize=True)
+        assert error is None and output
+
+    @pytest.mark.parametrize("source", PROGRAMS)
+    def test_programs(self, source, capsys):
+        """Same output and errors on programs covering every node type."""
+        assert_same(source, capsys)
+
+    def test_time_limit(self):
+        """Compiled loops honour the time limit."""
+        evaluator = Evaluator(engine="closure", time_limit=0.05)
+        with pytest.raises(ExecutionTimeout):
+            evaluator.evaluate(parse("fun main() { var i = 0 while (true) { i = i + 1 } }"))
+
+    def test_memoization(self, capsys):
+        """Compiled functions are still memoized."""
+        evaluator = Evaluator(engine="closure", memoize=True)
+        evaluator.evaluate(parse("""
+            fun fib(n: Int): Int { if (n < 2) { return n } return fib(n - 1) + fib(n - 2) }
+            fun main() { println(fib(60)) }
+        """))
+        assert capsys.readouterr().out == "1548008755920\n"
+
+    def test_unknown_engine(self):
+        """Unknown engine names are rejected."""
+        with pytest.raises(ValueError):
+            Evaluator(engine="jit")
+
+
+class TestStackEngine:
+    """The stack engine behaves like the tree-walker, without its recursion limit."""
+
+    DEEP = """
+        fun sum(n: Int): Int { if (n == 0) { return 0 } return n + sum(n - 1) }
+        val total = sum(5000)
+        fun main() { println(total) println(if (sum(3) > 0) { sum(3000) } else { 0 }) }
+    """
+
+    @pytest.mark.parametrize("path", EXAMPLES, ids=lambda p: p.name)
+    def test_examples(self, path, capsys):
+        """Example programs print the same output."""
+        expected = run(path.read_text(), "tree", capsys, memoize=True)
+        assert run(path.read_text(), "stack", capsys, memoize=True) == expected
+
+    @pytest.mark.parametrize("source", PROGRAMS)
+    def test_programs(self, source, capsys):
+        """Same output and errors on programs covering every node type."""
+        assert run(source, "stack", capsys) == run(source, "tree", capsys)
+
+    def test_deep_recursion(self, capsys):
+        """Recursion far beyond the Python stack, in initializers and expressions."""
+        assert run(self.DEEP, "stack", capsys) == ("12502500\n4501500\n", None)
+
+    def test_stack_overflow(self, capsys):
+        """Exceeding max_depth raises StackOverflowError with the Kotlin call stack."""
+        evaluator = Evaluator(engine="stack", max_depth=50)
+        with pytest.raises(StackOverflowError) as exc_info:
+            evaluator.evaluate(parse(
+                "fun f(n: Int): Int {\n  return 1 + f(n + 1)\n}\n"
+                "fun main() {\n  println(f(0))\n}"
+            ))
+        error = exc_info.value
+        assert error.kotlin_stack == [("f", 2)] * 49 + [("main", 5)]
+        assert str(error).splitlines() == [
+            "StackOverflowError: more than 50 nested calls",
+            "    at f (line 2)",
+            "    ... 48 more identical frames",
+            "    at main (line 5)",
+        ]
+        # Frames and scopes were unwound
+        assert evaluator.current_env is evaluator.global_env and evaluator.trampoline.frames == []
+
+    def test_time_limit(self):
+        """Loops and calls on the heap stack honour the time limit."""
+        evaluator = Evaluator(engine="stack", time_limit=0.05)
+        with pytest.raises(ExecutionTimeout):
+            evaluator.evaluate(parse("fun g(): Int { return 1 }\nfun main() { var i = 0 while (true) { i = i + g() } }"))
+
+
+class TestUnboxedValues:
+    """Unboxed mode behaves exactly like boxed values, without the wrappers."""
+
+    def run_unboxed(self, source: str, capsys, **options):
+        """Run in unboxed mode; return (output, error message or None)."""
+        return run_engine(source, capsys, lambda: Evaluator(unboxed=True, **options))
+
+    @pytest.mark.parametrize("path", EXAMPLES, ids=lambda p: p.name)
+    def test_examples(self, path, capsys):
+        """Example programs print the same output."""
+        expected = run(path.read_text(), "tree", capsys, memoize=True)
+        assert self.run_unboxed(path.read_text(), capsys, memoize=True) == expected
+
+    @pytest.mark.parametrize("source", PROGRAMS + [
+        'fun main() { println(true) println(false == false) println(println()) println("x" + (1 == 1)) }',
+        "fun f(a: Int): Int { return a }\nfun main() { val g = f\n println(g) println(g(2)) println(g == g) }",
+    ])
+    def test_programs(self, source, capsys):
+        """Same output and errors, including Boolean and Unit formatting."""
+        expected = run(source, "tree", capsys)
+        assert self.run_unboxed(source, capsys) == expected
+
+    def test_no_wrappers_allocated(self, monkeypatch):
+        """Arithmetic and comparisons allocate no value wrappers."""
+        from src.runtime import IntValue, StringValue, BooleanValue, UnitValue
+        created = []
+        for cls in (IntValue, StringValue, BooleanValue, UnitValue):
+            def counting_init(self, *args, _init=cls.__init__, **kwargs):
+                created.append(type(self))
+                _init(self, *args, **kwargs)
+            monkeypatch.setattr(cls, "__init__", counting_init)
+
+        # 's = s * 1 + ...' keeps the loop from being summed as a reduction
+        program = "fun main() { var i = 0 var s = 0 while (i < 100) { s = s * 1 + i * 2 i = i + 1 } }"
+        Evaluator().evaluate(parse(program))
+        boxed = len(created)
+        created.clear()
+        result = Evaluator(unboxed=True).evaluate(parse(program))
+        # Only the result of evaluate() is boxed
+        assert created == [IntValue] and boxed > 500
+        assert str(result) == "100"
+
+    def test_memoization(self, capsys):
+        """Memo caches key unboxed arguments."""
+        evaluator = Evaluator(unboxed=True, memoize=True)
+        evaluator.evaluate(parse("""
+            fun fib(n: Int): Int { if (n < 2) { return n } return fib(n - 1) + fib(n - 2) }
+            fun main() { println(fib(60)) }
+        """))
+        assert capsys.readouterr().out == "1548008755920\n"
+        assert evaluator.memo_stats()[0]['hits'] > 0
+
+    def test_closure_engine_rejected(self):
+        """Unboxed values need the tree engine."""
+        with pytest.raises(ValueError):
+            Evaluator(engine="closure", unboxed=True)
+
+
+class TestJumps:
+    """return, break and continue are signaled without exceptions."""
+
+    @pytest.mark.parametrize("source, message", [
+        ("fun main() { break }", "'break' is only allowed inside a loop"),
+        ("fun main() { while (true) { } continue }", "'continue' is only allowed inside a loop"),
+        ("fun main() { a@ while (true) { break@b } }", "Unresolved label: '@b'"),
+        ("fun f() { a@ while (true) { } }\nfun main() { while (true) { break@a } }", "Unresolved label"),
+        ("fun main() { repeat(3) { break } }", "'break' is only allowed inside a loop"),
+        ("fun main() { repeat(1, 2) { } }", "repeat expects 1 argument"),
+        ("fun main() { while (true) { buildString { break } } }", "'break' is only allowed inside a loop"),
+        ("fun main() { buildString { append(1, 2) } }", "append expects 1 argument"),
+        ("fun main() { buildString { appendLine(1, 2) } }", "appendLine expects at most 1 argument"),
+    ])
+    def test_parse_errors(self, source, message):
+        with pytest.raises(ParseError) as exc_info:
+            parse(source)
+        assert message in str(exc_info.value)
+
+    @pytest.mark.parametrize("engine", Evaluator.ENGINES)
+    def test_return_does_not_raise(self, engine, capsys, monkeypatch):
+        """A return inside a loop unwinds through the jump flag, not an exception."""
+        def no_exceptions(*args, **kwargs):
+            raise AssertionError("return raised an exception")
+        monkeypatch.setattr("src.runtime.evaluator.PendingJump.__init__", no_exceptions)
+        evaluator = Evaluator(engine=engine)
+        evaluator.evaluate(parse("""
+            fun find(n: Int): Int { var i = 0 while (true) { if (i * i >= n) { return i } i = i + 1 } }
+            fun main() { println(find(50)) }
+        """))
+        assert capsys.readouterr().out == "8\n"
+        assert evaluator.jump is None
+
+
+class TestCountedLoops:
+    """Counted while loops run over a Python range when their guards hold."""
+
+    def plans(self, source: str):
+        from src.analysis import CountedLoopAnalysis
+        from src.analysis.scopes import ScopeAnalysis
+        program = parse(source)
+        ScopeAnalysis().analyze(program)
+        return [loop.counted for loop in CountedLoopAnalysis().analyze(program)]
+
+    def test_recognized(self):
+        plans = self.plans("""
+            fun f(n: Int) {
+                var i = 0 while (i < n * 2) { println(i) i = i + 1 }
+                var j = n while (j >= -n) { j = j - 3 }
+                var k = 0 while (k < n) { k = k + 1 println(k) }
+                var a = 0 while (a < n) { n = 1 a = a + 1 }
+                var b = 0 while (b < 5) { if (b == 2) { continue } b = b + 1 }
+                var c = 0 while (c < 5) { c = c - 1 }
+                var d = 0 while (d < f(1)) { d = d + 1 }
+            }
+        """)
+        assert [(p.counter, p.operator, p.step, p.names) for p in plans] == [
+            ("i", "<", 1, ["n"]),
+            ("j", ">=", -3, ["n"]),
+        ]
+        assert list(plans[1].numbers(5, -5)) == [5, 2, -1, -4]
+
+    @pytest.mark.parametrize("unboxed", [False, True])
+    def test_fast_path_taken(self, unboxed, capsys, monkeypatch):
+        """The condition and the increment are not evaluated per iteration."""
+        evaluator = Evaluator(unboxed=unboxed)
+        conditions = []
+        original = evaluator.eval_condition
+        monkeypatch.setattr(evaluator, "eval_condition", lambda node: conditions.append(node) or original(node))
+        evaluator.evaluate(parse("fun main() { var i = 0 var s = 0 while (i < 1000) { s = s + i i = i + 1 } println(s) println(i) }"))
+        assert capsys.readouterr().out == "499500\n1000\n"
+        assert conditions == []
+
+    @pytest.mark.parametrize("engine", ["tree", "closure"])
+    def test_guard_failure_falls_back(self, engine, capsys):
+        """A call that changes a global bound keeps the loop on the generic path."""
+        source = """
+            var n = 10
+            fun halve(): Int { n = n / 2 return n }
+            fun main() { var i = 0 while (i < n) { halve() i = i + 1 } println(i) println(n) }
+        """
+        assert run(source, engine, capsys) == ("2\n2\n", None)
+
+
+class TestQuickening:
+    """Operator and variable nodes specialize to the types they see."""
+
+    MIXED = """
+        fun f(a: Int, b: Int): Int { return a + b }
+        fun main() {
+            var i = 0
+            while (i < 3) { println(f(i, 1)) i = i + 1 }
+            println(f("x", 2))
+            println(f(3, "y"))
+            println(f(1, true))
+        }
+    """
+
+    @pytest.mark.parametrize("unboxed", [False, True])
+    def test_specializations_counted(self, unboxed, capsys):
+        evaluator = Evaluator(unboxed=unboxed)
+        # 'i = 1 + i' keeps the loop off the counted-loop fast path
+        evaluator.evaluate(parse(
+            "fun main() { var i = 0 while (i < 5) { i = 1 + i } println(-i) println(!(i == 5)) println(i < 6) }"
+        ))
+        assert capsys.readouterr().out == "-5\nfalse\ntrue\n"
+        stats = evaluator.quicken_stats()
+        for name in ("IntLess", "IntAdd", "IntNegate", "IntEqual", "BooleanNot"):
+            assert stats['specialized'][name] == 1
+        assert stats['specialized']["LocalRead"] == 5
+        assert stats['deopts'] == {}
+
+    @pytest.mark.parametrize("unboxed", [False, True])
+    def test_deopt_on_type_change(self, unboxed, capsys):
+        """A failed guard falls back to the generic path with the same results and errors."""
+        expected = run(self.MIXED, "tree", capsys, quicken=False)
+        evaluator = Evaluator(unboxed=unboxed)
+        error = None
+        try:
+            evaluator.evaluate(parse(self.MIXED))
+        except RuntimeError as e:
+            error = f"{type(e).__name__}: {e}"
+        assert (capsys.readouterr().out, error) == expected
+        assert error == "RuntimeError: Invalid operands for +: Int, Boolean"
+        stats = evaluator.quicken_stats()
+        # a + b: IntAdd until "x" + 2, then StringConcat until 1 + true, then generic
+        assert stats['deopts'] == {"IntAdd": 1, "StringConcat": 1}
+        assert stats['specialized']["StringConcat"] == 1
+        assert stats['generic'] == 1
+
+    def test_disabled(self, capsys):
+        evaluator = Evaluator(quicken=False)
+        program = parse("fun main() { println(1 + 2) }")
+        evaluator.evaluate(program)
+        assert capsys.readouterr().out == "3\n"
+        assert evaluator.quicken_stats() == {}
+
+
+class TestInlineCaches:
+    """Call sites cache global callees until a global is redefined."""
+
+    @pytest.mark.parametrize("engine", Evaluator.ENGINES)
+    def test_recursion_hits_cache(self, engine, capsys):
+        evaluator = Evaluator(engine=engine)
+        evaluator.evaluate(parse("""
+            fun factorial(n: Int): Int { if (n <= 1) { return 1 } return n * factorial(n - 1) }
+            fun main() { println(factorial(10)) }
+        """))
+        assert capsys.readouterr().out == "3628800\n"
+        # Each call site misses once: println, factorial(10), factorial(n - 1)
+        assert evaluator.call_cache_stats() == {'hits': 8, 'misses': 3}
+
+    @pytest.mark.parametrize("engine", Evaluator.ENGINES)
+    def test_global_reassignment_invalidates(self, engine, capsys):
+        source = """
+            fun one(x: Int): Int { return 1 }
+            fun two(x: Int): Int { return 2 }
+            var g = one
+            fun call(): Int { return g(0) }
+            fun main() {
+                println(call())
+                println(call())
+                g = two
+                println(call())
+                g = 5
+                println(call())
+            }
+        """
+        assert assert_same(source, capsys) == ("1\n1\n2\n", "RuntimeError: 'g' is not a function")
+
+    @pytest.mark.parametrize("engine", Evaluator.ENGINES)
+    def test_shadowed_names_not_cached(self, engine, capsys):
+        source = """
+            fun f(x: Int): Int { return x + 1 }
+            fun apply(f: Int, n: Int): Int { if (n == 0) { return f } return apply(f, n - 1) }
+            fun local(n: Int): Int { if (n == 0) { val f = 3 return f(1) } return f(n) + local(n - 1) }
+            fun main() { println(apply(7, 2)) println(local(2)) }
+        """
+        output, error = run(source, engine, capsys)
+        assert output == "7\n"
+        assert error == "RuntimeError: 'f' is not a function"
+
+    def test_cache_not_shared_between_runs(self, capsys):
+        """A cache filled by one evaluator is never valid for another's globals."""
+        program = parse("fun f(): Int { return 1 }\nfun main() { println(f()) }")
+        Evaluator().evaluate(program)
+        second = Evaluator()
+        second.evaluate(program)
+        assert capsys.readouterr().out == "1\n1\n"
+        assert second.call_cache_stats()['hits'] == 0
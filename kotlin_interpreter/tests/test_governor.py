@@ -0,0 +1,120 @@
+"""
+Unit tests for the execution governor: step, time and memory limits.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.runtime import Evaluator, ExecutionTimeout, ResourceLimitExceeded, CaptureSink
+from src.runtime.governor import Governor, ACTIVE, CHECK_INTERVAL
+
+from tests.helpers import parse, capture
+
+
+ENGINES = [{}, {"engine": "closure"}, {"engine": "stack"}, {"unboxed": True}]
+
+LOOP = """
+fun main() {
+    var i = 0
+    while (true) {
+        i = i + 1
+    }
+}
+"""
+
+RECURSION = """
+fun count(n: Int): Int {
+    if (n == 0) { return 0 }
+    return 1 + count(n - 1)
+}
+
+fun main() {
+    var total = 0
+    for (i in 0 until 1000000) {
+        total = total + count(3)
+    }
+}
+"""
+
+DOUBLING = """
+fun main() {
+    var s = "abcdefgh"
+    while (true) {
+        s = s + s
+    }
+}
+"""
+
+
+class TestLimits:
+    """Test each limit on every Evaluator engine."""
+
+    @pytest.mark.parametrize("options", ENGINES)
+    def test_step_limit(self, options):
+        with pytest.raises(ResourceLimitExceeded, match=r"Step limit of 5000 exceeded \(line 4\)") as error:
+            capture(LOOP, max_steps=5000, **options)
+        assert error.value.limit == "steps" and error.value.maximum == 5000
+        assert 5000 < error.value.used <= 5000 + CHECK_INTERVAL
+        assert error.value.location.line == 4
+
+    @pytest.mark.parametrize("options", ENGINES)
+    def test_calls_count_as_steps(self, options):
+        with pytest.raises(ResourceLimitExceeded, match="Step limit") as error:
+            capture(RECURSION, max_steps=20000, **options)
+        assert error.value.location.line in (2, 10)  # The function body or the loop
+
+    @pytest.mark.parametrize("options", ENGINES)
+    def test_time_limit(self, options):
+        with pytest.raises(ExecutionTimeout, match=r"Time limit of 0.05s exceeded \(line 4\)") as error:
+            capture(LOOP, time_limit=0.05, **options)
+        assert error.value.limit == "time" and error.value.used >= 0.05
+
+    @pytest.mark.parametrize("options", ENGINES)
+    def test_memory_limit(self, options):
+        with pytest.raises(ResourceLimitExceeded, match="Memory limit of 1000000 bytes exceeded") as error:
+            capture(DOUBLING, memory_limit=1_000_000, **options)
+        assert error.value.limit == "memory"
+        assert 1_000_000 < error.value.used <= 2_100_000  # Stopped at the doubling that crossed it
+
+    def test_live_environments_count(self):
+        """Deep recursion holds one environment per frame."""
+        source = "fun f(n: Int): Int { if (n == 0) { return 0 } return f(n - 1) + 1 }\nfun main() { println(f(3000)) }"
+        with pytest.raises(ResourceLimitExceeded, match="Memory limit"):
+            capture(source, memory_limit=100_000, engine="stack")
+        assert capture(source, memory_limit=10_000_000, engine="stack")[0] == "3000\n"
+
+
+class TestGovernor:
+    """Test the governor itself."""
+
+    def test_checks_every_interval(self):
+        governor = Governor(max_steps=10)
+        for _ in range(CHECK_INTERVAL - 1):
+            governor.tick(None)
+        assert governor.stats()['steps'] == CHECK_INTERVAL - 1
+        with pytest.raises(ResourceLimitExceeded) as error:
+            governor.tick(None)
+        assert error.value.location is None and str(error.value) == "Step limit of 10 exceeded"
+
+    def test_limits_do_not_change_results(self):
+        source = 'fun main() { var s = "" for (i in 0 until 3000) { s = s + i } println(s) }'
+        limited, _ = capture(source, max_steps=10_000_000, memory_limit=10_000_000, time_limit=30.0)
+        assert limited == capture(source)[0]
+
+    def test_no_governor_without_limits(self):
+        evaluator = Evaluator(output=CaptureSink())
+        evaluator.evaluate(parse(LOOP.replace("true", "i < 10")))
+        assert evaluator.governor is None
+
+    def test_active_only_while_running(self):
+        evaluator = Evaluator(memory_limit=10**9, output=CaptureSink())
+        evaluator.evaluate(parse('fun main() { println("a" + 1) }'))
+        assert ACTIVE.get() is None
+        assert evaluator.governor.string_bytes == 0  # Short Strings are not charged
+        evaluator.evaluate(parse(DOUBLING.replace("var s", "var i = 0 var s").replace("true", "i < 14")
+                                 .replace("s = s + s", "s = s + s i = i + 1")))
+        assert evaluator.governor.string_bytes >= 8 * 2**14 and ACTIVE.get() is None
@@ -0,0 +1,250 @@
+"""
+Unit tests for body type checking and incremental semantic analysis.
+"""
+
+import random
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.parser import Expression, FunctionDeclaration, walk
+from src.semantic import (
+    SymbolTable, ErrorCollector, CollectionPass, TypeCheckPass, IncrementalChecker, INT, STRING
+)
+from src.semantic.incremental import fingerprint
+from src.analysis import CountedLoopAnalysis, LoopIdiomAnalysis
+from src.analysis.scopes import ScopeAnalysis
+from src.analysis.tail_calls import TailCallAnalysis
+from src.runtime import Evaluator, CaptureSink
+
+from tests.helpers import parse
+
+
+def full_check(program):
+    """Non-incremental analysis: collection pass + type checking pass."""
+    symbols, errors = SymbolTable(), ErrorCollector()
+    CollectionPass(symbols, errors).collect(program)
+    checker = TypeCheckPass(symbols, errors)
+    checker.check(program)
+    return checker, errors
+
+
+def messages(errors):
+    """Diagnostics as comparable strings, independent of reporting order."""
+    return sorted(str(e) for e in errors.errors + errors.warnings)
+
+
+class TestTypeCheckPass:
+    """Test body checking."""
+
+    def test_valid_program_has_no_errors(self):
+        """Well-typed programs produce no diagnostics."""
+        _, errors = full_check(parse("""
+            var total = 0
+            fun add(a: Int, b: Int): Int { return a + b }
+            fun main() {
+                val s = if (total > 0) { "pos" } else { "neg" }
+                total = add(total, 2)
+                println(s + total)
+            }
+        """))
+        assert messages(errors) == []
+
+    @pytest.mark.parametrize("body, expected", [
+        ("println(y)", "Undefined variable: 'y'"),
+        ("foo(1)", "Undefined function: 'foo'"),
+        ("val x = 1 x = 2", "Cannot assign to val 'x'"),
+        ("var x = 1 x = \"s\"", "Type mismatch: expected Int, got String"),
+        ("val x = 10 - \"a\"", "Operator '-' cannot be applied to types Int and String"),
+        ("sq(\"a\")", "Type mismatch: expected Int, got String"),
+        ("sq(1, 2)", "Function 'sq' expects 1 argument(s), got 2"),
+        ("while (1) { }", "Type mismatch: expected Boolean, got Int"),
+        ("val a = 1 val a = 2", "Redefinition of variable 'a'"),
+    ])
+    def test_errors(self, body, expected):
+        """Common mistakes are reported."""
+        _, errors = full_check(parse(
+            "fun sq(n: Int): Int { return n * n }\nfun main() { " + body + " }"
+        ))
+        assert expected in [e.message for e in errors.errors]
+
+    def test_return_type_mismatch(self):
+        """Returned values must match the declared return type."""
+        _, errors = full_check(parse('fun f(): Int { return "x" }'))
+        assert [e.message for e in errors.errors] == [
+            "Function 'f' returns String, but signature specifies Int"
+        ]
+
+    def test_expression_types(self):
+        """Every expression gets a type; globals are inferred from initializers."""
+        program = parse('val g = "a" + 1\nfun f(x: Int): Int { return x * 2 }')
+        checker, _ = full_check(program)
+        assert checker.type_of(program.declarations[0].initializer) == STRING
+        ret = program.declarations[1].body.statements[0]
+        assert checker.type_of(ret.value) == INT
+
+
+# Building blocks for random programs: each function has variants that
+# change its body, its signature, or introduce errors.
+FUNCTION_VARIANTS = {
+    "sq": [
+        "fun sq(n: Int): Int {\n    return n * n\n}",
+        "fun sq(n: Int): Int {\n    val r = n * n\n    return r\n}",
+        "fun sq(n: String): String {\n    return n + n\n}",
+        "fun sq(n: Int): Int {\n    return n + flag\n}",
+    ],
+    "describe": [
+        "fun describe(x: Int): String {\n    return \"v=\" + sq(x)\n}",
+        "fun describe(x: Int): String {\n    return if (x > 0) { \"pos\" } else { \"neg\" }\n}",
+        "fun describe(x: Int): String {\n    return sq(x) - 1\n}",
+        "fun describe(x: Int): Int {\n    counter = counter + x\n    return counter\n}",
+    ],
+    "loop": [
+        "tailrec fun loop(n: Int, acc: Int): Int {\n    if (n == 0) {\n        return acc\n    }\n    return loop(n - 1, acc + sq(n))\n}",
+        "tailrec fun loop(n: Int, acc: Int): Int {\n    return 1 + loop(n, acc)\n}",
+        "fun loop(n: Int, acc: Int): Int {\n    var i = n\n    while (i > 0) {\n        i = i - 1\n    }\n    return acc + i\n}",
+    ],
+    "main": [
+        "fun main() {\n    println(describe(3))\n    println(loop(5, 0))\n}",
+        "fun main() {\n    val d = describe(flag)\n    println(d)\n}",
+        "fun main() {\n    println(missing(1))\n}",
+    ],
+}
+GLOBAL_VARIANTS = [
+    "",
+    "val flag = 1\nvar counter = 0",
+    "val flag = \"no\"\nvar counter = 0",
+    "var flag = true",
+]
+
+
+def render(state) -> str:
+    """Render a program state: (global variant, [(name, variant, blank lines before)])."""
+    globals_index, functions = state
+    parts = [GLOBAL_VARIANTS[globals_index]]
+    for name, variant, padding in functions:
+        parts.append("\n" * padding + FUNCTION_VARIANTS[name][variant])
+    return "\n".join(parts)
+
+
+def random_edit(state, rng: random.Random):
+    """Apply one random edit: change a body/signature, move code, add/remove a function."""
+    globals_index, functions = state
+    functions = list(functions)
+    action = rng.choice(["variant", "variant", "globals", "move", "remove", "add", "duplicate"])
+    if action == "globals":
+        globals_index = rng.randrange(len(GLOBAL_VARIANTS))
+    elif action == "move" and functions:
+        i = rng.randrange(len(functions))
+        name, variant, padding = functions[i]
+        functions[i] = (name, variant, rng.randrange(4))
+    elif action == "remove" and functions:
+        functions.pop(rng.randrange(len(functions)))
+    elif action == "duplicate" and functions:
+        functions.insert(rng.randrange(len(functions) + 1), rng.choice(functions))
+    elif action == "add" or not functions:
+        name = rng.choice(list(FUNCTION_VARIANTS))
+        variant = rng.randrange(len(FUNCTION_VARIANTS[name]))
+        functions.insert(rng.randrange(len(functions) + 1), (name, variant, rng.randrange(3)))
+    else:
+        i = rng.randrange(len(functions))
+        name, _, padding = functions[i]
+        functions[i] = (name, rng.randrange(len(FUNCTION_VARIANTS[name])), padding)
+    return globals_index, functions
+
+
+class TestIncrementalChecker:
+    """Incremental results must match full re-analysis."""
+
+    SOURCE = render((1, [("sq", 0, 0), ("describe", 0, 0), ("loop", 0, 0), ("main", 0, 0)]))
+
+    def test_unchanged_program_reuses_everything(self):
+        """A second run on the same source re-checks nothing."""
+        checker = IncrementalChecker()
+        first = checker.check(parse(self.SOURCE))
+        assert first.rechecked == ["sq", "describe", "loop", "main"]
+        second = checker.check(parse(self.SOURCE))
+        assert second.rechecked == []
+        assert second.reused == ["sq", "describe", "loop", "main"]
+
+    def test_body_change_rechecks_only_that_function(self):
+        """Changing a body without changing the signature stays local."""
+        checker = IncrementalChecker()
+        checker.check(parse(self.SOURCE))
+        edited = render((1, [("sq", 1, 0), ("describe", 0, 0), ("loop", 0, 0), ("main", 0, 0)]))
+        assert checker.check(parse(edited)).rechecked == ["sq"]
+
+    def test_signature_change_rechecks_callers(self):
+        """Changing a signature re-checks functions that use it."""
+        checker = IncrementalChecker()
+        checker.check(parse(self.SOURCE))
+        edited = render((1, [("sq", 2, 0), ("describe", 0, 0), ("loop", 0, 0), ("main", 0, 0)]))
+        result = checker.check(parse(edited))
+        assert result.rechecked == ["sq", "describe", "loop"]
+
+    def test_moved_function_diagnostics_are_shifted(self):
+        """Reused diagnostics follow the function when lines are inserted above."""
+        checker = IncrementalChecker()
+        source = render((1, [("sq", 0, 0), ("main", 2, 0)]))
+        checker.check(parse(source))
+        moved = render((1, [("sq", 0, 3), ("main", 2, 2)]))
+        result = checker.check(parse(moved))
+        assert result.rechecked == []
+        _, expected = full_check(parse(moved))
+        assert messages(result.errors) == messages(expected)
+
+    def test_annotations_do_not_change_fingerprint(self):
+        """Analyses and a run annotate the AST; the function is still reused."""
+        source = ("fun count(n: Int, acc: Int): Int { if (n == 0) { return acc } return count(n - 1, acc + 1) }\n"
+                  "fun main() { var s = 0 var i = 0 while (i < 50) { s = s + i i = i + 1 } "
+                  "println(count(30, s) + i) }")
+        program = parse(source)
+        before = [fingerprint(d) for d in program.declarations if isinstance(d, FunctionDeclaration)]
+        checker = IncrementalChecker()
+        checker.check(program)
+        ScopeAnalysis().analyze(program)
+        TailCallAnalysis().analyze(program)
+        CountedLoopAnalysis().analyze(program)
+        LoopIdiomAnalysis().analyze(program)
+        Evaluator(output=CaptureSink()).evaluate(program)
+        after = [fingerprint(d) for d in program.declarations if isinstance(d, FunctionDeclaration)]
+        assert after == before
+        assert checker.check(program).rechecked == []
+
+    @pytest.mark.parametrize("seed", range(8))
+    def test_random_edit_sequences(self, seed):
+        """After every edit, incremental == fresh analysis (diagnostics, symbols, types)."""
+        rng = random.Random(seed)
+        state = (1, [("sq", 0, 0), ("describe", 0, 0), ("loop", 0, 0), ("main", 0, 0)])
+        checker = IncrementalChecker()
+        reused = 0
+
+        for _ in range(25):
+            state = random_edit(state, rng)
+            source = render(state)
+
+            program = parse(source)
+            incremental = checker.check(program)
+            fresh_program = parse(source)
+            fresh = IncrementalChecker().check(fresh_program)
+            reused += len(incremental.reused)
+
+            assert [str(e) for e in incremental.errors.errors] == [str(e) for e in fresh.errors.errors]
+            assert [str(e) for e in incremental.errors.warnings] == [str(e) for e in fresh.errors.warnings]
+            _, full = full_check(parse(source))
+            assert messages(incremental.errors) == messages(full)
+
+            for key, analysis in fresh.functions.items():
+                cached = incremental.functions[key]
+                assert [(s.name, s.type, s.location) for s in cached.locals] == \
+                       [(s.name, s.type, s.location) for s in analysis.locals]
+
+            for decl, fresh_decl in zip(program.declarations, fresh_program.declarations):
+                nodes = [n for n in walk(decl) if isinstance(n, Expression)]
+                fresh_nodes = [n for n in walk(fresh_decl) if isinstance(n, Expression)]
+                assert [incremental.type_of(n) for n in nodes] == [fresh.type_of(n) for n in fresh_nodes]
+
+        assert reused > 0
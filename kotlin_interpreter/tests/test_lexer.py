@@ -53,6 +53,17 @@ class TestLexerBasics:
         assert len(tokens) == len(expected)
         for token, expected_type in zip(tokens, expected):
             assert token.type == expected_type
+    
+    def test_labels(self):
+        """Test lexing loop labels and break/continue targets."""
+        tokens = Lexer("outer@ while break@outer continue").tokenize()
+        assert [(t.type, t.value) for t in tokens[:-1]] == [
+            (TokenType.LABEL, "outer"),
+            (TokenType.WHILE, "while"),
+            (TokenType.BREAK, "break"),
+            (TokenType.AT_LABEL, "outer"),
+            (TokenType.CONTINUE, "continue"),
+        ]
 
 
 class TestLexerLiterals:
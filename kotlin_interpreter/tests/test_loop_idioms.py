@@ -0,0 +1,146 @@
+"""
+Unit tests for loop idiom recognition and reduction loops summed without running them.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analysis import CountedLoopAnalysis, LoopIdiomAnalysis
+from src.analysis.scopes import ScopeAnalysis
+from src.runtime import Evaluator, ExecutionTimeout
+from src.runtime import reductions
+from src.vm import VM
+
+from tests.helpers import parse, run_engine
+
+
+def idioms(source: str):
+    """Reduction plans of the while loops of a program."""
+    program = parse(source)
+    ScopeAnalysis().analyze(program)
+    CountedLoopAnalysis().analyze(program)
+    return [loop.idiom for loop in LoopIdiomAnalysis().analyze(program)]
+
+
+def loop(term: str, header: str = "var i = -20 while (i < 35)", step: str = "i = i + 1") -> str:
+    """Program accumulating term over a counted loop."""
+    return (f"fun main() {{ val k = 4 var s = 11 {header} {{ s = s + ({term}) {step} }} "
+            f"println(s) println(i) }}")
+
+
+def run(source: str, capsys, **options):
+    """Run on the tree engine; return (output, error, evaluator)."""
+    evaluator = Evaluator(**options)
+    error = None
+    try:
+        evaluator.evaluate(parse(source))
+    except RuntimeError as e:
+        error = f"{type(e).__name__}: {e}"
+    return capsys.readouterr().out, error, evaluator
+
+
+TERMS = [
+    "i * i", "2 * i * i * i - 5 * i + k", "-i", "k * k",
+    "i / 3 + i % 4", "if (i % 3 == 0) 1 else 0",
+    "if (i % 3 == 0 && i > k || i == -7) { i } else { -i / (k + 1) }",
+    "if (!(i < 5)) (i - k) % 7 else 2", "if (i != 0) 100 / i else 0",
+]
+
+
+class TestLoopIdiomAnalysis:
+    """Test which counted loops are reductions."""
+
+    def test_recognized(self):
+        plans = idioms("""
+            fun f(n: Int, k: Int) {
+                var s = 0 var c = 0 var i = 0
+                while (i < n) { s = s + i * k c = (if (i % 2 == 0) 1 else 0) + c s = s - 1 i = i + 1 }
+            }
+        """)
+        plan, = plans
+        assert plan.counter == "i" and plan.targets == ["s", "c"] and plan.inputs == ["k"]
+        assert [acc.sign for acc in plan.accumulations] == [1, 1, -1]
+
+    @pytest.mark.parametrize("body", [
+        "s = s + i println(s)",  # Side effect
+        "s = s + f(i)",  # Call
+        "s = s * 2 + i",  # Not an accumulation
+        "s = s + c c = c + 1",  # Term reads an accumulator
+        "s = s + (if (i > 0) \"x\" else 0)",  # Not an Int term
+        "n = n + 1",  # Accumulates into the bound
+        "val t = i s = s + t",  # Declaration
+    ])
+    def test_rejected(self, body):
+        source = (f"fun f(i: Int): Int {{ return i }}\n"
+                  f"fun g(n: Int) {{ var s = 0 var c = 0 var i = 0 while (i < n) {{ {body} i = i + 1 }} }}")
+        assert idioms(source) == []
+
+
+class TestReductions:
+    """Test the sums against running the loop."""
+
+    @pytest.mark.parametrize("numbers", [range(0, 10), range(-7, 40, 3), range(50, -13, -4), range(5, 5)])
+    def test_progression_sum(self, numbers):
+        coefficients = [3, -2, 0, 5, 1]
+        expected = sum(sum(c * i ** d for d, c in enumerate(coefficients)) for i in numbers)
+        assert reductions.progression_sum(coefficients, numbers) == expected
+
+    @pytest.mark.parametrize("term", TERMS)
+    @pytest.mark.parametrize("header, step", [
+        ("var i = -20 while (i < 35)", "i = i + 1"),
+        ("var i = 40 while (i >= -33)", "i = i - 3"),
+        ("var i = 0 while (i <= 0)", "i = i + 2"),
+        ("var i = 5 while (i < 3)", "i = i + 1"),
+    ])
+    @pytest.mark.parametrize("engine", ["tree", "closure"])
+    def test_same_as_loop(self, term, header, step, engine, capsys):
+        source = loop(term, header, step)
+        output, error, _ = run(source, capsys, engine=engine)
+        assert (output, error) == run_engine(source, capsys, VM)  # The VM runs every iteration
+
+    def test_closed_form_is_exact(self, capsys):
+        output, _, evaluator = run(loop("i * i * i * k", "var i = 0 while (i < 1000000000)"), capsys)
+        assert output == f"{11 + 4 * (999999999 * 1000000000 // 2) ** 2}\n1000000000\n"
+        assert evaluator.reduction_stats() == {"closed form": 1}
+
+    @pytest.mark.parametrize("unboxed", [False, True])
+    def test_division_by_zero_runs_the_loop(self, unboxed, capsys):
+        output, error, evaluator = run(loop("100 / (i - 3)"), capsys, unboxed=unboxed)
+        assert error == "RuntimeError: Division by zero"
+        assert evaluator.reduction_stats() == {}
+
+    def test_non_int_accumulator_runs_the_loop(self, capsys):
+        source = 'fun main() { var s = "" var i = 0 while (i < 3) { s = s + i i = i + 1 } println(s) }'
+        output, error, evaluator = run(source, capsys)
+        assert output == "012\n" and evaluator.reduction_stats() == {}
+
+    def test_vectorized(self, capsys):
+        """With NumPy, non-polynomial terms run on int64 arrays unless they could overflow."""
+        pytest.importorskip("numpy")
+        source = loop("if (i % 3 == 0) i * k else i / 7", "var i = -50000 while (i < 50000)")
+        output, error, evaluator = run(source, capsys)
+        assert (output, error) == run_engine(source, capsys, VM)
+        assert evaluator.reduction_stats() == {"vectorized": 1}
+
+        big = loop("if (i % 2 == 0) i * 3000000000000 * 3000000000000 else 1", "var i = 0 while (i < 1000)")
+        output, error, evaluator = run(big, capsys)
+        assert (output, error) == run_engine(big, capsys, VM)
+        assert evaluator.reduction_stats() == {"scalar": 1}
+
+    def test_scalar_without_numpy(self, capsys, monkeypatch):
+        monkeypatch.setattr(reductions, "numpy", None)
+        source = loop("if (i % 3 == 0) 1 else 0")
+        output, error, evaluator = run(source, capsys)
+        assert (output, error) == run_engine(source, capsys, VM)
+        assert evaluator.reduction_stats() == {"scalar": 1}
+
+    def test_time_limit(self, monkeypatch):
+        """The scalar form honours the time limit."""
+        monkeypatch.setattr(reductions, "numpy", None)
+        evaluator = Evaluator(time_limit=0.05)
+        with pytest.raises(ExecutionTimeout):
+            evaluator.evaluate(parse(loop("if (i % 3 == 0) 1 else 0", "var i = 0 while (i < 1000000000)")))
@@ -0,0 +1,194 @@
+"""
+Unit tests for the call graph, dead-function elimination and inlining.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.parser import FunctionDeclaration, CallExpression, walk
+from src.analysis import CallGraph
+from src.optimizer import Optimizer
+
+from tests.helpers import parse, output_of
+
+
+def function_names(program):
+    """Names of functions declared in a program."""
+    return [d.name for d in program.declarations if isinstance(d, FunctionDeclaration)]
+
+
+class TestCallGraph:
+    """Test call graph construction."""
+    
+    SOURCE = """
+        val g = sq(2)
+        fun sq(x: Int): Int { return x * x }
+        fun unused() { println(1) }
+        fun ev(n: Int): Boolean { if (n == 0) { return true } return od(n - 1) }
+        fun od(n: Int): Boolean { if (n == 0) { return false } return ev(n - 1) }
+        fun main() { println(ev(4)) }
+    """
+    
+    def test_reachability(self):
+        """Functions reachable from main and global initializers."""
+        graph = CallGraph.build(parse(self.SOURCE))
+        assert graph.is_reachable("sq")
+        assert graph.is_reachable("od")
+        assert graph.unreachable() == ["unused"]
+    
+    def test_recursion_and_leaves(self):
+        """Mutual recursion is detected; leaves call no user functions."""
+        graph = CallGraph.build(parse(self.SOURCE))
+        assert graph.is_recursive("ev") and graph.is_recursive("od")
+        assert not graph.is_recursive("sq")
+        assert graph.is_leaf("sq") and graph.is_leaf("unused")
+        assert graph.callers("od") == {"ev"}
+    
+    def test_postorder_is_callees_first(self):
+        """Callees appear before their callers."""
+        graph = CallGraph.build(parse("""
+            fun a(): Int { return b() } fun b(): Int { return c() } fun c(): Int { return 1 }
+        """))
+        order = graph.postorder()
+        assert order.index("c") < order.index("b") < order.index("a")
+
+
+class TestDeadFunctionElimination:
+    """Test removal of unreachable functions."""
+    
+    def test_unreachable_removed(self):
+        """Functions not reachable from main are dropped."""
+        optimizer = Optimizer(inline=False, partial_eval=False)
+        program = optimizer.optimize(parse(TestCallGraph.SOURCE))
+        assert "unused" not in function_names(program)
+        assert optimizer.report.removed_functions == ["unused"]
+    
+    def test_without_main_nothing_removed(self):
+        """Library-style programs keep all functions."""
+        program = Optimizer().optimize(parse("fun a(): Int { return 1 }"))
+        assert function_names(program) == ["a"]
+    
+    def test_input_not_modified(self):
+        """The optimizer works on a copy of the AST."""
+        original = parse(TestCallGraph.SOURCE)
+        Optimizer().optimize(original)
+        assert "unused" in function_names(original)
+
+
+class TestInlining:
+    """Test inlining of small leaf functions."""
+    
+    def assert_same_output(self, source: str, capsys, **options) -> Optimizer:
+        """Optimized program prints exactly what the original prints."""
+        original = parse(source)
+        expected = output_of(original, capsys)
+        optimizer = Optimizer(**options)
+        optimized = optimizer.optimize(original)
+        assert output_of(optimized, capsys) == expected
+        return optimizer
+    
+    def test_expression_form_swapped_arguments(self, capsys):
+        """Parameters are substituted simultaneously."""
+        optimizer = self.assert_same_output("""
+            fun sub(a: Int, b: Int): Int { return a - b }
+            fun main() { val a = 10 val b = 3 println(sub(b, a)) println(sub(a, b)) }
+        """, capsys)
+        assert optimizer.report.inlined_calls == 2
+    
+    def test_block_form_renames_locals(self, capsys):
+        """Callee locals and parameters cannot capture caller variables."""
+        optimizer = self.assert_same_output("""
+            fun mix(a: Int, b: Int): Int { val t = a * 10 return t + b }
+            fun main() {
+                val t = 1
+                val a = 2
+                println(mix(a + 1, t))
+                println(mix(t, a) + t)
+            }
+        """, capsys)
+        assert optimizer.report.inlined_calls == 2
+    
+    def test_argument_side_effects_evaluated_once_in_order(self, capsys):
+        """Non-trivial arguments are bound once, left to right."""
+        self.assert_same_output("""
+            var counter = 0
+            fun next(): Int { counter = counter + 1 println("next " + counter) return counter }
+            fun twice(x: Int): Int { return x + x }
+            fun pair(a: Int, b: Int): Int { return b }
+            fun main() { println(twice(next())) println(pair(next(), next())) }
+        """, capsys)
+    
+    def test_unit_function(self, capsys):
+        """Functions without return are inlined with Unit result."""
+        optimizer = self.assert_same_output("""
+            fun greet(name: String) { println("hi " + name) }
+            fun main() { greet("bob") println(greet("amy")) }
+        """, capsys)
+        assert optimizer.report.inlined_calls == 2
+    
+    def test_recursive_and_early_return_kept(self, capsys):
+        """Recursive functions and early returns are not inlined."""
+        optimizer = self.assert_same_output("""
+            fun fact(n: Int): Int { if (n <= 1) { return 1 } return n * fact(n - 1) }
+            fun sign(x: Int): Int { if (x < 0) { return -1 } return 1 }
+            fun main() { println(fact(5)) println(sign(-4)) }
+        """, capsys, partial_eval=False)
+        reasons = {d.callee: d.reason for d in optimizer.report.inline_decisions if not d.inlined}
+        assert reasons["fact"] == "recursive"
+        assert reasons["sign"] == "early return"
+    
+    def test_expression_form_renames_locals(self, capsys):
+        """A local of the returned expression cannot capture an argument name."""
+        optimizer = self.assert_same_output("""
+            fun f(a: Int): Int { return if (a > 0) { val y = 10 a + y } else 0 }
+            fun main() { val y = 1 println(f(y)) }
+        """, capsys, partial_eval=False)
+        assert [d.reason for d in optimizer.report.inline_decisions] == ["expression form, size 15"]
+
+    def test_return_nested_in_final_return_kept(self, capsys):
+        """A return inside the returned expression leaves the callee, not the caller."""
+        optimizer = self.assert_same_output("""
+            fun g(c: Boolean): Int { return if (c) { return 1 } else 2 }
+            fun main() { var t = true println(g(t)) println("after") }
+        """, capsys, partial_eval=False)
+        assert [d.reason for d in optimizer.report.inline_decisions] == ["early return"]
+
+    def test_shadowed_global_not_inlined(self, capsys):
+        """A callee reading a global is not inlined where a local hides it."""
+        optimizer = self.assert_same_output("""
+            val k = 3
+            fun scale(x: Int): Int { return x * k }
+            fun main() { val k = 100 println(scale(2)) }
+        """, capsys)
+        assert optimizer.report.inlined_calls == 0
+    
+    def test_bottom_up_inlining(self, capsys):
+        """A function becomes a leaf after its callees were inlined."""
+        optimizer = self.assert_same_output("""
+            fun add(a: Int, b: Int): Int { return a + b }
+            fun twice(x: Int): Int { return add(x, x) }
+            fun main() { println(twice(21)) }
+        """, capsys)
+        program = optimizer.optimize(parse("""
+            fun add(a: Int, b: Int): Int { return a + b }
+            fun twice(x: Int): Int { return add(x, x) }
+            fun main() { println(twice(21)) }
+        """))
+        calls = [n.function_name for n in walk(program) if isinstance(n, CallExpression)]
+        assert calls == ["println"]
+        assert function_names(program) == ["main"]
+    
+    def test_size_budget(self, capsys):
+        """Functions above the size limit are kept."""
+        source = """
+            fun big(x: Int): Int { val a = x + 1 val b = a * 2 val c = b - 3 return a + b + c }
+            fun main() { println(big(1)) }
+        """
+        optimizer = Optimizer(max_inline_size=5, partial_eval=False)
+        optimizer.optimize(parse(source))
+        assert optimizer.report.inlined_calls == 0
+        assert optimizer.report.inline_decisions[0].reason.startswith("too large")
@@ -0,0 +1,121 @@
+"""
+Unit tests for output sinks: buffered print/println on every engine.
+"""
+
+import io
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.runtime import Evaluator, OutputSink, CaptureSink
+from src.vm import VM
+from src.codegen import PythonEngine
+
+from tests.helpers import parse
+
+
+ENGINES = {
+    "tree": lambda output: Evaluator(output=output),
+    "closure": lambda output: Evaluator(engine="closure", output=output),
+    "stack": lambda output: Evaluator(engine="stack", output=output),
+    "unboxed": lambda output: Evaluator(unboxed=True, output=output),
+    "vm": lambda output: VM(output=output),
+    "py": lambda output: PythonEngine(cache_dir=None, output=output),
+}
+
+PROGRAM = """
+fun main() {
+    for (i in 0 until 3) { print(i) print(" ") }
+    println()
+    println("done" + true)
+    println(main)
+}
+"""
+
+
+class CountingStream(io.StringIO):
+    """StringIO counting the writes and flushes it receives."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+        self.flushes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+    def flush(self):
+        self.flushes += 1
+
+
+class TestOutputSink:
+    """Test the flush policies."""
+
+    def test_buffered(self):
+        stream = CountingStream()
+        sink = OutputSink(stream, buffer_size=10)
+        for piece in ("abc\n", "def\n"):
+            sink.write(piece)
+        assert stream.getvalue() == "" and sink.size == 8
+        sink.write("ghi")  # Reaches the buffer size
+        assert stream.getvalue() == "abc\ndef\nghi" and stream.writes == 1
+        sink.write("!")
+        sink.flush()
+        sink.flush()
+        assert stream.getvalue() == "abc\ndef\nghi!" and stream.writes == 2
+
+    def test_line_buffered(self):
+        stream = CountingStream()
+        sink = OutputSink(stream, mode="line")
+        sink.write("a")
+        sink.write("b")
+        assert stream.getvalue() == ""
+        sink.write("c\n")
+        assert stream.getvalue() == "abc\n" and (stream.writes, stream.flushes) == (1, 1)
+
+    def test_unbuffered(self):
+        stream = CountingStream()
+        sink = OutputSink(stream, mode="unbuffered")
+        sink.write("a")
+        sink.write("b")
+        assert stream.getvalue() == "ab" and (stream.writes, stream.flushes) == (2, 2)
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            OutputSink(mode="block")
+
+    def test_default_stream_is_looked_up_late(self, capsys):
+        sink = OutputSink()
+        sink.write("late\n")
+        sink.flush()
+        assert capsys.readouterr().out == "late\n"
+
+
+class TestEngineOutput:
+    """Test print/println through the sinks of every engine."""
+
+    @pytest.mark.parametrize("engine", ENGINES)
+    def test_capture_does_not_touch_stdout(self, engine, monkeypatch):
+        monkeypatch.setattr(sys, "stdout", None)  # Any use of sys.stdout fails
+        output = CaptureSink()
+        ENGINES[engine](output).evaluate(parse(PROGRAM))
+        assert output.getvalue() == "0 1 2 \ndonetrue\n<function()>\n"
+
+    @pytest.mark.parametrize("engine", ENGINES)
+    def test_flushed_once_at_exit(self, engine):
+        stream = CountingStream()
+        ENGINES[engine](OutputSink(stream)).evaluate(
+            parse("fun main() { for (i in 0 until 5000) { println(i) } }"))
+        assert stream.getvalue() == "".join(f"{i}\n" for i in range(5000))
+        assert stream.writes == 1
+
+    @pytest.mark.parametrize("engine", ENGINES)
+    def test_flushed_on_error(self, engine):
+        stream = CountingStream()
+        with pytest.raises(RuntimeError, match="Division by zero"):
+            ENGINES[engine](OutputSink(stream)).evaluate(parse('fun main() { println("before") println(1 / 0) }'))
+        assert stream.getvalue() == "before\n"
@@ -0,0 +1,74 @@
+"""
+Unit tests for process-parallel semantic analysis.
+"""
+
+import pickle
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.semantic import ParallelChecker, IncrementalChecker, GlobalSnapshot, SymbolTable
+
+from tests.helpers import parse
+
+
+def make_program(count: int) -> str:
+    """Program with many functions, some of them with errors and warnings."""
+    parts = ["val base = 3", "var counter = 0"]
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            parts.append(f"fun f{i}(x: Int): Int {{ val y = x * base return y + {i} }}")
+        elif kind == 1:
+            parts.append(f"fun f{i}(x: Int): Int {{ return f{i - 1}(x) + \"oops\" }}")
+        elif kind == 2:
+            parts.append(f"tailrec fun f{i}(x: Int): Int {{ return 1 + f{i}(x - 1) }}")
+        else:
+            parts.append(f"fun f{i}(x: Int): Int {{ counter = counter + x return missing{i} }}")
+    parts.append("fun f0(x: Int): Int { return x }")  # Redefinition
+    return "\n".join(parts)
+
+
+def diagnostics(result):
+    """Errors and warnings in reporting order."""
+    return [str(e) for e in result.errors.errors], [str(e) for e in result.errors.warnings]
+
+
+class TestParallelChecker:
+    """Parallel body checking must match the serial analysis exactly."""
+
+    def test_matches_serial_order(self):
+        """Diagnostics are merged in declaration order."""
+        source = make_program(60)
+        parallel = ParallelChecker(max_workers=2, min_functions=0, chunks_per_worker=3)
+        result = parallel.check(parse(source))
+        serial = ParallelChecker(max_workers=1).check(parse(source))
+
+        assert diagnostics(result) == diagnostics(serial)
+        assert diagnostics(result) == diagnostics(IncrementalChecker().check(parse(source)))
+        assert list(result.functions) == list(serial.functions)
+        assert "f0#2" in result.functions
+        assert len(result.errors.errors) == 31 and len(result.errors.warnings) == 30
+
+    def test_expression_types_from_workers(self):
+        """Types computed in workers are available on the result."""
+        program = parse(make_program(8))
+        result = ParallelChecker(max_workers=2, min_functions=0).check(program)
+        ret = program.declarations[2].body.statements[1]
+        assert result.type_of(ret.value).name == "Int"
+
+    def test_small_programs_stay_serial(self):
+        """Below the threshold no processes are started."""
+        checker = ParallelChecker(max_workers=4)
+        checker.check(parse(make_program(10)))
+        assert not checker.used_processes
+
+    def test_snapshot_is_picklable(self):
+        """The global snapshot survives the trip to a worker."""
+        table = SymbolTable()
+        snapshot = pickle.loads(pickle.dumps(GlobalSnapshot.capture(table)))
+        rebuilt = snapshot.to_symbol_table()
+        assert repr(rebuilt.lookup("println")) == repr(table.lookup("println"))
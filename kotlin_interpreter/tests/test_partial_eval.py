@@ -0,0 +1,129 @@
+"""
+Unit tests for partial evaluation of calls with constant arguments.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.parser import FunctionDeclaration, CallExpression, IfStatement, walk
+from src.optimizer import PartialEvaluator
+from src.runtime import Evaluator
+
+from tests.helpers import parse, output_of
+
+
+def specialize(source: str, capsys, **options):
+    """Partially evaluate source; check the output is unchanged."""
+    expected = output_of(parse(source), capsys)
+    evaluator = PartialEvaluator(**options)
+    program = evaluator.specialize(parse(source))
+    assert output_of(program, capsys) == expected
+    return program, evaluator
+
+
+def calls(program, name: str):
+    """Call sites of a function."""
+    return [n for n in walk(program) if isinstance(n, CallExpression) and n.function_name == name]
+
+
+FACTORIAL = """
+fun factorial(n: Int): Int {
+    if (n <= 1) { return 1 }
+    return n * factorial(n - 1)
+}
+"""
+
+
+class TestFolding:
+    """Test replacing pure calls by their results."""
+
+    def test_pure_calls_folded(self, capsys):
+        """factorial(5) and add(5, 3) become literals."""
+        program, evaluator = specialize(FACTORIAL + """
+            fun add(a: Int, b: Int): Int { return a + b }
+            fun main() { println(factorial(5)) println(add(5, 3)) println(add(factorial(3), 1)) }
+        """, capsys)
+        main = program.declarations[-1]
+        assert calls(main, "factorial") == [] and calls(main, "add") == []
+        assert [d.action for d in evaluator.decisions] == ["folded"] * 4
+
+    def test_folded_value_shown_like_println(self, capsys):
+        """Decisions show results as Kotlin prints them, not as Python values."""
+        _, evaluator = specialize("""
+            fun isBig(n: Int): Boolean { return n > 10 }
+            fun greet(name: String): String { return "hi " + name }
+            fun main() { println(isBig(20)) println(greet("abc")) }
+        """, capsys)
+        assert [d.detail.split(",")[0] for d in evaluator.decisions] == ["= true", "= hi abc"]
+
+    def test_global_constants_visibility(self, capsys):
+        """Only constants certainly initialized when the call would run are used."""
+        program, _ = specialize("""
+            val a = 2
+            val b = twice()
+            val c = 5
+            fun twice(): Int { return a * 2 }
+            fun later(): Int { return c + 1 }
+            fun main() { println(b) println(later()) }
+        """, capsys)
+        assert calls(program, "twice") == []
+        # 'c' is declared after user code first runs (in b's initializer)
+        assert len(calls(program, "later")) == 1
+
+    def test_fuel_limits_folding(self, capsys):
+        """Calls that need more fuel than allowed are not folded."""
+        program, evaluator = specialize(FACTORIAL + """
+            fun main() { println(factorial(12)) }
+        """, capsys, fuel=30)
+        assert evaluator.decisions[0].action == "specialized"
+        assert "out of fuel" in evaluator.decisions[0].detail
+
+    def test_runtime_errors_stay_at_runtime(self, capsys):
+        """A call that fails is not folded, so the error still happens when it runs."""
+        source = "fun div(a: Int, b: Int): Int { return a / b }\nfun main() { println(div(1, 0)) }"
+        program = PartialEvaluator().specialize(parse(source))
+        with pytest.raises(RuntimeError, match="Division by zero"):
+            Evaluator().evaluate(program)
+
+
+class TestResiduals:
+    """Test residual functions for calls that cannot be folded."""
+
+    def test_impure_function_specialized(self, capsys):
+        """Constant parameters are substituted and dead branches removed."""
+        program, evaluator = specialize("""
+            fun report(label: String, verbose: Boolean) {
+                if (verbose) { println("details: " + label) } else { println(label) }
+            }
+            fun main() { report("a", true) report("b", false) report("a", true) }
+        """, capsys)
+        names = [d.name for d in program.declarations if isinstance(d, FunctionDeclaration)]
+        assert names == ["report", "report$spec1", "report$spec2", "main"]
+        residual = program.declarations[1]
+        assert residual.parameters == []
+        assert not any(isinstance(n, IfStatement) for n in walk(residual.body))
+        assert [c.function_name for c in calls(program.declarations[-1], "report$spec1")] == ["report$spec1"] * 2
+
+    def test_reassigned_parameter_kept(self, capsys):
+        """Calls are kept when the callee assigns to a parameter."""
+        _, evaluator = specialize("""
+            fun countdown(n: Int) { var i = n while (i > 0) { println(i) i = i - 1 } }
+            fun shout(n: Int) { val n = 3 println(n) }
+            fun main() { countdown(3) shout(1) }
+        """, capsys)
+        actions = {d.callee: d.action for d in evaluator.decisions}
+        assert actions == {"countdown": "specialized", "shout": "kept"}
+
+    def test_recursive_residual(self, capsys):
+        """Residual bodies still call the general function."""
+        program, _ = specialize("""
+            fun countdown(n: Int) { if (n > 0) { println(n) countdown(n - 1) } }
+            fun main() { countdown(3) }
+        """, capsys)
+        residual = program.declarations[1]
+        assert residual.name == "countdown$spec1"
+        assert [c.arguments[0].value for c in calls(residual, "countdown")] == [2]
@@ -0,0 +1,106 @@
+"""
+Unit tests for the Kotlin profiler: calls, times, line hits and exports.
+"""
+
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.runtime import Evaluator, CaptureSink, Profiler
+
+from tests.helpers import parse
+
+
+ENGINES = [{}, {"engine": "closure"}, {"engine": "stack"}, {"unboxed": True}, {"quicken": False}]
+
+PROGRAM = """
+fun fib(n: Int): Int {
+    if (n < 2) {
+        return n
+    }
+    return fib(n - 1) + fib(n - 2)
+}
+
+fun square(x: Int): Int {
+    return x * x
+}
+
+fun main() {
+    var total = 0
+    for (i in 0 until 100) {
+        total = total + square(i)
+    }
+    println(fib(10))
+    println(total)
+}
+"""
+
+
+class FakeClock:
+    """Clock advancing one second per reading."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+
+def profile(source: str, **options) -> Profiler:
+    """Run a program under a profiler."""
+    profiler = Profiler()
+    Evaluator(profiler=profiler, output=CaptureSink(), **options).evaluate(parse(source))
+    return profiler
+
+
+class TestProfiler:
+    """Test recording and reports."""
+
+    @pytest.mark.parametrize("options", ENGINES)
+    def test_calls_and_lines(self, options):
+        profiler = profile(PROGRAM, **options)
+        assert {f.name: f.calls for f in profiler.functions.values()} == {"main": 1, "fib": 177, "square": 100}
+        assert dict(profiler.lines) == {3: 177, 4: 89, 6: 88, 10: 100, 14: 1, 15: 1, 16: 100, 18: 1, 19: 1}
+        assert profiler.hot_lines(1) == [(3, 177)]
+
+    def test_self_and_total_time(self):
+        profiler = Profiler(clock=FakeClock())
+        profiler.enter("main")      # t=1
+        profiler.enter("f")         # t=2
+        profiler.enter("f")         # t=3
+        profiler.exit()             # t=4: inner f 1s
+        profiler.exit()             # t=5: outer f 3s, 2s of it its own
+        profiler.enter("g")         # t=6
+        profiler.exit()             # t=7
+        profiler.exit()             # t=8: main 7s, 3s of it its own
+        f, main, g = (profiler.functions[name] for name in ("f", "main", "g"))
+        assert (f.calls, f.self_time, f.total_time) == (2, 3.0, 3.0)  # Recursion counted once
+        assert (main.self_time, main.total_time, g.total_time) == (3.0, 7.0, 1.0)
+        assert profiler.stacks() == {"main": 3.0, "main;f": 2.0, "main;f;f": 1.0, "main;g": 1.0}
+        assert profiler.to_collapsed() == "main 3000000\nmain;f 2000000\nmain;f;f 1000000\nmain;g 1000000\n"
+
+    @pytest.mark.parametrize("options", [{}, {"engine": "stack"}])
+    def test_frames_closed_on_error(self, options):
+        profiler = Profiler()
+        source = "fun f(n: Int): Int { return 10 / n }\nfun main() { println(f(0)) }"
+        with pytest.raises(RuntimeError, match="Division by zero"):
+            Evaluator(profiler=profiler, output=CaptureSink(), **options).evaluate(parse(source))
+        assert profiler.frames == [] and profiler.functions["f"].calls == 1
+        assert profiler.elapsed > 0
+
+    def test_json_summary(self):
+        summary = json.loads(profile(PROGRAM).to_json())
+        assert {f["name"] for f in summary["functions"]} == {"main", "fib", "square"}
+        assert summary["lines"]["16"] == 100
+        assert set(summary["stacks"]) == {"main", "main;fib", "main;square"} | {
+            "main" + ";fib" * depth for depth in range(2, 11)}
+
+    def test_text_report_shows_source(self):
+        text = profile(PROGRAM).to_text(PROGRAM, limit=3)
+        assert "fib" in text and "square" in text
+        assert "if (n < 2) {" in text and "total = total + square(i)" in text
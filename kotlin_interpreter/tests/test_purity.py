@@ -0,0 +1,152 @@
+"""
+Unit tests for purity analysis and memoization of pure functions.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analysis import PurityAnalysis
+from src.runtime import Evaluator
+from src.runtime.memo import MemoCache
+from src.runtime.runtime_objects import make_int, make_boolean
+
+from tests.helpers import parse
+
+
+FIB = """
+fun fib(n: Int): Int {
+    if (n < 2) {
+        return n
+    }
+    return fib(n - 1) + fib(n - 2)
+}
+
+fun main() {
+    println(fib(30))
+}
+"""
+
+
+class TestPurityAnalysis:
+    """Test effect analysis of user functions."""
+    
+    def test_recursive_function_is_pure(self):
+        """Self-recursion does not make a function impure."""
+        effects = PurityAnalysis().analyze(parse(FIB))
+        assert effects["fib"].is_pure
+        assert effects["fib"].callees == {"fib"}
+        assert not effects["main"].is_pure
+    
+    def test_println_is_impure(self):
+        """Output makes a function impure."""
+        effects = PurityAnalysis().analyze(parse("""
+            fun log(x: Int): Int { println(x) return x }
+        """))
+        assert not effects["log"].is_pure
+        assert "calls 'println'" in effects["log"].reasons
+    
+    def test_global_write_is_impure(self):
+        """Assigning a global variable is an effect; locals are not."""
+        effects = PurityAnalysis().analyze(parse("""
+            var counter = 0
+            fun bump(): Int { counter = counter + 1 return counter }
+            fun local(): Int { var c = 0 c = c + 1 return c }
+        """))
+        assert not effects["bump"].is_pure
+        assert effects["local"].is_pure
+    
+    def test_block_local_does_not_hide_global_write(self):
+        """A local declared in an inner block is out of scope afterwards."""
+        effects = PurityAnalysis().analyze(parse("""
+            var g = 0
+            fun f(): Int { if (true) { var g = 1 } g = 2 return 0 }
+        """))
+        assert not effects["f"].is_pure
+    
+    def test_mutable_global_read_is_impure(self):
+        """Reading a var global makes results depend on program state."""
+        effects = PurityAnalysis().analyze(parse("""
+            val k = 3
+            var v = 3
+            fun a(x: Int): Int { return x * k }
+            fun b(x: Int): Int { return x * v }
+        """))
+        assert effects["a"].is_pure
+        assert not effects["b"].is_pure
+    
+    def test_impurity_propagates_through_calls(self):
+        """Callers of impure functions are impure, transitively."""
+        effects = PurityAnalysis().analyze(parse("""
+            fun leaf(x: Int): Int { println(x) return x }
+            fun mid(x: Int): Int { return leaf(x) }
+            fun top(x: Int): Int { return mid(x) + 1 }
+            fun ok(x: Int): Int { return x + 1 }
+        """))
+        assert not effects["mid"].is_pure
+        assert not effects["top"].is_pure
+        assert effects["ok"].is_pure
+
+
+class TestMemoCache:
+    """Test the LRU cache."""
+    
+    def test_lru_eviction(self):
+        """Least recently used entry is evicted first."""
+        cache = MemoCache("f", max_size=2)
+        cache.put((1,), make_int(1))
+        cache.put((2,), make_int(2))
+        assert cache.get((1,)).value == 1
+        cache.put((3,), make_int(3))
+        assert cache.get((2,)) is None
+        assert cache.get((1,)) is not None
+        assert cache.evictions == 1
+        assert cache.hits == 2
+        assert cache.misses == 1
+    
+    def test_key_distinguishes_types(self):
+        """Int 1 and Boolean true produce different keys."""
+        assert MemoCache.make_key([make_int(1)]) != MemoCache.make_key([make_boolean(True)])
+
+
+class TestMemoizedEvaluation:
+    """Test evaluator memoization mode."""
+    
+    def test_memoized_fib(self, capsys):
+        """Memoized fib produces correct output with cache hits."""
+        evaluator = Evaluator(memoize=True)
+        evaluator.evaluate(parse(FIB))
+        assert capsys.readouterr().out == "832040\n"
+        
+        stats = {entry['function']: entry for entry in evaluator.memo_stats()}
+        assert set(stats) == {"fib"}
+        assert stats["fib"]["misses"] == 31
+        assert stats["fib"]["hits"] == 28
+    
+    def test_memoization_is_opt_in(self):
+        """No caches are created by default."""
+        evaluator = Evaluator()
+        evaluator.evaluate(parse("fun sq(x: Int): Int { return x * x } fun main() { sq(2) }"))
+        assert evaluator.memo_stats() == []
+    
+    def test_per_function_limit(self, capsys):
+        """Per-function limits override the default size."""
+        evaluator = Evaluator(memoize=True, memo_cache_size=100, memo_limits={"fib": 4})
+        evaluator.evaluate(parse(FIB.replace("fib(30)", "fib(15)")))
+        assert capsys.readouterr().out == "610\n"
+        stats = evaluator.memo_stats()[0]
+        assert stats["max_size"] == 4
+        assert stats["size"] <= 4
+    
+    def test_impure_function_not_cached(self, capsys):
+        """Impure functions run every time."""
+        evaluator = Evaluator(memoize=True)
+        evaluator.evaluate(parse("""
+            fun say(x: Int): Int { println(x) return x }
+            fun main() { say(1) say(1) }
+        """))
+        assert capsys.readouterr().out == "1\n1\n"
+        assert evaluator.memo_stats() == []
@@ -0,0 +1,130 @@
+"""
+Unit tests for the Kotlin → Python transpiler and the "py" engine.
+"""
+
+import os
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.runtime import ExecutionTimeout
+from src.codegen import PythonTranspiler, PythonEngine, CodeCache
+
+from tests.helpers import EXAMPLES, parse, assert_same_as_tree
+from tests.test_engines import PROGRAMS
+
+
+def uncached() -> PythonEngine:
+    """A "py" engine that does not use the on-disk code cache."""
+    return PythonEngine(cache_dir=None)
+
+class TestPythonEngine:
+    """Transpiled programs behave exactly like the tree-walker."""
+
+    @pytest.mark.parametrize("path", EXAMPLES, ids=lambda p: p.name)
+    def test_examples(self, path, capsys):
+        """Example programs print the same output."""
+        output, error = assert_same_as_tree(path.read_text(), capsys, uncached)
+        assert error is None and output
+
+    @pytest.mark.parametrize("source", PROGRAMS + [
+        # Hoisted block expressions keep evaluation order
+        "fun main() { var x = 1\n val y = x + if (x > 0) { x = 10\n 5 } else { 0 }\n println(y) println(x) }",
+        "fun main() { var i = 0\n while (if (i < 3) { i = i + 1\n true } else { false }) { println(i) } }",
+        # Function values, undefined assignment, loop value
+        "fun twice(x: Int): Int { return x * 2 }\nfun main() { val h = twice\n println(h(4)) println(h) }",
+        "fun main() { undefinedThing = 3 }",
+        "fun w(): Int { var i = 0\n while (i < 3) { i = i + 1 } }\nfun main() { println(w()) }",
+        "fun f(): Int { return g } val g = f()\nfun main() { }",
+    ])
+    def test_programs(self, source, capsys):
+        """Same output and errors on programs covering every node type."""
+        assert_same_as_tree(source, capsys, uncached)
+
+    def test_kotlin_division(self, capsys):
+        """Int division and remainder truncate toward zero in every engine."""
+        source = "fun main() { println(-7 / 2) println(-7 % 3) println(7 % -3) println(7 / -2) }"
+        output, _ = assert_same_as_tree(source, capsys, uncached)
+        assert output == "-3\n-1\n1\n-3\n"
+
+    def test_error_line(self):
+        """Run-time errors carry the Kotlin line they happened on."""
+        with pytest.raises(RuntimeError) as info:
+            uncached().evaluate(parse("fun main() {\n  val a = 1\n  println(a / 0)\n}"))
+        assert info.value.kotlin_line == 3
+
+    def test_time_limit(self):
+        """Loops honour the time limit."""
+        with pytest.raises(ExecutionTimeout):
+            PythonEngine(time_limit=0.05, cache_dir=None).evaluate(
+                parse("fun main() { var i = 0 while (true) { i = i + 1 } }")
+            )
+
+    def test_code_cache(self, tmp_path, capsys):
+        """The compiled code object is reused from disk; bad entries are ignored."""
+        source = "fun main() { println(42) }"
+        first = PythonEngine(cache_dir=tmp_path)
+        first.evaluate(parse(source))
+        assert not first.cache_hit
+        assert len(list(tmp_path.glob("*.marshal"))) == 1
+
+        second = PythonEngine(cache_dir=tmp_path)
+        second.evaluate(parse(source))
+        assert second.cache_hit
+
+        for entry in tmp_path.glob("*.marshal"):
+            entry.write_bytes(b"garbage")
+        third = PythonEngine(cache_dir=tmp_path)
+        third.evaluate(parse(source))
+        assert not third.cache_hit
+        assert capsys.readouterr().out == "42\n42\n42\n"
+
+    def test_code_cache_is_private(self, tmp_path, monkeypatch, capsys):
+        """The cache directory is created 0700; entries of another user are not loaded."""
+        source = "fun main() { println(42) }"
+        cache_dir = tmp_path / "cache"
+        PythonEngine(cache_dir=cache_dir).evaluate(parse(source))
+        assert cache_dir.stat().st_mode & 0o777 == 0o700
+
+        monkeypatch.setattr(os, "getuid", lambda: cache_dir.stat().st_uid + 1)
+        other = PythonEngine(cache_dir=cache_dir)
+        other.evaluate(parse(source))
+        assert not other.cache_hit
+        assert capsys.readouterr().out == "42\n42\n"
+
+    @pytest.mark.parametrize("body", [
+        "return if (n == 0) acc else loop(n - 1, acc + 1)",
+        "return if (n == 0) { acc } else { val m = n - 1 loop(m, acc + 1) }",
+    ])
+    def test_tail_call_in_returned_if_becomes_loop(self, body, capsys):
+        """Self-calls in the branches of a returned if expression do not grow the stack."""
+        source = f"tailrec fun loop(n: Int, acc: Int): Int {{ {body} }}\nfun main() {{ println(loop(50000, 0)) }}"
+        uncached().evaluate(parse(source))
+        assert capsys.readouterr().out == "50000\n"
+
+
+class TestPythonTranspiler:
+    """Shape of the generated source."""
+
+    def test_shadowing_gets_new_names(self):
+        """Each declaration is its own Python local."""
+        source = PythonTranspiler().transpile(parse("fun main() { val x = 1 { val x = 2 println(x) } println(x) }")).source
+        assert "k_x = 1" in source and "k_x_2 = 2" in source
+
+    def test_typed_locals_use_plain_operators(self):
+        """Int locals compile to Python operators, unknown operands to checked helpers."""
+        source = PythonTranspiler().transpile(parse(
+            "fun f(n: Int): Int { var i = 0 while (i < 10) { i = i + 1 } return n - i }"
+        )).source
+        assert "while (k_i < 10):" in source
+        assert "_sub(k_n, k_i)" in source
+
+    def test_tail_call_becomes_loop(self):
+        """Self-calls in tail position rebind the parameters."""
+        source = PythonTranspiler().transpile(parse(
+            "tailrec fun count(n: Int): Int { if (n == 0) { return 0 } return count(n - 1) }"
+        )).source
+        assert "while True:" in source and "continue" in source
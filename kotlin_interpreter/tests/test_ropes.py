@@ -0,0 +1,87 @@
+"""
+Unit tests for ropes: long Strings built by concatenation.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.runtime import Evaluator, StringValue
+from src.runtime import ropes, unboxed
+from src.runtime.ropes import Rope, concat
+
+from tests.helpers import parse
+
+
+LONG = "x" * ropes.MIN_LENGTH
+
+
+class TestRope:
+    """Test the rope itself."""
+
+    def test_short_results_stay_str(self):
+        assert concat("ab", "cd") == "abcd" and type(concat("ab", "cd")) is str
+        assert type(concat(LONG[1:], "y")) is Rope
+
+    def test_append_shares_chunks(self):
+        a = concat(LONG, "a")
+        b = concat(a, "b")
+        c = concat(b, "c")
+        assert b.chunks is a.chunks is c.chunks
+        assert (str(a), str(b), str(c)) == (LONG + "a", LONG + "ab", LONG + "abc")
+
+    def test_branches_keep_their_text(self):
+        base = concat(LONG, "-")
+        left = concat(base, "left")
+        right = concat(base, "right")  # base's list already holds "left"
+        again = concat(left, "!")
+        assert str(right) == LONG + "-right"
+        assert str(left) == LONG + "-left" and str(again) == LONG + "-left!"
+        assert str(base) == LONG + "-"
+
+    def test_joined_when_observed(self):
+        text = concat(concat(LONG, "a"), "b")
+        assert text.count == 3
+        assert text == LONG + "ab" and hash(text) == hash(LONG + "ab")
+        assert text.count == 1 and len(text) == len(LONG) + 2
+        assert concat(text, "c") == concat(LONG + "a", "bc")
+        assert text != 3 and text != LONG
+
+    def test_small_chunks_are_joined(self):
+        text = LONG
+        for i in range(10000):
+            text = concat(text, "y")
+        assert text.count <= max(ropes.MAX_CHUNKS, text.length // ropes.MIN_CHUNK + 1)
+        assert str(text) == LONG + "y" * 10000
+
+
+class TestStringValues:
+    """Test ropes inside the engines' String values."""
+
+    def test_string_value_joins_on_read(self):
+        value = StringValue(concat(LONG, "z"))
+        assert type(value.text) is Rope
+        assert value.value == LONG + "z" and type(value.text) is str
+        assert value == StringValue(LONG + "z") and str(value) == LONG + "z"
+
+    def test_unboxed_operations(self):
+        text = unboxed.binary_operation("+", LONG, 1)
+        assert type(text) is Rope and unboxed.type_name(text) == "String"
+        assert unboxed.binary_operation("+", 2, text) == "2" + LONG + "1"
+        assert unboxed.binary_operation("==", text, LONG + "1") is True
+        assert unboxed.box(text) == StringValue(LONG + "1") and unboxed.to_text(text) == LONG + "1"
+
+    @pytest.mark.parametrize("options", [{}, {"engine": "closure"}, {"unboxed": True}, {"quicken": False}])
+    def test_concatenation_loop_builds_ropes(self, options, capsys, monkeypatch):
+        """'s = s + x' only appends: the text is joined once, when printed."""
+        joins = []
+        original = Rope.__str__
+        monkeypatch.setattr(Rope, "__str__", lambda self: joins.append(self.count) or original(self))
+        Evaluator(**options).evaluate(parse(
+            'fun main() { var s = "" var i = 0 while (i < 2000) { s = s + "ab" + i i = i + 1 } println(s) }'
+        ))
+        assert capsys.readouterr().out == "".join(f"ab{i}" for i in range(2000)) + "\n"
+        assert len(joins) < 50
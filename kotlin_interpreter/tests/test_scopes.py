@@ -0,0 +1,174 @@
+"""
+Unit tests for scope analysis and scope-free block execution.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.parser import BlockStatement, BlockExpression, walk
+from src.analysis.scopes import ScopeAnalysis
+from src.runtime import Evaluator, Environment
+from src.runtime.environment import EnvironmentPool
+
+from tests.helpers import parse, capture
+
+
+def blocks(func):
+    """Nested blocks of a function, in pre-order (body excluded)."""
+    return [n for n in walk(func.body)
+            if isinstance(n, (BlockStatement, BlockExpression)) and n is not func.body]
+
+
+class TestScopeAnalysis:
+    """Test which blocks need their own scope."""
+
+    def test_blocks_without_declarations_are_flat(self):
+        """Loop and branch bodies that declare nothing run in place."""
+        program = parse("""
+            fun f(n: Int): Int {
+                var i = 0
+                while (i < n) { i = i + 1 }
+                if (i > 2) { println(i) } else { println(0) }
+                return i
+            }
+        """)
+        info = ScopeAnalysis().analyze(program)["f"]
+        assert info.flat_body
+        assert all(not b.needs_scope for b in blocks(program.declarations[0]))
+        assert info.flat_blocks == 3 and info.scoped_blocks == 0
+        assert info.captured == set()
+
+    def test_unique_locals_are_flattened(self):
+        """Locals declared once and used only in their block go in the enclosing frame."""
+        program = parse("""
+            fun f() { var i = 0 while (i < 3) { val sq = i * i println(sq) i = i + 1 } }
+        """)
+        info = ScopeAnalysis().analyze(program)["f"]
+        assert info.flat_locals == {"i", "sq"}
+
+    @pytest.mark.parametrize("source", [
+        # Same name declared twice
+        "fun f() { { val x = 1 println(x) } { val x = 2 println(x) } }",
+        # Shadows a parameter
+        "fun f(x: Int) { while (x > 0) { val x = 0 println(x) } }",
+        # Shadows a global
+        "val x = 5\nfun f() { { val x = 1 println(x) } }",
+        # Referenced outside its block
+        "fun f() { { val x = 1 } println(x) }",
+    ])
+    def test_blocks_needing_scope(self, source):
+        """Blocks whose locals could be observed outside keep their scope."""
+        program = parse(source)
+        ScopeAnalysis().analyze(program)
+        func = program.declarations[-1]
+        assert any(b.needs_scope for b in blocks(func))
+
+    def test_body_shadowing_parameter_keeps_scope(self):
+        """A body local that shadows a parameter needs the body scope."""
+        program = parse("fun f(n: Int): Int { val n = 1 return n }")
+        assert not ScopeAnalysis().analyze(program)["f"].flat_body
+
+
+class TestScopeFreeExecution:
+    """Flattened blocks must behave exactly like scoped ones."""
+
+    def test_allocations_avoided(self):
+        """Every while iteration skips its block allocation."""
+        output, evaluator = capture("""
+            fun main() {
+                var i = 0
+                var total = 0
+                while (i < 10) { val sq = i * i total = total + sq i = i + 1 }
+                println(total)
+            }
+        """)
+        assert output == "285\n"
+        assert evaluator.env_stats() == {'allocated': 0, 'avoided': 11}
+
+    def test_shadowing_in_loops(self):
+        """Scoped blocks still get a fresh scope per iteration."""
+        output, _ = capture("""
+            val x = 100
+            fun main() {
+                var i = 0
+                while (i < 2) {
+                    println(x)
+                    val x = i
+                    println(x)
+                    i = i + 1
+                }
+                println(x)
+            }
+        """)
+        assert output == "100\n0\n100\n1\n100\n"
+
+    def test_tail_recursive_function_with_flat_body(self):
+        """Tail-call iterations start from a clean frame."""
+        output, _ = capture("""
+            tailrec fun count(n: Int, acc: Int): Int {
+                val next = acc + n
+                if (n == 0) { return acc }
+                return count(n - 1, next)
+            }
+            fun main() { println(count(1000, 0)) }
+        """)
+        assert output == "500500\n"
+
+    def test_block_expression_values(self):
+        """Flattened block expressions still produce their last value."""
+        output, _ = capture("""
+            fun pick(c: Boolean): String {
+                val label = if (c) { val a = "yes" a } else { val b = "no" b }
+                return label
+            }
+            fun main() { println(pick(true)) println(pick(false)) }
+        """)
+        assert output == "yes\nno\n"
+
+
+class TestEnvironmentPool:
+    """Call frames and block scopes are recycled."""
+
+    @pytest.mark.parametrize("engine", Evaluator.ENGINES)
+    def test_frames_reused(self, engine, capsys):
+        evaluator = Evaluator(engine=engine)
+        evaluator.evaluate(parse("""
+            fun depth(n: Int): Int { if (n == 0) { return 0 } val next = n - 1 return 1 + depth(next) }
+            fun main() {
+                var i = 0
+                while (i < 5) { val d = depth(20) if (d != 20) { println("wrong") } i = i + 1 }
+                println(depth(20))
+            }
+        """))
+        assert capsys.readouterr().out == "20\n"
+        stats = evaluator.pool_stats()
+        # The deepest recursion needs its frames once; later calls reuse them
+        assert stats['created'] < 50 and stats['reused'] > 100
+
+    def test_released_environment_is_cleared(self):
+        pool = EnvironmentPool()
+        parent = Environment()
+        env = pool.acquire(parent)
+        env.define("x", 1)
+        pool.release(env)
+        again = pool.acquire(None)
+        assert again is env and again.variables == {} and again.parent is None
+
+    def test_pinned_environments_not_recycled(self):
+        """An environment captured by a function (and its parents) stays out of the pool."""
+        pool = EnvironmentPool()
+        outer = pool.acquire(None)
+        inner = pool.acquire(outer)
+        inner.pin()
+        pool.release(inner)
+        pool.release(outer)
+        assert pool.free == []
+
+    def test_limit(self):
+        pool = EnvironmentPool(limit=0)
+        pool.release(pool.acquire(None))
+        assert pool.free == [] and pool.stats() == {'created': 1, 'reused': 0}
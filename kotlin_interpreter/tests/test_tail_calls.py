@@ -0,0 +1,120 @@
+"""
+Unit tests for tail-call detection and tail-call elimination.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.lexer import Lexer, TokenType
+from src.analysis import TailCallAnalysis
+from src.semantic import CollectionPass, SymbolTable, ErrorCollector
+
+from tests.helpers import parse, output_of
+
+
+class TestTailrecSyntax:
+    """Test lexing and parsing of the tailrec modifier."""
+    
+    def test_tailrec_keyword(self):
+        """tailrec is a keyword token."""
+        tokens = Lexer("tailrec fun").tokenize()
+        assert tokens[0].type == TokenType.TAILREC
+        assert tokens[0].is_keyword
+    
+    def test_tailrec_function(self):
+        """tailrec sets the flag on the function declaration."""
+        program = parse("tailrec fun f(n: Int): Int { return f(n) } fun g() { }")
+        assert program.declarations[0].is_tailrec
+        assert not program.declarations[1].is_tailrec
+
+
+class TestTailCallAnalysis:
+    """Test detection of self-calls in tail position."""
+    
+    def test_return_call_is_tail(self):
+        """return f(...) is a tail call; n * f(...) is not."""
+        program = parse("""
+            fun a(n: Int, acc: Int): Int { if (n == 0) { return acc } return a(n - 1, acc * n) }
+            fun b(n: Int): Int { if (n == 0) { return 1 } return n * b(n - 1) }
+        """)
+        results = TailCallAnalysis().analyze(program)
+        assert results["a"].has_tail_calls
+        assert not results["a"].non_tail_calls
+        assert not results["b"].has_tail_calls
+        assert len(results["b"].non_tail_calls) == 1
+    
+    def test_if_expression_branches(self):
+        """Both branches of a returned if expression are tail positions."""
+        program = parse("""
+            fun f(n: Int): Int { return if (n > 10) f(n - 1) else if (n > 0) f(n - 2) else 0 }
+        """)
+        info = TailCallAnalysis().analyze(program)["f"]
+        assert len(info.tail_calls) == 2
+    
+    def test_last_statement_is_tail(self):
+        """A call as the last statement of the body is a tail call."""
+        program = parse("fun loop(n: Int) { if (n > 0) { println(n) loop(n - 1) } }")
+        info = TailCallAnalysis().analyze(program)["loop"]
+        assert len(info.tail_calls) == 1
+    
+    def test_tailrec_warnings(self):
+        """tailrec functions without tail calls produce warnings."""
+        errors = ErrorCollector()
+        CollectionPass(SymbolTable(), errors).collect(parse("""
+            tailrec fun fact(n: Int): Int { if (n <= 1) { return 1 } return n * fact(n - 1) }
+        """))
+        messages = [w.message for w in errors.warnings]
+        assert any("no tail calls" in m for m in messages)
+        assert any("not a tail call" in m for m in messages)
+        assert not errors.has_errors()
+
+
+class TestTailCallElimination:
+    """Test evaluation of tail-recursive functions."""
+    
+    def test_deep_accumulator_recursion(self, capsys):
+        """Accumulator recursion far beyond Python's stack limit."""
+        source = """
+            tailrec fun sumTo(n: Int, acc: Int): Int {
+                if (n == 0) {
+                    return acc
+                }
+                return sumTo(n - 1, acc + n)
+            }
+            fun main() { println(sumTo(20000, 0)) }
+        """
+        assert output_of(parse(source), capsys) == "200010000\n"
+    
+    def test_without_modifier(self, capsys):
+        """Detection is automatic, also without the tailrec modifier."""
+        source = """
+            fun count(n: Int) { if (n > 0) { count(n - 1) } else { println("done") } }
+            fun main() { count(20000) }
+        """
+        assert output_of(parse(source), capsys) == "done\n"
+    
+    def test_locals_are_fresh_each_iteration(self, capsys):
+        """Block locals from a previous iteration do not leak."""
+        source = """
+            fun f(n: Int, acc: String): String {
+                val label = "<" + n + ">"
+                if (n == 0) {
+                    return acc
+                }
+                return f(n - 1, acc + label)
+            }
+            fun main() { println(f(3, "")) }
+        """
+        assert output_of(parse(source), capsys) == "<3><2><1>\n"
+    
+    def test_non_tail_recursion_unchanged(self, capsys):
+        """Ordinary recursion still produces correct results."""
+        source = """
+            fun fact(n: Int): Int { if (n <= 1) { return 1 } return n * fact(n - 1) }
+            fun main() { println(fact(10)) }
+        """
+        assert output_of(parse(source), capsys) == "3628800\n"
@@ -0,0 +1,79 @@
+"""
+Unit tests for the tiered engine: promotion of hot functions and loops.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.runtime import ExecutionTimeout
+
+from tests.helpers import EXAMPLES, capture
+from tests.test_engines import PROGRAMS, run
+
+
+HOT_LOOP = """
+fun square(x: Int): Int {
+    return x * x
+}
+
+fun main() {
+    var i = 0
+    var total = 0
+    while (i < 50) {
+        if (i == 40) { break }
+        i = i + 1
+        if (i % 2 == 0) { continue }
+        total = total + square(i)
+    }
+    for (k in 0 until 30) {
+        total = total + k
+    }
+    println(total)
+}
+"""
+
+
+class TestTieredEngine:
+    """Test promotions and that they do not change results."""
+
+    @pytest.mark.parametrize("threshold", [1, 3])
+    @pytest.mark.parametrize("source", PROGRAMS + [path.read_text() for path in EXAMPLES])
+    def test_same_output_as_tree(self, source, threshold, capsys):
+        """Same output and errors whichever code gets promoted (memoized to keep fibonacci fast)."""
+        expected = run(source, "tree", capsys, memoize=True)
+        assert run(source, "tiered", capsys, memoize=True, tier_threshold=threshold) == expected
+
+    def test_hot_function_promoted(self):
+        output, evaluator = capture(HOT_LOOP, engine="tiered", tier_threshold=5)
+        assert output == capture(HOT_LOOP)[0]
+        function = next(p for p in evaluator.tier_stats() if p.kind == "function")
+        assert (function.name, function.line, function.calls) == ("square", 2, 5)
+        assert evaluator.global_env.get("square").compiled is not None
+        assert evaluator.global_env.get("main").compiled is None  # Called once
+
+    def test_running_loops_replaced(self):
+        _, evaluator = capture(HOT_LOOP, engine="tiered", tier_threshold=5)
+        loops = [p for p in evaluator.tier_stats() if p.kind == "loop"]
+        assert [(p.name, p.line, p.back_edges) for p in loops] == [("main", 9, 5), ("main", 15, 5)]
+        assert [p.kind for p in evaluator.tier_stats()] == ["loop", "function", "loop"]
+
+    def test_nothing_promoted_below_threshold(self):
+        output, evaluator = capture(HOT_LOOP, engine="tiered")
+        assert output == capture(HOT_LOOP)[0] and evaluator.tier_stats() == []
+
+    def test_recursion_switches_tier(self):
+        source = "fun fib(n: Int): Int { if (n < 2) { return n } return fib(n - 1) + fib(n - 2) }\n" \
+                 "fun main() { println(fib(15)) }"
+        output, evaluator = capture(source, engine="tiered", tier_threshold=100)
+        assert output == "610\n"
+        assert [(p.name, p.calls) for p in evaluator.tier_stats()] == [("fib", 100)]
+
+    def test_time_limit(self):
+        """A promoted loop still stops at the time limit."""
+        with pytest.raises(ExecutionTimeout):
+            capture("fun main() { var i = 0 while (true) { i = i + 1 } }",
+                    engine="tiered", tier_threshold=10, time_limit=0.05)
@@ -0,0 +1,84 @@
+"""
+Unit tests for the bytecode compiler and VM: same output and errors as the tree-walker.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.runtime import ExecutionTimeout
+from src.vm import VM, Op, BytecodeCompiler, disassemble_module
+
+from tests.helpers import EXAMPLES, parse, assert_same_as_tree
+from tests.test_engines import PROGRAMS
+
+
+class TestVM:
+    """The VM behaves exactly like the tree-walker."""
+
+    @pytest.mark.parametrize("path", EXAMPLES, ids=lambda p: p.name)
+    def test_examples(self, path, capsys):
+        """Example programs print the same output."""
+        output, error = assert_same_as_tree(path.read_text(), capsys, VM)
+        assert error is None and output
+
+    @pytest.mark.parametrize("source", PROGRAMS + [
+        # Global initialized after use, call through a local function value
+        "fun f(): Int { return g } val g = f()\nfun main() { }",
+        "fun twice(x: Int): Int { return x * 2 }\nfun main() { val h = twice\n println(h(4)) }",
+        'fun main() { println("n=" + 1 + true) print("a") print("b") println() }',
+    ])
+    def test_programs(self, source, capsys):
+        """Same output and errors on programs covering every node type."""
+        assert_same_as_tree(source, capsys, VM)
+
+    def test_deep_recursion(self, capsys):
+        """Calls do not use the Python stack."""
+        VM().evaluate(parse("""
+            fun depth(n: Int): Int { if (n == 0) { return 0 } return 1 + depth(n - 1) }
+            fun main() { println(depth(50000)) }
+        """))
+        assert capsys.readouterr().out == "50000\n"
+
+    def test_recursion_limit(self):
+        """Runaway recursion stops at max_depth."""
+        with pytest.raises(RecursionError):
+            VM(max_depth=1000).evaluate(parse("fun f(n: Int): Int { return 1 + f(n) } fun main() { f(0) }"))
+
+    def test_tail_call_reuses_frame(self, capsys):
+        """Self-calls in tail position compile to TAIL_CALL and run in constant depth."""
+        source = """
+            tailrec fun count(n: Int, acc: Int): Int { if (n == 0) { return acc } return count(n - 1, acc + 1) }
+            fun main() { println(count(200000, 0)) }
+        """
+        module = BytecodeCompiler().compile(parse(source))
+        assert Op.TAIL_CALL in module.functions["count"].code
+        VM(max_depth=10).evaluate(parse(source))
+        assert capsys.readouterr().out == "200000\n"
+
+    def test_time_limit(self):
+        """Loops honour the time limit."""
+        with pytest.raises(ExecutionTimeout):
+            VM(time_limit=0.05).evaluate(parse("fun main() { var i = 0 while (true) { i = i + 1 } }"))
+
+    def test_disassemble(self):
+        """The disassembler names opcodes, locals, globals and jump targets."""
+        module = BytecodeCompiler().compile(parse(
+            "fun loop(n: Int): Int { var i = 0 while (i < n) { i = i + 1 } return i }"
+        ))
+        text = disassemble_module(module)
+        assert "== loop(n)" in text
+        assert "STORE_LOCAL" in text and "(i)" in text
+        assert "LOOP" in text and ">>" in text
+
+    def test_fused_conditions(self):
+        """'a < b && c' conditions branch with COMPARE_JUMP; && in values short-circuits."""
+        module = BytecodeCompiler().compile(parse(
+            "fun f(n: Int): Boolean { var i = 0 while (i < n && i != 5) { i = i + 1 } return i > 2 && n > 0 }"
+        ))
+        text = disassemble_module(module)
+        assert text.count("COMPARE_JUMP") == 2 and "unless LT" in text and "unless NE" in text
+        assert "JUMP_IF_FALSE" not in text and "AND_JUMP" in text